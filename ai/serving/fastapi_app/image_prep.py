@@ -0,0 +1,155 @@
+"""
+모델 입력 이미지 전처리(Pillow)
+- 페르소나/스타일 참조 이미지(/chat/image)와 캡션 대상 이미지(/caption/generate)를 원본(수 MB PNG 등) 그대로
+  Gemini에 보내지 않도록, 긴 변을 INPUT_IMAGE_MAX_EDGE 이하로 줄이고 메타데이터(EXIF 등)를 제거해
+  INPUT_IMAGE_FORMAT/INPUT_IMAGE_QUALITY로 다시 인코딩합니다.
+- EXIF 회전 정보는 인코딩 전에 픽셀에 반영합니다(메타데이터를 지워도 방향 유지).
+- 줄일 필요가 없고 재인코딩 결과가 더 크면 원본을 그대로 씁니다.
+- 결과는 ref_images 캐시에 전처리 설정(variant)별로 함께 저장됩니다.
+- 처리량/절감 바이트/처리 시간은 /__metrics 의 image_prep 항목.
+
+Env
+- INPUT_IMAGE_PREP_ENABLED (default 1)
+- INPUT_IMAGE_MAX_EDGE (default 1536)
+- INPUT_IMAGE_FORMAT (default webp; webp | jpeg | png)
+- INPUT_IMAGE_QUALITY (default 85)
+
+벤치마크: python -m ai.serving.fastapi_app.image_prep <image files...>
+"""
+from __future__ import annotations
+import io
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except Exception:
+    Image = None  # type: ignore
+    ImageOps = None  # type: ignore
+
+log = logging.getLogger("ai-image-prep")
+
+_FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg"), "png": ("PNG", "image/png")}
+
+_stats: Dict[str, Any] = {
+    "processed": 0,
+    "resized": 0,
+    "kept_original": 0,
+    "failed": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+}
+
+
+def _settings() -> Tuple[int, str, int]:
+    try:
+        edge = max(64, int(os.getenv("INPUT_IMAGE_MAX_EDGE", "1536") or 1536))
+    except Exception:
+        edge = 1536
+    fmt = (os.getenv("INPUT_IMAGE_FORMAT", "webp") or "webp").strip().lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    if fmt not in _FORMATS:
+        fmt = "webp"
+    try:
+        quality = min(100, max(1, int(os.getenv("INPUT_IMAGE_QUALITY", "85") or 85)))
+    except Exception:
+        quality = 85
+    return edge, fmt, quality
+
+
+def prep_enabled() -> bool:
+    if Image is None:
+        return False
+    return (os.getenv("INPUT_IMAGE_PREP_ENABLED", "1") or "1").strip().lower() in ("1", "true", "yes")
+
+
+def variant() -> str:
+    """캐시 키 접미사: 설정이 바뀌면 다른 항목으로 저장."""
+    edge, fmt, quality = _settings()
+    return f"prep:{edge}:{fmt}:{quality}"
+
+
+def prepare_image(data: bytes, mime: str) -> Tuple[bytes, str]:
+    """(bytes, mime) → 축소/재인코딩된 (bytes, mime). CPU 작업이므로 이벤트 루프 밖(to_thread)에서 호출.
+    디코딩 실패 등은 원본을 그대로 돌려줍니다.
+    """
+    if not data or not prep_enabled():
+        return data, mime
+    edge, fmt, quality = _settings()
+    t0 = time.perf_counter()
+    try:
+        with Image.open(io.BytesIO(data)) as src:
+            img = ImageOps.exif_transpose(src)
+            resized = max(img.size) > edge
+            if resized:
+                img.thumbnail((edge, edge), Image.LANCZOS)
+            pil_fmt, out_mime = _FORMATS[fmt]
+            has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+            if pil_fmt == "JPEG":
+                if has_alpha:
+                    rgba = img.convert("RGBA")
+                    bg = Image.new("RGB", rgba.size, (255, 255, 255))
+                    bg.paste(rgba, mask=rgba.getchannel("A"))
+                    img = bg
+                elif img.mode != "RGB":
+                    img = img.convert("RGB")
+            elif img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if has_alpha else "RGB")
+            buf = io.BytesIO()
+            # exif/icc 를 넘기지 않으므로 메타데이터는 저장되지 않음
+            if pil_fmt == "PNG":
+                img.save(buf, format=pil_fmt, optimize=True)
+            elif pil_fmt == "WEBP":
+                img.save(buf, format=pil_fmt, quality=quality, method=4)
+            else:
+                img.save(buf, format=pil_fmt, quality=quality, optimize=True, progressive=True)
+            out = buf.getvalue()
+    except Exception as e:
+        _stats["failed"] += 1
+        log.warning("input image prep failed, using original: %s", e)
+        return data, mime
+    ms = (time.perf_counter() - t0) * 1000.0
+    _stats["processed"] += 1
+    _stats["total_ms"] += ms
+    _stats["max_ms"] = max(_stats["max_ms"], round(ms, 1))
+    _stats["bytes_in"] += len(data)
+    if not resized and len(out) >= len(data):
+        _stats["kept_original"] += 1
+        _stats["bytes_out"] += len(data)
+        return data, mime
+    if resized:
+        _stats["resized"] += 1
+    _stats["bytes_out"] += len(out)
+    return out, out_mime
+
+
+def image_prep_stats() -> Dict[str, Any]:
+    edge, fmt, quality = _settings()
+    n = _stats["processed"]
+    return {
+        **_stats,
+        "total_ms": round(_stats["total_ms"], 1),
+        "avg_ms": round(_stats["total_ms"] / n, 1) if n else 0.0,
+        "bytes_saved": _stats["bytes_in"] - _stats["bytes_out"],
+        "enabled": prep_enabled(),
+        "max_edge": edge,
+        "format": fmt,
+        "quality": quality,
+    }
+
+
+if __name__ == "__main__":
+    # 간단 벤치마크: 파일별 원본/전처리 크기와 처리 시간
+    for path in sys.argv[1:]:
+        with open(path, "rb") as f:
+            raw = f.read()
+        t = time.perf_counter()
+        out, out_mime = prepare_image(raw, "image/png")
+        print(f"{path}: {len(raw)} -> {len(out)} bytes ({out_mime}), {(time.perf_counter() - t) * 1000:.1f} ms")
+    print(image_prep_stats())
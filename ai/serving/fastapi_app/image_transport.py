@@ -0,0 +1,45 @@
+"""
+생성 이미지 전송 형식 (backend ↔ AI)
+- 기본(JSON): {"ok": true, "prompt": ..., "image": "data:<mime>;base64,..."} — 기존 클라이언트 호환
+- 바이너리: 요청 Accept 헤더에 image/* 또는 application/octet-stream 이 있으면
+  이미지 원본 바이트를 응답 본문으로 그대로 보내고 메타데이터는 헤더로 전달합니다.
+    Content-Type          : image/png 등 실제 MIME
+    X-Image-Prompt-B64    : 생성 프롬프트(UTF-8 → base64url, 길면 생략)
+  base64 인코딩(+33%)과 대용량 JSON 파싱 없이 백엔드가 바로 S3에 올릴 수 있습니다.
+"""
+from __future__ import annotations
+import base64
+from typing import Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+PROMPT_HEADER = "X-Image-Prompt-B64"
+# 응답 헤더 크기 제한(h11 기본 16KB)을 넘지 않도록 프롬프트 헤더 길이를 제한
+_MAX_PROMPT_HEADER = 8000
+
+
+def wants_binary(request: Optional[Request]) -> bool:
+    """Accept 헤더가 이미지/옥텟 스트림을 요청하면 True."""
+    if request is None:
+        return False
+    accept = (request.headers.get("accept") or "").lower()
+    for item in accept.split(","):
+        media = item.split(";", 1)[0].strip()
+        if media.startswith("image/") or media == "application/octet-stream":
+            return True
+    return False
+
+
+def to_data_uri(data: bytes, mime: str) -> str:
+    return f"data:{mime or 'image/png'};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+def image_response(data: bytes, mime: str, prompt: Optional[str] = None) -> Response:
+    """이미지 바이트를 그대로 담은 응답(메타데이터는 헤더)."""
+    headers: Dict[str, str] = {"X-Image-Bytes": str(len(data)), "Cache-Control": "no-store"}
+    if prompt:
+        enc = base64.urlsafe_b64encode(prompt.encode("utf-8")).decode("ascii")
+        if len(enc) <= _MAX_PROMPT_HEADER:
+            headers[PROMPT_HEADER] = enc
+    return Response(content=bytes(data), media_type=mime or "image/png", headers=headers)
@@ -15,6 +15,10 @@ if _ROOT not in sys.path:
 	sys.path.insert(0, _ROOT)
 load_dotenv(dotenv_path=os.path.join(_ROOT, ".env"), override=True)
 
+from ai.serving.fastapi_app.model_pool import model_pool_stats, shutdown_model_pool
+from ai.serving.fastapi_app.session_memory import session_memory_stats
+from ai.serving.fastapi_app.image_prep import image_prep_stats
+from ai.serving.fastapi_app.ref_images import close_ref_image_client, ref_image_stats
 from ai.serving.fastapi_app.routes.image_model import router as image_router
 try:
 	from ai.serving.fastapi_app.routes.caption import router as caption_router
@@ -51,3 +55,24 @@ except Exception as e:
 def __routes():
 	# quick route list for debugging
 	return sorted([getattr(r, "path", "") for r in app.router.routes])
+
+
+@app.get("/__metrics")
+def __metrics():
+	# model lane concurrency / queue depth (image generation vs. reply traffic)
+	return {
+		"model_lanes": model_pool_stats(),
+		"session_memory": session_memory_stats(),
+		"ref_images": ref_image_stats(),
+		"image_prep": image_prep_stats(),
+	}
+
+
+@app.on_event("shutdown")
+def _shutdown_model_pool():
+	shutdown_model_pool()
+
+
+@app.on_event("shutdown")
+async def _close_ref_image_client():
+	await close_ref_image_client()
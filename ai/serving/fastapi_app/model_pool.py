@@ -0,0 +1,172 @@
+"""
+Gemini 호출 실행기 (레인별 동시성 제한)
+- async 핸들러에서 동기 SDK(client.models.generate_content)를 직접 부르면 이벤트 루프가
+  이미지 생성 내내 멈춰 /comment/reply, /health까지 같이 지연됩니다.
+- 여기서는 SDK의 async API(client.aio)를 우선 사용하고, 없으면 제한된 스레드 풀로 넘깁니다.
+- 레인(text/reply/image)마다 세마포어를 따로 두어 이미지 생성이 댓글 답글 트래픽을 굶기지 않게 합니다.
+
+Env
+- AI_CONCURRENCY_TEXT  (default 8)  : /chat, /caption, 메타 프롬프트 생성
+- AI_CONCURRENCY_REPLY (default 8)  : /comment/reply (스케줄러 자동 답글)
+- AI_CONCURRENCY_IMAGE (default 2)  : /chat/image, /predict 이미지 생성
+- AI_SDK_THREADS       (default 8)  : async API가 없을 때 쓰는 스레드 풀 크기
+"""
+from __future__ import annotations
+import asyncio
+import functools
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+log = logging.getLogger("ai-model-pool")
+
+_LANE_DEFAULTS = {"text": 8, "reply": 8, "image": 2}
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+class _Lane:
+    __slots__ = ("name", "limit", "sem", "waiting", "running", "completed", "failed", "wait_ms_max")
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.sem = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_ms_max = 0.0
+
+
+_lanes: Dict[str, _Lane] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_lane(name: str) -> _Lane:
+    lane = _lanes.get(name)
+    if lane is None:
+        default = _LANE_DEFAULTS.get(name, 4)
+        lane = _Lane(name, _env_int(f"AI_CONCURRENCY_{name.upper()}", default))
+        _lanes[name] = lane
+    return lane
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_env_int("AI_SDK_THREADS", 8), thread_name_prefix="gemini-sdk"
+        )
+    return _executor
+
+
+@asynccontextmanager
+async def model_slot(lane_name: str) -> AsyncIterator[None]:
+    """레인의 동시 실행 슬롯을 하나 점유합니다. 대기 중인 요청 수는 queue depth로 집계됩니다."""
+    lane = _get_lane(lane_name)
+    lane.waiting += 1
+    t0 = time.perf_counter()
+    try:
+        await lane.sem.acquire()
+    finally:
+        lane.waiting -= 1
+    waited_ms = (time.perf_counter() - t0) * 1000.0
+    if waited_ms > lane.wait_ms_max:
+        lane.wait_ms_max = waited_ms
+    lane.running += 1
+    try:
+        yield
+        lane.completed += 1
+    except BaseException:
+        lane.failed += 1
+        raise
+    finally:
+        lane.running -= 1
+        lane.sem.release()
+
+
+async def run_blocking(lane_name: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """동기 함수를 레인 슬롯 안에서 스레드 풀로 실행합니다."""
+    async with model_slot(lane_name):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+async def generate_content(client: Any, lane_name: str, **kwargs: Any) -> Any:
+    """`client.models.generate_content(**kwargs)`의 비동기 버전(레인 동시성 제한 적용)."""
+    aio = getattr(client, "aio", None)
+    if aio is not None:
+        async with model_slot(lane_name):
+            return await aio.models.generate_content(**kwargs)
+    return await run_blocking(lane_name, client.models.generate_content, **kwargs)
+
+
+async def generate_content_stream(client: Any, lane_name: str, **kwargs: Any) -> AsyncIterator[Any]:
+    """`generate_content_stream`의 비동기 버전. 청크를 받는 즉시 내보내며, 스트림이 끝날 때까지 레인 슬롯을 점유합니다.
+    async API가 없으면 동기 스트림을 스레드 풀에서 돌려 큐로 넘깁니다.
+    """
+    aio = getattr(client, "aio", None)
+    async with model_slot(lane_name):
+        if aio is not None:
+            stream = await aio.models.generate_content_stream(**kwargs)
+            async for chunk in stream:
+                yield chunk
+            return
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def _pump() -> None:
+            try:
+                for chunk in client.models.generate_content_stream(**kwargs):
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except BaseException as e:  # 소비 측에서 다시 발생
+                loop.call_soon_threadsafe(queue.put_nowait, e)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        fut = loop.run_in_executor(_get_executor(), _pump)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # 소비자가 중간에 끊어도 스레드는 스트림을 끝까지 읽고 종료(결과는 버림)
+            fut.add_done_callback(lambda f: f.exception())
+
+
+def model_pool_stats() -> Dict[str, Any]:
+    """레인별 한도/실행 중/대기(queue depth)/누적 처리 수."""
+    for name in _LANE_DEFAULTS:
+        _get_lane(name)
+    return {
+        name: {
+            "limit": lane.limit,
+            "running": lane.running,
+            "queue_depth": lane.waiting,
+            "completed": lane.completed,
+            "failed": lane.failed,
+            "wait_ms_max": round(lane.wait_ms_max, 3),
+        }
+        for name, lane in _lanes.items()
+    }
+
+
+def shutdown_model_pool() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
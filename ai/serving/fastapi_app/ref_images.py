@@ -0,0 +1,348 @@
+"""
+참조 이미지(페르소나/스타일/캡션 대상) 다운로드 캐시
+- /chat/image, /caption/generate 가 매 요청 같은 S3 객체를 서명만 다른 프리사인 URL로 다시 받던 것을 캐시합니다.
+- 캐시 키: 백엔드가 보낸 S3 오브젝트 키(+ETag). 키가 없으면 프리사인 URL(X-Amz-*/Signature 쿼리)의
+  호스트+경로(쿼리 제외). 그 외 URL과 data URI는 캐시하지 않습니다.
+  ETag가 있으면 내용이 바뀌지 않으므로 만료 없이, 없으면 REF_IMAGE_CACHE_UNVERIFIED_TTL_SECONDS 동안만 사용합니다.
+- 메모리 계층(LRU, 바이트 상한) → 디스크 계층(파일, 바이트 상한, 오래된 것부터 삭제) → 다운로드 순.
+  같은 키의 동시 다운로드는 한 번으로 합칩니다. 다운로드는 공유 httpx 클라이언트(keep-alive)를 씁니다.
+- 모델 입력용 전처리(prepare=True, image_prep.py) 결과도 같은 계층에 설정별 키로 저장합니다.
+- 적중률/절약 바이트는 /__metrics 의 ref_images 항목.
+
+Env
+- REF_IMAGE_CACHE_ENABLED (default 1)
+- REF_IMAGE_CACHE_MEMORY_MB (default 64)
+- REF_IMAGE_CACHE_DISK_MB (default 512, 0이면 디스크 계층 없음)
+- REF_IMAGE_CACHE_DIR (default <tmp>/selfstar-ref-images)
+- REF_IMAGE_CACHE_UNVERIFIED_TTL_SECONDS (default 600)
+- REF_IMAGE_FETCH_TIMEOUT (default 20)
+"""
+from __future__ import annotations
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from ai.serving.fastapi_app.image_prep import prep_enabled, prepare_image, variant
+
+log = logging.getLogger("ai-ref-images")
+
+
+class ImageFetchError(Exception):
+    """잘못된 data URI / 다운로드 실패(호출 측에서 400으로 변환)."""
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def _enabled() -> bool:
+    return (os.getenv("REF_IMAGE_CACHE_ENABLED", "1") or "1").strip().lower() in ("1", "true", "yes")
+
+
+# (bytes, mime, expires_at or None)
+_Entry = Tuple[bytes, str, Optional[float]]
+_mem: "OrderedDict[str, _Entry]" = OrderedDict()
+_mem_bytes = 0
+_inflight: Dict[str, "asyncio.Future[Tuple[bytes, str]]"] = {}
+_disk_bytes: Optional[int] = None
+_client: Optional[httpx.AsyncClient] = None
+
+_stats: Dict[str, Any] = {
+    "requests": 0,
+    "hits_memory": 0,
+    "hits_disk": 0,
+    "misses": 0,
+    "uncacheable": 0,
+    "bytes_saved": 0,
+    "bytes_fetched": 0,
+    "evictions_memory": 0,
+    "evictions_disk": 0,
+}
+
+
+def cache_key(url: str, object_key: Optional[str] = None, etag: Optional[str] = None) -> Tuple[Optional[str], bool]:
+    """(캐시 키, 내용 검증 여부). 캐시할 수 없으면 (None, False)."""
+    if object_key:
+        if etag:
+            return f"obj:{object_key}#{etag.strip(chr(34))}", True
+        return f"obj:{object_key}", False
+    try:
+        parts = urlsplit(url)
+    except Exception:
+        return None, False
+    q = (parts.query or "").lower()
+    if "x-amz-signature=" in q or "signature=" in q:
+        # 프리사인 서명/만료 쿼리는 무시 — 버킷 경로가 곧 오브젝트 키
+        return f"url:{parts.netloc}{parts.path}", False
+    return None, False
+
+
+def _decode_data_uri(uri: str, default_mime: str) -> Tuple[bytes, str]:
+    try:
+        head, b64 = uri.split(",", 1)
+        mime = default_mime
+        prefix = head.split(";")[0]
+        if prefix.startswith("data:") and len(prefix) > 5:
+            mime = prefix[len("data:"):]
+        return base64.b64decode(b64), mime
+    except Exception as e:
+        raise ImageFetchError(f"invalid_data_uri: {e}")
+
+
+def _get_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=_env_num("REF_IMAGE_FETCH_TIMEOUT", 20.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def _download(url: str, default_mime: str) -> Tuple[bytes, str]:
+    try:
+        r = await _get_client().get(url)
+        r.raise_for_status()
+    except Exception as e:
+        raise ImageFetchError(f"failed_to_fetch_image: {e}")
+    mime = (r.headers.get("content-type") or default_mime).split(";")[0]
+    _stats["bytes_fetched"] += len(r.content)
+    return r.content, mime
+
+
+# ===== memory tier =====
+
+def _mem_get(key: str) -> Optional[Tuple[bytes, str]]:
+    global _mem_bytes
+    e = _mem.get(key)
+    if e is None:
+        return None
+    if e[2] is not None and e[2] < time.monotonic():
+        _mem.pop(key, None)
+        _mem_bytes -= len(e[0])
+        return None
+    _mem.move_to_end(key)
+    return e[0], e[1]
+
+
+def _mem_put(key: str, data: bytes, mime: str, expires: Optional[float]) -> None:
+    global _mem_bytes
+    limit = int(_env_num("REF_IMAGE_CACHE_MEMORY_MB", 64) * 1024 * 1024)
+    if len(data) > limit:
+        return
+    old = _mem.pop(key, None)
+    if old is not None:
+        _mem_bytes -= len(old[0])
+    _mem[key] = (data, mime, expires)
+    _mem_bytes += len(data)
+    while _mem_bytes > limit and _mem:
+        _, ev = _mem.popitem(last=False)
+        _mem_bytes -= len(ev[0])
+        _stats["evictions_memory"] += 1
+
+
+# ===== disk tier =====
+
+def _disk_dir() -> str:
+    return os.getenv("REF_IMAGE_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "selfstar-ref-images")
+
+
+def _disk_limit() -> int:
+    return int(_env_num("REF_IMAGE_CACHE_DISK_MB", 512) * 1024 * 1024)
+
+
+def _disk_paths(key: str) -> Tuple[str, str]:
+    h = hashlib.sha256(key.encode("utf-8")).hexdigest()
+    base = os.path.join(_disk_dir(), h[:2], h)
+    return base + ".bin", base + ".json"
+
+
+def _disk_read(key: str) -> Optional[Tuple[bytes, str]]:
+    data_path, meta_path = _disk_paths(key)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("key") != key:
+            return None
+        # 검증 안 된 항목은 wall clock 기준 만료(프로세스 재시작 후에도 유지)
+        if meta.get("expires_at") and float(meta["expires_at"]) < time.time():
+            return None
+        with open(data_path, "rb") as f:
+            data = f.read()
+        os.utime(data_path, None)  # LRU 근사: 최근 사용 시각 갱신
+        return data, str(meta.get("mime") or "image/jpeg")
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        log.debug("ref image disk read failed: %s", e)
+        return None
+
+
+def _scan_disk() -> int:
+    total = 0
+    for root, _dirs, files in os.walk(_disk_dir()):
+        for name in files:
+            if name.endswith(".bin"):
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    pass
+    return total
+
+
+def _evict_disk(limit: int) -> int:
+    """오래 안 쓴(mtime) 파일부터 limit 이하가 될 때까지 삭제. 남은 총 바이트 반환."""
+    items = []
+    total = 0
+    for root, _dirs, files in os.walk(_disk_dir()):
+        for name in files:
+            if name.endswith(".bin"):
+                p = os.path.join(root, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                items.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+    items.sort()
+    for _mtime, size, p in items:
+        if total <= limit:
+            break
+        for path in (p, p[:-4] + ".json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+        _stats["evictions_disk"] += 1
+    return total
+
+
+def _disk_write(key: str, data: bytes, mime: str, ttl: Optional[float]) -> None:
+    global _disk_bytes
+    limit = _disk_limit()
+    if limit <= 0 or len(data) > limit:
+        return
+    data_path, meta_path = _disk_paths(key)
+    try:
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        if _disk_bytes is None:
+            _disk_bytes = _scan_disk()
+        tmp = f"{data_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, data_path)
+        meta = {"key": key, "mime": mime, "expires_at": (time.time() + ttl) if ttl else None}
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        _disk_bytes += len(data)
+        if _disk_bytes > limit:
+            # 여유를 두고(90%) 정리해 매 쓰기마다 디렉터리를 훑지 않도록
+            _disk_bytes = _evict_disk(int(limit * 0.9))
+    except Exception as e:
+        log.warning("ref image disk write failed: %s", e)
+
+
+# ===== public =====
+
+async def _load(url: str, default_mime: str, prepare: bool) -> Tuple[bytes, str]:
+    data, mime = await _download(url, default_mime)
+    if prepare:
+        data, mime = await asyncio.to_thread(prepare_image, data, mime)
+    return data, mime
+
+
+async def fetch_image(
+    uri_or_url: str,
+    object_key: Optional[str] = None,
+    etag: Optional[str] = None,
+    default_mime: str = "image/jpeg",
+    prepare: bool = False,
+) -> Tuple[bytes, str]:
+    """data URI 또는 http(s) URL → (bytes, mime). 가능한 경우 캐시를 거칩니다.
+    prepare=True면 모델 입력용으로 축소/재인코딩(image_prep)한 결과를 반환·캐시합니다.
+    실패 시 ImageFetchError.
+    """
+    prepare = prepare and prep_enabled()
+    if uri_or_url.startswith("data:"):
+        data, mime = _decode_data_uri(uri_or_url, default_mime)
+        if prepare:
+            data, mime = await asyncio.to_thread(prepare_image, data, mime)
+        return data, mime
+    if not (uri_or_url.startswith("http://") or uri_or_url.startswith("https://")):
+        raise ImageFetchError("image must be a data URI or http(s) URL")
+
+    _stats["requests"] += 1
+    key, verified = cache_key(uri_or_url, object_key, etag)
+    if key is None or not _enabled():
+        _stats["uncacheable"] += 1
+        return await _load(uri_or_url, default_mime, prepare)
+    if prepare:
+        # 전처리 결과는 설정별로 따로 저장(원본 바이트는 보관하지 않음)
+        key = f"{key}|{variant()}"
+
+    got = _mem_get(key)
+    if got is not None:
+        _stats["hits_memory"] += 1
+        _stats["bytes_saved"] += len(got[0])
+        return got
+
+    fut = _inflight.get(key)
+    if fut is not None:
+        data, mime = await asyncio.shield(fut)
+        _stats["hits_memory"] += 1
+        _stats["bytes_saved"] += len(data)
+        return data, mime
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    try:
+        ttl = None if verified else _env_num("REF_IMAGE_CACHE_UNVERIFIED_TTL_SECONDS", 600)
+        got = await asyncio.to_thread(_disk_read, key)
+        if got is not None:
+            _stats["hits_disk"] += 1
+            _stats["bytes_saved"] += len(got[0])
+        else:
+            _stats["misses"] += 1
+            got = await _load(uri_or_url, default_mime, prepare)
+            await asyncio.to_thread(_disk_write, key, got[0], got[1], ttl)
+        _mem_put(key, got[0], got[1], (time.monotonic() + ttl) if ttl else None)
+        fut.set_result(got)
+        return got
+    except BaseException as e:
+        fut.set_exception(e)
+        fut.exception()  # 대기자가 없을 때 경고 방지
+        raise
+    finally:
+        _inflight.pop(key, None)
+
+
+def ref_image_stats() -> Dict[str, Any]:
+    served = _stats["hits_memory"] + _stats["hits_disk"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_ratio": round((_stats["hits_memory"] + _stats["hits_disk"]) / served, 4) if served else 0.0,
+        "memory_entries": len(_mem),
+        "memory_bytes": _mem_bytes,
+        "disk_bytes": _disk_bytes,
+    }
+
+
+async def close_ref_image_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -2,13 +2,13 @@ from fastapi import APIRouter, HTTPException
 from typing import Optional, Tuple
 import logging
 import os
-import base64
-import httpx
 
 from google import genai
 from google.genai import types
 
 from ai.serving.fastapi_app.schemas.caption import CaptionRequest, CaptionResponse
+from ai.serving.fastapi_app.model_pool import generate_content
+from ai.serving.fastapi_app.ref_images import ImageFetchError, fetch_image
 
 router = APIRouter()
 log = logging.getLogger("ai-caption")
@@ -35,32 +35,13 @@ CAPTION_MAX_TOKENS_ENV = os.getenv("CAPTION_MAX_TOKENS", "")
 CAPTION_MAX_TOKENS = int(CAPTION_MAX_TOKENS_ENV) if CAPTION_MAX_TOKENS_ENV.isdigit() else None
 
 
-async def _fetch_image_bytes(uri_or_url: str) -> Tuple[bytes, str]:
-    # data URI
-    if uri_or_url.startswith("data:"):
-        try:
-            head, b64 = uri_or_url.split(",", 1)
-            mime = "image/jpeg"
-            try:
-                prefix = head.split(";")[0]
-                if prefix.startswith("data:"):
-                    mime = prefix[len("data:"):]
-            except Exception:
-                pass
-            return base64.b64decode(b64), mime
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"invalid_data_uri: {e}")
-    # http(s)
-    if uri_or_url.startswith("http://") or uri_or_url.startswith("https://"):
-        try:
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                r = await client.get(uri_or_url)
-                r.raise_for_status()
-                mime = r.headers.get("content-type", "image/jpeg").split(";")[0]
-                return r.content, mime
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"failed_to_fetch_image: {e}")
-    raise HTTPException(status_code=400, detail="image must be a data URI or http(s) URL")
+async def _fetch_image_bytes(uri_or_url: str, key: Optional[str] = None, etag: Optional[str] = None) -> Tuple[bytes, str]:
+    # data URI 또는 http(s) URL — URL은 S3 키/ETag(또는 프리사인 경로) 기준으로 캐시(ref_images)
+    # 모델 입력용으로 축소/재인코딩(image_prep)된 바이트를 반환
+    try:
+        return await fetch_image(uri_or_url, key, etag, prepare=True, default_mime="image/jpeg")
+    except ImageFetchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 def _build_caption_prompt(personality: Optional[str], tone: Optional[str]) -> str:
@@ -109,7 +90,7 @@ async def generate_caption(req: CaptionRequest):
         raise HTTPException(status_code=503, detail=f"model_unavailable: {e}")
 
     # Fetch image bytes
-    img_bytes, img_mime = await _fetch_image_bytes(req.image)
+    img_bytes, img_mime = await _fetch_image_bytes(req.image, req.image_key, req.image_etag)
 
     prompt = _build_caption_prompt(req.personality, req.tone)
 
@@ -129,7 +110,9 @@ async def generate_caption(req: CaptionRequest):
         if CAPTION_MAX_TOKENS:
             gen_cfg.max_output_tokens = CAPTION_MAX_TOKENS
 
-        resp = client.models.generate_content(
+        resp = await generate_content(
+            client,
+            "text",
             model=GEMINI_TEXT_MODEL,
             contents=parts,
             config=gen_cfg,
@@ -1,13 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 import os
+import json
 import logging
 import traceback
 import base64
-from typing import Optional, Dict, Tuple, Any
-import httpx
+from typing import Optional, Tuple, Any
 from google import genai
 from google.genai import types
 from ai.serving.fastapi_app.schemas.chat import ChatRequest, ChatResponse
+from ai.serving.fastapi_app.model_pool import generate_content, generate_content_stream
+from ai.serving.fastapi_app.session_memory import append_messages, clear_session, get_history
+from ai.serving.fastapi_app.image_transport import image_response, to_data_uri, wants_binary
+from ai.serving.fastapi_app.ref_images import ImageFetchError, fetch_image
 from pydantic import BaseModel, Field
 try:
     from PIL import Image, ImageDraw
@@ -18,28 +23,6 @@ router = APIRouter()
 log = logging.getLogger("ai-chat")
 
 _client = None
-_jobs: Dict[str, Dict] = {}
-
-# ===== Session memory (LangChain) =====
-try:
-    from langchain.memory import ConversationBufferMemory  # type: ignore
-    from langchain.schema import HumanMessage, AIMessage  # type: ignore
-    _LC_AVAILABLE = True
-except Exception:
-    ConversationBufferMemory = None  # type: ignore
-    HumanMessage = AIMessage = None  # type: ignore
-    _LC_AVAILABLE = False
-
-_SESSION_MEMORY: Dict[str, Any] = {}
-
-def _get_memory(session_id: Optional[str]) -> Optional[Any]:
-    if not _LC_AVAILABLE or not session_id:
-        return None
-    mem = _SESSION_MEMORY.get(session_id)
-    if mem is None:
-        mem = ConversationBufferMemory(return_messages=True, memory_key="history")
-        _SESSION_MEMORY[session_id] = mem
-    return mem
 
 # Optional LangSmith tracing
 LS_ENABLED = False
@@ -131,11 +114,7 @@ async def chat_session_clear(body: dict | None = None):
         sid = None
         if isinstance(body, dict):
             sid = body.get("ls_session_id") or body.get("session_id")
-        if sid and sid in _SESSION_MEMORY:
-            try:
-                del _SESSION_MEMORY[sid]
-            except Exception:
-                _SESSION_MEMORY.pop(sid, None)
+        await clear_session(sid)
         return {"ok": True, "cleared": bool(sid)}
     except Exception as e:
         return {"ok": False, "error": str(e)}
@@ -170,14 +149,59 @@ def _canonicalize_models(text_model: str, image_model: str):
 GEMINI_TEXT_MODEL, GEMINI_IMAGE_MODEL = _canonicalize_models(GEMINI_TEXT_MODEL, GEMINI_IMAGE_MODEL)
 
 
+_CHAT_SYSTEM_PROMPT = (
+    "You are a social media assistant helping an influencer craft concise, friendly responses. "
+    "Keep replies within 2-3 sentences unless asked for more."
+)
+_CHAT_CONFIG = types.GenerateContentConfig(response_modalities=[types.Modality.TEXT], candidate_count=1)
+_CHAT_FALLBACK_REPLY = "(fallback) 현재 모델이 준비되지 않았어요. 테스트 모드에서 응답합니다."
+_CHAT_EMPTY_REPLY = "지금은 답변을 만들 수 없었어요. 잠시 후 다시 시도해주세요."
+
+
+def _chat_parts(req: ChatRequest) -> list:
+    """/chat, /chat/stream 공통 프롬프트(시스템 + 페르소나 이미지 + 마지막 사용자 메시지)."""
+    parts = [types.Part.from_text(text=_CHAT_SYSTEM_PROMPT)]
+    if req.persona_img:
+        snippet = req.persona_img
+        if snippet.startswith("data:"):
+            snippet = snippet[:72] + "..."
+        parts.append(types.Part.from_text(text=f"Persona image: {snippet}"))
+
+    last_user = None
+    for m in reversed(req.messages):
+        if m.role == "user":
+            last_user = m.content
+            break
+    if last_user is None:
+        last_user = req.messages[-1].content
+
+    parts.append(types.Part.from_text(text=f"User: {last_user}"))
+    return parts
+
+
+def _response_text(resp: Any) -> str:
+    out = ""
+    for c in getattr(resp, "candidates", []) or []:
+        for p in getattr(getattr(c, "content", None), "parts", []) or []:
+            if getattr(p, "text", None):
+                out += p.text
+    return out
+
+
+def _require_model() -> bool:
+    return os.getenv("AI_REQUIRE_MODEL", "1").strip().lower() in ("1", "true", "yes")
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(req: ChatRequest):
     try:
         if not req.messages:
             raise HTTPException(status_code=400, detail="messages_required")
-        require_model = (
-            os.getenv("AI_REQUIRE_MODEL", "1").strip().lower() in ("1", "true", "yes")
-        )
+        require_model = _require_model()
         # Try to get client
         try:
             client = _get_client()
@@ -185,52 +209,26 @@ async def chat(req: ChatRequest):
             if require_model:
                 raise
             # Fallback text when model disabled
-            return ChatResponse(ok=True, reply="(fallback) 현재 모델이 준비되지 않았어요. 테스트 모드에서 응답합니다.")
+            return ChatResponse(ok=True, reply=_CHAT_FALLBACK_REPLY)
 
-        system_prompt = (
-            "You are a social media assistant helping an influencer craft concise, friendly responses. "
-            "Keep replies within 2-3 sentences unless asked for more."
-        )
-        parts = [types.Part.from_text(text=system_prompt)]
-        if req.persona_img:
-            snippet = req.persona_img
-            if snippet.startswith("data:"):
-                snippet = snippet[:72] + "..."
-            parts.append(types.Part.from_text(text=f"Persona image: {snippet}"))
-
-        last_user = None
-        for m in reversed(req.messages):
-            if m.role == "user":
-                last_user = m.content
-                break
-        if last_user is None:
-            last_user = req.messages[-1].content
-
-        parts.append(types.Part.from_text(text=f"User: {last_user}"))
+        parts = _chat_parts(req)
 
         try:
-            resp = client.models.generate_content(
+            resp = await generate_content(
+                client,
+                "text",
                 model=GEMINI_TEXT_MODEL,
                 contents=parts,
-                config=types.GenerateContentConfig(
-                    response_modalities=[types.Modality.TEXT], candidate_count=1
-                ),
+                config=_CHAT_CONFIG,
             )
-            reply = ""
-            for c in getattr(resp, "candidates", []) or []:
-                for p in getattr(c.content, "parts", []) or []:
-                    if getattr(p, "text", None):
-                        reply += p.text
+            reply = _response_text(resp)
         except Exception as e:
             # If dev mode (model not strictly required), fall back to a canned reply
-            require_model = (
-                os.getenv("AI_REQUIRE_MODEL", "1").strip().lower() in ("1", "true", "yes")
-            )
             if require_model:
                 raise
             log.warning("/chat text generation failed, falling back: %s", e)
-            reply = "(fallback) 현재 모델이 준비되지 않았어요. 테스트 모드에서 응답합니다."
-        reply = (reply or "").strip() or "지금은 답변을 만들 수 없었어요. 잠시 후 다시 시도해주세요."
+            reply = _CHAT_FALLBACK_REPLY
+        reply = (reply or "").strip() or _CHAT_EMPTY_REPLY
         return ChatResponse(ok=True, reply=reply)
     except HTTPException:
         raise
@@ -239,11 +237,61 @@ async def chat(req: ChatRequest):
         raise HTTPException(status_code=500, detail={"error": "chat_failed", "message": str(e)})
 
 
+@router.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """/chat의 스트리밍 버전(SSE). Gemini 스트리밍 청크가 오는 대로 전달합니다.
+    events: `delta` {"text"} … → `done` {"reply"} | `error` {"error", "message"}
+    """
+    if not req.messages:
+        raise HTTPException(status_code=400, detail="messages_required")
+    client = None
+    try:
+        client = _get_client()
+    except Exception as e:
+        if _require_model():
+            raise HTTPException(status_code=500, detail={"error": "chat_failed", "message": str(e)})
+    parts = _chat_parts(req)
+
+    async def _events():
+        if client is None:
+            yield _sse("delta", {"text": _CHAT_FALLBACK_REPLY})
+            yield _sse("done", {"reply": _CHAT_FALLBACK_REPLY})
+            return
+        reply = ""
+        try:
+            async for chunk in generate_content_stream(
+                client, "text", model=GEMINI_TEXT_MODEL, contents=parts, config=_CHAT_CONFIG
+            ):
+                text = _response_text(chunk)
+                if text:
+                    reply += text
+                    yield _sse("delta", {"text": text})
+        except Exception as e:
+            log.error("/chat/stream failed: %s\n%s", e, traceback.format_exc())
+            if _require_model() or reply:
+                yield _sse("error", {"error": "chat_failed", "message": str(e)})
+                return
+            reply = _CHAT_FALLBACK_REPLY
+            yield _sse("delta", {"text": reply})
+        if not reply.strip():
+            reply = _CHAT_EMPTY_REPLY
+            yield _sse("delta", {"text": reply})
+        yield _sse("done", {"reply": reply.strip()})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ======= Notebook-style create_img_original flow =======
 
 class ChatImageRequest(BaseModel):
     user_text: str = Field(..., min_length=1)
     persona_img: Optional[str] = None  # URL or data URI
+    persona_img_key: Optional[str] = None   # S3 object key of persona_img (cache key)
+    persona_img_etag: Optional[str] = None  # S3 ETag (cache validator)
     persona: Optional[str] = None      # persona data stringified if any
     ls_session_id: Optional[str] = None
     style_img: Optional[str] = None    # Optional: outfit/style reference image
@@ -252,11 +300,11 @@ class ChatImageRequest(BaseModel):
 class ChatImageResponse(BaseModel):
     ok: bool = True
     prompt: str
-    image: str  # data URI
+    image: str  # data URI (Accept: image/* 요청 시에는 바이너리 응답)
 
 
-def _placeholder_image_data_uri(text: str) -> str:
-    """Generate a simple placeholder PNG as data URI.
+def _placeholder_image(text: str) -> Tuple[bytes, str]:
+    """Generate a simple placeholder PNG (bytes, mime).
     Tries PIL first; if unavailable, returns a tiny 1x1 PNG.
     """
     try:
@@ -268,15 +316,21 @@ def _placeholder_image_data_uri(text: str) -> str:
             import io
             buf = io.BytesIO()
             img.save(buf, format="PNG")
-            import base64 as _b64
-            return f"data:image/png;base64,{_b64.b64encode(buf.getvalue()).decode('ascii')}"
+            return buf.getvalue(), "image/png"
     except Exception:
         pass
     # 1x1 transparent PNG
     tiny_png_b64 = (
         "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR4nGNgYAAAAAMAASsJTYQAAAAASUVORK5CYII="
     )
-    return f"data:image/png;base64,{tiny_png_b64}"
+    return base64.b64decode(tiny_png_b64), "image/png"
+
+
+def _image_result(request: Request, prompt: str, data: bytes, mime: str):
+    """Accept 헤더에 따라 바이너리(Response) 또는 JSON(data URI)으로 응답."""
+    if wants_binary(request):
+        return image_response(data, mime, prompt=prompt)
+    return ChatImageResponse(ok=True, prompt=prompt, image=to_data_uri(data, mime))
 
 
 def _build_meta_prompt(persona: str, user_text: str, has_style_img: bool) -> str:
@@ -350,36 +404,17 @@ def _with_outfit_lock_prompt(base_prompt: str, has_style_img: bool) -> str:
     return (base_prompt.strip() + lock)
 
 
-async def _fetch_image_bytes(uri_or_url: str) -> Tuple[bytes, str]:
-    # data URI (PNG/JPEG 등 모두 허용)
-    if uri_or_url.startswith("data:"):
-        try:
-            head, b64 = uri_or_url.split(",", 1)
-            mime = "image/png"
-            try:
-                prefix = head.split(";")[0]
-                if prefix.startswith("data:"):
-                    mime = prefix[len("data:"):]
-            except Exception:
-                pass
-            return base64.b64decode(b64), mime
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"invalid_data_uri: {e}")
-    # http(s) URL
-    if uri_or_url.startswith("http://") or uri_or_url.startswith("https://"):
-        try:
-            async with httpx.AsyncClient(timeout=20.0) as client:
-                r = await client.get(uri_or_url)
-                r.raise_for_status()
-                mime = r.headers.get("content-type", "image/jpeg").split(";")[0]
-                return r.content, mime
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"failed_to_fetch_image: {e}")
-    raise HTTPException(status_code=400, detail="persona_img must be a data URI or http(s) URL")
+async def _fetch_image_bytes(uri_or_url: str, key: Optional[str] = None, etag: Optional[str] = None) -> Tuple[bytes, str]:
+    # data URI 또는 http(s) URL — URL은 S3 키/ETag(또는 프리사인 경로) 기준으로 캐시(ref_images)
+    # 모델 입력용으로 축소/재인코딩(image_prep)된 바이트를 반환
+    try:
+        return await fetch_image(uri_or_url, key, etag, prepare=True, default_mime="image/png")
+    except ImageFetchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/chat/image", response_model=ChatImageResponse)
-async def chat_image(req: ChatImageRequest):
+async def chat_image(req: ChatImageRequest, request: Request):
     try:
         require_model = (
             os.getenv("AI_REQUIRE_MODEL", "1").strip().lower() in ("1", "true", "yes")
@@ -402,24 +437,15 @@ async def chat_image(req: ChatImageRequest):
 
         persona_text = req.persona or ""
         # ===== Pull session memory and include as context =====
-        mem = _get_memory(req.ls_session_id)
         history_text = ""
-        if mem is not None:
-            try:
-                msgs = getattr(mem, "chat_memory").messages or []
-                # Keep last 8 exchanges
-                tail = msgs[-16:]
-                formatted = []
-                for m in tail:
-                    if hasattr(m, 'content'):
-                        role = 'User' if m.__class__.__name__.startswith('Human') else 'Assistant'
-                        txt = str(getattr(m, 'content', '') or '')
-                        if txt:
-                            formatted.append(f"{role}: {txt}")
-                if formatted:
-                    history_text = "\n".join(formatted)
-            except Exception:
-                history_text = ""
+        try:
+            # 최근 메시지(세션당 SESSION_MEMORY_MAX_MESSAGES까지 보관)
+            history = await get_history(req.ls_session_id)
+            history_text = "\n".join(
+                f"{'User' if role == 'user' else 'Assistant'}: {txt}" for role, txt in history if txt
+            )
+        except Exception:
+            history_text = ""
         # Build the notebook meta-prompt and improve it with a text model (2-step flow)
         extra_context = ("\n\nPrevious session conversation (use to maintain continuity, style preferences and constraints):\n" + history_text) if history_text else ""
         meta_prompt = _build_meta_prompt(persona_text, req.user_text, bool(req.style_img)) + extra_context
@@ -427,7 +453,9 @@ async def chat_image(req: ChatImageRequest):
         generated_prompt = ""
         if client is not None:
             try:
-                llm_resp = client.models.generate_content(
+                llm_resp = await generate_content(
+                    client,
+                    "text",
                     model=GEMINI_TEXT_MODEL,
                     contents=[types.Part.from_text(text=meta_prompt)],
                     config=types.GenerateContentConfig(
@@ -462,7 +490,7 @@ async def chat_image(req: ChatImageRequest):
         if not req.persona_img:
             raise HTTPException(status_code=400, detail="persona_img_required")
         try:
-            persona_bytes, persona_mime = await _fetch_image_bytes(req.persona_img)
+            persona_bytes, persona_mime = await _fetch_image_bytes(req.persona_img, req.persona_img_key, req.persona_img_etag)
         except HTTPException:
             raise
         except Exception as e:
@@ -490,7 +518,9 @@ async def chat_image(req: ChatImageRequest):
                 if style_bytes:
                     contents.append(types.Part.from_bytes(data=style_bytes, mime_type=style_mime))
                 contents.append(types.Part.from_bytes(data=persona_bytes, mime_type=persona_mime))
-                img_resp = client.models.generate_content(
+                img_resp = await generate_content(
+                    client,
+                    "image",
                     model=GEMINI_IMAGE_MODEL,
                     contents=contents,
                     config=types.GenerateContentConfig(
@@ -548,35 +578,34 @@ async def chat_image(req: ChatImageRequest):
                 if require_model:
                     raise HTTPException(status_code=502, detail="image_not_returned")
                 # Fallback to placeholder
-                data_uri = _placeholder_image_data_uri(req.user_text)
+                ph_bytes, ph_mime = _placeholder_image(req.user_text)
                 if rt:
                     rt.end(outputs={"ok": True, "fallback": True})
                     rt.post(lsc)
-                return ChatImageResponse(ok=True, prompt=generated_prompt, image=data_uri)
+                return _image_result(request, generated_prompt, ph_bytes, ph_mime)
             else:
                 # Normal successful generation path
-                data_uri = f"data:{out_mime};base64,{base64.b64encode(out_bytes).decode('ascii')}"
                 if rt:
                     rt.end(outputs={"ok": True, "image_mime": out_mime, "image_len": len(out_bytes)})
                     rt.post(lsc)
                 # Update session memory with this turn
-                if mem is not None:
-                    try:
-                        mem.chat_memory.add_user_message(req.user_text)
-                        # store brief info instead of full data-uri
-                        mem.chat_memory.add_ai_message("[image_generated]")
-                    except Exception:
-                        pass
-                return ChatImageResponse(ok=True, prompt=generated_prompt, image=data_uri)
+                try:
+                    # store brief info instead of full data-uri
+                    await append_messages(
+                        req.ls_session_id, [("user", req.user_text), ("assistant", "[image_generated]")]
+                    )
+                except Exception:
+                    pass
+                return _image_result(request, generated_prompt, out_bytes, out_mime)
         else:
             # Fallback placeholder image
             if require_model:
                 raise HTTPException(status_code=503, detail="model_unavailable")
-            data_uri = _placeholder_image_data_uri(req.user_text)
+            ph_bytes, ph_mime = _placeholder_image(req.user_text)
             if rt:
                 rt.end(outputs={"ok": True, "fallback": True})
                 rt.post(lsc)
-            return ChatImageResponse(ok=True, prompt=generated_prompt, image=data_uri)
+            return _image_result(request, generated_prompt, ph_bytes, ph_mime)
     except HTTPException:
         # Pass-through but try to mark error in run
         try:
@@ -8,6 +8,7 @@ from google.genai import types
 import httpx
 
 from ai.serving.fastapi_app.schemas.comment import CommentReplyRequest, CommentReplyResponse
+from ai.serving.fastapi_app.model_pool import generate_content, model_slot
 
 router = APIRouter()
 log = logging.getLogger("ai-comment")
@@ -72,7 +73,9 @@ async def generate_comment_reply(req: CommentReplyRequest):
 
     try:
         # Mirror the notebook pattern: pass the prompt string and use resp.text
-        resp = client.models.generate_content(
+        resp = await generate_content(
+            client,
+            "reply",
             model=GEMINI_TEXT_MODEL,
             contents=prompt,
             config=types.GenerateContentConfig(
@@ -122,8 +125,8 @@ async def generate_comment_reply(req: CommentReplyRequest):
                     }
                 ]
             }
-            with httpx.Client(timeout=20) as client2:
-                r = client2.post(url, json=payload)
+            async with model_slot("reply"), httpx.AsyncClient(timeout=20) as client2:
+                r = await client2.post(url, json=payload)
             if r.status_code != 200:
                 raise RuntimeError(f"rest_status_{r.status_code}:{r.text[:200]}")
             data = r.json() or {}
@@ -2,7 +2,7 @@
 [파트 개요] AI 서빙 라우터 (Gemini 고정)
 - 이 모듈은 FastAPI Router만 제공하며, 최상위 ai/main.py에서 앱에 포함됩니다.
 """
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import Any
 import base64
 from io import BytesIO
@@ -42,6 +42,8 @@ def health():
 
 
 from ai.serving.fastapi_app.schemas.predict import PredictRequest
+from ai.serving.fastapi_app.model_pool import generate_content
+from ai.serving.fastapi_app.image_transport import image_response, to_data_uri, wants_binary
 
 
 # 기본적으로 모델 필요(폴백 비활성화 유지)
@@ -122,7 +124,7 @@ def _build_prompt_from_fields(payload: dict) -> str:
 
 
 @router.post("/predict")
-async def predict(req: PredictRequest):
+async def predict(req: PredictRequest, request: Request):
     try:
         require_model = (
             os.getenv("AI_REQUIRE_MODEL", "1").strip().lower() in ("1", "true", "yes")
@@ -140,7 +142,9 @@ async def predict(req: PredictRequest):
             payload = req.dict(exclude_none=True)
             prompt = _build_prompt_from_fields(payload)
             client = _get_client()
-            image_response = client.models.generate_content(
+            gen_resp = await generate_content(
+                client,
+                "image",
                 model=GEMINI_IMAGE_MODEL,
                 contents=[types.Part.from_text(text=prompt)],
                 config=types.GenerateContentConfig(
@@ -150,7 +154,7 @@ async def predict(req: PredictRequest):
             )
 
             # 이미지 추출
-            for cand in getattr(image_response, "candidates", []) or []:
+            for cand in getattr(gen_resp, "candidates", []) or []:
                 parts = getattr(cand.content, "parts", []) or []
                 for part in parts:
                     inline = getattr(part, "inline_data", None)
@@ -188,21 +192,23 @@ async def predict(req: PredictRequest):
                 raise HTTPException(status_code=503, detail=f"model_failed: {e}")
 
         # ---- 출력 인코딩 ----
+        # Accept: image/* 이면 바이트 그대로, 아니면 기존 JSON(data URI)
+        def _respond(buf: bytes, mime: str):
+            if wants_binary(request):
+                return image_response(buf, mime)
+            return {"ok": True, "image": to_data_uri(buf, mime)}
+
         if Image is not None and isinstance(result, Image.Image):
             buf = BytesIO()
             result.save(buf, format="PNG")
-            data = base64.b64encode(buf.getvalue()).decode("ascii")
-            return {"ok": True, "image": f"data:image/png;base64,{data}"}
+            return _respond(buf.getvalue(), "image/png")
 
         elif isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], (bytes, bytearray)):
             buf, mime = result
-            mime = mime or "image/png"
-            data = base64.b64encode(buf).decode("ascii")
-            return {"ok": True, "image": f"data:{mime};base64,{data}"}
+            return _respond(bytes(buf), mime or "image/png")
 
         elif isinstance(result, (bytes, bytearray)):
-            data = base64.b64encode(result).decode("ascii")
-            return {"ok": True, "image": f"data:image/png;base64,{data}"}
+            return _respond(bytes(result), "image/png")
 
         # ---- 폴백 (모델 불필요 모드에서만) ----
         if not require_model and Image is not None:
@@ -215,8 +221,7 @@ async def predict(req: PredictRequest):
                 draw.text((24, 24), text, fill=(30, 30, 30))
                 buf = BytesIO()
                 img.save(buf, format="PNG")
-                data = base64.b64encode(buf.getvalue()).decode("ascii")
-                return {"ok": True, "image": f"data:image/png;base64,{data}"}
+                return _respond(buf.getvalue(), "image/png")
             except Exception as fe:
                 log.warning("Fallback image failed: %s", fe)
 
@@ -5,6 +5,8 @@ from typing import Optional
 class CaptionRequest(BaseModel):
     image: str = Field(..., min_length=10, description="Data URI or http(s) URL of the preview image")
     personality: Optional[str] = Field(None, description="Persona tone/style to reflect in the caption")
+    image_key: Optional[str] = Field(None, description="S3 object key of image, used as the reference-image cache key")
+    image_etag: Optional[str] = Field(None, description="S3 ETag of image; cached bytes are reused while it matches")
     tone: Optional[str] = Field(None, description="Optional tone hint, e.g., 'insta' | 'editorial' | 'playful'")
 
 
@@ -0,0 +1,240 @@
+"""
+세션 대화 메모리(ls_session_id 단위)
+- 세션마다 (role, text) 링 버퍼(deque(maxlen))만 보관합니다. LangChain 객체를 만들지 않습니다.
+- 로컬 저장소: 유휴 TTL 만료 + LRU(최대 세션 수) + 전체 텍스트 예산(바이트) 초과 시 오래된 세션부터 제거.
+- 공유 저장소(선택): SESSION_MEMORY_REDIS_URL 이 있고 redis 패키지가 설치돼 있으면 Redis 리스트
+  (RPUSH + LTRIM + EXPIRE)로 여러 워커가 같은 대화 이력을 봅니다. Redis 오류 시 로컬로 대체합니다.
+
+Env
+- SESSION_MEMORY_TTL_SECONDS      (default 3600) : 마지막 사용 후 만료
+- SESSION_MEMORY_MAX_SESSIONS     (default 1000)
+- SESSION_MEMORY_MAX_MESSAGES     (default 16)   : 세션당 보관 메시지 수(링 버퍼 크기)
+- SESSION_MEMORY_MAX_MESSAGE_CHARS(default 2000) : 메시지 1개 최대 길이(초과분 절단)
+- SESSION_MEMORY_MAX_BYTES        (default 16MB) : 로컬 저장소 전체 텍스트 예산
+- SESSION_MEMORY_REDIS_URL        (optional)     : 예) redis://redis:6379/0
+"""
+from __future__ import annotations
+import json
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+try:
+    import redis.asyncio as _redis  # type: ignore
+except Exception:
+    _redis = None  # type: ignore
+
+log = logging.getLogger("ai-session-memory")
+
+Message = Tuple[str, str]  # (role: "user" | "assistant", text)
+
+_KEY_PREFIX = "ss:ai:session:"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+class _Session:
+    __slots__ = ("messages", "size", "touched")
+
+    def __init__(self, cap: int):
+        self.messages: Deque[Message] = deque(maxlen=cap)
+        self.size = 0
+        self.touched = time.monotonic()
+
+
+class LocalSessionStore:
+    """프로세스 내 세션 저장소(TTL/LRU/바이트 예산)."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_sessions: int,
+        max_messages: int,
+        max_bytes: int,
+    ):
+        self.ttl = float(ttl)
+        self.max_sessions = int(max_sessions)
+        self.max_messages = int(max_messages)
+        self.max_bytes = int(max_bytes)
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._bytes = 0
+        self.evicted_ttl = 0
+        self.evicted_lru = 0
+        self.evicted_budget = 0
+
+    def _drop(self, sid: str) -> None:
+        s = self._sessions.pop(sid, None)
+        if s is not None:
+            self._bytes -= s.size
+
+    def _expire(self, now: float) -> None:
+        # OrderedDict는 사용 순서 — 앞에서부터 만료된 것만 제거
+        while self._sessions:
+            sid, s = next(iter(self._sessions.items()))
+            if now - s.touched <= self.ttl:
+                break
+            self._drop(sid)
+            self.evicted_ttl += 1
+
+    def get(self, sid: str, limit: Optional[int] = None) -> List[Message]:
+        now = time.monotonic()
+        self._expire(now)
+        s = self._sessions.get(sid)
+        if s is None:
+            return []
+        s.touched = now
+        self._sessions.move_to_end(sid)
+        msgs = list(s.messages)
+        return msgs[-limit:] if limit else msgs
+
+    def append(self, sid: str, messages: List[Message]) -> None:
+        now = time.monotonic()
+        self._expire(now)
+        s = self._sessions.get(sid)
+        if s is None:
+            s = _Session(self.max_messages)
+            self._sessions[sid] = s
+        for role, text in messages:
+            if len(s.messages) == s.messages.maxlen:
+                old = s.messages[0]
+                s.size -= len(old[1].encode("utf-8"))
+                self._bytes -= len(old[1].encode("utf-8"))
+            s.messages.append((role, text))
+            n = len(text.encode("utf-8"))
+            s.size += n
+            self._bytes += n
+        s.touched = now
+        self._sessions.move_to_end(sid)
+        while len(self._sessions) > self.max_sessions:
+            self._drop(next(iter(self._sessions)))
+            self.evicted_lru += 1
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._drop(next(iter(self._sessions)))
+            self.evicted_budget += 1
+
+    def clear(self, sid: str) -> bool:
+        existed = sid in self._sessions
+        self._drop(sid)
+        return existed
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "max_sessions": self.max_sessions,
+            "max_bytes": self.max_bytes,
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_lru": self.evicted_lru,
+            "evicted_budget": self.evicted_budget,
+        }
+
+
+_local: Optional[LocalSessionStore] = None
+_redis_client: Any = None
+_redis_errors = 0
+
+
+def _get_local() -> LocalSessionStore:
+    global _local
+    if _local is None:
+        _local = LocalSessionStore(
+            ttl=_env_int("SESSION_MEMORY_TTL_SECONDS", 3600),
+            max_sessions=_env_int("SESSION_MEMORY_MAX_SESSIONS", 1000),
+            max_messages=_env_int("SESSION_MEMORY_MAX_MESSAGES", 16),
+            max_bytes=_env_int("SESSION_MEMORY_MAX_BYTES", 16 * 1024 * 1024),
+        )
+    return _local
+
+
+def _get_redis() -> Any:
+    global _redis_client
+    url = os.getenv("SESSION_MEMORY_REDIS_URL")
+    if not url or _redis is None:
+        return None
+    if _redis_client is None:
+        _redis_client = _redis.from_url(url, decode_responses=True)
+    return _redis_client
+
+
+def _redis_failed(op: str, e: Exception) -> None:
+    global _redis_errors
+    _redis_errors += 1
+    log.warning("session memory redis %s failed, using local store: %s", op, e)
+
+
+def _clip(text: str) -> str:
+    limit = _env_int("SESSION_MEMORY_MAX_MESSAGE_CHARS", 2000)
+    text = str(text or "")
+    return text if len(text) <= limit else text[:limit]
+
+
+async def get_history(session_id: Optional[str], limit: Optional[int] = None) -> List[Message]:
+    """최근 메시지(오래된 것 → 최신 순)."""
+    if not session_id:
+        return []
+    r = _get_redis()
+    if r is not None:
+        try:
+            n = limit or _env_int("SESSION_MEMORY_MAX_MESSAGES", 16)
+            key = _KEY_PREFIX + session_id
+            raw = await r.lrange(key, -n, -1)
+            if raw:
+                await r.expire(key, _env_int("SESSION_MEMORY_TTL_SECONDS", 3600))
+            out: List[Message] = []
+            for item in raw or []:
+                try:
+                    role, text = json.loads(item)
+                    out.append((str(role), str(text)))
+                except Exception:
+                    continue
+            return out
+        except Exception as e:
+            _redis_failed("get", e)
+    return _get_local().get(session_id, limit)
+
+
+async def append_messages(session_id: Optional[str], messages: List[Message]) -> None:
+    if not session_id or not messages:
+        return
+    msgs = [(role, _clip(text)) for role, text in messages]
+    r = _get_redis()
+    if r is not None:
+        try:
+            key = _KEY_PREFIX + session_id
+            pipe = r.pipeline()
+            pipe.rpush(key, *[json.dumps([role, text], ensure_ascii=False) for role, text in msgs])
+            pipe.ltrim(key, -_env_int("SESSION_MEMORY_MAX_MESSAGES", 16), -1)
+            pipe.expire(key, _env_int("SESSION_MEMORY_TTL_SECONDS", 3600))
+            await pipe.execute()
+            return
+        except Exception as e:
+            _redis_failed("append", e)
+    _get_local().append(session_id, msgs)
+
+
+async def clear_session(session_id: Optional[str]) -> bool:
+    if not session_id:
+        return False
+    cleared = _get_local().clear(session_id)
+    r = _get_redis()
+    if r is not None:
+        try:
+            cleared = bool(await r.delete(_KEY_PREFIX + session_id)) or cleared
+        except Exception as e:
+            _redis_failed("clear", e)
+    return cleared
+
+
+def session_memory_stats() -> Dict[str, Any]:
+    return {
+        "backend": "redis" if _get_redis() is not None else "local",
+        "redis_errors": _redis_errors,
+        "local": _get_local().stats(),
+    }
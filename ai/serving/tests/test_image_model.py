@@ -0,0 +1,45 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+_REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+pytest.importorskip("google.genai")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ai.serving.fastapi_app.routes import image_model  # noqa: E402
+
+PNG = b"\x89PNG\r\n\x1a\nfake-image-bytes"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def _generate(client, lane, **kwargs):
+        inline = SimpleNamespace(data=PNG, mime_type="image/png")
+        part = SimpleNamespace(inline_data=inline)
+        return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
+
+    monkeypatch.setattr(image_model, "_get_client", lambda: object())
+    monkeypatch.setattr(image_model, "generate_content", _generate)
+    app = FastAPI()
+    app.include_router(image_model.router)
+    return TestClient(app)
+
+
+def test_predict_binary_mode_returns_image_bytes(client):
+    r = client.post("/predict", json={"name": "a", "gender": "female"}, headers={"Accept": "image/png"})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/png"
+    assert r.content == PNG
+
+
+def test_predict_json_mode_returns_data_uri(client):
+    r = client.post("/predict", json={"name": "a", "gender": "female"})
+    assert r.status_code == 200
+    assert r.json()["image"].startswith("data:image/png;base64,")
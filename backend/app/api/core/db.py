@@ -1,13 +1,2 @@
-import aiomysql
-import os
-
-async def get_mysql_pool():
-    return await aiomysql.create_pool(
-        host=os.getenv("DB_HOST", "project-db-cgi.smhrd.com"),
-        port=int(os.getenv("DB_PORT", 3307)),
-        user=os.getenv("DB_USER", "cgi_25IS_LI1_p3_3"),
-        password=os.getenv("DB_PASS", "smhrd3"),
-        db=os.getenv("DB_NAME", "cgi_25IS_LI1_p3_3"),
-        maxsize=10,
-        autocommit=True
-    )
\ No newline at end of file
+# 호환용 모듈: 풀 생성/수명 주기는 app.api.core.mysql 한 곳에서 관리합니다.
+from app.api.core.mysql import get_mysql_pool, get_mysql_conn, mysql_conn  # noqa: F401
@@ -0,0 +1,225 @@
+"""
+[파트 개요] 인스타그램 웹훅 이벤트 수집/큐
+- 외부 통신: Meta Webhooks(POST /webhooks/instagram) 본문의 X-Hub-Signature-256(HMAC-SHA256, 앱 시크릿) 검증
+- comments/mentions 변경을 이벤트 행으로 파싱해 ss_instagram_webhook_event에 저장(DB가 내구성 있는 큐)
+- 저장 후 같은 워커의 소비자(main의 자동 답글 스케줄러)를 깨우고, 다른 워커는 주기적으로 확인합니다.
+- 소비자는 claim_events로 대기 이벤트를 토큰으로 선점하므로 여러 워커가 떠 있어도 한 번만 처리됩니다.
+  오래 처리 중으로 남은 이벤트(워커 종료 등)는 IG_WEBHOOK_CLAIM_TIMEOUT_SECONDS 후 다시 선점됩니다.
+
+Env
+- IG_WEBHOOK_ENABLED (default 0): 1이면 자동 답글 스케줄러가 이벤트 소비자를 띄우고 폴링은 정합성 점검 주기로 늦춤
+- META_APP_SECRET: 서명 검증용 앱 시크릿
+- IG_WEBHOOK_SKIP_SIGNATURE (default 0): 1이면 서명 검증 생략(로컬 개발용)
+- IG_WEBHOOK_CLAIM_TIMEOUT_SECONDS (default 600)
+- IG_WEBHOOK_MAX_ATTEMPTS (default 5)
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+
+from app.api.core.mysql import get_mysql_pool
+
+_wake = asyncio.Event()
+
+_webhook_stats: Dict[str, Any] = {
+    "received": 0,
+    "invalid_signature": 0,
+    "events_stored": 0,
+    "events_duplicate": 0,
+    "claimed": 0,
+    "done": 0,
+    "skipped": 0,
+    "failed": 0,
+    "retried": 0,
+    "last_lag_ms": 0.0,
+    "max_lag_ms": 0.0,
+}
+
+EventRow = Tuple[str, str, str, Optional[str], Optional[str], Optional[str], Optional[str], str]
+
+_INSERT_EVENT_SQL = """
+INSERT IGNORE INTO ss_instagram_webhook_event
+  (field, external_id, ig_user_id, media_id, parent_id, from_id, text, payload)
+VALUES (%s,%s,%s,%s,%s,%s,%s,%s)
+"""
+
+
+def _truthy(name: str, default: str = "0") -> bool:
+    return (os.getenv(name, default) or "").strip().lower() in ("1", "true", "yes")
+
+
+def webhooks_enabled() -> bool:
+    """웹훅 구독 사용 여부(IG_WEBHOOK_ENABLED). 꺼져 있으면 이벤트 소비자를 띄우지 않습니다."""
+    return _truthy("IG_WEBHOOK_ENABLED")
+
+
+def verify_signature(raw: bytes, header: Optional[str], secret: Optional[str] = None) -> bool:
+    """X-Hub-Signature-256: 'sha256=<hex>' 를 앱 시크릿 HMAC과 비교."""
+    if _truthy("IG_WEBHOOK_SKIP_SIGNATURE"):
+        return True
+    secret = secret if secret is not None else os.getenv("META_APP_SECRET")
+    if not (secret and header and header.startswith("sha256=")):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), raw, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, header[len("sha256="):].strip().lower())
+
+
+def _sid(v: Any) -> Optional[str]:
+    return str(v) if v not in (None, "") else None
+
+
+def parse_events(body: Dict[str, Any]) -> List[EventRow]:
+    """웹훅 본문 → 이벤트 행 목록. 알 수 없는 필드는 무시."""
+    rows: List[EventRow] = []
+    if not isinstance(body, dict):
+        return rows
+    for entry in body.get("entry") or []:
+        if not isinstance(entry, dict):
+            continue
+        ig_user_id = _sid(entry.get("id"))
+        if not ig_user_id:
+            continue
+        for ch in entry.get("changes") or []:
+            if not isinstance(ch, dict):
+                continue
+            field = ch.get("field")
+            v = ch.get("value") or {}
+            if not isinstance(v, dict):
+                continue
+            if field in ("comments", "live_comments"):
+                cid = _sid(v.get("id"))
+                if not cid:
+                    continue
+                media = v.get("media") or {}
+                frm = v.get("from") or {}
+                rows.append((
+                    "comments", cid, ig_user_id,
+                    _sid(media.get("id") if isinstance(media, dict) else None),
+                    _sid(v.get("parent_id")),
+                    _sid(frm.get("id") if isinstance(frm, dict) else None),
+                    v.get("text"),
+                    json.dumps(ch, ensure_ascii=False),
+                ))
+            elif field == "mentions":
+                ext = _sid(v.get("comment_id")) or _sid(v.get("media_id"))
+                if not ext:
+                    continue
+                rows.append((
+                    "mentions", ext, ig_user_id, _sid(v.get("media_id")), None, None, None,
+                    json.dumps(ch, ensure_ascii=False),
+                ))
+    return rows
+
+
+async def store_events(rows: List[EventRow]) -> int:
+    """이벤트를 한 번의 multi-row INSERT IGNORE로 저장하고 커밋. 새로 저장된 수를 반환.
+    (field, external_id) 유니크 키로 Meta 재전송 중복은 무시됩니다.
+    """
+    if not rows:
+        return 0
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.executemany(_INSERT_EVENT_SQL, rows)
+            inserted = int(cur.rowcount or 0)
+        await conn.commit()
+    _webhook_stats["events_stored"] += inserted
+    _webhook_stats["events_duplicate"] += max(0, len(rows) - inserted)
+    if inserted:
+        _wake.set()
+    return inserted
+
+
+async def wait_for_events(timeout: float) -> None:
+    """새 이벤트 저장(같은 워커) 또는 timeout까지 대기."""
+    try:
+        await asyncio.wait_for(_wake.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+    _wake.clear()
+
+
+async def claim_events(limit: int = 50) -> List[Dict[str, Any]]:
+    """대기(또는 선점 시간 초과) 이벤트를 선점해 반환."""
+    token = uuid.uuid4().hex
+    claim_timeout = int(os.getenv("IG_WEBHOOK_CLAIM_TIMEOUT_SECONDS", "600") or 600)
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(
+                """
+                UPDATE ss_instagram_webhook_event
+                SET status='processing', claim_token=%s, claimed_at=UTC_TIMESTAMP(), attempts=attempts+1
+                WHERE status='pending'
+                   OR (status='processing' AND claimed_at < UTC_TIMESTAMP() - INTERVAL %s SECOND)
+                ORDER BY id
+                LIMIT %s
+                """,
+                (token, claim_timeout, int(limit)),
+            )
+            await conn.commit()
+            if not cur.rowcount:
+                return []
+            await cur.execute(
+                """
+                SELECT id, field, external_id, ig_user_id, media_id, parent_id, from_id, text,
+                       attempts, received_at
+                FROM ss_instagram_webhook_event
+                WHERE claim_token=%s
+                ORDER BY id
+                """,
+                (token,),
+            )
+            rows = list(await cur.fetchall() or [])
+    _webhook_stats["claimed"] += len(rows)
+    return rows
+
+
+async def finish_event(ev: Dict[str, Any], status: str) -> None:
+    """status: 'done' | 'skipped' | 'failed' | 'retry'(attempts 한도 전까지 다시 대기)."""
+    max_attempts = int(os.getenv("IG_WEBHOOK_MAX_ATTEMPTS", "5") or 5)
+    if status == "retry":
+        if int(ev.get("attempts") or 0) < max_attempts:
+            _webhook_stats["retried"] += 1
+            new_status = "pending"
+        else:
+            new_status = "failed"
+    else:
+        new_status = status
+    if new_status in ("done", "skipped", "failed"):
+        _webhook_stats[new_status] += 1
+    try:
+        # 수신 → 처리 완료 지연(received_at은 DB 세션 시간대 기준, UTC 가정)
+        rec = ev.get("received_at")
+        if isinstance(rec, datetime):
+            lag_ms = (datetime.now(timezone.utc).replace(tzinfo=None) - rec).total_seconds() * 1000.0
+            _webhook_stats["last_lag_ms"] = round(max(0.0, lag_ms), 1)
+            _webhook_stats["max_lag_ms"] = max(_webhook_stats["max_lag_ms"], _webhook_stats["last_lag_ms"])
+    except Exception:
+        pass
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "UPDATE ss_instagram_webhook_event SET status=%s, claim_token=NULL WHERE id=%s",
+                (new_status, int(ev["id"])),
+            )
+        await conn.commit()
+
+
+def note_received(valid: bool) -> None:
+    _webhook_stats["received"] += 1
+    if not valid:
+        _webhook_stats["invalid_signature"] += 1
+
+
+def webhook_stats() -> Dict[str, Any]:
+    return dict(_webhook_stats)
@@ -0,0 +1,314 @@
+"""
+[파트 개요] 비동기 이미지 생성 작업(Job) 저장소/워커
+- 프론트 통신: POST /api/chat/image/jobs 가 작업을 ss_image_job에 저장하고 job_id를 즉시 반환,
+  상태/결과는 GET /api/chat/image/jobs/{job_id} (폴링) 또는 .../events (SSE)로 확인합니다.
+- 워커: 프로세스마다 IMAGE_JOB_WORKERS개의 루프가 DB에서 대기 작업을 선점(claim_token)해 실행합니다.
+  DB가 큐이므로 워커가 재시작돼도 대기 작업은 유지되고, 실행 중 종료된 작업은
+  IMAGE_JOB_STALE_SECONDS 후 다른 워커가 다시 가져갑니다(IMAGE_JOB_MAX_ATTEMPTS까지).
+- 멱등성: Idempotency-Key(또는 idempotency_key)가 같으면 같은 작업을 돌려줍니다. 키가 없으면 요청 내용
+  해시로 IMAGE_JOB_DEDUPE_SECONDS 안의 재시도(프록시 타임아웃 후 재전송 등)를 같은 작업으로 묶습니다.
+
+Env
+- IMAGE_JOB_WORKERS (default 2)
+- IMAGE_JOB_POLL_SECONDS (default 2)
+- IMAGE_JOB_STALE_SECONDS (default 300)
+- IMAGE_JOB_MAX_ATTEMPTS (default 2)
+- IMAGE_JOB_DEDUPE_SECONDS (default 120)
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+from fastapi import HTTPException
+
+from app.api.core.mysql import get_mysql_pool
+
+log = logging.getLogger("image_jobs")
+
+TERMINAL = ("done", "failed")
+
+_wake = asyncio.Event()
+_workers: List[asyncio.Task] = []
+
+_job_stats: Dict[str, Any] = {
+    "submitted": 0,
+    "deduplicated": 0,
+    "running": 0,
+    "done": 0,
+    "failed": 0,
+    "reclaimed": 0,
+    "last_run_ms": 0.0,
+    "max_run_ms": 0.0,
+}
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def idempotency_keys(request: Dict[str, Any], explicit: Optional[str], now: Optional[float] = None) -> Tuple[str, List[str]]:
+    """(저장할 키, 기존 작업 조회용 키 목록).
+    명시 키는 그대로, 없으면 요청 해시 + 시간 구간(현재/직전 구간까지 조회해 경계 재시도도 묶음).
+    """
+    if explicit:
+        k = "k:" + explicit.strip()[:120]
+        return k, [k]
+    digest = hashlib.sha256(json.dumps(request, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()[:40]
+    window = _int_env("IMAGE_JOB_DEDUPE_SECONDS", 120)
+    bucket = int((now if now is not None else time.time()) // window)
+    return f"h:{digest}:{bucket}", [f"h:{digest}:{bucket}", f"h:{digest}:{bucket - 1}"]
+
+
+async def _find_job(cur, user_id: int, keys: List[str]) -> Optional[Dict[str, Any]]:
+    ph = ",".join(["%s"] * len(keys))
+    await cur.execute(
+        f"""
+        SELECT job_id, status FROM ss_image_job
+        WHERE user_id=%s AND idempotency_key IN ({ph}) AND status <> 'failed'
+        ORDER BY created_at DESC LIMIT 1
+        """,
+        (int(user_id), *keys),
+    )
+    return await cur.fetchone()
+
+
+async def submit_job(user_id: int, persona_num: int, request: Dict[str, Any], idem_key: Optional[str] = None) -> Tuple[str, bool]:
+    """(job_id, 새로 만들었는지). 같은 키의 진행/완료 작업이 있으면 그 작업을 반환."""
+    store_key, lookup = idempotency_keys(request, idem_key)
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            found = await _find_job(cur, user_id, lookup)
+            if found:
+                _job_stats["deduplicated"] += 1
+                return str(found["job_id"]), False
+            job_id = uuid.uuid4().hex
+            try:
+                await cur.execute(
+                    """
+                    INSERT INTO ss_image_job (job_id, user_id, persona_num, idempotency_key, request)
+                    VALUES (%s,%s,%s,%s,%s)
+                    """,
+                    (job_id, int(user_id), int(persona_num), store_key, json.dumps(request, ensure_ascii=False)),
+                )
+            except Exception as e:
+                # 동시 제출 경합(유니크 키) 또는 같은 명시 키의 실패 작업 → 재시도로 다시 대기열에
+                found = await _find_job(cur, user_id, lookup)
+                if found:
+                    _job_stats["deduplicated"] += 1
+                    return str(found["job_id"]), False
+                await cur.execute(
+                    """
+                    SELECT job_id FROM ss_image_job WHERE user_id=%s AND idempotency_key=%s
+                    """,
+                    (int(user_id), store_key),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    raise e
+                job_id = str(row["job_id"])
+                await cur.execute(
+                    """
+                    UPDATE ss_image_job
+                    SET status='queued', stage=NULL, error=NULL, result=NULL, attempts=0,
+                        claim_token=NULL, request=%s, finished_at=NULL
+                    WHERE job_id=%s AND status='failed'
+                    """,
+                    (json.dumps(request, ensure_ascii=False), job_id),
+                )
+        await conn.commit()
+    _job_stats["submitted"] += 1
+    _wake.set()
+    return job_id, True
+
+
+async def get_job(job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+    """사용자 소유 작업의 상태/결과. 결과 이미지는 조회 시점에 프리사인."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(
+                """
+                SELECT job_id, status, stage, result, error, created_at, finished_at
+                FROM ss_image_job WHERE job_id=%s AND user_id=%s
+                """,
+                (str(job_id), int(user_id)),
+            )
+            row = await cur.fetchone()
+    if not row:
+        return None
+    out: Dict[str, Any] = {
+        "job_id": row["job_id"],
+        "status": row["status"],
+        "stage": row.get("stage"),
+        "created_at": row["created_at"].isoformat() if row.get("created_at") else None,
+        "finished_at": row["finished_at"].isoformat() if row.get("finished_at") else None,
+    }
+    if row.get("error"):
+        try:
+            out["error"] = json.loads(row["error"])
+        except Exception:
+            out["error"] = row["error"]
+    if row["status"] == "done" and row.get("result"):
+        try:
+            res = json.loads(row["result"])
+            stored = res.get("stored") or {}
+            if stored.get("key"):
+                from app.core.s3 import apresign_get_url
+
+                stored["url"] = await apresign_get_url(stored["key"])
+            out["result"] = {"ok": True, "prompt": res.get("prompt") or "", "image": stored.get("url"), "stored": stored}
+        except Exception as e:
+            log.warning("job %s result decode failed: %s", job_id, e)
+    return out
+
+
+async def _claim_one() -> Optional[Dict[str, Any]]:
+    token = uuid.uuid4().hex
+    stale = _int_env("IMAGE_JOB_STALE_SECONDS", 300)
+    max_attempts = _int_env("IMAGE_JOB_MAX_ATTEMPTS", 2)
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            # 실행 중 워커가 죽어 남은 작업: 시도 한도를 넘으면 실패 처리
+            await cur.execute(
+                """
+                UPDATE ss_image_job
+                SET status='failed', error=%s, finished_at=UTC_TIMESTAMP(), claim_token=NULL
+                WHERE status='running' AND claimed_at < UTC_TIMESTAMP() - INTERVAL %s SECOND AND attempts >= %s
+                """,
+                (json.dumps("worker_lost"), stale, max_attempts),
+            )
+            await cur.execute(
+                """
+                UPDATE ss_image_job
+                SET status='running', stage='queued', claim_token=%s, claimed_at=UTC_TIMESTAMP(), attempts=attempts+1
+                WHERE status='queued'
+                   OR (status='running' AND claimed_at < UTC_TIMESTAMP() - INTERVAL %s SECOND)
+                ORDER BY created_at
+                LIMIT 1
+                """,
+                (token, stale),
+            )
+            await conn.commit()
+            if not cur.rowcount:
+                return None
+            await cur.execute(
+                "SELECT job_id, user_id, persona_num, request, attempts FROM ss_image_job WHERE claim_token=%s",
+                (token,),
+            )
+            row = await cur.fetchone()
+    if row:
+        row["claim_token"] = token
+        if int(row.get("attempts") or 0) > 1:
+            _job_stats["reclaimed"] += 1
+    return row
+
+
+async def _update(job: Dict[str, Any], sql_set: str, params: Tuple[Any, ...]) -> None:
+    """선점한 워커만 갱신(다른 워커가 재선점했으면 무시)."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                f"UPDATE ss_image_job SET {sql_set} WHERE job_id=%s AND claim_token=%s",
+                (*params, job["job_id"], job["claim_token"]),
+            )
+        await conn.commit()
+
+
+async def _run_job(job: Dict[str, Any]) -> None:
+    # Lazy import to avoid circular
+    from app.api.routes.chat import ChatImageRequest, generate_chat_image
+
+    t0 = time.monotonic()
+    _job_stats["running"] += 1
+    try:
+        req = ChatImageRequest(**json.loads(job["request"]))
+
+        async def _on_stage(stage: str) -> None:
+            await _update(job, "stage=%s", (stage,))
+
+        res = await generate_chat_image(int(job["user_id"]), req, on_stage=_on_stage)
+        stored = res.get("stored")
+        if not stored:
+            raise HTTPException(status_code=500, detail="image_store_failed")
+        result = {"prompt": res.get("prompt") or "", "stored": {"key": stored.get("key"), "id": stored.get("id")}}
+        await _update(
+            job,
+            "status='done', stage='done', result=%s, finished_at=UTC_TIMESTAMP(), claim_token=NULL",
+            (json.dumps(result, ensure_ascii=False),),
+        )
+        _job_stats["done"] += 1
+    except asyncio.CancelledError:
+        # 종료 중: 선점은 stale 시간 후 다른 워커가 회수
+        raise
+    except Exception as e:
+        detail: Any = e.detail if isinstance(e, HTTPException) else f"{type(e).__name__}: {e}"
+        log.warning("image job %s failed: %s", job.get("job_id"), detail)
+        try:
+            await _update(
+                job,
+                "status='failed', error=%s, finished_at=UTC_TIMESTAMP(), claim_token=NULL",
+                (json.dumps(detail, ensure_ascii=False, default=str),),
+            )
+        except Exception:
+            pass
+        _job_stats["failed"] += 1
+    finally:
+        _job_stats["running"] -= 1
+        ms = round((time.monotonic() - t0) * 1000.0, 1)
+        _job_stats["last_run_ms"] = ms
+        _job_stats["max_run_ms"] = max(_job_stats["max_run_ms"], ms)
+
+
+async def _worker_loop() -> None:
+    poll = float(os.getenv("IMAGE_JOB_POLL_SECONDS", "2") or 2)
+    while True:
+        try:
+            job = await _claim_one()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("image job claim failed: %s", e)
+            job = None
+        if job:
+            await _run_job(job)
+            continue
+        try:
+            await asyncio.wait_for(_wake.wait(), timeout=poll)
+        except asyncio.TimeoutError:
+            pass
+        _wake.clear()
+
+
+def start_image_job_workers() -> None:
+    if _workers:
+        return
+    for _ in range(_int_env("IMAGE_JOB_WORKERS", 2)):
+        _workers.append(asyncio.create_task(_worker_loop()))
+
+
+async def stop_image_job_workers() -> None:
+    for t in _workers:
+        t.cancel()
+    for t in _workers:
+        try:
+            await t
+        except BaseException:
+            pass
+    _workers.clear()
+
+
+def image_job_stats() -> Dict[str, Any]:
+    return {**_job_stats, "workers": len(_workers)}
@@ -0,0 +1,364 @@
+"""
+[파트 개요] 스키마 마이그레이션(버전 관리)
+- 앱 시작 시 1회(run_migrations) 또는 CLI로 실행하며, 적용된 버전을 ss_schema_version에 기록
+- 요청 처리 경로에서는 DDL/INFORMATION_SCHEMA 조회를 하지 않습니다(DML만).
+- 여러 워커가 동시에 시작해도 MySQL GET_LOCK으로 한 번만 적용됩니다.
+
+새 마이그레이션 추가: MIGRATIONS 끝에 (다음 버전, 이름, 함수)를 추가하세요.
+이미 배포된 마이그레이션은 수정하지 말고 새 버전으로 추가합니다.
+기존 운영 DB에 이미 있을 수 있는 객체는 IF NOT EXISTS/컬럼 확인으로 멱등하게 작성합니다.
+
+CLI
+    python -m app.api.core.migrations            # 미적용 마이그레이션 적용
+    python -m app.api.core.migrations --status   # 현재 버전/대기 목록만 출력
+
+Env
+- DB_MIGRATE_ON_STARTUP (default 1): 0이면 앱 시작 시 적용하지 않음(CLI로 별도 실행)
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Set, Tuple
+
+from app.api.core.mysql import get_mysql_pool
+
+log = logging.getLogger("migrations")
+
+_LOCK_NAME = "ss_schema_migrations"
+
+Migration = Tuple[int, str, Callable[[Any], Awaitable[None]]]
+
+
+async def _column_names(cur, table: str) -> Set[str]:
+    await cur.execute(
+        """
+        SELECT COLUMN_NAME
+        FROM INFORMATION_SCHEMA.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    return {str(r[0]).lower() for r in (await cur.fetchall() or [])}
+
+
+# ===== migrations =====
+
+async def _m0001_credit_tables(cur) -> None:
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_credit_balance (
+          user_id    INT PRIMARY KEY,
+          balance    INT NOT NULL DEFAULT 0,
+          updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        )
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_credit_ledger (
+          id         BIGINT AUTO_INCREMENT PRIMARY KEY,
+          user_id    INT NOT NULL,
+          delta      INT NOT NULL,
+          reason     VARCHAR(255) NULL,
+          ref_type   VARCHAR(64)  NULL,
+          ref_id     VARCHAR(128) NULL,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          INDEX idx_user_created (user_id, created_at)
+        )
+        """
+    )
+
+
+async def _m0002_instagram_connector_tables(cur) -> None:
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_instagram_connector (
+          user_id INT NOT NULL PRIMARY KEY,
+          long_lived_user_token TEXT NOT NULL,
+          expires_at DATETIME NULL,
+          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_instagram_connector_persona (
+          user_id INT NOT NULL,
+          user_persona_num INT NOT NULL,
+          long_lived_user_token TEXT NOT NULL,
+          expires_at DATETIME NULL,
+          created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+          updated_at TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+          PRIMARY KEY (user_id, user_persona_num)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _m0003_persona_instagram_columns(cur) -> None:
+    """ss_persona에 ig_user_id, ig_username, fb_page_id, ig_linked_at 컬럼 추가(없을 때만)."""
+    cols = await _column_names(cur, "ss_persona")
+    alters = []
+    if "ig_user_id" not in cols:
+        alters.append("ADD COLUMN ig_user_id VARCHAR(64) NULL")
+    if "ig_username" not in cols:
+        alters.append("ADD COLUMN ig_username VARCHAR(150) NULL")
+    if "fb_page_id" not in cols:
+        alters.append("ADD COLUMN fb_page_id VARCHAR(64) NULL")
+    if "ig_linked_at" not in cols:
+        alters.append("ADD COLUMN ig_linked_at DATETIME NULL")
+    if alters:
+        await cur.execute("ALTER TABLE ss_persona " + ", ".join(alters))
+
+
+async def _m0004_snapshot_run(cur) -> None:
+    """일일 인사이트 스냅샷 실행 상태/재개 커서(app.api.core.snapshot_engine)."""
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_snapshot_run (
+          run_date           DATE NOT NULL PRIMARY KEY,
+          status             VARCHAR(16) NOT NULL DEFAULT 'running',
+          cursor_user_id     INT NOT NULL DEFAULT 0,
+          cursor_persona_num INT NOT NULL DEFAULT 0,
+          processed          INT NOT NULL DEFAULT 0,
+          failed             INT NOT NULL DEFAULT 0,
+          started_at         TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at         TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+          finished_at        DATETIME NULL
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _m0005_instagram_webhook_event(cur) -> None:
+    """IG 웹훅 이벤트 보관/처리 큐(app.api.core.ig_webhook)."""
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_instagram_webhook_event (
+          id          BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+          field       VARCHAR(32) NOT NULL,
+          external_id VARCHAR(64) NOT NULL,
+          ig_user_id  VARCHAR(64) NOT NULL,
+          media_id    VARCHAR(64) NULL,
+          parent_id   VARCHAR(64) NULL,
+          from_id     VARCHAR(64) NULL,
+          text        TEXT NULL,
+          payload     TEXT NULL,
+          status      VARCHAR(16) NOT NULL DEFAULT 'pending',
+          attempts    INT NOT NULL DEFAULT 0,
+          claim_token VARCHAR(32) NULL,
+          claimed_at  DATETIME NULL,
+          received_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at  TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+          UNIQUE KEY uq_field_external (field, external_id),
+          KEY idx_status_id (status, id),
+          KEY idx_claim_token (claim_token)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _m0006_image_job(cur) -> None:
+    """비동기 이미지 생성 작업(app.api.core.image_jobs)."""
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_image_job (
+          job_id          CHAR(32) NOT NULL PRIMARY KEY,
+          user_id         INT NOT NULL,
+          persona_num     INT NOT NULL,
+          idempotency_key VARCHAR(128) NOT NULL,
+          request         MEDIUMTEXT NOT NULL,
+          status          VARCHAR(16) NOT NULL DEFAULT 'queued',
+          stage           VARCHAR(16) NULL,
+          result          TEXT NULL,
+          error           TEXT NULL,
+          attempts        INT NOT NULL DEFAULT 0,
+          claim_token     VARCHAR(32) NULL,
+          claimed_at      DATETIME NULL,
+          created_at      TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at      TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
+          finished_at     DATETIME NULL,
+          UNIQUE KEY uq_user_idem (user_id, idempotency_key),
+          KEY idx_status_created (status, created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _m0007_image_rendition(cur) -> None:
+    """원본 이미지 키별로 만들어진 렌디션 목록(app.api.core.renditions)."""
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_image_rendition (
+          img_key    VARCHAR(512) NOT NULL PRIMARY KEY,
+          renditions VARCHAR(128) NOT NULL,
+          ext        VARCHAR(8) NOT NULL DEFAULT '.webp',
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _index_names(cur, table: str) -> Set[str]:
+    await cur.execute(
+        """
+        SELECT DISTINCT INDEX_NAME
+        FROM INFORMATION_SCHEMA.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        """,
+        (table,),
+    )
+    return {str(r[0]).lower() for r in (await cur.fetchall() or [])}
+
+
+async def _m0008_chat_img_kind(cur) -> None:
+    """ss_chat_img에 kind(chat|drafts) 컬럼 + 커서 페이지네이션용 인덱스(app.api.models.chat_images).
+
+    구/신 스키마(chat_img_id/persona_chat_img, img_id/img_key) 모두 지원. 테이블이 없으면 건너뜀.
+    """
+    cols = await _column_names(cur, "ss_chat_img")
+    if not cols:
+        return
+    id_col = "img_id" if "img_id" in cols else "chat_img_id"
+    key_col = "img_key" if "img_key" in cols else "persona_chat_img"
+    if "kind" not in cols:
+        await cur.execute("ALTER TABLE ss_chat_img ADD COLUMN kind VARCHAR(16) NOT NULL DEFAULT 'chat'")
+        await cur.execute(f"UPDATE ss_chat_img SET kind='drafts' WHERE {key_col} LIKE 'drafts/%%'", ())
+    indexes = await _index_names(cur, "ss_chat_img")
+    alters = []
+    if "idx_user_persona_img" not in indexes:
+        alters.append(f"ADD INDEX idx_user_persona_img (user_id, persona_id, {id_col})")
+    if "idx_user_kind_img" not in indexes:
+        alters.append(f"ADD INDEX idx_user_kind_img (user_id, kind, {id_col})")
+    if "idx_user_kind_persona_img" not in indexes:
+        alters.append(f"ADD INDEX idx_user_kind_persona_img (user_id, kind, persona_id, {id_col})")
+    if alters:
+        await cur.execute("ALTER TABLE ss_chat_img " + ", ".join(alters))
+
+
+async def _m0009_event_seen_retention(cur) -> None:
+    """ss_instagram_event_seen(app.api.core.seen_store): 없으면 생성, 보존 기간 삭제용 updated_at 인덱스."""
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_instagram_event_seen (
+          external_id      VARCHAR(64) NOT NULL PRIMARY KEY,
+          user_id          INT NULL,
+          user_persona_num INT NULL,
+          created_at       TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          updated_at       TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+          KEY idx_user_persona (user_id, user_persona_num),
+          KEY idx_updated_at (updated_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+    cols = await _column_names(cur, "ss_instagram_event_seen")
+    if "updated_at" not in cols:
+        return
+    if "idx_updated_at" not in await _index_names(cur, "ss_instagram_event_seen"):
+        await cur.execute("ALTER TABLE ss_instagram_event_seen ADD INDEX idx_updated_at (updated_at)")
+
+
+MIGRATIONS: List[Migration] = [
+    (1, "credit_tables", _m0001_credit_tables),
+    (2, "instagram_connector_tables", _m0002_instagram_connector_tables),
+    (3, "persona_instagram_columns", _m0003_persona_instagram_columns),
+    (4, "snapshot_run", _m0004_snapshot_run),
+    (5, "instagram_webhook_event", _m0005_instagram_webhook_event),
+    (6, "image_job", _m0006_image_job),
+    (7, "image_rendition", _m0007_image_rendition),
+    (8, "chat_img_kind", _m0008_chat_img_kind),
+    (9, "event_seen_retention", _m0009_event_seen_retention),
+]
+
+
+# ===== runner =====
+
+async def _ensure_version_table(cur) -> None:
+    await cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS ss_schema_version (
+          version    INT NOT NULL PRIMARY KEY,
+          name       VARCHAR(128) NOT NULL,
+          applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+        """
+    )
+
+
+async def _applied_versions(cur) -> Set[int]:
+    await cur.execute("SELECT version FROM ss_schema_version")
+    return {int(r[0]) for r in (await cur.fetchall() or [])}
+
+
+async def migration_status() -> Dict[str, Any]:
+    """현재 스키마 버전과 미적용 마이그레이션 목록."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await _ensure_version_table(cur)
+            applied = await _applied_versions(cur)
+    pending = [f"{v:04d}_{name}" for (v, name, _fn) in MIGRATIONS if v not in applied]
+    return {"version": max(applied) if applied else 0, "latest": MIGRATIONS[-1][0], "pending": pending}
+
+
+async def run_migrations(lock_timeout: int = 60) -> List[str]:
+    """미적용 마이그레이션을 버전 순서대로 적용하고, 적용한 이름 목록을 반환합니다."""
+    pool = await get_mysql_pool()
+    applied_now: List[str] = []
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT GET_LOCK(%s, %s)", (_LOCK_NAME, int(lock_timeout)))
+            got = (await cur.fetchone() or [0])[0]
+            if not got:
+                raise RuntimeError("schema migration lock timeout")
+            try:
+                await _ensure_version_table(cur)
+                applied = await _applied_versions(cur)
+                for version, name, fn in MIGRATIONS:
+                    if version in applied:
+                        continue
+                    label = f"{version:04d}_{name}"
+                    log.info("applying migration %s", label)
+                    await fn(cur)
+                    await cur.execute(
+                        "INSERT INTO ss_schema_version (version, name) VALUES (%s, %s)",
+                        (version, name),
+                    )
+                    try:
+                        await conn.commit()
+                    except Exception:
+                        pass
+                    applied_now.append(label)
+            finally:
+                try:
+                    await cur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+                    await cur.fetchone()
+                except Exception:
+                    pass
+    if applied_now:
+        log.info("schema migrated: %s", ", ".join(applied_now))
+    return applied_now
+
+
+async def _main(argv: List[str]) -> int:
+    from app.api.core.mysql import close_mysql_pool
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        if "--status" in argv:
+            st = await migration_status()
+            print(f"schema version {st['version']} (latest {st['latest']})")
+            for label in st["pending"]:
+                print(f"  pending: {label}")
+        else:
+            done = await run_migrations()
+            print("applied: " + (", ".join(done) if done else "(none)"))
+    finally:
+        await close_mysql_pool()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
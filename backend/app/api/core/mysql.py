@@ -1,17 +1,207 @@
 """
 [파트 개요] MySQL 연결 풀 헬퍼
-- 내부 통신: aiomysql 풀을 생성하여 DB 접근에 사용
+- 내부 통신: 워커(프로세스)당 하나의 aiomysql 풀을 공유하여 DB 접근에 사용
 - 외부 통신: MySQL 서버(project-db-cgi.smhrd.com:3307)와 연결
+- 수명 주기: 앱 시작 시 init_mysql_pool(), 종료 시 close_mysql_pool()
+  (시작 훅 이전에 호출되면 get_mysql_pool()이 최초 1회 지연 생성)
+
+Env
+- DB_POOL_MIN_SIZE (default 1)
+- DB_POOL_MAX_SIZE (default 10)
+- DB_POOL_RECYCLE_SECONDS (default 3600, -1이면 재활용 안 함)
+- DB_POOL_ACQUIRE_TIMEOUT (default 10초, 0이면 무제한 대기)
 """
-import aiomysql
+from __future__ import annotations
+import asyncio
+import logging
 import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import aiomysql
+
+log = logging.getLogger("mysql")
+
+_pool: Optional["SharedPool"] = None
+_pool_lock = asyncio.Lock()
+
+# acquire 통계(풀 크기 산정용)
+_stats: Dict[str, float] = {
+    "acquires": 0,
+    "waits": 0,
+    "timeouts": 0,
+    "wait_ms_total": 0.0,
+    "wait_ms_max": 0.0,
+}
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+class _AcquireContext:
+    """`async with pool.acquire() as conn` 형태를 그대로 지원하는 컨텍스트."""
+
+    __slots__ = ("_shared", "_conn")
+
+    def __init__(self, shared: "SharedPool"):
+        self._shared = shared
+        self._conn = None
+
+    async def __aenter__(self):
+        self._conn = await self._shared._acquire()
+        return self._conn
+
+    async def __aexit__(self, exc_type, exc, tb):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._shared.release(conn)
+        return False
+
+
+class SharedPool:
+    """aiomysql.Pool 래퍼: acquire 대기/타임아웃 통계를 수집합니다.
+
+    기존 호출부(`pool.acquire()`)와 호환되며, 그 외 속성은 원본 풀로 위임합니다.
+    """
 
-async def get_mysql_pool():
-    return await aiomysql.create_pool(
+    def __init__(self, pool: aiomysql.Pool, acquire_timeout: float):
+        self._pool = pool
+        self._acquire_timeout = acquire_timeout
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool, name)
+
+    def acquire(self) -> _AcquireContext:
+        return _AcquireContext(self)
+
+    def release(self, conn) -> None:
+        # aiomysql의 release는 코루틴이 아님(완료된 future 반환)
+        self._pool.release(conn)
+
+    async def _acquire(self):
+        pool = self._pool
+        _stats["acquires"] += 1
+        if pool.freesize == 0 and pool.size >= pool.maxsize:
+            _stats["waits"] += 1
+        t0 = time.perf_counter()
+        try:
+            if self._acquire_timeout > 0:
+                return await asyncio.wait_for(pool.acquire(), timeout=self._acquire_timeout)
+            return await pool.acquire()
+        except asyncio.TimeoutError:
+            _stats["timeouts"] += 1
+            log.warning(
+                "mysql pool acquire timed out after %.1fs (size=%s free=%s max=%s)",
+                self._acquire_timeout, pool.size, pool.freesize, pool.maxsize,
+            )
+            raise
+        finally:
+            waited_ms = (time.perf_counter() - t0) * 1000.0
+            _stats["wait_ms_total"] += waited_ms
+            if waited_ms > _stats["wait_ms_max"]:
+                _stats["wait_ms_max"] = waited_ms
+
+
+async def _create_pool() -> SharedPool:
+    minsize = max(0, _int_env("DB_POOL_MIN_SIZE", 1))
+    maxsize = max(1, _int_env("DB_POOL_MAX_SIZE", 10))
+    raw = await aiomysql.create_pool(
         host=os.getenv("DB_HOST", "project-db-cgi.smhrd.com"),
         user=os.getenv("DB_USER", "cgi_25IS_LI1_p3_3"),
         password=os.getenv("DB_PASS", "smhrd3"),
         db=os.getenv("DB_NAME", "cgi_25IS_LI1_p3_3"),
         port=int(os.getenv("DB_PORT", 3307)),
-        autocommit=True
-    )
\ No newline at end of file
+        minsize=min(minsize, maxsize),
+        maxsize=maxsize,
+        pool_recycle=_int_env("DB_POOL_RECYCLE_SECONDS", 3600),
+        autocommit=True,
+    )
+    log.info("mysql pool created (min=%s max=%s)", raw.minsize, raw.maxsize)
+    return SharedPool(raw, _float_env("DB_POOL_ACQUIRE_TIMEOUT", 10.0))
+
+
+async def init_mysql_pool() -> SharedPool:
+    """공유 풀을 생성합니다(이미 있으면 그대로 반환). 앱 시작 훅에서 호출."""
+    global _pool
+    if _pool is not None:
+        return _pool
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await _create_pool()
+    return _pool
+
+
+async def get_mysql_pool() -> SharedPool:
+    """워커 공용 풀을 반환합니다. 호출마다 새 풀을 만들지 않습니다."""
+    if _pool is not None:
+        return _pool
+    return await init_mysql_pool()
+
+
+async def close_mysql_pool() -> None:
+    """공유 풀을 닫습니다. 앱 종료 훅에서 호출."""
+    global _pool
+    async with _pool_lock:
+        shared, _pool = _pool, None
+    if shared is None:
+        return
+    try:
+        shared.close()
+        await shared.wait_closed()
+        log.info("mysql pool closed")
+    except Exception as e:
+        log.warning("mysql pool close failed: %s", e)
+
+
+@asynccontextmanager
+async def mysql_conn() -> AsyncIterator[aiomysql.Connection]:
+    """공유 풀에서 커넥션을 빌려 쓰는 헬퍼: `async with mysql_conn() as conn:`"""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        yield conn
+
+
+async def get_mysql_conn() -> AsyncIterator[aiomysql.Connection]:
+    """FastAPI 의존성: 요청 동안 커넥션을 빌려주고 응답 후 반납합니다.
+
+    사용 예) `conn = Depends(get_mysql_conn)`
+    """
+    async with mysql_conn() as conn:
+        yield conn
+
+
+def mysql_pool_stats() -> Dict[str, Any]:
+    """풀 사용량(in-use/free)과 누적 acquire 대기 통계를 반환합니다."""
+    out: Dict[str, Any] = {"initialized": _pool is not None}
+    if _pool is not None:
+        size = int(_pool.size)
+        free = int(_pool.freesize)
+        out.update({
+            "minsize": int(_pool.minsize),
+            "maxsize": int(_pool.maxsize),
+            "size": size,
+            "free": free,
+            "in_use": size - free,
+            "acquire_timeout": _pool._acquire_timeout,
+        })
+    acquires = int(_stats["acquires"])
+    out.update({
+        "acquires": acquires,
+        "waits": int(_stats["waits"]),
+        "timeouts": int(_stats["timeouts"]),
+        "wait_ms_avg": round(_stats["wait_ms_total"] / acquires, 3) if acquires else 0.0,
+        "wait_ms_max": round(_stats["wait_ms_max"], 3),
+    })
+    return out
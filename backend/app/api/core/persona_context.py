@@ -0,0 +1,308 @@
+"""
+[파트 개요] 페르소나 컨텍스트 캐시
+- chat/send, chat/image, 댓글 자동 답글/초안/이미지, 캡션 초안, 스케줄러가 같은 페르소나 행을
+  요청마다 다시 읽고 JSON 파싱/성격(MBTI) 추출/이미지 URL 정규화를 반복하던 것을 한곳으로 모읍니다.
+- (user_id, persona_num) 단위로 파싱 결과 + IG 매핑 + 페르소나 토큰 + AI 접근용 이미지 URL을 보관합니다.
+- 한 번의 조인 쿼리(ss_persona LEFT JOIN ss_instagram_connector_persona)로 적재합니다.
+
+무효화
+- 페르소나 수정/이미지 교체/삭제(app.api.models.persona), IG 연결/해제·토큰 저장(oauth_instagram)에서
+  invalidate_persona()를 호출합니다. 캐시는 워커(프로세스)별이므로 다른 워커는 TTL 안에 갱신됩니다.
+
+Env
+- PERSONA_CACHE_TTL_SECONDS (default 60) : 0이면 캐시 사용 안 함(항상 DB 조회)
+- PERSONA_CACHE_SIZE        (default 1000): 최대 보관 페르소나 수(LRU)
+"""
+from __future__ import annotations
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+import aiomysql
+
+from app.api.core.mysql import get_mysql_pool
+from app.core.s3 import ahead_object, s3_enabled, presign_get_url
+
+_MBTI_RE = re.compile(r"^[E|I][N|S][F|T][P|J]$")
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
+
+
+def parse_params(raw: Any) -> Dict[str, Any]:
+    """persona_parameters(JSON 문자열 또는 dict)를 dict로."""
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (str, bytes)) and raw:
+        try:
+            pp = json.loads(raw)
+            return pp if isinstance(pp, dict) else {}
+        except Exception:
+            return {}
+    return {}
+
+
+def extract_personality(pp: Dict[str, Any]) -> str:
+    """답글 톤용 성격: personality/tone/style/voice → instagram.personality/tone 순."""
+    for key in ("personality", "tone", "style", "voice"):
+        val = pp.get(key)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    igp = pp.get("instagram") or {}
+    if isinstance(igp, dict):
+        val = igp.get("personality") or igp.get("tone")
+        if isinstance(val, str):
+            return val.strip()
+    return ""
+
+
+def extract_mbti(pp: Dict[str, Any]) -> str:
+    """캡션용 MBTI: 전용 키(mbti 등) → MBTI 패턴인 personality/tone/style/voice → instagram.personality/tone 순."""
+    for key in ("mbti", "MBTI", "mbti_type", "personality_mbti"):
+        val = pp.get(key)
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    for key in ("personality", "tone", "style", "voice"):
+        val = pp.get(key)
+        if isinstance(val, str) and val.strip():
+            s = val.strip().upper()
+            if _MBTI_RE.match(s):
+                return s
+    igp = pp.get("instagram") or {}
+    if isinstance(igp, dict):
+        val = igp.get("personality") or igp.get("tone")
+        if isinstance(val, str) and val.strip():
+            return val.strip()
+    return ""
+
+
+def mapping_from_row(user_id: int, persona_num: int, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """ss_persona 행에서 IG 매핑 추출: 컬럼 우선, 비어 있으면 persona_parameters.instagram(과거 데이터 호환)."""
+    if row.get("ig_user_id") and row.get("fb_page_id"):
+        return {
+            "user_id": user_id,
+            "user_persona_num": int(persona_num),
+            "ig_user_id": row.get("ig_user_id"),
+            "ig_username": row.get("ig_username"),
+            "fb_page_id": row.get("fb_page_id"),
+        }
+    params = parse_params(row.get("persona_parameters"))
+    ig = params.get("instagram")
+    if isinstance(ig, dict) and ig.get("ig_user_id") and ig.get("fb_page_id"):
+        return {
+            "user_id": user_id,
+            "user_persona_num": int(persona_num),
+            "ig_user_id": ig.get("ig_user_id"),
+            "ig_username": ig.get("ig_username"),
+            "fb_page_id": ig.get("fb_page_id"),
+        }
+    return None
+
+
+def ai_image_url(raw: Optional[str]) -> Optional[str]:
+    """persona_img를 AI 서비스가 접근 가능한 URL로 정규화(/media → 내부 URL, localhost → backend, S3 키 → 프리사인)."""
+    if not raw:
+        return None
+    s = str(raw)
+    try:
+        if s.startswith("data:"):
+            return s
+        if s.startswith("/"):
+            base = (os.getenv("BACKEND_INTERNAL_URL") or "http://backend:8000").rstrip("/")
+            return f"{base}{s}"
+        if s.lower().startswith("http://localhost") or s.lower().startswith("http://127.0.0.1"):
+            p = urlparse(s)
+            return urlunparse(p._replace(netloc="backend:8000"))
+        if s3_enabled() and not s.lower().startswith("http"):
+            return presign_get_url(s)
+        return s
+    except Exception:
+        return s
+
+
+def s3_object_key(raw: Optional[str]) -> Optional[str]:
+    """persona_img가 S3 오브젝트 키이면 그 키(AI 참조 이미지 캐시 키로 전달), 아니면 None."""
+    if not raw:
+        return None
+    s = str(raw)
+    if s.startswith("data:") or s.startswith("/") or s.lower().startswith("http"):
+        return None
+    return s if s3_enabled() else None
+
+
+@dataclass
+class PersonaContext:
+    user_id: int
+    persona_num: int
+    persona_img: Optional[str]
+    params: Dict[str, Any] = field(default_factory=dict)
+    # AI 서비스로 그대로 넘기는 JSON 문자열(원본 보존)
+    params_json: str = ""
+    personality: str = ""
+    mbti: str = ""
+    mapping: Optional[Dict[str, Any]] = None
+    token: Optional[str] = None
+    image_url: Optional[str] = None
+    # AI 서비스 참조 이미지 캐시 키(S3 키 + ETag) — 프리사인 서명이 달라도 같은 이미지로 인식
+    image_key: Optional[str] = None
+    image_etag: Optional[str] = None
+
+    @property
+    def ig_user_id(self) -> Optional[str]:
+        return (self.mapping or {}).get("ig_user_id")
+
+    @property
+    def image_ref(self) -> Dict[str, str]:
+        """/chat/image 페이로드에 더할 persona_img_key/persona_img_etag(S3 키가 아니면 빈 dict)."""
+        if not self.image_key:
+            return {}
+        ref = {"persona_img_key": self.image_key}
+        if self.image_etag:
+            ref["persona_img_etag"] = self.image_etag
+        return ref
+
+
+def build_context(user_id: int, persona_num: int, row: Dict[str, Any]) -> PersonaContext:
+    raw = row.get("persona_parameters")
+    params = parse_params(raw)
+    if isinstance(raw, (dict, list)):
+        params_json = json.dumps(raw, ensure_ascii=False)
+    else:
+        params_json = raw if isinstance(raw, str) else ""
+    img = row.get("persona_img")
+    return PersonaContext(
+        user_id=int(user_id),
+        persona_num=int(persona_num),
+        persona_img=img,
+        params=params,
+        params_json=params_json,
+        personality=extract_personality(params),
+        mbti=extract_mbti(params),
+        mapping=mapping_from_row(int(user_id), int(persona_num), row),
+        token=row.get("long_lived_user_token"),
+        image_url=ai_image_url(img),
+        image_key=s3_object_key(img),
+    )
+
+
+# ===== cache =====
+
+_Key = Tuple[int, int]
+_cache: "OrderedDict[_Key, Tuple[float, PersonaContext]]" = OrderedDict()
+_inflight: Dict[_Key, "asyncio.Future[Optional[PersonaContext]]"] = {}
+# 적재 중 무효화가 일어나면 그 결과는 캐시에 넣지 않도록 키별 세대 번호를 둠
+_generation: Dict[_Key, int] = {}
+_stats = {"hits": 0, "misses": 0, "loads": 0, "invalidations": 0, "evictions": 0}
+
+
+async def _load(user_id: int, persona_num: int) -> Optional[PersonaContext]:
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(
+                """
+                SELECT p.persona_img, p.persona_parameters, p.ig_user_id, p.ig_username, p.fb_page_id,
+                       t.long_lived_user_token
+                FROM ss_persona p
+                LEFT JOIN ss_instagram_connector_persona t
+                  ON t.user_id = p.user_id AND t.user_persona_num = p.user_persona_num
+                WHERE p.user_id=%s AND p.user_persona_num=%s
+                LIMIT 1
+                """,
+                (int(user_id), int(persona_num)),
+            )
+            row = await cur.fetchone()
+    _stats["loads"] += 1
+    if not row:
+        return None
+    ctx = build_context(user_id, persona_num, row)
+    if ctx.image_key:
+        # ETag까지 보내면 AI 캐시가 같은 키의 다른 내용(덮어쓰기)을 구분(실패해도 키만으로 동작)
+        try:
+            head = await ahead_object(ctx.image_key)
+            ctx.image_etag = (head or {}).get("etag")
+        except Exception:
+            pass
+    return ctx
+
+
+async def get_persona_context(user_id: int, persona_num: int) -> Optional[PersonaContext]:
+    """캐시된 페르소나 컨텍스트. 페르소나가 없으면 None(없음은 캐시하지 않음).
+
+    같은 키의 동시 미스는 한 번의 DB 조회로 합쳐집니다.
+    """
+    key = (int(user_id), int(persona_num))
+    ttl = _int_env("PERSONA_CACHE_TTL_SECONDS", 60)
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit is not None and ttl > 0:
+        if hit[0] > now:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return hit[1]
+        _cache.pop(key, None)
+    _stats["misses"] += 1
+
+    fut = _inflight.get(key)
+    if fut is not None:
+        return await asyncio.shield(fut)
+
+    fut = asyncio.get_running_loop().create_future()
+    _inflight[key] = fut
+    gen = _generation.get(key, 0)
+    try:
+        ctx = await _load(*key)
+    except BaseException as e:
+        _inflight.pop(key, None)
+        fut.set_exception(e)
+        # 대기자가 없으면 "never retrieved" 경고가 남지 않도록 소비
+        fut.exception()
+        raise
+    _inflight.pop(key, None)
+    if ctx is not None and ttl > 0 and _generation.get(key, 0) == gen:
+        _cache[key] = (time.monotonic() + ttl, ctx)
+        _cache.move_to_end(key)
+        limit = max(1, _int_env("PERSONA_CACHE_SIZE", 1000))
+        while len(_cache) > limit:
+            _cache.popitem(last=False)
+            _stats["evictions"] += 1
+    fut.set_result(ctx)
+    return ctx
+
+
+def invalidate_persona(user_id: int, persona_num: Optional[int] = None) -> None:
+    """페르소나(또는 사용자 전체 페르소나) 캐시 제거. DB 변경 직후 호출하세요."""
+    uid = int(user_id)
+    if persona_num is None:
+        keys = [k for k in list(_cache) + list(_inflight) if k[0] == uid]
+    else:
+        keys = [(uid, int(persona_num))]
+    for k in set(keys):
+        _cache.pop(k, None)
+        _generation[k] = _generation.get(k, 0) + 1
+    _stats["invalidations"] += 1
+
+
+def clear_persona_cache() -> None:
+    _cache.clear()
+    _generation.clear()
+
+
+def persona_cache_stats() -> Dict[str, Any]:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        "size": len(_cache),
+        "ttl_seconds": _int_env("PERSONA_CACHE_TTL_SECONDS", 60),
+        **_stats,
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,286 @@
+"""
+[파트 개요] 생성/업로드 이미지의 렌디션(압축 원본 크기 + 썸네일) 생성·조회
+원본(Gemini가 돌려준 PNG 등)은 그대로 두고, 업로드 직후 백그라운드에서 렌디션을 만들어
+원본 키 옆에 결정적인 접미사로 저장합니다.
+    chat/7/1/gen_123.png → chat/7/1/gen_123.r-full.webp, chat/7/1/gen_123.r-t320.webp, ...
+만들어진 렌디션 이름은 ss_image_rendition(img_key → "full,t320,t640")에 기록하고,
+목록 API(갤러리/임시저장/페르소나)는 resolve_urls()로 화면 크기에 맞는 렌디션 URL을 받습니다.
+렌디션이 아직 없거나(생성 중/과거 이미지) Pillow가 없으면 원본 URL을 그대로 씁니다.
+
+Env
+- IMAGE_RENDITIONS_ENABLED (default 1)
+- IMAGE_RENDITION_FORMAT (default webp; webp | jpeg)
+- IMAGE_RENDITION_QUALITY (default 80)
+- IMAGE_RENDITION_FULL_EDGE (default 2048) : 압축 원본 크기 렌디션의 긴 변 상한
+- IMAGE_RENDITION_THUMB_SIZES (default 320,640) : 썸네일 긴 변(px)
+- IMAGE_RENDITION_CONCURRENCY (default 2) : 동시에 처리할 이미지 수
+"""
+import asyncio
+import io
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from app.api.core.mysql import get_mysql_pool
+from app.core.s3 import adelete_object, aput_bytes, parse_data_uri, presign_many
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # Pillow 미설치 시 렌디션 비활성(원본만 사용)
+    Image = None  # type: ignore
+    ImageOps = None  # type: ignore
+
+log = logging.getLogger("renditions")
+
+# 렌디션은 내용이 바뀌지 않는 파생 객체(키가 원본에 묶임) → 브라우저/CDN 장기 캐시
+_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_FORMATS = {"webp": ("WEBP", "image/webp", ".webp"), "jpeg": ("JPEG", "image/jpeg", ".jpg")}
+
+_sem: Optional[asyncio.Semaphore] = None
+_tasks: Set[asyncio.Task] = set()
+_stats: Dict[str, Any] = {
+    "scheduled": 0,
+    "created": 0,
+    "failed": 0,
+    "skipped": 0,
+    "bytes_original": 0,
+    "bytes_renditions": 0,
+    "last_ms": 0.0,
+    "max_ms": 0.0,
+}
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def renditions_enabled() -> bool:
+    if Image is None:
+        return False
+    return (os.getenv("IMAGE_RENDITIONS_ENABLED", "1") or "1").strip().lower() in ("1", "true", "yes")
+
+
+def _format() -> Tuple[str, str, str]:
+    fmt = (os.getenv("IMAGE_RENDITION_FORMAT", "webp") or "webp").strip().lower()
+    if fmt == "jpg":
+        fmt = "jpeg"
+    return _FORMATS.get(fmt) or _FORMATS["webp"]
+
+
+def thumb_sizes() -> List[int]:
+    out: List[int] = []
+    for part in (os.getenv("IMAGE_RENDITION_THUMB_SIZES", "320,640") or "").split(","):
+        try:
+            n = int(part.strip())
+        except Exception:
+            continue
+        if n > 0 and n not in out:
+            out.append(n)
+    return sorted(out)
+
+
+def rendition_key(key: str, name: str, ext: Optional[str] = None) -> str:
+    """원본 키 → 렌디션 키(확장자만 교체하고 .r-{name} 접미사)."""
+    ext = ext or _format()[2]
+    slash = key.rfind("/")
+    dot = key.rfind(".")
+    stem = key[:dot] if dot > slash else key
+    return f"{stem}.r-{name}{ext}"
+
+
+def _decode_and_build(source: Union[bytes, str]) -> Tuple[int, Dict[str, Tuple[bytes, str]]]:
+    raw = parse_data_uri(source)[0] if isinstance(source, str) else source
+    return len(raw), build_renditions(raw)
+
+
+def build_renditions(raw: bytes) -> Dict[str, Tuple[bytes, str]]:
+    """원본 바이트 → {이름: (bytes, mime)}. CPU 작업이므로 스레드에서 호출.
+
+    - full: 긴 변 IMAGE_RENDITION_FULL_EDGE 이하로 줄인 압축본(이미 작으면 크기 유지, 재인코딩만)
+    - t{N}: 긴 변 N px 썸네일(원본보다 작을 때만)
+    메타데이터(EXIF 등)는 저장하지 않습니다.
+    """
+    if Image is None:
+        return {}
+    pil_fmt, mime, _ext = _format()
+    quality = min(100, _int_env("IMAGE_RENDITION_QUALITY", 80))
+    full_edge = _int_env("IMAGE_RENDITION_FULL_EDGE", 2048)
+    out: Dict[str, Tuple[bytes, str]] = {}
+    with Image.open(io.BytesIO(raw)) as src:
+        img = ImageOps.exif_transpose(src)
+        has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+        if pil_fmt == "JPEG" or not has_alpha:
+            if has_alpha:
+                rgba = img.convert("RGBA")
+                flat = Image.new("RGB", rgba.size, (255, 255, 255))
+                flat.paste(rgba, mask=rgba.getchannel("A"))
+                img = flat
+            else:
+                img = img.convert("RGB")
+        else:
+            img = img.convert("RGBA")
+
+        def _encode(im: Any) -> bytes:
+            buf = io.BytesIO()
+            if pil_fmt == "WEBP":
+                im.save(buf, format=pil_fmt, quality=quality, method=4)
+            else:
+                im.save(buf, format=pil_fmt, quality=quality, optimize=True, progressive=True)
+            return buf.getvalue()
+
+        longest = max(img.size)
+        full = img.copy()
+        if longest > full_edge:
+            full.thumbnail((full_edge, full_edge), Image.LANCZOS)
+        out["full"] = (_encode(full), mime)
+        for n in thumb_sizes():
+            if n >= longest:
+                continue
+            t = img.copy()
+            t.thumbnail((n, n), Image.LANCZOS)
+            out[f"t{n}"] = (_encode(t), mime)
+    return out
+
+
+def pick_rendition(names: Iterable[str], width: Optional[int] = None) -> Optional[str]:
+    """표시 폭(px)에 맞는 렌디션 이름. width가 없으면 가장 큰 썸네일(그리드용)."""
+    names = set(names or [])
+    thumbs = sorted(int(n[1:]) for n in names if n.startswith("t") and n[1:].isdigit())
+    if width is None:
+        return f"t{thumbs[-1]}" if thumbs else ("full" if "full" in names else None)
+    for n in thumbs:
+        if n >= int(width):
+            return f"t{n}"
+    return "full" if "full" in names else (f"t{thumbs[-1]}" if thumbs else None)
+
+
+# ===== DB: img_key → 렌디션 이름 목록 =====
+
+async def _record(key: str, names: List[str]) -> None:
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                INSERT INTO ss_image_rendition (img_key, renditions, ext)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE renditions=VALUES(renditions), ext=VALUES(ext)
+                """,
+                (key, ",".join(names), _format()[2]),
+            )
+        await conn.commit()
+
+
+async def rendition_map(keys: Iterable[str]) -> Dict[str, Tuple[List[str], str]]:
+    """{원본 키: ([렌디션 이름...], 확장자)} — 렌디션이 기록된 키만 포함. 실패 시 빈 dict."""
+    keys = [k for k in dict.fromkeys(keys) if k]
+    if not keys:
+        return {}
+    try:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                ph = ",".join(["%s"] * len(keys))
+                await cur.execute(
+                    f"SELECT img_key, renditions, ext FROM ss_image_rendition WHERE img_key IN ({ph})",
+                    tuple(keys),
+                )
+                rows = await cur.fetchall() or []
+    except Exception as e:
+        log.warning("rendition lookup failed; using originals: %s", e)
+        return {}
+    return {str(r[0]): ([n for n in str(r[1] or "").split(",") if n], str(r[2] or ".webp")) for r in rows}
+
+
+async def resolve_urls(keys: Iterable[str], width: Optional[int] = None) -> Dict[str, Dict[str, str]]:
+    """{원본 키: {"url": 원본 URL, "thumb_url": 화면에 맞는 렌디션 URL, "full_url": 압축 원본 크기 URL}}.
+
+    url은 항상 원본(게시/다운로드용, 렌디션은 WebP라 IG 게시에 쓸 수 없음).
+    렌디션이 없으면 thumb_url/full_url도 원본 프리사인 URL. 프리사인은 presign_many 한 번으로 처리합니다.
+    """
+    keys = [k for k in dict.fromkeys(keys) if k]
+    rmap = await rendition_map(keys)
+    chosen: Dict[str, Tuple[str, str]] = {}
+    for k in keys:
+        names, ext = rmap.get(k, ([], ""))
+        pick = pick_rendition(names, width)
+        thumb_key = rendition_key(k, pick, ext) if pick else k
+        full_key = rendition_key(k, "full", ext) if "full" in names else k
+        chosen[k] = (thumb_key, full_key)
+    urls = presign_many(list(chosen) + [v for pair in chosen.values() for v in pair])
+    return {
+        k: {"url": urls.get(k) or "", "thumb_url": urls.get(t) or "", "full_url": urls.get(f) or ""}
+        for k, (t, f) in chosen.items()
+    }
+
+
+# ===== 생성(업로드 직후 백그라운드) =====
+
+async def create_renditions(key: str, source: Union[bytes, str]) -> List[str]:
+    """렌디션을 만들어 업로드하고 DB에 기록. 만든 이름 목록 반환(실패 시 빈 목록).
+
+    source는 원본 바이트 또는 data URI(디코드도 스레드에서 수행).
+    """
+    if not renditions_enabled() or not key or not source:
+        _stats["skipped"] += 1
+        return []
+    global _sem
+    if _sem is None:
+        _sem = asyncio.Semaphore(_int_env("IMAGE_RENDITION_CONCURRENCY", 2))
+    t0 = time.perf_counter()
+    async with _sem:
+        try:
+            size, built = await asyncio.to_thread(_decode_and_build, source)
+            ext = _format()[2]
+            names = list(built.keys())
+            await asyncio.gather(*[
+                aput_bytes(data, mime, key=rendition_key(key, name, ext), cache_control=_CACHE_CONTROL)
+                for name, (data, mime) in built.items()
+            ])
+            await _record(key, names)
+        except Exception as e:
+            _stats["failed"] += 1
+            log.warning("rendition build failed for %s: %s", key, e)
+            return []
+    ms = round((time.perf_counter() - t0) * 1000.0, 1)
+    _stats["created"] += 1
+    _stats["last_ms"] = ms
+    _stats["max_ms"] = max(_stats["max_ms"], ms)
+    _stats["bytes_original"] += size
+    _stats["bytes_renditions"] += sum(len(d) for d, _m in built.values())
+    return names
+
+
+def schedule_renditions(key: str, source: Union[bytes, str]) -> None:
+    """업로드 응답을 늦추지 않도록 렌디션 생성을 백그라운드 태스크로 예약."""
+    if not renditions_enabled():
+        return
+    _stats["scheduled"] += 1
+    task = asyncio.create_task(create_renditions(key, source))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def delete_renditions(key: str) -> None:
+    """원본 삭제 시 렌디션 객체와 기록도 함께 삭제(best-effort)."""
+    rmap = await rendition_map([key])
+    if key not in rmap:
+        return
+    names, ext = rmap[key]
+    await asyncio.gather(*[adelete_object(rendition_key(key, n, ext)) for n in names], return_exceptions=True)
+    try:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute("DELETE FROM ss_image_rendition WHERE img_key=%s", (key,))
+            await conn.commit()
+    except Exception as e:
+        log.warning("rendition row delete failed for %s: %s", key, e)
+
+
+def rendition_stats() -> Dict[str, Any]:
+    return {**_stats, "enabled": renditions_enabled(), "pending": len(_tasks), "thumb_sizes": thumb_sizes()}
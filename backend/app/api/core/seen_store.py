@@ -0,0 +1,289 @@
+"""
+[파트 개요] IG 이벤트 '확인됨(seen/ACK)' 저장소(ss_instagram_event_seen)
+- 기록: 여러 external_id를 다중 행 INSERT 한 번으로 저장(mark_seen). 처리 선점이 필요한 곳(자동 답글 PRE-ACK)은
+  INSERT IGNORE 결과로 새로 기록했는지 판단(claim).
+- 조회: 프로세스 내 LRU(external_id → (user_id, persona_num))에 '확인됨'으로 알려진 ID를 보관해
+  대부분의 조회(comments_overview, 스케줄러 사이클의 이미 처리한 댓글)가 MySQL까지 가지 않습니다.
+  미확인 결과는 캐시하지 않습니다(다른 워커가 방금 기록했을 수 있음). 캐시에 없는 ID만 IN (...) 배치로 조회.
+- 보존: SEEN_RETENTION_DAYS보다 오래 갱신되지 않은 행은 주기적으로 배치 삭제(prune_loop).
+  스케줄러는 기간 제한 없이 최근 게시물의 댓글을 계속 다시 읽으므로, seen_ids가 아직 보이는 ID의
+  updated_at을 SEEN_REFRESH_DAYS마다 배치 UPDATE로 갱신합니다. 삭제되는 것은 보존 기간 내내
+  한 번도 조회되지 않은(=더 이상 어떤 목록에도 나오지 않는) ID뿐이라 다시 답글이 달리지 않습니다.
+
+Env
+- SEEN_CACHE_SIZE (default 200000)
+- SEEN_RETENTION_DAYS (default 180, 0이면 삭제 안 함)
+- SEEN_REFRESH_DAYS (default 7): 조회된 ID의 updated_at 갱신 간격(보존 기간의 절반으로 제한)
+- SEEN_PRUNE_INTERVAL_SECONDS (default 21600)
+- SEEN_PRUNE_BATCH (default 5000)
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.api.core.mysql import get_mysql_pool
+
+log = logging.getLogger("seen_store")
+
+# 한 번의 INSERT/IN 절에 넣을 최대 ID 수(패킷/플레이스홀더 크기 제한)
+_CHUNK = 1000
+
+# external_id → (user_id, persona_num, DB의 updated_at이 갱신된 시각(monotonic))
+_cache: "OrderedDict[str, Tuple[Optional[int], Optional[int], float]]" = OrderedDict()
+_stats: Dict[str, Any] = {
+    "cache_hits": 0,
+    "db_lookups": 0,
+    "db_ids_looked_up": 0,
+    "marked": 0,
+    "claimed": 0,
+    "refreshed": 0,
+    "pruned": 0,
+    "last_prune_at": None,
+}
+
+
+def _int_env(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def _remember(
+    ids: Iterable[str],
+    user_id: Optional[int] = None,
+    persona_num: Optional[int] = None,
+    age_seconds: float = 0.0,
+) -> None:
+    limit = _int_env("SEEN_CACHE_SIZE", 200000)
+    fresh_at = time.monotonic() - max(0.0, float(age_seconds))
+    for eid in ids:
+        _cache[eid] = (user_id, persona_num, fresh_at)
+        _cache.move_to_end(eid)
+    while len(_cache) > limit:
+        _cache.popitem(last=False)
+
+
+def _chunks(ids: List[str]) -> Iterable[List[str]]:
+    for i in range(0, len(ids), _CHUNK):
+        yield ids[i:i + _CHUNK]
+
+
+async def mark_seen(ids: Iterable[Any], user_id: Optional[int] = None, persona_num: Optional[int] = None, cur=None) -> int:
+    """external_id들을 확인됨으로 기록(이미 있으면 updated_at 갱신). 기록 요청한 ID 수 반환.
+
+    cur를 주면 호출자의 트랜잭션/커넥션에서 실행하고 커밋은 호출자가 합니다.
+    """
+    uniq = [str(i) for i in dict.fromkeys(ids) if i]
+    if not uniq:
+        return 0
+    uid = int(user_id) if user_id is not None else None
+    num = int(persona_num) if persona_num is not None else None
+
+    async def _run(c) -> None:
+        for ch in _chunks(uniq):
+            values = ",".join(["(%s,%s,%s)"] * len(ch))
+            params: List[Any] = []
+            for eid in ch:
+                params.extend((eid, uid, num))
+            await c.execute(
+                f"""
+                INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
+                VALUES {values}
+                ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
+                """,
+                tuple(params),
+            )
+
+    if cur is not None:
+        await _run(cur)
+    else:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as c:
+                await _run(c)
+            await conn.commit()
+    _remember(uniq, uid, num)
+    _stats["marked"] += len(uniq)
+    return len(uniq)
+
+
+async def claim(external_id: Any, user_id: Optional[int] = None, persona_num: Optional[int] = None) -> bool:
+    """처리 선점: 이번 호출이 처음 기록했으면 True(INSERT IGNORE). 캐시에 이미 있으면 DB를 거치지 않고 False."""
+    eid = str(external_id)
+    if eid in _cache:
+        _stats["cache_hits"] += 1
+        return False
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                INSERT IGNORE INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
+                VALUES (%s,%s,%s)
+                """,
+                (eid, user_id, persona_num),
+            )
+            claimed = cur.rowcount == 1
+        await conn.commit()
+    _remember([eid], user_id, persona_num)
+    if claimed:
+        _stats["claimed"] += 1
+    return claimed
+
+
+def _refresh_after_seconds() -> float:
+    """갱신 간격(초). 보존 기간의 절반을 넘지 않게 제한해 조회되는 ID가 정리되지 않도록 함."""
+    days = float(_int_env("SEEN_REFRESH_DAYS", 7))
+    retention = _int_env("SEEN_RETENTION_DAYS", 180, minimum=0)
+    if retention > 0:
+        days = min(days, retention / 2.0)
+    return days * 86400
+
+
+async def _refresh(ids: List[str]) -> None:
+    """아직 보이는 ID의 updated_at 갱신(보존 정리 대상에서 제외)."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            for ch in _chunks(ids):
+                ph = ",".join(["%s"] * len(ch))
+                await cur.execute(
+                    f"UPDATE ss_instagram_event_seen SET updated_at=CURRENT_TIMESTAMP WHERE external_id IN ({ph})",
+                    tuple(ch),
+                )
+        await conn.commit()
+    now = time.monotonic()
+    for eid in ids:
+        got = _cache.get(eid)
+        if got is not None:
+            _cache[eid] = (got[0], got[1], now)
+    _stats["refreshed"] += len(ids)
+
+
+async def seen_ids(ids: Iterable[Any]) -> Set[str]:
+    """주어진 ID 중 확인됨으로 기록된 것. 캐시 미스만 DB에서 IN (...) 배치 조회.
+
+    확인된 ID 중 updated_at이 SEEN_REFRESH_DAYS보다 오래된 것은 한 번의 배치 UPDATE로 갱신합니다.
+    """
+    uniq = [str(i) for i in dict.fromkeys(ids) if i]
+    refresh_after = _refresh_after_seconds()
+    now = time.monotonic()
+    out: Set[str] = set()
+    misses: List[str] = []
+    stale: List[str] = []
+    for eid in uniq:
+        got = _cache.get(eid)
+        if got is not None:
+            _cache.move_to_end(eid)
+            out.add(eid)
+            if now - got[2] > refresh_after:
+                stale.append(eid)
+        else:
+            misses.append(eid)
+    _stats["cache_hits"] += len(out)
+    if misses:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for ch in _chunks(misses):
+                    ph = ",".join(["%s"] * len(ch))
+                    await cur.execute(
+                        "SELECT external_id, user_id, user_persona_num, TIMESTAMPDIFF(SECOND, updated_at, NOW()) "
+                        f"FROM ss_instagram_event_seen WHERE external_id IN ({ph})",
+                        tuple(ch),
+                    )
+                    _stats["db_lookups"] += 1
+                    for row in (await cur.fetchall()) or []:
+                        eid = str(row[0])
+                        age = float(row[3] or 0)
+                        out.add(eid)
+                        _remember([eid], row[1], row[2], age_seconds=age)
+                        if age > refresh_after:
+                            stale.append(eid)
+        _stats["db_ids_looked_up"] += len(misses)
+    if stale:
+        try:
+            await _refresh(stale)
+        except Exception as e:
+            # 갱신 실패는 다음 조회에서 다시 시도(조회 결과에는 영향 없음)
+            log.warning("seen store refresh failed: %s", e)
+    return out
+
+
+async def is_seen(external_id: Any) -> bool:
+    return str(external_id) in await seen_ids([external_id])
+
+
+async def forget_persona(user_id: int, persona_num: int, cur=None) -> None:
+    """페르소나 삭제 시 기록/캐시 제거(cur를 주면 호출자 트랜잭션에서 실행)."""
+    sql = "DELETE FROM ss_instagram_event_seen WHERE user_id=%s AND user_persona_num=%s"
+    if cur is not None:
+        await cur.execute(sql, (int(user_id), int(persona_num)))
+    else:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as c:
+                await c.execute(sql, (int(user_id), int(persona_num)))
+            await conn.commit()
+    owner = (int(user_id), int(persona_num))
+    for eid in [k for k, v in _cache.items() if v[:2] == owner]:
+        _cache.pop(eid, None)
+
+
+async def prune(retention_days: Optional[int] = None, batch: Optional[int] = None) -> int:
+    """보존 기간이 지난 행을 batch 단위로 삭제(긴 잠금 방지). 삭제 수 반환."""
+    days = retention_days if retention_days is not None else _int_env("SEEN_RETENTION_DAYS", 180, minimum=0)
+    if days <= 0:
+        return 0
+    batch = batch or _int_env("SEEN_PRUNE_BATCH", 5000)
+    total = 0
+    pool = await get_mysql_pool()
+    while True:
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    DELETE FROM ss_instagram_event_seen
+                    WHERE updated_at < NOW() - INTERVAL %s DAY
+                    LIMIT %s
+                    """,
+                    (int(days), int(batch)),
+                )
+                n = int(cur.rowcount or 0)
+            await conn.commit()
+        total += n
+        if n < batch:
+            break
+        await asyncio.sleep(0)
+    if total:
+        # 삭제된 ID는 어떤 것인지 모르므로 캐시는 그대로 둠(오래된 ID는 LRU에서 자연히 밀려남)
+        log.info("seen store pruned %d rows older than %d days", total, days)
+    _stats["pruned"] += total
+    return total
+
+
+async def prune_loop() -> None:
+    """SEEN_PRUNE_INTERVAL_SECONDS마다 prune(). 여러 워커가 동시에 돌아도 배치 DELETE라 안전."""
+    while True:
+        try:
+            await prune()
+            _stats["last_prune_at"] = datetime.now(timezone.utc).isoformat()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.warning("seen store prune failed: %s", e)
+        await asyncio.sleep(_int_env("SEEN_PRUNE_INTERVAL_SECONDS", 21600))
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def seen_store_stats() -> Dict[str, Any]:
+    return {**_stats, "cache_size": len(_cache)}
@@ -0,0 +1,248 @@
+"""
+[파트 개요] 일일 인사이트 스냅샷 엔진
+- IG 연결(+페르소나 토큰 보유) 페르소나를 (user_id, user_persona_num) 순서의 배치로 가져와
+  제한된 동시성으로 perform_snapshot을 실행합니다.
+- 실행 상태는 ss_snapshot_run(run_date 단위)에 배치마다 커서로 기록하므로, 중간에 재시작해도
+  같은 날에는 마지막 커서 다음부터 이어서 처리합니다(이미 끝난 날은 다시 돌지 않음).
+- 프로세스 시작 시각이 아니라 벽시계(UTC) 기준 매일 INSIGHTS_SNAPSHOT_AT에 실행합니다.
+  시작 시 오늘 분이 끝나지 않았으면 바로 따라잡습니다.
+- 여러 워커가 떠 있어도 MySQL GET_LOCK으로 한 워커만 실행합니다.
+- 진행/실패 지표는 /__metrics 의 snapshot 항목(snapshot_stats())에서 확인합니다.
+
+Env
+- INSIGHTS_SNAPSHOT_ENABLED (default 1)
+- INSIGHTS_SNAPSHOT_AT (default "00:30", UTC HH:MM)
+- INSIGHTS_SNAPSHOT_CONCURRENCY (default 8)
+- INSIGHTS_SNAPSHOT_BATCH_SIZE (default 200)
+"""
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiomysql
+
+from app.api.core.mysql import get_mysql_pool
+
+log = logging.getLogger("insights_snapshot")
+
+_LOCK_NAME = "ss_insights_snapshot"
+
+_snapshot_stats: Dict[str, Any] = {
+    "running": False,
+    "run_date": None,
+    "processed": 0,
+    "failed": 0,
+    "partial": 0,
+    "batches": 0,
+    "resumed_from": None,
+    "last_started_at": None,
+    "last_finished_at": None,
+    "last_duration_ms": 0.0,
+    "last_status": None,
+    "last_error": None,
+    "locked_skips": 0,
+    "failures_total": 0,
+    "next_run_at": None,
+}
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default)) or default))
+    except Exception:
+        return default
+
+
+def _run_at() -> Tuple[int, int]:
+    raw = (os.getenv("INSIGHTS_SNAPSHOT_AT") or "00:30").strip()
+    try:
+        hh, mm = raw.split(":", 1)
+        h, m = int(hh), int(mm)
+        if 0 <= h < 24 and 0 <= m < 60:
+            return h, m
+    except Exception:
+        pass
+    return 0, 30
+
+
+def next_run_time(now: datetime) -> datetime:
+    """now(UTC) 이후 가장 가까운 실행 시각."""
+    h, m = _run_at()
+    target = now.replace(hour=h, minute=m, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return target
+
+
+async def _next_batch(after: Tuple[int, int], limit: int) -> List[Dict[str, Any]]:
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            await cur.execute(
+                """
+                SELECT p.user_id, p.user_persona_num, p.ig_user_id, t.long_lived_user_token
+                FROM ss_persona p
+                JOIN ss_instagram_connector_persona t
+                  ON t.user_id = p.user_id AND t.user_persona_num = p.user_persona_num
+                WHERE p.ig_user_id IS NOT NULL
+                  AND (p.user_id > %s OR (p.user_id = %s AND p.user_persona_num > %s))
+                ORDER BY p.user_id, p.user_persona_num
+                LIMIT %s
+                """,
+                (after[0], after[0], after[1], int(limit)),
+            )
+            return list(await cur.fetchall() or [])
+
+
+async def _snapshot_one(row: Dict[str, Any], sem: asyncio.Semaphore) -> str:
+    """'ok' | 'partial' | 'failed'"""
+    from app.api.routes.instagram_insights import perform_snapshot
+
+    uid, num = int(row["user_id"]), int(row["user_persona_num"])
+    async with sem:
+        try:
+            saved = await perform_snapshot(
+                uid, num, ig_user_id=str(row["ig_user_id"]), token=row.get("long_lived_user_token")
+            )
+            return "partial" if saved.get("partial") else "ok"
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+            _snapshot_stats["last_error"] = f"uid={uid} num={num}: {detail}"
+            log.warning("snapshot failed uid=%s num=%s: %s", uid, num, detail)
+            return "failed"
+
+
+async def run_snapshot(run_date: Optional[date] = None) -> Dict[str, Any]:
+    """run_date(기본: 오늘 UTC)의 스냅샷을 처음부터 또는 저장된 커서부터 실행."""
+    run_date = run_date or datetime.now(timezone.utc).date()
+    st = _snapshot_stats
+    pool = await get_mysql_pool()
+    async with pool.acquire() as lock_conn:
+        async with lock_conn.cursor() as lcur:
+            await lcur.execute("SELECT GET_LOCK(%s, 0)", (_LOCK_NAME,))
+            got = (await lcur.fetchone() or [0])[0]
+            if not got:
+                st["locked_skips"] += 1
+                return {"status": "locked"}
+            try:
+                await lcur.execute(
+                    "INSERT IGNORE INTO ss_snapshot_run (run_date, status) VALUES (%s, 'running')",
+                    (run_date,),
+                )
+                await lcur.execute(
+                    """
+                    SELECT status, cursor_user_id, cursor_persona_num, processed, failed
+                    FROM ss_snapshot_run WHERE run_date=%s
+                    """,
+                    (run_date,),
+                )
+                row = await lcur.fetchone() or ("running", 0, 0, 0, 0)
+                try:
+                    await lock_conn.commit()
+                except Exception:
+                    pass
+                if row[0] == "done":
+                    return {"status": "done", "processed": int(row[3] or 0), "failed": int(row[4] or 0)}
+                cursor = (int(row[1] or 0), int(row[2] or 0))
+                processed, failed = int(row[3] or 0), int(row[4] or 0)
+
+                t0 = time.monotonic()
+                st.update({
+                    "running": True,
+                    "run_date": run_date.isoformat(),
+                    "processed": processed,
+                    "failed": failed,
+                    "partial": 0,
+                    "batches": 0,
+                    "resumed_from": list(cursor) if cursor != (0, 0) else None,
+                    "last_started_at": datetime.now(timezone.utc).isoformat(),
+                    "last_error": None,
+                })
+                sem = asyncio.Semaphore(_int_env("INSIGHTS_SNAPSHOT_CONCURRENCY", 8))
+                batch_size = _int_env("INSIGHTS_SNAPSHOT_BATCH_SIZE", 200)
+                status = "done"
+                try:
+                    while True:
+                        batch = await _next_batch(cursor, batch_size)
+                        if not batch:
+                            break
+                        results = await asyncio.gather(*(_snapshot_one(r, sem) for r in batch))
+                        processed += sum(1 for r in results if r != "failed")
+                        failed += sum(1 for r in results if r == "failed")
+                        st["partial"] += sum(1 for r in results if r == "partial")
+                        st["failures_total"] += sum(1 for r in results if r == "failed")
+                        last = batch[-1]
+                        cursor = (int(last["user_id"]), int(last["user_persona_num"]))
+                        st["processed"], st["failed"] = processed, failed
+                        st["batches"] += 1
+                        await lcur.execute(
+                            """
+                            UPDATE ss_snapshot_run
+                            SET cursor_user_id=%s, cursor_persona_num=%s, processed=%s, failed=%s
+                            WHERE run_date=%s
+                            """,
+                            (cursor[0], cursor[1], processed, failed, run_date),
+                        )
+                        try:
+                            await lock_conn.commit()
+                        except Exception:
+                            pass
+                        if len(batch) < batch_size:
+                            break
+                    await lcur.execute(
+                        "UPDATE ss_snapshot_run SET status='done', finished_at=UTC_TIMESTAMP() WHERE run_date=%s",
+                        (run_date,),
+                    )
+                    try:
+                        await lock_conn.commit()
+                    except Exception:
+                        pass
+                except BaseException as e:
+                    status = "interrupted"
+                    st["last_error"] = f"run: {e or type(e).__name__}"
+                    raise
+                finally:
+                    st["running"] = False
+                    st["last_status"] = status
+                    st["last_finished_at"] = datetime.now(timezone.utc).isoformat()
+                    st["last_duration_ms"] = round((time.monotonic() - t0) * 1000.0, 1)
+                log.info("insights snapshot %s: processed=%s failed=%s", run_date, processed, failed)
+                return {"status": status, "processed": processed, "failed": failed}
+            finally:
+                try:
+                    await lcur.execute("SELECT RELEASE_LOCK(%s)", (_LOCK_NAME,))
+                    await lcur.fetchone()
+                except Exception:
+                    pass
+
+
+async def snapshot_scheduler_loop() -> None:
+    """시작 시 오늘 분을 따라잡고, 이후 매일 INSIGHTS_SNAPSHOT_AT(UTC)에 실행."""
+    if os.getenv("INSIGHTS_SNAPSHOT_ENABLED", "1").strip().lower() not in ("1", "true", "yes"):
+        return
+    while True:
+        now = datetime.now(timezone.utc)
+        h, m = _run_at()
+        # 오늘 실행 시각이 지났으면 오늘 분 실행(이미 끝났으면 즉시 반환)
+        if now >= now.replace(hour=h, minute=m, second=0, microsecond=0):
+            try:
+                await run_snapshot(now.date())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _snapshot_stats["last_error"] = f"run: {e}"
+                log.warning("insights snapshot run failed: %s", e)
+                # DB 장애 등: 잠시 후 같은 날 커서부터 재시도
+                await asyncio.sleep(300)
+                continue
+        nxt = next_run_time(datetime.now(timezone.utc))
+        _snapshot_stats["next_run_at"] = nxt.isoformat()
+        await asyncio.sleep(max(1.0, (nxt - datetime.now(timezone.utc)).total_seconds()))
+
+
+def snapshot_stats() -> Dict[str, Any]:
+    return dict(_snapshot_stats)
@@ -0,0 +1,171 @@
+"""
+[파트 개요] 채팅/임시저장 이미지 기록(ss_chat_img) 액세스
+- 내부 통신: aiomysql 풀
+- 운영 DB에는 구 스키마(chat_img_id, persona_chat_img)와 신 스키마(img_id, img_key)가 섞여 있어
+  예전에는 쿼리마다 신 스키마로 시도하고 실패하면 구 스키마로 다시 실행했습니다.
+  여기서는 프로세스당 한 번 컬럼을 조회해 쿼리 경로를 고정합니다.
+- kind('chat' | 'drafts')는 저장 시 키 접두로 정해 컬럼에 기록하고(마이그레이션 0008),
+  목록은 (user_id, kind[, persona_id]) + img_id 커서로 조회합니다(OFFSET 없음 → 깊은 페이지도 같은 비용).
+"""
+from __future__ import annotations
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import aiomysql
+
+from app.api.core.mysql import get_mysql_pool
+
+log = logging.getLogger("chat_images")
+
+KINDS = ("chat", "drafts")
+
+
+@dataclass(frozen=True)
+class _Schema:
+    id_col: str
+    key_col: str
+    has_kind: bool
+
+
+_schema: Optional[_Schema] = None
+_schema_lock = asyncio.Lock()
+
+
+def image_kind(key: str) -> str:
+    """키 접두 → kind. drafts/ 외(chat/, 과거 URL 값 등)는 갤러리(chat)."""
+    return "drafts" if (key or "").startswith("drafts/") else "chat"
+
+
+def kind_for_prefix(prefix: Optional[str]) -> Optional[str]:
+    """목록 API의 prefix 인자 → kind(해당 없으면 None)."""
+    p = (prefix or "").strip().rstrip("/")
+    return p if p in KINDS else None
+
+
+async def _get_schema(cur) -> _Schema:
+    global _schema
+    if _schema is not None:
+        return _schema
+    async with _schema_lock:
+        if _schema is None:
+            await cur.execute(
+                """
+                SELECT COLUMN_NAME FROM INFORMATION_SCHEMA.COLUMNS
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ss_chat_img'
+                """
+            )
+            cols = {str((r.get("COLUMN_NAME") if isinstance(r, dict) else r[0]) or "").lower() for r in (await cur.fetchall() or [])}
+            if not cols:
+                # 테이블이 아직 없으면 고정하지 않음(다음 호출에서 다시 확인)
+                return _Schema("img_id", "img_key", False)
+            _schema = _Schema(
+                id_col="img_id" if "img_id" in cols else "chat_img_id",
+                key_col="img_key" if "img_key" in cols else "persona_chat_img",
+                has_kind="kind" in cols,
+            )
+            log.info("ss_chat_img schema: %s", _schema)
+    return _schema
+
+
+def reset_schema_cache() -> None:
+    """마이그레이션 직후/테스트용."""
+    global _schema
+    _schema = None
+
+
+async def insert_chat_image(user_id: int, persona_id: int, key: str) -> Optional[int]:
+    """이미지 기록 추가 후 id 반환(best-effort: 실패 시 로그만 남기고 None)."""
+    try:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                s = await _get_schema(cur)
+                if s.has_kind:
+                    await cur.execute(
+                        f"INSERT INTO ss_chat_img (user_id, persona_id, {s.key_col}, kind) VALUES (%s, %s, %s, %s)",
+                        (int(user_id), int(persona_id), key, image_kind(key)),
+                    )
+                else:
+                    await cur.execute(
+                        f"INSERT INTO ss_chat_img (user_id, persona_id, {s.key_col}) VALUES (%s, %s, %s)",
+                        (int(user_id), int(persona_id), key),
+                    )
+                new_id = cur.lastrowid
+            await conn.commit()
+        return int(new_id) if new_id else None
+    except Exception as e:
+        log.warning("ss_chat_img insert failed: %s", e)
+        return None
+
+
+async def list_chat_images(
+    user_id: int,
+    kind: Optional[str] = None,
+    persona_id: Optional[int] = None,
+    limit: int = 60,
+    before_id: Optional[int] = None,
+    offset: int = 0,
+    key_prefix: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """최신순(img_id DESC) 목록. before_id(커서)보다 작은 id만 반환.
+
+    kind가 있으면 kind 컬럼(없는 DB는 키 접두 LIKE)으로, key_prefix가 있으면 키 접두로 DB에서 거릅니다.
+    offset은 커서가 없을 때만 쓰는 하위 호환용입니다.
+    반환 행: {img_id, user_id, persona_id, img_key, created_at}
+    """
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
+            s = await _get_schema(cur)
+            where = ["user_id=%s"]
+            params: List[Any] = [int(user_id)]
+            if persona_id is not None:
+                where.append("persona_id=%s")
+                params.append(int(persona_id))
+            if kind:
+                if s.has_kind:
+                    where.append("kind=%s")
+                    params.append(kind)
+                elif kind == "drafts":
+                    where.append(f"{s.key_col} LIKE 'drafts/%%'")
+                else:
+                    where.append(f"({s.key_col} IS NULL OR {s.key_col} NOT LIKE 'drafts/%%')")
+            elif key_prefix:
+                where.append(f"{s.key_col} LIKE %s")
+                params.append(key_prefix.replace("%", r"\%").replace("_", r"\_") + "%")
+            if before_id is not None:
+                where.append(f"{s.id_col} < %s")
+                params.append(int(before_id))
+            sql = (
+                f"SELECT {s.id_col} AS img_id, user_id, persona_id, {s.key_col} AS img_key, created_at "
+                f"FROM ss_chat_img WHERE {' AND '.join(where)} ORDER BY {s.id_col} DESC LIMIT %s"
+            )
+            params.append(max(1, int(limit)))
+            if before_id is None and offset:
+                sql += " OFFSET %s"
+                params.append(max(0, int(offset)))
+            await cur.execute(sql, tuple(params))
+            return list(await cur.fetchall() or [])
+
+
+async def delete_chat_image(user_id: int, img_id: int) -> Optional[str]:
+    """사용자 소유 기록을 지우고 그 이미지 키를 반환(없으면 None)."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            s = await _get_schema(cur)
+            await cur.execute(
+                f"SELECT {s.key_col} FROM ss_chat_img WHERE {s.id_col}=%s AND user_id=%s LIMIT 1",
+                (int(img_id), int(user_id)),
+            )
+            row = await cur.fetchone()
+            if not row:
+                return None
+            await cur.execute(
+                f"DELETE FROM ss_chat_img WHERE {s.id_col}=%s AND user_id=%s",
+                (int(img_id), int(user_id)),
+            )
+        await conn.commit()
+    return row[0] if row[0] else None
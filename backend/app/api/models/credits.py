@@ -3,11 +3,9 @@
 - 내부 통신: MySQL (aiomysql) 연결 풀을 사용
 - 외부 통신: 없음
 
-테이블 구조(자동 생성)
+테이블 구조(app.api.core.migrations 0001_credit_tables에서 생성)
 - ss_credit_balance(user_id PK, balance INT NOT NULL DEFAULT 0, updated_at TIMESTAMP)
 - ss_credit_ledger(id PK, user_id, delta, reason, ref_type, ref_id, created_at)
-
-주의: 실제 운영에서는 별도의 마이그레이션 도구를 권장합니다. 여기선 편의상 앱에서 IF NOT EXISTS로 생성합니다.
 """
 from __future__ import annotations
 from typing import Optional, Dict, Any, List
@@ -16,38 +14,6 @@ import aiomysql
 from app.api.core.mysql import get_mysql_pool
 
 
-CREATE_BAL_SQL = """
-CREATE TABLE IF NOT EXISTS ss_credit_balance (
-  user_id    INT PRIMARY KEY,
-  balance    INT NOT NULL DEFAULT 0,
-  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-)
-"""
-
-
-CREATE_LEDGER_SQL = """
-CREATE TABLE IF NOT EXISTS ss_credit_ledger (
-  id         BIGINT AUTO_INCREMENT PRIMARY KEY,
-  user_id    INT NOT NULL,
-  delta      INT NOT NULL,
-  reason     VARCHAR(255) NULL,
-  ref_type   VARCHAR(64)  NULL,
-  ref_id     VARCHAR(128) NULL,
-  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
-  INDEX idx_user_created (user_id, created_at)
-)
-"""
-
-
-async def ensure_credit_tables():
-    pool = await get_mysql_pool()
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(CREATE_BAL_SQL)
-            await cur.execute(CREATE_LEDGER_SQL)
-            await conn.commit()
-
-
 async def get_balance(user_id: int) -> int:
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
@@ -0,0 +1,148 @@
+"""
+[파트 개요] 인스타그램 게시물 캐시(ss_instagram_post) 액세스
+- 내부 통신: aiomysql 풀
+- Graph /{ig_user_id}/media 응답 항목을 게시물 행으로 저장하고, 페르소나별 좋아요 합계를 DB에서 계산합니다.
+  (스냅샷이 매일 전체 게시물을 다시 페이지네이션하지 않도록 게시물별 like_count를 여기에 누적)
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.api.core.mysql import get_mysql_pool
+
+# Graph media 필드(동기화/스냅샷 공통)
+POST_FIELDS = "id,media_type,media_product_type,media_url,thumbnail_url,permalink,timestamp,caption,like_count,comments_count"
+
+UPSERT_POST_SQL = """
+INSERT INTO ss_instagram_post (
+  media_id, user_id, user_persona_num, ig_user_id,
+  media_type, media_product_type, media_url, thumbnail_url,
+  permalink, caption, posted_at, like_count, comments_count
+) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
+ON DUPLICATE KEY UPDATE
+  media_type=VALUES(media_type),
+  media_product_type=VALUES(media_product_type),
+  media_url=VALUES(media_url),
+  thumbnail_url=VALUES(thumbnail_url),
+  permalink=VALUES(permalink),
+  caption=VALUES(caption),
+  posted_at=VALUES(posted_at),
+  like_count=GREATEST(VALUES(like_count), like_count),
+  comments_count=GREATEST(VALUES(comments_count), comments_count),
+  updated_at=CURRENT_TIMESTAMP
+"""
+
+
+def posted_at_from_ts(timestamp: Any) -> Optional[str]:
+    """IG ISO 8601 timestamp → MySQL DATETIME 문자열."""
+    if not isinstance(timestamp, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        # '+0000' 형식(콜론 없음) 호환
+        try:
+            dt = datetime.strptime(timestamp[:19], "%Y-%m-%dT%H:%M:%S")
+            return dt.strftime("%Y-%m-%d %H:%M:%S")
+        except Exception:
+            return None
+
+
+def post_row(user_id: int, persona_num: int, ig_user_id: str, m: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    """Graph media 항목 → UPSERT_POST_SQL 파라미터. id가 없으면 None."""
+    mid = m.get("id")
+    if not mid:
+        return None
+    try:
+        like_count = int(m.get("like_count") or 0)
+    except Exception:
+        like_count = 0
+    try:
+        comments_count = int(m.get("comments_count") or 0)
+    except Exception:
+        comments_count = 0
+    return (
+        str(mid), int(user_id), int(persona_num), str(ig_user_id),
+        m.get("media_type"), m.get("media_product_type"), m.get("media_url"), m.get("thumbnail_url"),
+        m.get("permalink"), m.get("caption"), posted_at_from_ts(m.get("timestamp")), like_count, comments_count,
+    )
+
+
+async def upsert_post_rows(cur, rows: List[Tuple[Any, ...]]) -> int:
+    """post_row() 결과들을 저장. 여러 페르소나의 행을 섞어도 됩니다.
+
+    aiomysql executemany는 INSERT ... VALUES를 multi-row 문장으로 다시 써서
+    max_stmt_length(1MB) 단위로 나눠 보내므로, 게시물 수와 무관하게 왕복은 몇 번뿐입니다.
+    """
+    if rows:
+        await cur.executemany(UPSERT_POST_SQL, rows)
+    return len(rows)
+
+
+async def upsert_posts(cur, user_id: int, persona_num: int, ig_user_id: str, items: Iterable[Dict[str, Any]]) -> int:
+    """여러 게시물을 한 번의 multi-row INSERT ... ON DUPLICATE KEY UPDATE로 저장. 저장 대상 수를 반환."""
+    rows: List[Tuple[Any, ...]] = []
+    for m in items:
+        row = post_row(user_id, persona_num, ig_user_id, m)
+        if row is not None:
+            rows.append(row)
+    return await upsert_post_rows(cur, rows)
+
+
+async def prune_missing_posts(
+    cur,
+    user_id: int,
+    persona_num: int,
+    keep_ids: Iterable[str],
+    *,
+    since: Optional[str] = None,
+    recent_limit: Optional[int] = None,
+) -> int:
+    """Graph 응답(keep_ids)에 없는 캐시 게시물을 DELETE 한 번(anti-join)으로 삭제. 삭제 수 반환.
+
+    - since('YYYY-MM-DD HH:MM:SS'): posted_at이 그 이후(또는 NULL)인 행만 대상
+    - recent_limit: since가 없을 때 최근 N개 로컬 행만 대상(목록 정렬과 동일)
+    """
+    keep = [str(i) for i in dict.fromkeys(keep_ids) if i]
+    not_in = f" AND p.media_id NOT IN ({','.join(['%s'] * len(keep))})" if keep else ""
+    if since is not None:
+        sql = (
+            "DELETE p FROM ss_instagram_post p "
+            "WHERE p.user_id=%s AND p.user_persona_num=%s AND (p.posted_at IS NULL OR p.posted_at >= %s)" + not_in
+        )
+        params: List[Any] = [int(user_id), int(persona_num), since, *keep]
+    elif recent_limit is not None:
+        # LIMIT가 있는 파생 테이블은 먼저 구체화되므로 같은 테이블을 지우면서 조인해도 됩니다.
+        sql = (
+            "DELETE p FROM ss_instagram_post p "
+            "JOIN ("
+            " SELECT media_id FROM ss_instagram_post"
+            " WHERE user_id=%s AND user_persona_num=%s"
+            " ORDER BY (posted_at IS NULL) ASC, posted_at DESC, updated_at DESC"
+            " LIMIT %s"
+            ") recent ON recent.media_id = p.media_id "
+            "WHERE p.user_id=%s AND p.user_persona_num=%s" + not_in
+        )
+        params = [int(user_id), int(persona_num), max(1, int(recent_limit)), int(user_id), int(persona_num), *keep]
+    else:
+        return 0
+    await cur.execute(sql, tuple(params))
+    return int(cur.rowcount or 0)
+
+
+async def post_like_stats(user_id: int, persona_num: int) -> Tuple[int, int]:
+    """(저장된 게시물 수, like_count 합계)."""
+    pool = await get_mysql_pool()
+    async with pool.acquire() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(like_count), 0)
+                FROM ss_instagram_post
+                WHERE user_id=%s AND user_persona_num=%s
+                """,
+                (int(user_id), int(persona_num)),
+            )
+            row = await cur.fetchone() or (0, 0)
+    return int(row[0] or 0), int(row[1] or 0)
@@ -7,6 +7,8 @@ import aiomysql
 import json
 from typing import Any, Dict, List
 from app.api.core.mysql import get_mysql_pool
+from app.api.core.persona_context import invalidate_persona
+from app.api.core.seen_store import forget_persona
 import logging
 
 log = logging.getLogger("personas")
@@ -102,6 +104,7 @@ async def update_persona_img(user_id: int, persona_num: int, img_value: str) ->
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, persona_num)
 
 
 async def update_persona_fields(
@@ -163,6 +166,7 @@ async def update_persona_fields(
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, persona_num)
 
 
 async def delete_persona(user_id: int, persona_num: int) -> None:
@@ -184,12 +188,9 @@ async def delete_persona(user_id: int, persona_num: int) -> None:
                 )
             except Exception:
                 pass
-            # Remove seen acks (best-effort)
+            # Remove seen acks (best-effort, 프로세스 내 캐시 포함)
             try:
-                await cur.execute(
-                    "DELETE FROM ss_instagram_event_seen WHERE user_id=%s AND user_persona_num=%s",
-                    (user_id, persona_num),
-                )
+                await forget_persona(user_id, persona_num, cur=cur)
             except Exception:
                 pass
             # Finally, remove persona
@@ -201,3 +202,4 @@ async def delete_persona(user_id: int, persona_num: int) -> None:
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, persona_num)
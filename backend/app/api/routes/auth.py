@@ -6,7 +6,7 @@
 
 from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import RedirectResponse, JSONResponse
-import httpx
+from app.core.http_clients import http_client
 import os
 import logging
 from urllib.parse import urlencode
@@ -124,7 +124,7 @@ async def kakao_callback(request: Request):
         token_payload["client_secret"] = kakao_client_secret
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_client("kakao") as client:
             token_resp = await client.post(token_url, data=token_payload)
             if token_resp.status_code != 200:
                 logger.error("Kakao token error [%s]: %s", token_resp.status_code, token_resp.text)
@@ -195,7 +195,7 @@ async def kakao_unlink(request: Request):
     headers = {"Authorization": f"KakaoAK {KAKAO_ADMIN_KEY}"}
     data = {"target_id_type": "user_id", "target_id": inherent}
 
-    async with httpx.AsyncClient() as client:
+    async with http_client("kakao") as client:
         resp = await client.post(unlink_url, headers=headers, data=data)
         if resp.status_code != 200:
             logger.error("Kakao unlink error [%s]: %s", resp.status_code, resp.text)
@@ -252,7 +252,7 @@ async def google_callback(request: Request):
     }
 
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_client("google") as client:
             token_resp = await client.post(token_url, data=token_payload, headers={"Accept": "application/json"})
             if token_resp.status_code != 200:
                 logger.error("Google token error [%s]: %s", token_resp.status_code, token_resp.text)
@@ -333,7 +333,7 @@ async def naver_callback(request: Request):
         "redirect_uri": naver_redirect_uri,
     }
     try:
-        async with httpx.AsyncClient() as client:
+        async with http_client("naver") as client:
             token_resp = await client.post(token_url, data=token_payload)
             if token_resp.status_code != 200:
                 logger.error("Naver token error [%s]: %s", token_resp.status_code, token_resp.text)
@@ -1,13 +1,21 @@
 from fastapi import APIRouter, HTTPException, Request, Body
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from typing import Awaitable, Callable, List, Literal, Optional
 import os
-from urllib.parse import urlparse, urlunparse
+import json
+import time
+import asyncio
 import httpx
+from app.core.http_clients import get_http_client, http_client
 import logging
-import aiomysql
-from app.api.core.mysql import get_mysql_pool
-from app.core.s3 import s3_enabled, presign_get_url, put_data_uri, delete_object
+from app.core.s3 import s3_enabled, apresign_get_url, aput_bytes, adelete_object
+from app.core.ai_image import AI_IMAGE_ACCEPT, read_ai_image, to_data_uri
+from app.api.core.persona_context import get_persona_context
+from app.api.core.image_jobs import TERMINAL, get_job, submit_job
+from app.api.core.renditions import delete_renditions, resolve_urls, schedule_renditions
+from app.api.models.chat_images import delete_chat_image, insert_chat_image, kind_for_prefix, list_chat_images
 
 # 파트: 채팅/이미지 생성 API
 router = APIRouter(prefix="/api/chat", tags=["chat"])
@@ -25,6 +33,19 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessage] = Field(default_factory=list)
 
 
+async def _chat_persona_img(user_id: int, persona_num: Optional[int]) -> Optional[str]:
+    if persona_num is None:
+        return None
+    try:
+        ctx = await get_persona_context(int(user_id), int(persona_num))
+        # S3 키/상대 경로는 AI가 접근 가능한 URL(프리사인 등)로 정규화된 값 사용
+        if ctx and ctx.image_url:
+            return ctx.image_url
+    except Exception as e:
+        log.warning("persona lookup failed: %s", e)
+    return None
+
+
 @router.post("/send")
 async def send(req: ChatRequest, request: Request):
     if not req.messages:
@@ -33,41 +54,14 @@ async def send(req: ChatRequest, request: Request):
     if not user_id:
         raise HTTPException(status_code=401, detail="not_logged_in")
 
-    persona_img: Optional[str] = None
-    if req.persona_num is not None:
-        try:
-            pool = await get_mysql_pool()
-            async with pool.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cur:
-                    await cur.execute(
-                        """
-                        SELECT persona_img
-                        FROM ss_persona
-                        WHERE user_id = %s AND user_persona_num = %s
-                        LIMIT 1
-                        """,
-                        (int(user_id), int(req.persona_num)),
-                    )
-                    row = await cur.fetchone()
-                    if row and row.get("persona_img"):
-                        persona_img = row["persona_img"]
-        except Exception as e:
-            log.warning("persona lookup failed: %s", e)
-
-    # persona_img가 S3 키라면 프리사인 URL로 변환
-    try:
-        if persona_img and not persona_img.lower().startswith("http") and not persona_img.startswith("data:") and not persona_img.startswith("/"):
-            if s3_enabled():
-                persona_img = presign_get_url(persona_img)
-    except Exception as _e:
-        log.warning("persona_img presign failed: %s", _e)
+    persona_img = await _chat_persona_img(int(user_id), req.persona_num)
 
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://localhost:8600").rstrip("/")
     # 전송: POST {ai}/chat
     # payload: { persona_img: str|None, messages: [{role,content}] }
     payload = {"persona_img": persona_img, "messages": [m.model_dump() for m in req.messages]}
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with http_client("ai", timeout=30.0) as client:
             r = await client.post(f"{ai_url}/chat", json=payload)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ai_delegate_error: {e}")
@@ -82,6 +76,66 @@ async def send(req: ChatRequest, request: Request):
     return r.json()
 
 
+@router.post("/send/stream")
+async def send_stream(req: ChatRequest, request: Request):
+    """/send의 스트리밍 버전: AI /chat/stream 의 SSE(delta… → done | error)를 버퍼링 없이 그대로 전달."""
+    if not req.messages:
+        raise HTTPException(status_code=400, detail="messages_required")
+    user_id = request.session.get("user_id") if hasattr(request, "session") else None
+    if not user_id:
+        raise HTTPException(status_code=401, detail="not_logged_in")
+
+    persona_img = await _chat_persona_img(int(user_id), req.persona_num)
+    ai_url = (os.getenv("AI_SERVICE_URL") or "http://localhost:8600").rstrip("/")
+    payload = {"persona_img": persona_img, "messages": [m.model_dump() for m in req.messages]}
+    # 전체 응답 시간이 아니라 청크 사이 간격(read)에만 타임아웃 적용
+    idle = float(os.getenv("CHAT_STREAM_IDLE_TIMEOUT", "30") or 30)
+    client = get_http_client("ai")
+    try:
+        upstream = await client.send(
+            client.build_request(
+                "POST",
+                f"{ai_url}/chat/stream",
+                json=payload,
+                headers={"Accept": "text/event-stream"},
+                timeout=httpx.Timeout(idle, connect=10.0),
+            ),
+            stream=True,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"ai_delegate_error: {e}")
+    if upstream.status_code != 200:
+        try:
+            body = await upstream.aread()
+            try:
+                detail = json.loads(body)
+            except Exception:
+                detail = body.decode("utf-8", "replace")
+        finally:
+            await upstream.aclose()
+        raise HTTPException(status_code=502, detail={"ai_failed": True, "status": upstream.status_code, "body": detail})
+
+    async def _relay():
+        try:
+            async for chunk in upstream.aiter_raw():
+                yield chunk
+        except Exception as e:
+            log.warning("chat stream relay interrupted: %s", e)
+            err = {"error": "ai_stream_interrupted", "message": str(e)}
+            yield f"event: error\ndata: {json.dumps(err, ensure_ascii=False)}\n\n".encode("utf-8")
+        finally:
+            await upstream.aclose()
+
+    # 클라이언트가 본문 전송 전에 끊으면 _relay()가 시작되지 않아 finally도 돌지 않음 →
+    # 응답 종료 시 항상 실행되는 background로 업스트림을 닫아 공유 "ai" 풀 연결을 반환(중복 close는 무해)
+    return StreamingResponse(
+        _relay(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
 @router.get("/send")
 async def send_usage():
     """간단한 사용 가이드(브라우저 GET 보호)"""
@@ -107,74 +161,48 @@ class ChatImageRequest(BaseModel):
     ls_session_id: Optional[str] = None
     # style_img: data URI 또는 URL(선택) — 의상 유지 참고 이미지
     style_img: Optional[str] = None
+    # 응답 image 형식: 기본은 저장된 이미지 URL, "data_uri"면 data URI로 반환
+    image_format: Optional[Literal["url", "data_uri"]] = None
 
 
 @router.post("/image")
 async def image(req: ChatImageRequest, request: Request):
+    """동기 생성(생성·업로드가 끝날 때까지 연결 유지). 긴 요청은 /image/jobs 사용 권장."""
     user_id = request.session.get("user_id") if hasattr(request, "session") else None
     if not user_id:
         raise HTTPException(status_code=401, detail="not_logged_in")
+    return await generate_chat_image(int(user_id), req)
+
+
+async def generate_chat_image(
+    user_id: int,
+    req: ChatImageRequest,
+    on_stage: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> dict:
+    """페르소나 조회 → AI 이미지 생성 → S3 저장/ss_chat_img 기록. 실패 시 HTTPException.
+    on_stage: 단계 변경 알림(작업 API 진행 상태: generating → storing)
+    """
+    async def _stage(name: str) -> None:
+        if on_stage is not None:
+            try:
+                await on_stage(name)
+            except Exception:
+                pass
 
-    # 1) 페르소나 이미지/파라미터 조회
-    persona_img: Optional[str] = None
-    persona_params_json: Optional[str] = None
+    # 1) 페르소나 이미지/파라미터 조회(캐시)
     try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    """
-                    SELECT persona_img, persona_parameters
-                    FROM ss_persona
-                    WHERE user_id = %s AND user_persona_num = %s
-                    LIMIT 1
-                    """,
-                    (int(user_id), int(req.persona_num)),
-                )
-                row = await cur.fetchone()
-                if not row:
-                    raise HTTPException(status_code=404, detail="persona_not_found")
-                persona_db_id = int(req.persona_num)
-                persona_img = row.get("persona_img")
-                # persona_parameters는 JSON 문자열 또는 dict일 수 있음 → 문자열로 보냄
-                pp = row.get("persona_parameters")
-                if isinstance(pp, (dict, list)):
-                    import json as _json
-                    persona_params_json = _json.dumps(pp, ensure_ascii=False)
-                else:
-                    persona_params_json = pp
-    except HTTPException:
-        raise
+        ctx = await get_persona_context(int(user_id), int(req.persona_num))
     except Exception as e:
         log.exception("persona lookup failed: %s", e)
         raise HTTPException(status_code=500, detail="persona_lookup_failed")
-
-    if not persona_img:
+    if ctx is None:
+        raise HTTPException(status_code=404, detail="persona_not_found")
+    persona_db_id = int(req.persona_num)
+    if not ctx.persona_img:
         raise HTTPException(status_code=400, detail="persona_img_missing")
-
-    # 2) AI에서 접근 가능한 URL로 정규화 + S3 키면 프리사인
-    def _normalize_persona_img(raw: str) -> str:
-        try:
-            if raw.startswith("data:"):
-                return raw
-            if raw.startswith("/"):
-                base = (os.getenv("BACKEND_INTERNAL_URL") or "http://backend:8000").rstrip("/")
-                return f"{base}{raw}"
-            if raw.startswith("http://localhost") or raw.startswith("http://127.0.0.1"):
-                # 호스트만 backend로 교체
-                p = urlparse(raw)
-                repl = p._replace(netloc="backend:8000")
-                return urlunparse(repl)
-            # 그 외(http/https, /media가 아닌 경우) → S3 키로 보고 프리사인 시도
-            if s3_enabled():
-                return presign_get_url(raw)
-            return raw
-        except Exception:
-            return raw
-
-    persona_img_norm = _normalize_persona_img(persona_img)
-    if persona_img_norm != persona_img:
-        log.info("persona_img normalized: %s -> %s", persona_img, persona_img_norm)
+    # 2) AI에서 접근 가능한 URL(S3 키면 프리사인)과 persona_parameters JSON 문자열
+    persona_img_norm = ctx.image_url
+    persona_params_json = ctx.params_json
 
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://localhost:8600").rstrip("/")
     # 전송: POST {ai}/chat/image
@@ -185,11 +213,13 @@ async def image(req: ChatImageRequest, request: Request):
         "persona": persona_params_json or "",
         "ls_session_id": req.ls_session_id,
         "style_img": req.style_img,
+        **ctx.image_ref,
     }
     log.info("/chat/image forwarding -> user_id=%s persona_num=%s", user_id, req.persona_num)
+    await _stage("generating")
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            r = await client.post(f"{ai_url}/chat/image", json=payload)
+        async with http_client("ai") as client:
+            r = await client.post(f"{ai_url}/chat/image", json=payload, headers=AI_IMAGE_ACCEPT)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ai_delegate_error: {e}")
 
@@ -201,68 +231,35 @@ async def image(req: ChatImageRequest, request: Request):
         except Exception:
             detail = r.text
         raise HTTPException(status_code=502, detail={"ai_failed": True, "status": r.status_code, "body": detail})
-    ai_json = r.json()
+    # AI는 이미지 바이트를 그대로 반환(구버전은 JSON data URI) — base64 왕복 없이 S3로 업로드
+    got = read_ai_image(r)
+    if got is None:
+        raise HTTPException(status_code=502, detail="invalid_ai_response")
+    img_raw, img_mime, img_prompt = got
 
     # 3) 이미지 파일 저장(+ DB 기록) — S3(chat/{user_id}/{persona_id})에 저장하고 ss_chat_img에 기록
     stored = None
+    await _stage("storing")
     try:
-        img_str = ai_json.get("image") if isinstance(ai_json, dict) else None
-        if isinstance(img_str, str) and img_str.startswith("data:"):
+        if img_raw:
             if not s3_enabled():
                 raise HTTPException(status_code=400, detail="s3_not_configured")
             # 키 경로: chat/{user_id}/{persona_id}
-            key = put_data_uri(
-                img_str,
+            key = await aput_bytes(
+                img_raw,
+                img_mime,
                 model=None,
                 key_prefix=f"chat/{int(user_id)}/{int(persona_db_id)}",
                 base_prefix="",
                 include_model=False,
                 include_date=False,
             )
-            url = presign_get_url(key)
+            url = await apresign_get_url(key)
+            # 갤러리용 압축본/썸네일은 응답을 늦추지 않도록 백그라운드에서 생성
+            schedule_renditions(key, img_raw)
 
-            # DB 기록: ss_chat_img(img_id PK auto, user_id, persona_id, img_key, created_at)
-            chat_id = None
-            try:
-                pool = await get_mysql_pool()
-                async with pool.acquire() as conn:
-                    async with conn.cursor() as cur:
-                        inserted = False
-                        # 1차 시도: 최신 컬럼(img_key)
-                        try:
-                            await cur.execute(
-                                """
-                                INSERT INTO ss_chat_img (user_id, persona_id, img_key)
-                                VALUES (%s, %s, %s)
-                                """,
-                                (int(user_id), int(persona_db_id), key),
-                            )
-                            inserted = True
-                        except Exception as _ie:
-                            # 2차 시도: 구 스키마(persona_chat_img)
-                            try:
-                                await cur.execute(
-                                    """
-                                    INSERT INTO ss_chat_img (user_id, persona_id, persona_chat_img)
-                                    VALUES (%s, %s, %s)
-                                    """,
-                                    (int(user_id), int(persona_db_id), key),
-                                )
-                                inserted = True
-                            except Exception as _ie2:
-                                log.warning("ss_chat_img insert failed (both schemas): %s / %s", _ie, _ie2)
-                        if inserted:
-                            try:
-                                await conn.commit()
-                            except Exception:
-                                pass
-                            try:
-                                chat_id = cur.lastrowid
-                            except Exception:
-                                chat_id = None
-            except Exception as _e:
-                log.warning("ss_chat_img insert outer failed: %s", _e)
-                chat_id = None
+            # DB 기록: ss_chat_img(best-effort, 스키마 경로는 chat_images가 프로세스당 1회 결정)
+            chat_id = await insert_chat_image(int(user_id), int(persona_db_id), key)
 
             stored = {"key": key, "url": url, "id": chat_id}
     except HTTPException:
@@ -270,107 +267,153 @@ async def image(req: ChatImageRequest, request: Request):
     except Exception as e:
         log.warning("image store failed: %s", e)
 
-    if isinstance(ai_json, dict):
-        if stored:
-            ai_json["stored"] = stored
-        return ai_json
-    return {"ok": True, "image": ai_json, "stored": stored}
+    # data URI는 클라이언트가 요청했거나 저장에 실패한 경우에만 생성
+    if req.image_format == "data_uri" or not stored:
+        image_out = to_data_uri(img_raw, img_mime)
+    else:
+        image_out = stored["url"]
+    return {"ok": True, "prompt": img_prompt or "", "image": image_out, "stored": stored}
+
+
+class ChatImageJobRequest(ChatImageRequest):
+    # 재시도 시 같은 작업을 돌려받기 위한 키(Idempotency-Key 헤더로도 가능)
+    idempotency_key: Optional[str] = Field(None, max_length=120)
+
+
+@router.post("/image/jobs", status_code=202)
+async def submit_image_job(req: ChatImageJobRequest, request: Request):
+    """이미지 생성 작업 제출 → job_id 즉시 반환(같은 키/같은 요청 재전송은 기존 작업 반환)."""
+    user_id = request.session.get("user_id") if hasattr(request, "session") else None
+    if not user_id:
+        raise HTTPException(status_code=401, detail="not_logged_in")
+    payload = req.model_dump(exclude={"idempotency_key", "image_format"})
+    idem = request.headers.get("Idempotency-Key") or req.idempotency_key
+    try:
+        job_id, created = await submit_job(int(user_id), int(req.persona_num), payload, idem)
+    except Exception as e:
+        log.exception("image job submit failed: %s", e)
+        raise HTTPException(status_code=503, detail="job_submit_failed")
+    return {
+        "ok": True,
+        "job_id": job_id,
+        "created": created,
+        "status_url": f"/api/chat/image/jobs/{job_id}",
+        "events_url": f"/api/chat/image/jobs/{job_id}/events",
+    }
+
+
+@router.get("/image/jobs/{job_id}")
+async def image_job_status(job_id: str, request: Request):
+    """작업 상태: status(queued|running|done|failed), stage(queued|generating|storing|done), 완료 시 result."""
+    user_id = request.session.get("user_id") if hasattr(request, "session") else None
+    if not user_id:
+        raise HTTPException(status_code=401, detail="not_logged_in")
+    job = await get_job(job_id, int(user_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return job
+
+
+@router.get("/image/jobs/{job_id}/events")
+async def image_job_events(job_id: str, request: Request):
+    """SSE: 상태/단계가 바뀔 때마다 `event: status`를 보내고 완료/실패 시 종료."""
+    user_id = request.session.get("user_id") if hasattr(request, "session") else None
+    if not user_id:
+        raise HTTPException(status_code=401, detail="not_logged_in")
+    first = await get_job(job_id, int(user_id))
+    if first is None:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    interval = float(os.getenv("IMAGE_JOB_SSE_INTERVAL_SECONDS", "1") or 1)
+    max_seconds = float(os.getenv("IMAGE_JOB_SSE_MAX_SECONDS", "600") or 600)
+
+    async def _stream():
+        job = first
+        last = None
+        started = time.monotonic()
+        last_sent = started
+        while True:
+            state = (job.get("status"), job.get("stage"))
+            if state != last:
+                last = state
+                last_sent = time.monotonic()
+                yield f"event: status\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+            if job.get("status") in TERMINAL or time.monotonic() - started > max_seconds:
+                return
+            if await request.is_disconnected():
+                return
+            if time.monotonic() - last_sent > 15:
+                last_sent = time.monotonic()
+                yield ": ping\n\n"
+            await asyncio.sleep(interval)
+            job = await get_job(job_id, int(user_id)) or job
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/gallery")
-async def list_gallery(request: Request, persona_num: Optional[int] = None, limit: int = 60, offset: int = 0, prefix: Optional[str] = "chat/"):
+async def list_gallery(
+    request: Request,
+    persona_num: Optional[int] = None,
+    limit: int = 60,
+    offset: int = 0,
+    prefix: Optional[str] = "chat/",
+    w: Optional[int] = None,
+    cursor: Optional[int] = None,
+):
     """현재 로그인 사용자의 채팅 생성 이미지 갤러리 목록을 반환.
 
     - 기본 정렬: 최신순(img_id DESC)
     - persona_num이 있으면 해당 페르소나로 필터링
-    - 반환 시 persona_chat_img가 S3 키면 프리사인 URL로 변환하여 url 필드에 넣어줌
+    - 페이지네이션: 응답의 next_cursor를 다음 요청의 cursor로 전달(img_id 커서, OFFSET 없음).
+      offset은 cursor가 없을 때만 쓰는 하위 호환용
+    - chat/ 와 drafts/ 구분은 저장된 kind 컬럼으로 DB에서 거름(페이지가 짧게 잘리지 않음)
+    - url은 항상 원본 이미지(게시/다운로드용). thumb_url은 표시 폭 w(px)에 맞는 썸네일
+      (w가 없으면 그리드용 최대 썸네일), full_url은 압축 원본 크기 렌디션.
+      렌디션이 아직 없는 이미지는 모두 원본 URL
     """
     user_id = request.session.get("user_id") if hasattr(request, "session") else None
     if not user_id:
         raise HTTPException(status_code=401, detail="not_logged_in")
 
+    limit = max(1, min(int(limit), 200))
     try:
-        persona_db_id = None
-        if persona_num is not None:
+        try:
             # ss_chat_img.persona_id에는 user_persona_num을 저장하므로 그대로 사용
-            persona_db_id = int(persona_num)
+            rows = await list_chat_images(
+                int(user_id),
+                kind=kind_for_prefix(prefix),
+                persona_id=int(persona_num) if persona_num is not None else None,
+                limit=limit,
+                before_id=cursor,
+                offset=offset,
+                key_prefix=None if kind_for_prefix(prefix) else prefix,
+            )
+        except Exception as _se:
+            # 운영 DB 권한/스키마 문제로 테이블이 없거나 조회 실패 시 빈 목록 반환
+            log.warning("gallery select failed; returning empty. err=%s", _se)
+            rows = []
 
+        def _is_s3_key(k: str) -> bool:
+            return bool(k) and not k.lower().startswith("http") and not k.startswith("/")
+
+        # 렌디션 선택 + 프리사인 URL은 한 번의 배치 호출로 계산(캐시 재사용)
+        urls = {}
+        try:
+            if s3_enabled():
+                urls = await resolve_urls((k for k in (r.get("img_key") or "" for r in rows) if _is_s3_key(k)), w)
+        except Exception as _pe:
+            log.warning("gallery presign failed: %s", _pe)
         items = []
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                rows = []
-                # 1차: 최신 컬럼(img_id, img_key)
-                try:
-                    if persona_db_id is None:
-                        await cur.execute(
-                            """
-                            SELECT img_id, user_id, persona_id, img_key, created_at
-                            FROM ss_chat_img
-                            WHERE user_id=%s
-                            ORDER BY img_id DESC
-                            LIMIT %s OFFSET %s
-                            """,
-                            (int(user_id), int(limit), int(offset)),
-                        )
-                    else:
-                        await cur.execute(
-                            """
-                            SELECT img_id, user_id, persona_id, img_key, created_at
-                            FROM ss_chat_img
-                            WHERE user_id=%s AND persona_id=%s
-                            ORDER BY img_id DESC
-                            LIMIT %s OFFSET %s
-                            """,
-                            (int(user_id), int(persona_db_id), int(limit), int(offset)),
-                        )
-                    rows = await cur.fetchall() or []
-                except Exception as _se:
-                    # 2차: 구 스키마(chat_img_id, persona_chat_img)
-                    try:
-                        if persona_db_id is None:
-                            await cur.execute(
-                                """
-                                SELECT chat_img_id AS img_id, user_id, persona_id, persona_chat_img AS img_key, created_at
-                                FROM ss_chat_img
-                                WHERE user_id=%s
-                                ORDER BY chat_img_id DESC
-                                LIMIT %s OFFSET %s
-                                """,
-                                (int(user_id), int(limit), int(offset)),
-                            )
-                        else:
-                            await cur.execute(
-                                """
-                                SELECT chat_img_id AS img_id, user_id, persona_id, persona_chat_img AS img_key, created_at
-                                FROM ss_chat_img
-                                WHERE user_id=%s AND persona_id=%s
-                                ORDER BY chat_img_id DESC
-                                LIMIT %s OFFSET %s
-                                """,
-                                (int(user_id), int(persona_db_id), int(limit), int(offset)),
-                            )
-                        rows = await cur.fetchall() or []
-                    except Exception as _se2:
-                        # 운영 DB 권한/스키마 문제로 테이블이 없거나 조회 실패 시 빈 목록 반환
-                        log.warning("gallery select failed on both schemas; returning empty. err1=%s err2=%s", _se, _se2)
-                        rows = []
         for r in rows:
             key = r.get("img_key") or ""
-            # 접두(prefix) 필터: http/https 또는 / 로 시작하는 키는 필터 제외
-            try:
-                if isinstance(prefix, str) and prefix and not key.lower().startswith("http") and not key.startswith("/"):
-                    if not key.startswith(prefix):
-                        continue
-            except Exception:
-                pass
-            url = key
-            if key and not key.lower().startswith("http") and not key.startswith("/"):
-                try:
-                    if s3_enabled():
-                        url = presign_get_url(key)
-                except Exception:
-                    url = key
+            got = urls.get(key) or {}
+            url = got.get("url") or key
+            thumb_url = got.get("thumb_url") or url
+            full_url = got.get("full_url") or url
             # created_at이 문자열로 반환되는 운영 DB 대비
             ca = r.get("created_at")
             if ca:
@@ -385,13 +428,16 @@ async def list_gallery(request: Request, persona_num: Optional[int] = None, limi
                 "persona_id": r.get("persona_id"),
                 "key": key,
                 "url": url,
+                "thumb_url": thumb_url,
+                "full_url": full_url,
                 "created_at": created_at,
             })
-        return {"ok": True, "items": items}
+        next_cursor = items[-1]["id"] if len(rows) >= limit and items else None
+        return {"ok": True, "items": items, "next_cursor": next_cursor}
     except Exception as e:
         # 프로덕션 안전: 갤러리 조회에 실패해도 빈 목록 반환하여 UI가 붕괴되지 않도록 함
         log.warning("failed to list gallery; returning empty list: %s", e)
-        return {"ok": True, "items": []}
+        return {"ok": True, "items": [], "next_cursor": None}
 
 
 @router.delete("/gallery/{img_id}")
@@ -399,62 +445,24 @@ async def list_gallery(request: Request, persona_num: Optional[int] = None, limi
 async def delete_gallery_item(request: Request, img_id: int):
     """Delete a gallery image by id for the current user.
 
-    - Removes DB row (best-effort for both new/legacy schemas)
-    - Deletes S3 object by key if configured
+    - Removes the DB row (ownership checked)
+    - Deletes S3 object (and its renditions) by key if configured
     """
     user_id = request.session.get("user_id") if hasattr(request, "session") else None
     if not user_id:
         raise HTTPException(status_code=401, detail="not_logged_in")
 
     key: Optional[str] = None
-    # Look up the row to get key and ensure ownership
     try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                try:
-                    await cur.execute(
-                        """
-                        SELECT img_key AS k
-                        FROM ss_chat_img
-                        WHERE img_id=%s AND user_id=%s
-                        LIMIT 1
-                        """,
-                        (int(img_id), int(user_id)),
-                    )
-                except Exception:
-                    await cur.execute(
-                        """
-                        SELECT persona_chat_img AS k
-                        FROM ss_chat_img
-                        WHERE chat_img_id=%s AND user_id=%s
-                        LIMIT 1
-                        """,
-                        (int(img_id), int(user_id)),
-                    )
-                row = await cur.fetchone()
-                key = (row or {}).get("k") if row else None
-            async with conn.cursor() as cur2:
-                # Try new schema id first
-                try:
-                    await cur2.execute("DELETE FROM ss_chat_img WHERE img_id=%s AND user_id=%s", (int(img_id), int(user_id)))
-                except Exception:
-                    # Fallback legacy id
-                    try:
-                        await cur2.execute("DELETE FROM ss_chat_img WHERE chat_img_id=%s AND user_id=%s", (int(img_id), int(user_id)))
-                    except Exception:
-                        pass
-                try:
-                    await conn.commit()
-                except Exception:
-                    pass
+        key = await delete_chat_image(int(user_id), int(img_id))
     except Exception as e:
         log.warning("delete_gallery lookup/delete failed: %s", e)
 
     # Attempt to delete S3 object if key looks like one
     try:
         if key and not key.lower().startswith("http") and not key.startswith("/"):
-            delete_object(key)
+            await adelete_object(key)
+            await delete_renditions(key)
     except Exception:
         pass
     return {"ok": True}
@@ -476,9 +484,16 @@ async def image_usage():
 
 
 @router.get("/drafts")
-async def list_drafts(request: Request, persona_num: Optional[int] = None, limit: int = 60, offset: int = 0):
+async def list_drafts(
+    request: Request,
+    persona_num: Optional[int] = None,
+    limit: int = 60,
+    offset: int = 0,
+    w: Optional[int] = None,
+    cursor: Optional[int] = None,
+):
     """임시저장 목록(drafts/ 접두)."""
-    return await list_gallery(request, persona_num=persona_num, limit=limit, offset=offset, prefix="drafts/")
+    return await list_gallery(request, persona_num=persona_num, limit=limit, offset=offset, prefix="drafts/", w=w, cursor=cursor)
 
 
 @router.post("/session/start")
@@ -494,7 +509,7 @@ async def start_chat_session(request: Request):
     # LangSmith 가시화 하트비트(선택)
     try:
         ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with http_client("ai", timeout=5.0) as client:
             await client.post(f"{ai_url}/chat/trace/heartbeat", json={"ls_session_id": sid})
     except Exception:
         # Non-fatal: just ignore if AI is not reachable
@@ -516,7 +531,7 @@ async def end_chat_session(request: Request, body: dict = Body(default={})):
     try:
         if sid:
             ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
-            async with httpx.AsyncClient(timeout=5.0) as client:
+            async with http_client("ai", timeout=5.0) as client:
                 await client.post(f"{ai_url}/chat/session/clear", json={"ls_session_id": sid})
     except Exception:
         pass
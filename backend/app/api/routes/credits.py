@@ -11,22 +11,13 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
 import os
 
-from app.api.models.credits import ensure_credit_tables, get_balance, grant_credits, consume_credits, get_ledger
+from app.api.models.credits import get_balance, grant_credits, consume_credits, get_ledger
 from app.api.models.users import find_user_by_id, update_user_credit_plan
 
 
 router = APIRouter(prefix="/api/credits", tags=["credits"])
 
 
-@router.on_event("startup")
-async def _ensure_tables():
-    try:
-        await ensure_credit_tables()
-    except Exception:
-        # 테이블 생성 실패는 런타임에 첫 호출 시 다시 시도될 수 있도록 무시
-        pass
-
-
 class GrantBody(BaseModel):
     amount: int = Field(gt=0)
     reason: str | None = None
@@ -46,8 +37,6 @@ async def me(request: Request):
     # user plan from ss_user
     user = await find_user_by_id(int(user_id))
     plan = user.get("user_credit") if user else None
-    # ensure tables and get balance
-    await ensure_credit_tables()
     bal = await get_balance(int(user_id))
     return {"ok": True, "balance": bal, "plan": plan}
 
@@ -57,7 +46,6 @@ async def ledger(request: Request, limit: int = 50):
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Not logged in")
-    await ensure_credit_tables()
     rows = await get_ledger(int(user_id), limit=limit)
     return {"ok": True, "items": rows}
 
@@ -70,7 +58,6 @@ async def grant(request: Request, body: GrantBody):
     allow_self = os.getenv("CREDITS_ALLOW_SELF_GRANT", "1").lower() in ("1", "true", "yes")
     if not allow_self:
         raise HTTPException(status_code=403, detail="Grant not allowed")
-    await ensure_credit_tables()
     bal = await grant_credits(int(user_id), body.amount, body.reason, body.ref_type, body.ref_id)
     return {"ok": True, "balance": bal}
 
@@ -80,7 +67,6 @@ async def consume(request: Request, body: GrantBody):
     user_id = request.session.get("user_id")
     if not user_id:
         raise HTTPException(status_code=401, detail="Not logged in")
-    await ensure_credit_tables()
     try:
         bal = await consume_credits(int(user_id), body.amount, body.reason, body.ref_type, body.ref_id)
         return {"ok": True, "balance": bal}
@@ -130,7 +116,6 @@ async def upgrade_plan(request: Request, body: UpgradeBody):
         grant_on_upgrade = 0
     if grant_on_upgrade > 0:
         try:
-            await ensure_credit_tables()
             await grant_credits(int(user_id), grant_on_upgrade, reason="upgrade:pro", ref_type="plan", ref_id="pro")
         except Exception:
             # 초기 크레딧 부여 실패는 플랜 변경 자체를 롤백하지 않음
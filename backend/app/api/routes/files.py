@@ -3,7 +3,8 @@ import os
 from typing import Optional
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
-from app.core.s3 import s3_enabled, put_data_uri, presign_get_url
+from app.core.s3 import s3_enabled, aput_data_uri, apresign_get_url
+from app.api.core.renditions import schedule_renditions
 
 # 파트: 파일/URL 유틸리티 — 공개 URL 보장(S3 우선)
 router = APIRouter(prefix="/api/files", tags=["files"]) 
@@ -58,7 +59,7 @@ async def ensure_public(request: Request, body: EnsurePublicBody):
         key_prefix = (
             f"chat/{int(user_id)}/{int(body.persona_num)}" if body.persona_num is not None else f"uploads/{int(user_id)}"
         )
-        key = put_data_uri(
+        key = await aput_data_uri(
             img,
             model=None,
             key_prefix=key_prefix,
@@ -66,7 +67,8 @@ async def ensure_public(request: Request, body: EnsurePublicBody):
             include_model=False,
             include_date=False,
         )
-        url = presign_get_url(key)
+        url = await apresign_get_url(key)
+        schedule_renditions(key, img)
         return {"ok": True, "url": url, "key": key}
 
     raise HTTPException(status_code=400, detail="unsupported_image_format")
@@ -1,7 +1,7 @@
 """이미지 API 라우트: AI 미리보기, 오브젝트 스토리지(S3) 저장, 프리사인 URL 재발급"""
 from fastapi import APIRouter, HTTPException, Request
 import os
-import httpx
+from app.core.http_clients import http_client
 import logging
 import re
 
@@ -10,7 +10,9 @@ from app.api.schemas.images import (
     ImageSaveRequest,
     ImageUrlRequest,
 )
-from app.core.s3 import s3_enabled, put_data_uri, presign_get_url
+from app.core.s3 import s3_enabled, aput_data_uri, apresign_get_url
+from app.api.core.renditions import schedule_renditions
+from app.core.ai_image import AI_IMAGE_ACCEPT, read_ai_image, to_data_uri
 from app.api.models.persona import update_persona_img
 
 router = APIRouter(prefix="/api", tags=["images"])
@@ -24,18 +26,19 @@ async def preview_image(payload: GenerateImageRequest):
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://localhost:8600").rstrip("/")
     body = payload.model_dump(exclude_none=True)
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            r = await client.post(f"{ai_url}/predict", json=body)
+        async with http_client("ai", timeout=30.0) as client:
+            r = await client.post(f"{ai_url}/predict", json=body, headers=AI_IMAGE_ACCEPT)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ai_delegate_error: {e}")
 
     if r.status_code != 200:
         raise HTTPException(status_code=502, detail="ai_failed")
-    data = r.json()
-    image = data.get("image")
-    if not (isinstance(image, str) and image.startswith("data:")):
+    got = read_ai_image(r)
+    if got is None:
         raise HTTPException(status_code=502, detail="invalid_ai_response")
-    return {"ok": True, "image": image}
+    # 미리보기는 저장 전이라 브라우저가 data URI를 그대로 표시/저장 요청에 사용
+    raw, mime, _prompt = got
+    return {"ok": True, "image": to_data_uri(raw, mime)}
 
 
 @router.post("/images/save", summary="미리보기 데이터 저장")
@@ -66,7 +69,7 @@ async def save_image(body: ImageSaveRequest, request: Request):
         if not s3_enabled():
             raise HTTPException(status_code=400, detail="s3_not_configured")
 
-        key = put_data_uri(
+        key = await aput_data_uri(
             body.image,
             model=body.model,
             key_prefix=body.prefix,
@@ -74,7 +77,8 @@ async def save_image(body: ImageSaveRequest, request: Request):
             include_model=bool(body.include_model) if body.include_model is not None else True,
             include_date=bool(body.include_date) if body.include_date is not None else True,
         )
-        url = presign_get_url(key)
+        url = await apresign_get_url(key)
+        schedule_renditions(key, body.image)
     # 선택: body.persona_num 이 있으면 ss_persona.persona_img 에 즉시 저장
         if body.persona_num:
             try:
@@ -103,7 +107,7 @@ async def renew_image_url(req: ImageUrlRequest):
     try:
         if not s3_enabled():
             raise HTTPException(status_code=400, detail="s3_not_configured")
-        url = presign_get_url(req.key)
+        url = await apresign_get_url(req.key)
         return {"ok": True, "key": req.key, "url": url}
     except HTTPException:
         raise
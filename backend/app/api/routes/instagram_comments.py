@@ -1,9 +1,11 @@
 from __future__ import annotations
+import asyncio
 import os
 from typing import Any, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Request
 import httpx
+from app.core.http_clients import http_client
 import logging
 
 # 내부 OAuth/연동 유틸 재사용
@@ -12,10 +14,13 @@ from .oauth_instagram import (
     _require_login,               # 세션에서 user_id 확인
     _get_persona_token,           # 페르소나별 long-lived user token 조회
     _get_persona_instagram_mapping,  # ss_persona에 저장된 IG 매핑(ig_user_id/fb_page_id)
+    _get_persona_links,           # 전체 페르소나의 IG 매핑 + 토큰(조인 1회)
 )
 from app.api.models.persona import get_user_personas as _get_user_personas
-from app.core.s3 import s3_enabled, presign_get_url
+from app.api.models.instagram_posts import POST_FIELDS, post_row, prune_missing_posts, upsert_post_rows
+from app.core.s3 import s3_enabled, presign_many
 from app.api.core.mysql import get_mysql_pool
+from app.api.core.seen_store import seen_ids as seen_ids_of
 import aiomysql
 from datetime import datetime, timedelta
 
@@ -24,6 +29,42 @@ router = APIRouter(prefix="/api/instagram", tags=["instagram"])
 log = logging.getLogger("instagram_comments")
 
 
+_MEDIA_FIELDS = "id,caption,permalink,media_type,media_url,thumbnail_url,timestamp"
+# username/text/timestamp/like_count 정도만 사용 (일반 코멘터의 프로필 이미지/ID는 제공되지 않음)
+_COMMENT_FIELDS = "id,text,username,timestamp,like_count"
+
+
+def _media_item(m: Dict[str, Any], comments: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "media_id": m.get("id"),
+        "caption": m.get("caption"),
+        "permalink": m.get("permalink"),
+        "media_type": m.get("media_type"),
+        "media_url": m.get("media_url"),
+        "thumbnail_url": m.get("thumbnail_url"),
+        "timestamp": m.get("timestamp"),
+        # 정규화해서 담기
+        "comments": [
+            {
+                "id": c.get("id"),
+                "text": c.get("text"),
+                "username": c.get("username"),
+                "timestamp": c.get("timestamp"),
+                "like_count": c.get("like_count"),
+            }
+            for c in comments
+            if c.get("id")
+        ],
+    }
+
+
+def _error_body(r: httpx.Response) -> Any:
+    try:
+        return r.json()
+    except Exception:
+        return {"text": r.text}
+
+
 async def _fetch_recent_media_and_comments(
     client: httpx.AsyncClient,
     ig_user_id: str,
@@ -39,84 +80,96 @@ async def _fetch_recent_media_and_comments(
       "media_id", "caption", "permalink", "media_type", "media_url", "thumbnail_url", "timestamp",
       "comments": [ { "id", "text", "username", "timestamp", "like_count" } ]
     }
+
+    기본은 Graph 필드 확장(`comments.limit(n){...}`)으로 미디어+댓글을 한 번에 가져옵니다.
+    확장 요청이 실패하면 미디어 조회 후 미디어별 댓글 조회를 제한된 동시성으로 수행합니다.
+
+    Env
+    - IG_COMMENTS_FIELD_EXPANSION (1/0; default 1)
+    - IG_COMMENTS_FETCH_CONCURRENCY (default 4): 폴백 시 미디어별 댓글 동시 조회 수
     """
-    # 1) 최근 미디어 조회
-    media_items: List[Dict[str, Any]] = []
+    media_limit = max(1, int(media_limit))
+    comments_limit = max(1, int(comments_limit))
+    debug_info: Optional[Dict[str, Any]] = None
+
+    # 1) 필드 확장: 미디어 + 최신 댓글을 1회 왕복으로
+    if (os.getenv("IG_COMMENTS_FIELD_EXPANSION", "1").strip().lower() in ("1", "true", "yes")):
+        r = await client.get(
+            f"{IG_GRAPH}/{ig_user_id}/media",
+            params={
+                "access_token": access_token,
+                "fields": f"{_MEDIA_FIELDS},comments.limit({comments_limit}){{{_COMMENT_FIELDS}}}",
+                "limit": media_limit,
+            },
+        )
+        if r.status_code == 200:
+            data = (r.json() or {}).get("data") or []
+            # 댓글이 없는 미디어는 comments 필드 자체가 빠져 있음
+            return (
+                [_media_item(m, ((m.get("comments") or {}).get("data") or [])) for m in data if m.get("id")],
+                debug_info,
+            )
+        body = _error_body(r)
+        log.warning("IG media+comments expansion failed, falling back: status=%s body=%s", r.status_code, body)
+        if return_debug:
+            debug_info = {"expansion_status": r.status_code, "expansion_body": body}
+
+    # 2) 폴백: 최근 미디어 조회
     r = await client.get(
         f"{IG_GRAPH}/{ig_user_id}/media",
         params={
             "access_token": access_token,
-            "fields": "id,caption,permalink,media_type,media_url,thumbnail_url,timestamp",
-            "limit": max(1, int(media_limit)),
+            "fields": _MEDIA_FIELDS,
+            "limit": media_limit,
         },
     )
-    debug_info: Optional[Dict[str, Any]] = None
     if r.status_code != 200:
         # 미디어 접근 불가 — 상태/본문 로깅 및 디버그 수집
-        try:
-            body = r.json()
-        except Exception:
-            body = {"text": r.text}
+        body = _error_body(r)
         log.warning("IG media fetch failed: status=%s body=%s", r.status_code, body)
         if return_debug:
-            debug_info = {"media_status": r.status_code, "media_body": body}
+            debug_info = dict(debug_info or {}, media_status=r.status_code, media_body=body)
         return ([], debug_info)
-    data = (r.json() or {}).get("data") or []
+    data = [m for m in ((r.json() or {}).get("data") or []) if m.get("id")]
 
-    for m in data:
-        mid = m.get("id")
-        if not mid:
-            continue
-        item = {
-            "media_id": mid,
-            "caption": m.get("caption"),
-            "permalink": m.get("permalink"),
-            "media_type": m.get("media_type"),
-            "media_url": m.get("media_url"),
-            "thumbnail_url": m.get("thumbnail_url"),
-            "timestamp": m.get("timestamp"),
-            "comments": [],
-        }
-        # 2) 각 미디어의 댓글 조회
-        cr = await client.get(
-            f"{IG_GRAPH}/{mid}/comments",
-            params={
-                "access_token": access_token,
-                # username/text/timestamp/like_count 정도만 사용 (일반 코멘터의 프로필 이미지/ID는 제공되지 않음)
-                "fields": "id,text,username,timestamp,like_count",
-                "limit": max(1, int(comments_limit)),
-            },
-        )
+    # 3) 각 미디어의 댓글 조회(제한된 동시성, 결과 순서는 미디어 순서 유지)
+    try:
+        concurrency = max(1, int(os.getenv("IG_COMMENTS_FETCH_CONCURRENCY", "4") or 4))
+    except Exception:
+        concurrency = 4
+    sem = asyncio.Semaphore(concurrency)
+
+    async def _comments_for(mid: str) -> httpx.Response:
+        async with sem:
+            return await client.get(
+                f"{IG_GRAPH}/{mid}/comments",
+                params={
+                    "access_token": access_token,
+                    "fields": _COMMENT_FIELDS,
+                    "limit": comments_limit,
+                },
+            )
+
+    responses = await asyncio.gather(*(_comments_for(m["id"]) for m in data), return_exceptions=True)
+    media_items: List[Dict[str, Any]] = []
+    for m, cr in zip(data, responses):
+        mid = m["id"]
         comments: List[Dict[str, Any]] = []
-        if cr.status_code == 200:
+        if isinstance(cr, httpx.Response) and cr.status_code == 200:
             comments = (cr.json() or {}).get("data") or []
         else:
-            try:
-                cbody = cr.json()
-            except Exception:
-                cbody = {"text": cr.text}
-            log.warning("IG comments fetch failed: media_id=%s status=%s body=%s", mid, cr.status_code, cbody)
+            status = cr.status_code if isinstance(cr, httpx.Response) else None
+            cbody = _error_body(cr) if isinstance(cr, httpx.Response) else {"error": str(cr)}
+            log.warning("IG comments fetch failed: media_id=%s status=%s body=%s", mid, status, cbody)
             if return_debug:
                 if debug_info is None:
                     debug_info = {}
                 debug_info.setdefault("comments", []).append({
                     "media_id": mid,
-                    "status": cr.status_code,
+                    "status": status,
                     "body": cbody,
                 })
-        # 정규화해서 담기
-        item["comments"] = [
-            {
-                "id": c.get("id"),
-                "text": c.get("text"),
-                "username": c.get("username"),
-                "timestamp": c.get("timestamp"),
-                "like_count": c.get("like_count"),
-            }
-            for c in comments
-            if c.get("id")
-        ]
-        media_items.append(item)
+        media_items.append(_media_item(m, comments))
     return (media_items, debug_info)
 
 
@@ -180,182 +233,162 @@ async def list_posts(request: Request, persona_num: Optional[int] = None, limit:
         raise HTTPException(status_code=500, detail=f"posts_list_failed:{e}")
 
 
+async def _fetch_sync_media(
+    client: httpx.AsyncClient,
+    ig_user_id: str,
+    token: str,
+    limit: int,
+    since: Optional[str] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """posts/sync용 최근 게시물 조회. IG 계정이 없으면(404) None, 토큰 만료(190)는 401."""
+    params: Dict[str, Any] = {
+        "access_token": token,
+        "fields": POST_FIELDS,
+        "limit": max(1, int(limit)),
+    }
+    if since:
+        params["since"] = since
+    r = await client.get(f"{IG_GRAPH}/{ig_user_id}/media", params=params)
+    if r.status_code != 200:
+        try:
+            body = r.json()
+            err = (body or {}).get("error") or {}
+            if err.get("code") == 190:
+                raise HTTPException(status_code=401, detail="persona_oauth_required")
+        except HTTPException:
+            raise
+        except Exception:
+            pass
+        if r.status_code == 404:
+            return None
+        raise HTTPException(status_code=r.status_code, detail=r.text)
+    return (r.json() or {}).get("data") or []
+
+
 @router.post("/posts/sync")
 async def sync_posts(
     request: Request,
     persona_num: Optional[int] = None,
+    persona_nums: Optional[str] = None,
     limit: int = 18,
     days: Optional[int] = None,
     prune_missing: bool = True,
 ):
-    """Fetch recent posts from Graph and upsert into DB for this persona.
+    """Fetch recent posts from Graph and upsert into DB for one or many personas.
 
     Behavior:
     - Upserts the most recent posts returned by Graph API.
     - If `days` is provided, adds `since` to Graph query and PRUNES local cached posts within that window
       that are not returned by Graph (handles 'deleted on Instagram' cases).
     - If `days` is not provided and `prune_missing=True`, prunes only among the latest `limit` local rows.
+    - `persona_nums` ("1,2,3" or "all") syncs several personas in one call: Graph is queried concurrently
+      (IG_POSTS_SYNC_CONCURRENCY, default 4), all posts are written in one batched upsert and each persona
+      is pruned with a single anti-join DELETE. Per-persona failures are reported in `results` instead of
+      failing the whole call.
     """
     uid = _require_login(request)
-    if persona_num is None:
+    links = await _get_persona_links(int(uid))
+    single = not persona_nums
+    if persona_nums:
+        raw = persona_nums.strip().lower()
+        try:
+            nums = sorted(links) if raw == "all" else list(dict.fromkeys(int(x) for x in raw.split(",") if x.strip()))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid_persona_nums")
+    elif persona_num is not None:
+        nums = [int(persona_num)]
+    else:
         raise HTTPException(status_code=400, detail="persona_num_required")
 
-    mapping = await _get_persona_instagram_mapping(int(uid), int(persona_num))
-    if not mapping or not mapping.get("ig_user_id"):
-        return {"ok": True, "synced": 0}
-    token = await _get_persona_token(int(uid), int(persona_num))
-    if not token:
-        raise HTTPException(status_code=401, detail="persona_oauth_required")
+    results: Dict[int, Dict[str, Any]] = {}
+    targets: List[Tuple[int, str, str]] = []
+    for num in nums:
+        link = links.get(num) or {}
+        mapping = link.get("mapping") or {}
+        if not mapping.get("ig_user_id"):
+            results[num] = {"synced": 0, "pruned": 0}
+            continue
+        if not link.get("token"):
+            if single:
+                raise HTTPException(status_code=401, detail="persona_oauth_required")
+            results[num] = {"error": "persona_oauth_required"}
+            continue
+        targets.append((num, str(mapping["ig_user_id"]), str(link["token"])))
+
+    since_dt = datetime.utcnow() - timedelta(days=int(days)) if days and isinstance(days, int) and days > 0 else None
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            params = {
-                "access_token": token,
-                "fields": "id,media_type,media_product_type,media_url,thumbnail_url,permalink,timestamp,caption,like_count,comments_count",
-                "limit": max(1, int(limit)),
-            }
-            if days and isinstance(days, int) and days > 0:
-                params["since"] = (datetime.utcnow() - timedelta(days=int(days))).strftime('%Y-%m-%d')
-            r = await client.get(
-                f"{IG_GRAPH}/{mapping['ig_user_id']}/media",
-                params=params,
-            )
-        if r.status_code != 200:
-            try:
-                body = r.json()
-                err = (body or {}).get("error") or {}
-                if err.get("code") == 190:
-                    raise HTTPException(status_code=401, detail="persona_oauth_required")
-            except HTTPException:
-                raise
-            except Exception:
-                pass
-            if r.status_code == 404:
-                return {"ok": True, "synced": 0}
-            raise HTTPException(status_code=r.status_code, detail=r.text)
+        concurrency = max(1, int(os.getenv("IG_POSTS_SYNC_CONCURRENCY", "4") or 4))
+    except Exception:
+        concurrency = 4
+    sem = asyncio.Semaphore(concurrency)
 
-        data = (r.json() or {}).get("data") or []
-        # Even if empty, continue to possible prune step below when days provided
+    try:
+        async with http_client("graph") as client:
+            async def _fetch(ig_user_id: str, token: str):
+                async with sem:
+                    return await _fetch_sync_media(
+                        client, ig_user_id, token, limit,
+                        since_dt.strftime('%Y-%m-%d') if since_dt else None,
+                    )
 
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                upcnt = 0
-                fetched_ids: set[str] = set()
-                for m in data:
-                    mid = m.get("id")
-                    if not mid:
-                        continue
-                    try:
-                        fetched_ids.add(str(mid))
-                    except Exception:
-                        pass
-                    media_type = m.get("media_type")
-                    product_type = m.get("media_product_type")
-                    media_url = m.get("media_url")
-                    thumbnail_url = m.get("thumbnail_url")
-                    permalink = m.get("permalink")
-                    caption = m.get("caption")
-                    timestamp = m.get("timestamp")
-                    like_count = int(m.get("like_count") or 0)
-                    comments_count = int(m.get("comments_count") or 0)
-                    # Normalize timestamp to MySQL DATETIME string
-                    posted_at = None
-                    if isinstance(timestamp, str):
-                        # IG returns ISO 8601; MySQL accepts 'YYYY-MM-DD HH:MM:SS'
-                        try:
-                            dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                            posted_at = dt.strftime("%Y-%m-%d %H:%M:%S")
-                        except Exception:
-                            posted_at = None
-                    try:
-                        await cur.execute(
-                            """
-                            INSERT INTO ss_instagram_post (
-                              media_id, user_id, user_persona_num, ig_user_id,
-                              media_type, media_product_type, media_url, thumbnail_url,
-                              permalink, caption, posted_at, like_count, comments_count
-                            ) VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-                            ON DUPLICATE KEY UPDATE
-                              media_type=VALUES(media_type),
-                              media_product_type=VALUES(media_product_type),
-                              media_url=VALUES(media_url),
-                              thumbnail_url=VALUES(thumbnail_url),
-                              permalink=VALUES(permalink),
-                              caption=VALUES(caption),
-                              posted_at=VALUES(posted_at),
-                              like_count=GREATEST(VALUES(like_count), like_count),
-                              comments_count=GREATEST(VALUES(comments_count), comments_count),
-                              updated_at=CURRENT_TIMESTAMP
-                            """,
-                            (
-                                str(mid), int(uid), int(persona_num), str(mapping["ig_user_id"]),
-                                media_type, product_type, media_url, thumbnail_url,
-                                permalink, caption, posted_at, like_count, comments_count,
-                            ),
-                        )
-                        upcnt += 1
-                    except Exception:
-                        # Continue on individual failure
-                        pass
-                pruned = 0
-                if prune_missing:
-                    try:
-                        if days and isinstance(days, int) and days > 0:
-                            # Prune within the since window: rows not in fetched_ids
-                            since_dt = (datetime.utcnow() - timedelta(days=int(days)))
-                            since_str = since_dt.strftime("%Y-%m-%d %H:%M:%S")
-                            # Collect local ids in window
-                            await cur.execute(
-                                """
-                                SELECT media_id FROM ss_instagram_post
-                                WHERE user_id=%s AND user_persona_num=%s AND (posted_at IS NULL OR posted_at >= %s)
-                                """,
-                                (int(uid), int(persona_num), since_str),
-                            )
-                            rows = await cur.fetchall() or []
-                            local_ids = {str(r[0]) if not isinstance(r, dict) else str(r.get('media_id')) for r in rows}
-                            to_delete = [i for i in local_ids if i and i not in fetched_ids]
-                            if to_delete:
-                                ph = ",".join(["%s"] * len(to_delete))
-                                await cur.execute(
-                                    f"DELETE FROM ss_instagram_post WHERE user_id=%s AND user_persona_num=%s AND media_id IN ({ph})",
-                                    (int(uid), int(persona_num), *to_delete),
-                                )
-                                pruned = cur.rowcount or 0
-                        else:
-                            # No days: prune among top-N recent locals
-                            await cur.execute(
-                                """
-                                SELECT media_id FROM ss_instagram_post
-                                WHERE user_id=%s AND user_persona_num=%s
-                                ORDER BY (posted_at IS NULL) ASC, posted_at DESC, updated_at DESC
-                                LIMIT %s
-                                """,
-                                (int(uid), int(persona_num), int(limit)),
-                            )
-                            rows = await cur.fetchall() or []
-                            local_ids = {str(r[0]) if not isinstance(r, dict) else str(r.get('media_id')) for r in rows}
-                            to_delete = [i for i in local_ids if i and i not in fetched_ids]
-                            if to_delete:
-                                ph = ",".join(["%s"] * len(to_delete))
-                                await cur.execute(
-                                    f"DELETE FROM ss_instagram_post WHERE user_id=%s AND user_persona_num=%s AND media_id IN ({ph})",
-                                    (int(uid), int(persona_num), *to_delete),
+            fetched = await asyncio.gather(*(_fetch(ig, tok) for (_n, ig, tok) in targets), return_exceptions=True)
+
+        # 조회에 성공한 페르소나만 저장/정리(실패한 페르소나의 캐시는 건드리지 않음)
+        ok: List[Tuple[int, str, List[Dict[str, Any]]]] = []
+        for (num, ig_user_id, _t), res in zip(targets, fetched):
+            if isinstance(res, BaseException):
+                if single:
+                    raise res
+                log.warning("posts sync fetch failed: persona=%s err=%s", num, res)
+                results[num] = {"error": res.detail if isinstance(res, HTTPException) else str(res)}
+            elif res is None:
+                results[num] = {"synced": 0, "pruned": 0}
+            else:
+                ok.append((num, ig_user_id, res))
+
+        if ok:
+            pool = await get_mysql_pool()
+            async with pool.acquire() as conn:
+                async with conn.cursor() as cur:
+                    rows: List[Tuple[Any, ...]] = []
+                    fetched_ids: Dict[int, List[str]] = {}
+                    for num, ig_user_id, data in ok:
+                        prow = [r for r in (post_row(int(uid), num, ig_user_id, m) for m in data) if r is not None]
+                        rows.extend(prow)
+                        fetched_ids[num] = [r[0] for r in prow]
+                        results[num] = {"synced": len(prow), "pruned": 0}
+                    # 전체 페르소나의 게시물을 batched multi-row upsert 한 번으로
+                    await upsert_post_rows(cur, rows)
+                    if prune_missing:
+                        for num, _ig, _d in ok:
+                            try:
+                                results[num]["pruned"] = await prune_missing_posts(
+                                    cur, int(uid), num, fetched_ids[num],
+                                    since=since_dt.strftime("%Y-%m-%d %H:%M:%S") if since_dt else None,
+                                    recent_limit=None if since_dt else int(limit),
                                 )
-                                pruned = cur.rowcount or 0
-                    except Exception:
-                        pruned = 0
+                            except Exception as e:
+                                log.warning("posts prune failed: persona=%s err=%s", num, e)
                 try:
                     await conn.commit()
                 except Exception:
                     pass
-        return {"ok": True, "synced": upcnt, "pruned": pruned}
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"posts_sync_failed:{e}")
 
+    if single:
+        r = results.get(nums[0]) or {}
+        return {"ok": True, "synced": r.get("synced", 0), "pruned": r.get("pruned", 0)}
+    return {
+        "ok": True,
+        "synced": sum(int(r.get("synced") or 0) for r in results.values()),
+        "pruned": sum(int(r.get("pruned") or 0) for r in results.values()),
+        "results": [{"persona_num": n, **results.get(n, {})} for n in nums],
+    }
+
 
 @router.delete("/posts/{media_id}")
 async def delete_post(
@@ -383,7 +416,7 @@ async def delete_post(
             mapping = await _get_persona_instagram_mapping(int(uid), int(persona_num))
             token = await _get_persona_token(int(uid), int(persona_num))
             if mapping and token and media_id:
-                async with httpx.AsyncClient(timeout=15) as client:
+                async with http_client("graph", timeout=15) as client:
                     r = await client.delete(f"{IG_GRAPH}/{media_id}", params={"access_token": token})
                 if r.status_code in (200, 204):
                     deleted_on_instagram = True
@@ -440,115 +473,128 @@ async def comments_overview(
     if not personas:
         return {"ok": True, "personas": []}
 
-    results: List[Dict[str, Any]] = []
-    async with httpx.AsyncClient(timeout=30) as client:
-        for p in personas:
-            num = p.get("user_persona_num")
-            if num is None:
-                continue
-            # IG 매핑/토큰 검사
-            mapping = await _get_persona_instagram_mapping(int(user_id), int(num))
-            if not mapping or not mapping.get("ig_user_id"):
-                continue
-            token = await _get_persona_token(int(user_id), int(num))
-            if not token:
-                continue
-
-            media, dbg = await _fetch_recent_media_and_comments(
-                client,
-                mapping["ig_user_id"],
-                token,
-                media_limit=media_limit,
-                comments_limit=comments_limit,
-                return_debug=bool(debug),
-            )
+    # IG 매핑/토큰: 모든 페르소나를 한 번의 조인 쿼리로
+    links = await _get_persona_links(int(user_id))
+    targets: List[Tuple[Dict[str, Any], Dict[str, Any], str]] = []
+    for p in personas:
+        num = p.get("user_persona_num")
+        if num is None:
+            continue
+        link = links.get(int(num)) or {}
+        mapping = link.get("mapping")
+        token = link.get("token")
+        if not mapping or not mapping.get("ig_user_id") or not token:
+            continue
+        targets.append((p, mapping, str(token)))
+    if not targets:
+        return {"ok": True, "personas": []}
 
-            # 선택적으로 '확인된(ack)' 알림은 제외
-            if exclude_seen and media:
-                try:
-                    # 댓글 ID 수집
-                    all_comment_ids: List[str] = []
-                    for m in media:
-                        for c in m.get("comments") or []:
-                            cid = c.get("id")
-                            if isinstance(cid, str):
-                                all_comment_ids.append(cid)
-                    # 없으면 건너뜀
-                    if all_comment_ids:
-                        # IN 절은 너무 길어지지 않도록 100개 단위로 분할
-                        seen_ids: set[str] = set()
-                        pool = await get_mysql_pool()
-                        chunks = [all_comment_ids[i:i+100] for i in range(0, len(all_comment_ids), 100)]
-                        async with pool.acquire() as conn:
-                            async with conn.cursor(aiomysql.DictCursor) as cur:
-                                for chunk in chunks:
-                                    ph = ",".join(["%s"] * len(chunk))
-                                    try:
-                                        await cur.execute(
-                                            f"""
-                                            SELECT external_id
-                                            FROM ss_instagram_event_seen
-                                            WHERE external_id IN ({ph})
-                                            """,
-                                            chunk,
-                                        )
-                                        for r in (await cur.fetchall()) or []:
-                                            sid = r.get("external_id")
-                                            if isinstance(sid, str):
-                                                seen_ids.add(sid)
-                                    except Exception:
-                                        # 테이블 미존재 등은 무시하고 전체 반환
-                                        seen_ids = set()
-                                        break
-                        if seen_ids:
-                            # 각 미디어의 comments에서 seen_ids 제거
-                            for m in media:
-                                cs = m.get("comments") or []
-                                m["comments"] = [c for c in cs if c.get("id") not in seen_ids]
-                except Exception:
-                    # 필터링 실패 시 원본 반환(치명적 아님)
-                    pass
+    # 페르소나별 Graph 조회는 공유 클라이언트로 동시에(상한 COMMENTS_OVERVIEW_CONCURRENCY)
+    try:
+        concurrency = max(1, int(os.getenv("COMMENTS_OVERVIEW_CONCURRENCY", "4") or 4))
+    except Exception:
+        concurrency = 4
+    sem = asyncio.Semaphore(concurrency)
+
+    async with http_client("graph") as client:
+        async def _fetch(mapping: Dict[str, Any], token: str):
+            async with sem:
+                return await _fetch_recent_media_and_comments(
+                    client,
+                    mapping["ig_user_id"],
+                    token,
+                    media_limit=media_limit,
+                    comments_limit=comments_limit,
+                    return_debug=bool(debug),
+                )
+
+        fetched = await asyncio.gather(*(_fetch(m, t) for (_p, m, t) in targets), return_exceptions=True)
+
+    per_persona: List[Tuple[Dict[str, Any], Dict[str, Any], List[Dict[str, Any]], Optional[Dict[str, Any]]]] = []
+    for (p, mapping, _t), res in zip(targets, fetched):
+        if isinstance(res, BaseException):
+            log.warning("comments overview fetch failed: persona=%s err=%s", p.get("user_persona_num"), res)
+            media, dbg = [], ({"error": str(res)} if debug else None)
+        else:
+            media, dbg = res
+        per_persona.append((p, mapping, media, dbg))
 
-            # 표시용 이름/이미지
-            params = p.get("persona_parameters") or {}
-            disp_name = params.get("name") or f"프로필 {num}"
-            persona_img = p.get("persona_img")
-            # Normalize persona_img for browser use: presign S3 keys and fix legacy localhost URLs
-            try:
-                s = str(persona_img) if persona_img is not None else ""
-                if s and not s.lower().startswith("http") and not s.startswith("data:") and not s.startswith("/"):
+    # 선택적으로 '확인된(ack)' 알림은 제외 — 전체 페르소나의 댓글 ID를 한 번에 조회
+    if exclude_seen:
+        try:
+            all_comment_ids: List[str] = []
+            for (_p, _m, media, _d) in per_persona:
+                for m in media:
+                    for c in m.get("comments") or []:
+                        cid = c.get("id")
+                        if isinstance(cid, str):
+                            all_comment_ids.append(cid)
+            # 확인된 ID는 프로세스 내 캐시에서, 나머지만 DB에서 배치 조회(테이블 미존재 등은 아래 except)
+            seen_ids = await seen_ids_of(all_comment_ids) if all_comment_ids else set()
+            if seen_ids:
+                # 각 미디어의 comments에서 seen_ids 제거
+                for (_p, _m, media, _d) in per_persona:
+                    for m in media:
+                        cs = m.get("comments") or []
+                        m["comments"] = [c for c in cs if c.get("id") not in seen_ids]
+        except Exception:
+            # 필터링 실패 시 원본 반환(치명적 아님)
+            pass
+
+    # 표시용 이미지: S3 키는 모아서 한 번에 프리사인
+    backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
+    img_plan: List[Tuple[Optional[str], Any]] = []  # (presign_key, fallback)
+    for (p, _m, _media, _d) in per_persona:
+        persona_img = p.get("persona_img")
+        presign_key: Optional[str] = None
+        # Normalize persona_img for browser use: presign S3 keys and fix legacy localhost URLs
+        try:
+            s = str(persona_img) if persona_img is not None else ""
+            if s and not s.lower().startswith("http") and not s.startswith("data:") and not s.startswith("/"):
+                if s3_enabled():
+                    presign_key = s
+            elif s.lower().startswith("http://localhost") or s.lower().startswith("http://127.0.0.1"):
+                from urllib.parse import urlparse
+                purl = urlparse(s)
+                path = purl.path or ""
+                if path.startswith("/personas/") or path.startswith("/uploads/"):
                     if s3_enabled():
-                        persona_img = presign_get_url(s)
-                elif s.lower().startswith("http://localhost") or s.lower().startswith("http://127.0.0.1"):
-                    from urllib.parse import urlparse
-                    purl = urlparse(s)
-                    path = purl.path or ""
-                    if path.startswith("/personas/") or path.startswith("/uploads/"):
-                        if s3_enabled():
-                            persona_img = presign_get_url(path.lstrip("/"))
-                        else:
-                            backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
-                            persona_img = f"{backend_url}{path}"
-                    elif path.startswith("/media/"):
-                        backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
-                        persona_img = f"{backend_url}{path}"
+                        presign_key = path.lstrip("/")
                     else:
-                        backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
-                        persona_img = f"{backend_url}{path or '/'}"
-            except Exception:
-                pass
+                        persona_img = f"{backend_url}{path}"
+                elif path.startswith("/media/"):
+                    persona_img = f"{backend_url}{path}"
+                else:
+                    persona_img = f"{backend_url}{path or '/'}"
+        except Exception:
+            pass
+        img_plan.append((presign_key, persona_img))
+    urls: Dict[str, str] = {}
+    keys = [k for (k, _f) in img_plan if k]
+    if keys:
+        try:
+            urls = presign_many(keys)
+        except Exception as e:
+            log.warning("comments overview presign failed: %s", e)
 
-            results.append(
-                {
-                    "persona_num": num,
-                    "persona_name": disp_name,
-                    "persona_img": persona_img,
-                    "ig_user_id": mapping.get("ig_user_id"),
-                    "ig_username": mapping.get("ig_username"),
-                    "items": media,
-                    **({"debug": dbg} if debug and dbg is not None else {}),
-                }
-            )
+    results: List[Dict[str, Any]] = []
+    for (p, mapping, media, dbg), (presign_key, persona_img) in zip(per_persona, img_plan):
+        num = p.get("user_persona_num")
+        params = p.get("persona_parameters") or {}
+        disp_name = params.get("name") or f"프로필 {num}"
+        if presign_key:
+            persona_img = urls.get(presign_key) or persona_img
+        results.append(
+            {
+                "persona_num": num,
+                "persona_name": disp_name,
+                "persona_img": persona_img,
+                "ig_user_id": mapping.get("ig_user_id"),
+                "ig_username": mapping.get("ig_username"),
+                "items": media,
+                **({"debug": dbg} if debug and dbg is not None else {}),
+            }
+        )
 
     return {"ok": True, "personas": results}
 
@@ -581,7 +627,7 @@ async def debug_comments_raw(
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with http_client("graph") as client:
             mr = await client.get(
                 f"{IG_GRAPH}/{mapping['ig_user_id']}/media",
                 params={
@@ -655,7 +701,7 @@ async def get_media_comments(
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with http_client("graph") as client:
             # Fetch top-level comments
             cr = await client.get(
                 f"{IG_GRAPH}/{media_id}/comments",
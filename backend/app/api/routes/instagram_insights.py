@@ -2,12 +2,15 @@ from __future__ import annotations
 import os
 from datetime import datetime, timedelta, timezone
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Dict, List, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Request
 import httpx
+from app.core.http_clients import http_client
+from app.core.graph_cache import graph_get, media_insights_kind
 import aiomysql
 from app.api.core.mysql import get_mysql_pool
+from app.api.models.instagram_posts import POST_FIELDS, post_like_stats, upsert_posts
 
 from .oauth_instagram import (
     GRAPH as IG_GRAPH,
@@ -23,6 +26,34 @@ def _iso_date(d: datetime) -> str:
     return d.strftime("%Y-%m-%d")
 
 
+def _deadline(env_name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(env_name, str(default)) or default))
+    except Exception:
+        return default
+
+
+async def _gather_within(deadline: float, **calls: Awaitable[Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """서로 독립적인 업스트림 호출을 동시에 실행하고, 공통 마감 시간(초) 안에 끝난 결과만 모읍니다.
+
+    반환: ({이름: 결과}, [실패/시간 초과한 이름]) — 호출부는 빠진 항목을 기본값으로 두고 부분 결과를 응답합니다.
+    """
+    tasks = {name: asyncio.ensure_future(c) for name, c in calls.items()}
+    if not tasks:
+        return {}, []
+    done, pending = await asyncio.wait(tasks.values(), timeout=deadline)
+    for t in pending:
+        t.cancel()
+    results: Dict[str, Any] = {}
+    partial: List[str] = []
+    for name, t in tasks.items():
+        if t in done and not t.cancelled() and t.exception() is None:
+            results[name] = t.result()
+        else:
+            partial.append(name)
+    return results, partial
+
+
 @router.get("/insights/overview")
 async def insights_overview(
     request: Request,
@@ -49,117 +80,129 @@ async def insights_overview(
     if days <= 0 or days > 30:
         days = 30
 
-    mapping = await _get_persona_instagram_mapping(int(user_id), int(persona_num))
+    mapping, token = await asyncio.gather(
+        _get_persona_instagram_mapping(int(user_id), int(persona_num)),
+        _get_persona_token(int(user_id), int(persona_num)),
+    )
     if not mapping or not mapping.get("ig_user_id"):
         raise HTTPException(status_code=400, detail="persona_instagram_not_linked")
-    token = await _get_persona_token(int(user_id), int(persona_num))
     if not token:
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
     ig_user_id = mapping["ig_user_id"]
     since = datetime.now(timezone.utc) - timedelta(days=days)
     until = datetime.now(timezone.utc)
-
-    async with httpx.AsyncClient(timeout=30) as client:
-        # 현재 팔로워 수 및 사용자명
-        usr = await client.get(
+    scope = str(ig_user_id)
+
+    # 사용자 필드/일별 인사이트/최근 미디어는 서로 독립 → 동시에 요청하고 공통 마감 시간까지 기다림.
+    # Graph 응답은 graph_cache 경유(TTL 내 재조회는 캐시, 만료 직후에는 stale 반환 + 백그라운드 갱신)
+    # impressions는 API v22+에서 views로 대체 예정이므로 둘 다 시도
+    metrics = "follower_count,follows,unfollows,reach,impressions,profile_views,views"
+    got, partial = await _gather_within(
+        _deadline("INSIGHTS_OVERVIEW_DEADLINE_SECONDS", 8.0),
+        user=graph_get(
             f"{IG_GRAPH}/{ig_user_id}",
-            params={
-                "access_token": token,
-                "fields": "username,followers_count",
-            },
-        )
-        followers_count = None
-        username = None
-        if usr.status_code == 200:
-            uj = usr.json() or {}
-            followers_count = uj.get("followers_count")
-            username = uj.get("username")
-
-        # 사용자 인사이트(일별)
-        # impressions는 API v22+에서 views로 대체 예정이므로 둘 다 시도
-        metrics = "follower_count,follows,unfollows,reach,impressions,profile_views,views"
-        ins = await client.get(
+            {"access_token": token, "fields": "username,followers_count"},
+            scope=scope,
+            kind="user",
+        ),
+        insights=graph_get(
             f"{IG_GRAPH}/{ig_user_id}/insights",
-            params={
+            {
                 "metric": metrics,
                 "period": "day",
                 "since": _iso_date(since),
                 "until": _iso_date(until),
                 "access_token": token,
             },
-        )
-        series: Dict[str, List[Dict[str, Any]]] = {
-            "follower_count": [],
-            "follows": [],
-            "unfollows": [],
-            "reach": [],
-            "impressions": [],
-            "profile_views": [],
-        }
-        if ins.status_code == 200:
-            ij = (ins.json() or {}).get("data") or []
-            for m in ij:
-                name = m.get("name")
-                values = m.get("values") or []
-                # views가 오면 기존 'impressions'로 매핑해 UI 호환 유지
-                if name == "views":
-                    name_key = "impressions"
-                else:
-                    name_key = name
-                if name_key in series:
-                    out: List[Dict[str, Any]] = []
-                    for v in values:
-                        t = v.get("end_time") or v.get("time") or v.get("date")
-                        # end_time이 ISO timestamp인 경우 날짜만 잘라냄
-                        dstr = None
-                        if isinstance(t, str) and len(t) >= 10:
-                            dstr = t[:10]
-                        elif isinstance(t, (int, float)):
-                            try:
-                                dstr = datetime.fromtimestamp(float(t), tz=timezone.utc).strftime("%Y-%m-%d")
-                            except Exception:
-                                dstr = None
-                        if not dstr:
-                            continue
-                        out.append({"date": dstr, "value": v.get("value")})
-                    series[name_key] = out
-
-        # 최근 미디어(좋아요/댓글 수 포함) + 게시일 기준 좋아요 합계(approx)
-        med = await client.get(
+            scope=scope,
+            kind="user_insights",
+        ),
+        media=graph_get(
             f"{IG_GRAPH}/{ig_user_id}/media",
-            params={
+            {
                 "access_token": token,
                 "fields": "id,timestamp,like_count,comments_count,permalink,media_type,media_url,thumbnail_url,caption",
                 "limit": 50,
                 "since": _iso_date(since),
             },
-        )
-        recent_media: List[Dict[str, Any]] = []
-        approx_likes_by_post_day: Dict[str, int] = {}
-        if med.status_code == 200:
-            for m in (med.json() or {}).get("data", []):
-                # 게시일 기준 좋아요 합계(정확한 증가분이 아닌 보정 지표)
-                ts = (m.get("timestamp") or "")[:10]
-                try:
-                    lc = int(m.get("like_count") or 0)
-                except Exception:
-                    lc = 0
-                if ts:
-                    approx_likes_by_post_day[ts] = approx_likes_by_post_day.get(ts, 0) + lc
-                recent_media.append(
-                    {
-                        "id": m.get("id"),
-                        "timestamp": m.get("timestamp"),
-                        "like_count": m.get("like_count"),
-                        "comments_count": m.get("comments_count"),
-                        "permalink": m.get("permalink"),
-                        "media_type": m.get("media_type"),
-                        "media_url": m.get("media_url"),
-                        "thumbnail_url": m.get("thumbnail_url"),
-                        "caption": m.get("caption"),
-                    }
-                )
+            scope=scope,
+            kind="media_list",
+        ),
+    )
+    usr, ins, med = got.get("user"), got.get("insights"), got.get("media")
+
+    # 현재 팔로워 수 및 사용자명
+    followers_count = None
+    username = None
+    if usr is not None and usr.status_code == 200:
+        uj = usr.json() or {}
+        followers_count = uj.get("followers_count")
+        username = uj.get("username")
+
+    # 사용자 인사이트(일별)
+    series: Dict[str, List[Dict[str, Any]]] = {
+        "follower_count": [],
+        "follows": [],
+        "unfollows": [],
+        "reach": [],
+        "impressions": [],
+        "profile_views": [],
+    }
+    if ins is not None and ins.status_code == 200:
+        ij = (ins.json() or {}).get("data") or []
+        for m in ij:
+            name = m.get("name")
+            values = m.get("values") or []
+            # views가 오면 기존 'impressions'로 매핑해 UI 호환 유지
+            if name == "views":
+                name_key = "impressions"
+            else:
+                name_key = name
+            if name_key in series:
+                out: List[Dict[str, Any]] = []
+                for v in values:
+                    t = v.get("end_time") or v.get("time") or v.get("date")
+                    # end_time이 ISO timestamp인 경우 날짜만 잘라냄
+                    dstr = None
+                    if isinstance(t, str) and len(t) >= 10:
+                        dstr = t[:10]
+                    elif isinstance(t, (int, float)):
+                        try:
+                            dstr = datetime.fromtimestamp(float(t), tz=timezone.utc).strftime("%Y-%m-%d")
+                        except Exception:
+                            dstr = None
+                    if not dstr:
+                        continue
+                    out.append({"date": dstr, "value": v.get("value")})
+                series[name_key] = out
+
+    # 최근 미디어(좋아요/댓글 수 포함) + 게시일 기준 좋아요 합계(approx)
+    recent_media: List[Dict[str, Any]] = []
+    approx_likes_by_post_day: Dict[str, int] = {}
+    if med is not None and med.status_code == 200:
+        for m in (med.json() or {}).get("data", []):
+            # 게시일 기준 좋아요 합계(정확한 증가분이 아닌 보정 지표)
+            ts = (m.get("timestamp") or "")[:10]
+            try:
+                lc = int(m.get("like_count") or 0)
+            except Exception:
+                lc = 0
+            if ts:
+                approx_likes_by_post_day[ts] = approx_likes_by_post_day.get(ts, 0) + lc
+            recent_media.append(
+                {
+                    "id": m.get("id"),
+                    "timestamp": m.get("timestamp"),
+                    "like_count": m.get("like_count"),
+                    "comments_count": m.get("comments_count"),
+                    "permalink": m.get("permalink"),
+                    "media_type": m.get("media_type"),
+                    "media_url": m.get("media_url"),
+                    "thumbnail_url": m.get("thumbnail_url"),
+                    "caption": m.get("caption"),
+                }
+            )
 
     # approx 시계열 정렬
     approx_sorted: List[Dict[str, Any]] = []
@@ -199,6 +242,8 @@ async def insights_overview(
         "today_followers_date": latest_date_str,
         "today_followers_baseline_date": baseline_date_str,
         "recent_media": recent_media,
+        # 마감 시간 안에 못 받았거나 실패한 구성 요소(user/insights/media) — 나머지는 정상 값
+        "partial": partial,
     }
 
 
@@ -208,14 +253,26 @@ REEL_METRICS = "plays,reach,likes,comments,shares,saves,total_interactions"
 FEED_METRICS = "impressions,reach,saved,engagement,video_views"
 
 
-async def _media_insights(client: httpx.AsyncClient, media_id: str, product_type: str | None, token: str) -> Dict[str, Any]:
+async def _media_insights(
+    media_id: str,
+    product_type: str | None,
+    token: str,
+    scope: str,
+    timestamp: str | None = None,
+) -> Dict[str, Any]:
     """Fetch insights for a single media. Maps 'views' to 'impressions' when present.
 
     Note: Reels and Feed have different metric sets; request the set depending on product type.
+    Cached per media; posts older than GRAPH_CACHE_OLD_MEDIA_DAYS use the longer TTL.
     """
     pt = (product_type or "").upper()
     metrics = REEL_METRICS if pt in ("REEL", "REELS") else FEED_METRICS
-    r = await client.get(f"{IG_GRAPH}/{media_id}/insights", params={"metric": metrics, "access_token": token})
+    r = await graph_get(
+        f"{IG_GRAPH}/{media_id}/insights",
+        {"metric": metrics, "access_token": token},
+        scope=scope,
+        kind=media_insights_kind(timestamp),
+    )
     out: Dict[str, Any] = {}
     if r.status_code == 200:
         try:
@@ -253,42 +310,43 @@ async def media_overview(request: Request, persona_num: int, limit: int = 12, da
     since = _iso_date(datetime.now(timezone.utc) - timedelta(days=days))
 
     items: List[Dict[str, Any]] = []
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(
-            f"{IG_GRAPH}/{ig_user_id}/media",
-            params={
-                "access_token": token,
-                "fields": "id,timestamp,caption,permalink,media_type,media_product_type,media_url,thumbnail_url,like_count,comments_count",
-                "limit": limit,
-                "since": since,
-            },
-        )
-        data = []
-        if r.status_code == 200:
-            data = (r.json() or {}).get("data", [])
+    r = await graph_get(
+        f"{IG_GRAPH}/{ig_user_id}/media",
+        {
+            "access_token": token,
+            "fields": "id,timestamp,caption,permalink,media_type,media_product_type,media_url,thumbnail_url,like_count,comments_count",
+            "limit": limit,
+            "since": since,
+        },
+        scope=ig_user_id,
+        kind="media_list",
+    )
+    data = []
+    if r.status_code == 200:
+        data = (r.json() or {}).get("data", [])
 
-        sem = asyncio.Semaphore(5)
+    sem = asyncio.Semaphore(5)
 
-        async def process(m: Dict[str, Any]):
-            async with sem:
-                prod = m.get("media_product_type") or m.get("media_type")
-                ins = await _media_insights(client, str(m.get("id")), prod, token)
-                return {
-                    "id": m.get("id"),
-                    "timestamp": m.get("timestamp"),
-                    "caption": m.get("caption"),
-                    "permalink": m.get("permalink"),
-                    "media_type": m.get("media_type"),
-                    "media_product_type": m.get("media_product_type"),
-                    "preview_url": m.get("thumbnail_url") or m.get("media_url"),
-                    "like_count": m.get("like_count"),
-                    "comments_count": m.get("comments_count"),
-                    "insights": ins,
-                }
+    async def process(m: Dict[str, Any]):
+        async with sem:
+            prod = m.get("media_product_type") or m.get("media_type")
+            ins = await _media_insights(str(m.get("id")), prod, token, ig_user_id, m.get("timestamp"))
+            return {
+                "id": m.get("id"),
+                "timestamp": m.get("timestamp"),
+                "caption": m.get("caption"),
+                "permalink": m.get("permalink"),
+                "media_type": m.get("media_type"),
+                "media_product_type": m.get("media_product_type"),
+                "preview_url": m.get("thumbnail_url") or m.get("media_url"),
+                "like_count": m.get("like_count"),
+                "comments_count": m.get("comments_count"),
+                "insights": ins,
+            }
 
-        tasks = [process(m) for m in data if m.get("id")]
-        if tasks:
-            items = await asyncio.gather(*tasks)
+    tasks = [process(m) for m in data if m.get("id")]
+    if tasks:
+        items = await asyncio.gather(*tasks)
 
     return {"ok": True, "items": items}
 
@@ -304,65 +362,66 @@ async def media_detail(request: Request, persona_num: int, media_id: str):
     if not token:
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
-    async with httpx.AsyncClient(timeout=30) as client:
-        r = await client.get(
-            f"{IG_GRAPH}/{media_id}",
-            params={
-                "access_token": token,
-                "fields": "id,timestamp,caption,permalink,media_type,media_product_type,media_url,thumbnail_url,owner,like_count,comments_count",
-            },
-        )
-        if r.status_code != 200:
-            raise HTTPException(status_code=r.status_code, detail="media_not_found")
-        m = r.json() or {}
-        prod = m.get("media_product_type") or m.get("media_type")
-        ins = await _media_insights(client, str(m.get("id")), prod, token)
-        return {
-            "ok": True,
-            "item": {
-                "id": m.get("id"),
-                "timestamp": m.get("timestamp"),
-                "caption": m.get("caption"),
-                "permalink": m.get("permalink"),
-                "media_type": m.get("media_type"),
-                "media_product_type": m.get("media_product_type"),
-                "media_url": m.get("media_url"),
-                "thumbnail_url": m.get("thumbnail_url"),
-                "like_count": m.get("like_count"),
-                "comments_count": m.get("comments_count"),
-                "insights": ins,
-            }
+    scope = str(mapping["ig_user_id"])
+    r = await graph_get(
+        f"{IG_GRAPH}/{media_id}",
+        {
+            "access_token": token,
+            "fields": "id,timestamp,caption,permalink,media_type,media_product_type,media_url,thumbnail_url,owner,like_count,comments_count",
+        },
+        scope=scope,
+        kind="media",
+    )
+    if r.status_code != 200:
+        raise HTTPException(status_code=r.status_code, detail="media_not_found")
+    m = r.json() or {}
+    prod = m.get("media_product_type") or m.get("media_type")
+    ins = await _media_insights(str(m.get("id")), prod, token, scope, m.get("timestamp"))
+    return {
+        "ok": True,
+        "item": {
+            "id": m.get("id"),
+            "timestamp": m.get("timestamp"),
+            "caption": m.get("caption"),
+            "permalink": m.get("permalink"),
+            "media_type": m.get("media_type"),
+            "media_product_type": m.get("media_product_type"),
+            "media_url": m.get("media_url"),
+            "thumbnail_url": m.get("thumbnail_url"),
+            "like_count": m.get("like_count"),
+            "comments_count": m.get("comments_count"),
+            "insights": ins,
         }
+    }
 
 
 # ====== Daily snapshot storage and delta endpoints ======
 
 
 
-async def _paginate_media(client: httpx.AsyncClient, ig_user_id: str, token: str, limit_total: int = 200):
-    total = 0
+async def _fetch_media(
+    client: httpx.AsyncClient,
+    ig_user_id: str,
+    token: str,
+    limit_total: int = 200,
+    since: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """최근 게시물부터 limit_total개까지 페이지네이션(since가 있으면 그 이후 게시물만)."""
     url = f"{IG_GRAPH}/{ig_user_id}/media"
-    params = {
+    params: Dict[str, Any] = {
         "access_token": token,
-        "fields": "id,timestamp,like_count",
+        "fields": POST_FIELDS,
         "limit": 50,
     }
-    likes_sum = 0
-    while True:
+    if since:
+        params["since"] = since
+    items: List[Dict[str, Any]] = []
+    while len(items) < limit_total:
         r = await client.get(url, params=params)
         if r.status_code != 200:
             break
         body = r.json() or {}
-        for it in body.get("data", []):
-            try:
-                likes_sum += int(it.get("like_count") or 0)
-            except Exception:
-                pass
-            total += 1
-            if total >= limit_total:
-                break
-        if total >= limit_total:
-            break
+        items.extend(body.get("data", [])[: limit_total - len(items)])
         paging = (body or {}).get("paging") or {}
         next_url = paging.get("next")
         if not next_url:
@@ -370,57 +429,122 @@ async def _paginate_media(client: httpx.AsyncClient, ig_user_id: str, token: str
         # next_url already contains everything
         url = next_url
         params = {}
-    return likes_sum
+    return items
 
 
-async def perform_snapshot(user_id: int, persona_num: int) -> dict:
-    """Core snapshot logic reusable by API and scheduler."""
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)) or default)
+    except Exception:
+        return default
 
-    mapping = await _get_persona_instagram_mapping(int(user_id), int(persona_num))
-    if not mapping or not mapping.get("ig_user_id"):
-        raise HTTPException(status_code=400, detail="persona_instagram_not_linked")
-    token = await _get_persona_token(int(user_id), int(persona_num))
-    if not token:
-        raise HTTPException(status_code=401, detail="persona_oauth_required")
-    ig_user_id = str(mapping["ig_user_id"])
+
+async def _refresh_post_likes(
+    client: httpx.AsyncClient,
+    user_id: int,
+    persona_num: int,
+    ig_user_id: str,
+    token: str,
+) -> int:
+    """좋아요 합계를 ss_instagram_post에 저장된 게시물별 like_count로 계산.
+
+    - 저장된 게시물이 없으면 최근 INSIGHTS_SNAPSHOT_BACKFILL_LIMIT(200)개를 한 번 채움
+    - 이후에는 최근 INSIGHTS_SNAPSHOT_RECENT_DAYS(7)일 게시물만 다시 받아 갱신
+      (오래된 게시물의 좋아요는 거의 변하지 않음)
+    """
+    backfill = max(1, _env_int("INSIGHTS_SNAPSHOT_BACKFILL_LIMIT", 200))
+    stored, _ = await post_like_stats(user_id, persona_num)
+    if stored == 0:
+        items = await _fetch_media(client, ig_user_id, token, limit_total=backfill)
+    else:
+        recent_days = max(1, _env_int("INSIGHTS_SNAPSHOT_RECENT_DAYS", 7))
+        since = _iso_date(datetime.now(timezone.utc) - timedelta(days=recent_days))
+        items = await _fetch_media(client, ig_user_id, token, limit_total=backfill, since=since)
+    if items:
+        pool = await get_mysql_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                await upsert_posts(cur, user_id, persona_num, ig_user_id, items)
+                try:
+                    await conn.commit()
+                except Exception:
+                    pass
+    _, total = await post_like_stats(user_id, persona_num)
+    return total
+
+
+async def perform_snapshot(
+    user_id: int,
+    persona_num: int,
+    *,
+    ig_user_id: Optional[str] = None,
+    token: Optional[str] = None,
+) -> dict:
+    """Core snapshot logic reusable by API and scheduler.
+
+    followers/insights/likes 호출은 동시에 실행하고 INSIGHTS_SNAPSHOT_DEADLINE_SECONDS 안에
+    끝난 값만 저장합니다. 빠진 값은 기존 행의 값을 유지합니다(반환의 partial에 이름 기록).
+    total_likes는 ss_instagram_post의 게시물별 like_count 합계(최근 게시물만 재조회).
+    스케줄러는 조회해 둔 ig_user_id/token을 넘겨 페르소나별 DB 조회를 생략합니다.
+    """
+
+    if not (ig_user_id and token):
+        mapping, token = await asyncio.gather(
+            _get_persona_instagram_mapping(int(user_id), int(persona_num)),
+            _get_persona_token(int(user_id), int(persona_num)),
+        )
+        if not mapping or not mapping.get("ig_user_id"):
+            raise HTTPException(status_code=400, detail="persona_instagram_not_linked")
+        if not token:
+            raise HTTPException(status_code=401, detail="persona_oauth_required")
+        ig_user_id = mapping["ig_user_id"]
+    ig_user_id = str(ig_user_id)
     today = datetime.now(timezone.utc).date()
-    async with httpx.AsyncClient(timeout=30) as client:
-        usr = await client.get(f"{IG_GRAPH}/{ig_user_id}", params={"access_token": token, "fields": "followers_count"})
-        followers_count = None
-        if usr.status_code == 200:
-            try:
-                followers_count = (usr.json() or {}).get("followers_count")
-            except Exception:
-                followers_count = None
-        since = (today - timedelta(days=1)).strftime("%Y-%m-%d")
-        ins = await client.get(
-            f"{IG_GRAPH}/{ig_user_id}/insights",
-            params={
-                "metric": "profile_views,reach,impressions,views",
-                "period": "day",
-                "since": since,
-                "access_token": token,
-            },
+    since = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    async with http_client("graph") as client:
+        got, partial = await _gather_within(
+            _deadline("INSIGHTS_SNAPSHOT_DEADLINE_SECONDS", 30.0),
+            user=client.get(f"{IG_GRAPH}/{ig_user_id}", params={"access_token": token, "fields": "followers_count"}),
+            insights=client.get(
+                f"{IG_GRAPH}/{ig_user_id}/insights",
+                params={
+                    "metric": "profile_views,reach,impressions,views",
+                    "period": "day",
+                    "since": since,
+                    "access_token": token,
+                },
+            ),
+            likes=_refresh_post_likes(client, int(user_id), int(persona_num), ig_user_id, token),
         )
-        profile_views = reach = impressions = None
-        if ins.status_code == 200:
-            try:
-                for m in (ins.json() or {}).get("data", []):
-                    name = m.get("name"); vals = m.get("values") or []
-                    if not vals:
-                        continue
-                    val = (vals[-1] or {}).get("value")
-                    if name == "profile_views":
-                        profile_views = val
-                    elif name == "reach":
-                        reach = val
-                    elif name == "impressions":
-                        impressions = val
-                    elif name == "views":
-                        # map views -> impressions for compatibility
-                        impressions = val
-            except Exception:
-                pass
+    usr, ins = got.get("user"), got.get("insights")
+    total_likes = got.get("likes")
+
+    followers_count = None
+    if usr is not None and usr.status_code == 200:
+        try:
+            followers_count = (usr.json() or {}).get("followers_count")
+        except Exception:
+            followers_count = None
+    profile_views = reach = impressions = None
+    if ins is not None and ins.status_code == 200:
+        try:
+            for m in (ins.json() or {}).get("data", []):
+                name = m.get("name"); vals = m.get("values") or []
+                if not vals:
+                    continue
+                val = (vals[-1] or {}).get("value")
+                if name == "profile_views":
+                    profile_views = val
+                elif name == "reach":
+                    reach = val
+                elif name == "impressions":
+                    impressions = val
+                elif name == "views":
+                    # map views -> impressions for compatibility
+                    impressions = val
+        except Exception:
+            pass
+    if ins is not None:
         # If API returns empty datasets (common for no-activity), normalize to 0 instead of NULL
         if profile_views is None:
             profile_views = 0
@@ -428,8 +552,8 @@ async def perform_snapshot(user_id: int, persona_num: int) -> dict:
             reach = 0
         if impressions is None:
             impressions = 0
-        total_likes = await _paginate_media(client, ig_user_id, token, limit_total=200)
     # upsert to ss_dashboard (assumes table already exists)
+    # 시간 초과/실패로 빠진 값(NULL)은 같은 날 이미 저장된 값을 덮어쓰지 않음
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         async with conn.cursor() as cur:
@@ -439,11 +563,11 @@ async def perform_snapshot(user_id: int, persona_num: int) -> dict:
                     (user_id, user_persona_num, ig_user_id, date, followers_count, total_likes, profile_views, reach, impressions)
                 VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s)
                 ON DUPLICATE KEY UPDATE
-                    followers_count=VALUES(followers_count),
-                    total_likes=VALUES(total_likes),
-                    profile_views=VALUES(profile_views),
-                    reach=VALUES(reach),
-                    impressions=VALUES(impressions)
+                    followers_count=COALESCE(VALUES(followers_count), followers_count),
+                    total_likes=COALESCE(VALUES(total_likes), total_likes),
+                    profile_views=COALESCE(VALUES(profile_views), profile_views),
+                    reach=COALESCE(VALUES(reach), reach),
+                    impressions=COALESCE(VALUES(impressions), impressions)
                 """,
                 (int(user_id), int(persona_num), ig_user_id, today, followers_count, total_likes, profile_views, reach, impressions),
             )
@@ -451,7 +575,15 @@ async def perform_snapshot(user_id: int, persona_num: int) -> dict:
                 await conn.commit()
             except Exception:
                 pass
-    return {"date": today.strftime("%Y-%m-%d"), "followers_count": followers_count, "total_likes": total_likes, "profile_views": profile_views, "reach": reach, "impressions": impressions}
+    return {
+        "date": today.strftime("%Y-%m-%d"),
+        "followers_count": followers_count,
+        "total_likes": total_likes,
+        "profile_views": profile_views,
+        "reach": reach,
+        "impressions": impressions,
+        "partial": partial,
+    }
 
 
 @router.post("/insights/snapshot")
@@ -516,17 +648,19 @@ async def insights_daily(request: Request, persona_num: int, days: int = 30):
             token = await _get_persona_token(int(user_id), int(persona_num))
             if mapping and mapping.get("ig_user_id") and token:
                 ig_user_id = str(mapping["ig_user_id"])
-                async with httpx.AsyncClient(timeout=20) as client:
-                    ins = await client.get(
-                        f"{IG_GRAPH}/{ig_user_id}/insights",
-                        params={
-                            "metric": "follower_count",
-                            "period": "day",
-                            "since": (since_date.strftime("%Y-%m-%d")),
-                            "until": (today.strftime("%Y-%m-%d")),
-                            "access_token": token,
-                        },
-                    )
+                ins = await graph_get(
+                    f"{IG_GRAPH}/{ig_user_id}/insights",
+                    {
+                        "metric": "follower_count",
+                        "period": "day",
+                        "since": (since_date.strftime("%Y-%m-%d")),
+                        "until": (today.strftime("%Y-%m-%d")),
+                        "access_token": token,
+                    },
+                    scope=ig_user_id,
+                    kind="user_insights",
+                    timeout=20,
+                )
                 if ins.status_code == 200:
                     vals = ((ins.json() or {}).get("data") or [{}])[0].get("values", [])
                     prev = None
@@ -5,7 +5,7 @@ from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 import aiomysql
 
-from app.api.core.mysql import get_mysql_pool
+from app.api.core.seen_store import mark_seen
 from .oauth_instagram import _require_login
 
 
@@ -30,30 +30,9 @@ async def acknowledge_notifications(request: Request, body: AckBody):
     if not ids:
         return {"ok": True, "acknowledged": 0}
 
-    inserted = 0
     try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                for eid in ids:
-                    try:
-                        # user_id, persona 정보는 부가정보로만 저장(필터링은 external_id 기준)
-                        await cur.execute(
-                            """
-                            INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                            VALUES (%s, %s, %s)
-                            ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                            """,
-                            (str(eid), int(user_id), int(body.persona_num) if body.persona_num is not None else None),
-                        )
-                        inserted += 1
-                    except Exception:
-                        # 테이블 미존재 또는 UNIQUE 충돌 시 건너뜀
-                        pass
-                try:
-                    await conn.commit()
-                except Exception:
-                    pass
+        # user_id, persona 정보는 부가정보로만 저장(필터링은 external_id 기준) — 다중 행 INSERT 1회
+        inserted = await mark_seen(ids, int(user_id), body.persona_num)
     except Exception:
         # 커넥션 오류/테이블 미존재 시에도 API는 성공으로 간주
         return {"ok": True, "acknowledged": 0}
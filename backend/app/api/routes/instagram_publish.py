@@ -5,7 +5,8 @@ import asyncio
 
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, AnyHttpUrl
-import httpx
+from app.core.http_clients import http_client
+from app.core.graph_cache import invalidate_graph_cache
 
 # 내부 OAuth/연동 유틸 재사용
 from .oauth_instagram import (
@@ -58,7 +59,7 @@ async def publish_instagram(request: Request, body: InstagramPublishRequest):
     ig_user_id = mapping["ig_user_id"]
 
     # 1) 컨테이너 생성
-    async with httpx.AsyncClient(timeout=60) as client:
+    async with http_client("graph", timeout=60) as client:
         create = await client.post(
             f"{IG_GRAPH}/{ig_user_id}/media",
             data={
@@ -75,7 +76,7 @@ async def publish_instagram(request: Request, body: InstagramPublishRequest):
 
     # 1.5) 컨테이너 준비 상태 대기 (status_code == FINISHED)
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with http_client("graph") as client:
             finished = False
             # Configurable poll cadence
             poll_interval = float(os.getenv("IG_POLL_INTERVAL_SECONDS", "1.0") or 1.0)
@@ -103,7 +104,7 @@ async def publish_instagram(request: Request, body: InstagramPublishRequest):
         pass
 
     # 2) 발행 (컨테이너 준비가 덜 되었을 수 있어 1회 재시도 포함)
-    async with httpx.AsyncClient(timeout=60) as client:
+    async with http_client("graph", timeout=60) as client:
         async def do_publish():
             return await client.post(
                 f"{IG_GRAPH}/{ig_user_id}/media_publish",
@@ -124,10 +125,13 @@ async def publish_instagram(request: Request, body: InstagramPublishRequest):
                     await asyncio.sleep(retry_sleep)
                     pub2 = await do_publish()
                     if pub2.status_code == 200:
+                        invalidate_graph_cache(str(ig_user_id))
                         return {"ok": True, "result": pub2.json()}
                     else:
                         raise HTTPException(status_code=pub2.status_code, detail=pub2.text)
             except Exception:
                 pass
             raise HTTPException(status_code=pub.status_code, detail=pub.text)
+    # 새 게시물이 인사이트 목록에 바로 보이도록 캐시 비움
+    invalidate_graph_cache(str(ig_user_id))
     return {"ok": True, "result": pub.json()}
@@ -1,16 +1,18 @@
 from __future__ import annotations
 from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel, Field
-import httpx
+from app.core.http_clients import http_client
 from typing import Optional, Dict, Any, List
 import os
-import json
 import asyncio
-import aiomysql
 
-from app.api.core.mysql import get_mysql_pool
-from app.core.s3 import s3_enabled, presign_get_url, put_data_uri
+from app.api.core.persona_context import get_persona_context
+from app.core.s3 import s3_enabled, apresign_get_url, aput_bytes
+from app.core.ai_image import AI_IMAGE_ACCEPT, read_ai_image
 from app.api.models.users import find_user_by_id
+from app.api.models.chat_images import insert_chat_image
+from app.api.core.seen_store import mark_seen
+from app.core.rate_limit import account_limiter
 
 from .oauth_instagram import (
     GRAPH as IG_GRAPH,
@@ -48,7 +50,7 @@ async def post_comment_on_media(request: Request, media_id: str, body: PostComme
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with http_client("graph", timeout=20) as client:
             r = await client.post(
                 f"{IG_GRAPH}/{media_id}/comments",
                 data={"message": body.message, "access_token": token},
@@ -87,7 +89,7 @@ async def reply_to_comment(request: Request, body: ReplyBody):
 
     # Graph API endpoint: POST /{comment-id}/replies with message
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with http_client("graph", timeout=20) as client:
             r = await client.post(
                 f"{IG_GRAPH}/{body.comment_id}/replies",
                 data={
@@ -110,24 +112,7 @@ async def reply_to_comment(request: Request, body: ReplyBody):
         data = r.json() or {}
         # ACK-hide the original comment id (best-effort)
         try:
-            pool = await get_mysql_pool()
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cur:
-                    try:
-                        await cur.execute(
-                            """
-                            INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                            VALUES (%s,%s,%s)
-                            ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                            """,
-                            (str(body.comment_id), int(uid), int(body.persona_num)),
-                        )
-                        try:
-                            await conn.commit()
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
+            await mark_seen([body.comment_id], int(uid), int(body.persona_num))
         except Exception:
             pass
         # Typical response: {"id": "<new_comment_id>"}
@@ -166,72 +151,22 @@ async def auto_reply_to_comment(request: Request, body: AutoReplyBody):
 
     # 0) PRE-ACK: Mark comment as seen BEFORE processing to prevent duplicate replies
     try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute(
-                    """
-                    INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                    VALUES (%s,%s,%s)
-                    ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                    """,
-                    (str(body.comment_id), int(uid), int(body.persona_num)),
-                )
-                try:
-                    await conn.commit()
-                except Exception:
-                    pass
+        await mark_seen([body.comment_id], int(uid), int(body.persona_num))
     except Exception:
         # If PRE-ACK fails, abort to avoid duplicate replies
         raise HTTPException(status_code=500, detail="pre_ack_failed")
 
-    # 1) Ensure persona is linked and token available
-    mapping = await _get_persona_instagram_mapping(int(uid), int(body.persona_num))
-    if not mapping or not mapping.get("ig_user_id"):
+    # 1) Ensure persona is linked and token available (캐시된 페르소나 컨텍스트)
+    ctx = await get_persona_context(int(uid), int(body.persona_num))
+    if not ctx or not ctx.ig_user_id:
         raise HTTPException(status_code=400, detail="persona_not_linked")
-    token = await _get_persona_token(int(uid), int(body.persona_num))
+    token = ctx.token
     if not token:
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
-    # 2) Load persona parameters and image to extract "personality"
-    personality: str = ""
-    persona_img: Optional[str] = None
-    try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    """
-                    SELECT persona_img, persona_parameters
-                    FROM ss_persona
-                    WHERE user_id=%s AND user_persona_num=%s
-                    LIMIT 1
-                    """,
-                    (int(uid), int(body.persona_num)),
-                )
-                row = await cur.fetchone()
-                if row:
-                    persona_img = row.get("persona_img")
-                    pp_raw = row.get("persona_parameters")
-                    try:
-                        pp = json.loads(pp_raw) if isinstance(pp_raw, str) else (pp_raw or {})
-                    except Exception:
-                        pp = {}
-                    # Try common keys for tone/personality
-                    for key in ("personality", "tone", "style", "voice"):
-                        val = pp.get(key)
-                        if isinstance(val, str) and val.strip():
-                            personality = val.strip()
-                            break
-                    # Instagram nested section fallback
-                    if not personality:
-                        igp = (pp.get("instagram") or {}) if isinstance(pp, dict) else {}
-                        val = igp.get("personality") or igp.get("tone")
-                        if isinstance(val, str):
-                            personality = val.strip()
-    except Exception:
-        # Non-fatal: continue with empty personality
-        pass
+    # 2) Persona personality and AI-reachable image
+    personality = ctx.personality
+    persona_img = ctx.image_url
 
     # 3) Call AI to generate reply text
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
@@ -243,7 +178,7 @@ async def auto_reply_to_comment(request: Request, body: AutoReplyBody):
         "persona_img": persona_img,
     }
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with http_client("ai", timeout=20) as client:
             ar = await client.post(f"{ai_url}/comment/reply", json=payload)
         if ar.status_code != 200:
             # Bubble up AI failure clearly
@@ -263,7 +198,7 @@ async def auto_reply_to_comment(request: Request, body: AutoReplyBody):
 
     # 4) Post reply to Graph
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with http_client("graph", timeout=20) as client:
             gr = await client.post(
                 f"{IG_GRAPH}/{body.comment_id}/replies",
                 data={"message": reply_text, "access_token": token},
@@ -297,47 +232,14 @@ async def auto_draft_reply(request: Request, body: AutoDraftBody):
     uid = _require_login(request)
 
     # Ensure persona is linked for personality lookup (token not required here)
-    mapping = await _get_persona_instagram_mapping(int(uid), int(body.persona_num))
-    if not mapping:
+    ctx = await get_persona_context(int(uid), int(body.persona_num))
+    if not ctx or not ctx.mapping:
         # Still allow draft without IG mapping, but warn via 400 to be explicit
         raise HTTPException(status_code=400, detail="persona_not_linked")
 
-    # Load persona parameters and image to extract "personality"
-    personality: str = ""
-    persona_img: Optional[str] = None
-    try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    """
-                    SELECT persona_img, persona_parameters
-                    FROM ss_persona
-                    WHERE user_id=%s AND user_persona_num=%s
-                    LIMIT 1
-                    """,
-                    (int(uid), int(body.persona_num)),
-                )
-                row = await cur.fetchone()
-                if row:
-                    persona_img = row.get("persona_img")
-                    pp_raw = row.get("persona_parameters")
-                    try:
-                        pp = json.loads(pp_raw) if isinstance(pp_raw, str) else (pp_raw or {})
-                    except Exception:
-                        pp = {}
-                    for key in ("personality", "tone", "style", "voice"):
-                        val = pp.get(key)
-                        if isinstance(val, str) and val.strip():
-                            personality = val.strip()
-                            break
-                    if not personality:
-                        igp = (pp.get("instagram") or {}) if isinstance(pp, dict) else {}
-                        val = igp.get("personality") or igp.get("tone")
-                        if isinstance(val, str):
-                            personality = val.strip()
-    except Exception:
-        pass
+    # Persona personality and AI-reachable image
+    personality = ctx.personality
+    persona_img = ctx.image_url
 
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
     payload = {
@@ -348,7 +250,7 @@ async def auto_draft_reply(request: Request, body: AutoDraftBody):
         "persona_img": persona_img,
     }
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
+        async with http_client("ai", timeout=20) as client:
             ar = await client.post(f"{ai_url}/comment/reply", json=payload)
         if ar.status_code != 200:
             try:
@@ -398,69 +300,12 @@ def _looks_like_image_request(text: str) -> bool:
     return False
 
 
-def _normalize_persona_img(raw: str) -> str:
-    try:
-        if raw.startswith("data:"):
-            return raw
-        if raw.startswith("/"):
-            base = (os.getenv("BACKEND_INTERNAL_URL") or "http://backend:8000").rstrip("/")
-            return f"{base}{raw}"
-        if raw.startswith("http://localhost") or raw.startswith("http://127.0.0.1"):
-            from urllib.parse import urlparse, urlunparse
-            p = urlparse(raw)
-            repl = p._replace(netloc="backend:8000")
-            return urlunparse(repl)
-        if s3_enabled() and not raw.lower().startswith("http"):
-            return presign_get_url(raw)
-        return raw
-    except Exception:
-        return raw
-
-
-def _extract_mbti_from_params(pp_raw: Optional[str | Dict[str, Any]]) -> str:
-    """Extract MBTI-like personality code from persona_parameters JSON.
-
-    Priority:
-    - Explicit MBTI fields: mbti, MBTI, mbti_type, personality_mbti
-    - Fallback: personality/tone/style/voice if looks like MBTI (e.g., INFP)
-    - Instagram-nested personality/tone
-    """
-    try:
-        if isinstance(pp_raw, str):
-            try:
-                pp = json.loads(pp_raw)
-            except Exception:
-                pp = {}
-        else:
-            pp = pp_raw or {}
-        if not isinstance(pp, dict):
-            return ""
-        for key in ("mbti", "MBTI", "mbti_type", "personality_mbti"):
-            val = pp.get(key)
-            if isinstance(val, str) and val.strip():
-                return val.strip()
-        import re as _re
-        for key in ("personality", "tone", "style", "voice"):
-            val = pp.get(key)
-            if isinstance(val, str) and val.strip():
-                s = val.strip().upper()
-                if _re.match(r"^[E|I][N|S][F|T][P|J]$", s):
-                    return s
-        igp = (pp.get("instagram") or {}) if isinstance(pp, dict) else {}
-        val = igp.get("personality") or igp.get("tone")
-        if isinstance(val, str) and val.strip():
-            return val.strip()
-    except Exception:
-        pass
-    return ""
-
-
 @router.post("/comments/auto_image")
 async def auto_image_for_comment(request: Request, body: AutoImageBody):
     """댓글 텍스트를 보고 이미지 요청이면 자동으로 생성하여 갤러리에 저장합니다.
 
     - 판별: 간단 키워드 기반 (운영 시 Gemini 등으로 고도화 권장)
-    - 생성: AI 서비스 /chat/image 위임 (data URI 수신)
+    - 생성: AI 서비스 /chat/image 위임 (이미지 바이트 수신)
     - 저장: S3 업로드 + ss_chat_img 기록
     - 중복 방지: 옵션에 따라 ss_instagram_event_seen에 ACK 기록
     """
@@ -473,40 +318,18 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
     if not _looks_like_image_request(body.text):
         return {"ok": False, "skipped": True, "reason": "not_image_request"}
 
-    persona_img: Optional[str] = None
-    persona_params_json: Optional[str] = None
     persona_db_id = int(body.persona_num)
     try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor(aiomysql.DictCursor) as cur:
-                await cur.execute(
-                    """
-                    SELECT persona_img, persona_parameters
-                    FROM ss_persona
-                    WHERE user_id=%s AND user_persona_num=%s
-                    LIMIT 1
-                    """,
-                    (int(uid), int(persona_db_id)),
-                )
-                row = await cur.fetchone()
-                if not row:
-                    raise HTTPException(status_code=404, detail="persona_not_found")
-                persona_img = row.get("persona_img")
-                pp = row.get("persona_parameters")
-                if isinstance(pp, (dict, list)):
-                    persona_params_json = json.dumps(pp, ensure_ascii=False)
-                else:
-                    persona_params_json = pp
-    except HTTPException:
-        raise
+        ctx = await get_persona_context(int(uid), persona_db_id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"persona_lookup_failed:{e}")
-
-    if not persona_img:
+    if ctx is None:
+        raise HTTPException(status_code=404, detail="persona_not_found")
+    if not ctx.persona_img:
         raise HTTPException(status_code=400, detail="persona_img_missing")
 
-    persona_img_norm = _normalize_persona_img(str(persona_img))
+    persona_img_norm = ctx.image_url
+    persona_params_json = ctx.params_json
 
     # Prefer internal Docker service name by default; allow override via AI_SERVICE_URL
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
@@ -514,10 +337,11 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
         "user_text": body.text,
         "persona_img": persona_img_norm,
         "persona": persona_params_json or "",
+        **ctx.image_ref,
     }
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            r = await client.post(f"{ai_url}/chat/image", json=payload)
+        async with http_client("ai") as client:
+            r = await client.post(f"{ai_url}/chat/image", json=payload, headers=AI_IMAGE_ACCEPT)
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"ai_delegate_error: {e}")
     if r.status_code != 200:
@@ -526,84 +350,31 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
         except Exception:
             detail = r.text
         raise HTTPException(status_code=502, detail={"ai_failed": True, "status": r.status_code, "body": detail})
-    ai_json = r.json() or {}
-    img_data_uri = ai_json.get("image")
-    if not (isinstance(img_data_uri, str) and img_data_uri.startswith("data:")):
+    got = read_ai_image(r)
+    if got is None:
         raise HTTPException(status_code=502, detail="invalid_ai_response")
+    img_raw, img_mime, img_prompt = got
 
     if not s3_enabled():
         raise HTTPException(status_code=400, detail="s3_not_configured")
-    key = put_data_uri(
-        img_data_uri,
+    key = await aput_bytes(
+        img_raw,
+        img_mime,
         model=None,
         key_prefix=f"drafts/{int(uid)}/{int(persona_db_id)}",
         base_prefix="",
         include_model=False,
         include_date=False,
     )
-    url = presign_get_url(key)
+    url = await apresign_get_url(key)
 
-    chat_id = None
-    try:
-        pool = await get_mysql_pool()
-        async with pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                inserted = False
-                try:
-                    await cur.execute(
-                        """
-                        INSERT INTO ss_chat_img (user_id, persona_id, img_key)
-                        VALUES (%s, %s, %s)
-                        """,
-                        (int(uid), int(persona_db_id), key),
-                    )
-                    inserted = True
-                except Exception:
-                    try:
-                        await cur.execute(
-                            """
-                            INSERT INTO ss_chat_img (user_id, persona_id, persona_chat_img)
-                            VALUES (%s, %s, %s)
-                            """,
-                            (int(uid), int(persona_db_id), key),
-                        )
-                        inserted = True
-                    except Exception:
-                        inserted = False
-                if inserted:
-                    try:
-                        await conn.commit()
-                    except Exception:
-                        pass
-                    try:
-                        chat_id = cur.lastrowid
-                    except Exception:
-                        chat_id = None
-    except Exception:
-        pass
+    chat_id = await insert_chat_image(int(uid), int(persona_db_id), key)
 
     try:
         # Only ACK-hide the original comment after image creation if explicitly enabled.
         # Default is disabled so comments remain visible until a reply is actually posted.
         if (os.getenv("AUTO_IMAGE_ACK_SEEN", "0").strip().lower() in ("1", "true", "yes")):
-            pool = await get_mysql_pool()
-            async with pool.acquire() as conn:
-                async with conn.cursor() as cur:
-                    try:
-                        await cur.execute(
-                            """
-                            INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                            VALUES (%s,%s,%s)
-                            ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                            """,
-                            (str(body.comment_id), int(uid), int(persona_db_id)),
-                        )
-                        try:
-                            await conn.commit()
-                        except Exception:
-                            pass
-                    except Exception:
-                        pass
+            await mark_seen([body.comment_id], int(uid), int(persona_db_id))
     except Exception:
         pass
 
@@ -620,11 +391,11 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
         plan_norm = (str(plan).strip().lower() if plan else "")
         if plan_norm in ("business", "biz"):
             # 1) Generate caption via AI (reuse personality from persona_parameters)
-            personality = _extract_mbti_from_params(persona_params_json)
+            personality = ctx.mbti
             ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
-            cap_payload = {"image": url, "personality": personality or "", "tone": None}
+            cap_payload = {"image": url, "image_key": key, "personality": personality or "", "tone": None}
             try:
-                async with httpx.AsyncClient(timeout=30.0) as client:
+                async with http_client("ai", timeout=30.0) as client:
                     cr = await client.post(f"{ai_url}/caption/generate", json=cap_payload)
                 if cr.status_code == 200:
                     cj = cr.json() or {}
@@ -659,8 +430,8 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
 
             # 2) Publish to Instagram if persona is linked and token exists
             try:
-                mapping = await _get_persona_instagram_mapping(int(uid), int(persona_db_id))
-                token = await _get_persona_token(int(uid), int(persona_db_id))
+                mapping = ctx.mapping
+                token = ctx.token
                 if not mapping or not mapping.get("ig_user_id"):
                     publish_error = "persona_instagram_not_linked"
                 elif not token:
@@ -668,7 +439,7 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
                 else:
                     ig_user_id = mapping["ig_user_id"]
                     # Create media container
-                    async with httpx.AsyncClient(timeout=60) as client:
+                    async with http_client("graph", timeout=60) as client:
                         create = await client.post(
                             f"{IG_GRAPH}/{ig_user_id}/media",
                             data={
@@ -686,7 +457,7 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
                         else:
                             # Wait briefly for container readiness (configurable)
                             try:
-                                async with httpx.AsyncClient(timeout=30) as client:
+                                async with http_client("graph") as client:
                                     finished = False
                                     poll_interval = float(os.getenv("IG_POLL_INTERVAL_SECONDS", "1.0") or 1.0)
                                     poll_attempts = int(os.getenv("IG_POLL_MAX_ATTEMPTS", "20") or 20)
@@ -707,7 +478,7 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
                                 pass
 
                             # Publish (with one retry if readiness issue)
-                            async with httpx.AsyncClient(timeout=60) as client:
+                            async with http_client("graph", timeout=60) as client:
                                 async def _do_publish():
                                     return await client.post(
                                         f"{IG_GRAPH}/{ig_user_id}/media_publish",
@@ -742,24 +513,7 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
             # ACK-hide on successful publish regardless of env flag (best-effort)
             if auto_published:
                 try:
-                    pool = await get_mysql_pool()
-                    async with pool.acquire() as conn:
-                        async with conn.cursor() as cur:
-                            try:
-                                await cur.execute(
-                                    """
-                                    INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                                    VALUES (%s,%s,%s)
-                                    ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                                    """,
-                                    (str(body.comment_id), int(uid), int(persona_db_id)),
-                                )
-                                try:
-                                    await conn.commit()
-                                except Exception:
-                                    pass
-                            except Exception:
-                                pass
+                    await mark_seen([body.comment_id], int(uid), int(persona_db_id))
                 except Exception:
                     pass
     except Exception:
@@ -769,7 +523,7 @@ async def auto_image_for_comment(request: Request, body: AutoImageBody):
     return {
         "ok": True,
         "stored": {"key": key, "url": url, "id": chat_id},
-        "prompt": ai_json.get("prompt"),
+        "prompt": img_prompt,
         "auto_published": auto_published,
         "auto_caption": auto_caption,
         "publish_result": publish_result,
@@ -792,8 +546,9 @@ class BulkReplyBody(BaseModel):
 async def reply_to_comments_bulk(request: Request, body: BulkReplyBody):
     """Reply to multiple Instagram comments in a single request.
 
-    Posts replies sequentially on the server, returns per-item result list.
-    Also best-effort ACK-hides each original comment in DB.
+    Replies are posted concurrently (IG_REPLY_BULK_CONCURRENCY, default 4) but paced per
+    IG account by the shared `ig_write` rate limiter; results keep the order of `items`.
+    All original comments are ACK-hidden in DB with one batched write before posting.
     """
     uid = _require_login(request)
     mapping = await _get_persona_instagram_mapping(int(uid), int(body.persona_num))
@@ -803,54 +558,51 @@ async def reply_to_comments_bulk(request: Request, body: BulkReplyBody):
     if not token:
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
-    results: List[Dict[str, Any]] = []
+    # PRE-ACK: 모든 항목을 처리 전에 한 번에(다중 행 INSERT) 확인됨으로 기록해 중복 답글 방지
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            for it in body.items:
-                try:
-                    # PRE-ACK: Mark as seen before processing to prevent duplicates
+        await mark_seen([it.comment_id for it in body.items], int(uid), int(body.persona_num))
+    except Exception:
+        # If pre-ACK fails, skip all to avoid duplicates
+        return {"ok": True, "results": [
+            {"comment_id": it.comment_id, "ok": False, "status": 500, "error": "pre_ack_failed"} for it in body.items
+        ]}
+
+    try:
+        concurrency = max(1, int(os.getenv("IG_REPLY_BULK_CONCURRENCY", "4") or 4))
+    except Exception:
+        concurrency = 4
+    sem = asyncio.Semaphore(concurrency)
+    # 스케줄러 자동 답글과 같은 리미터를 공유 → 같은 IG 계정으로 나가는 쓰기 호출 간격 유지
+    limiter = account_limiter("ig_write")
+    ig_user_id = str(mapping["ig_user_id"])
+
+    try:
+        async with http_client("graph", timeout=20) as client:
+            async def _reply(it: BulkReplyItem) -> Dict[str, Any]:
+                async with sem:
                     try:
-                        pool = await get_mysql_pool()
-                        async with pool.acquire() as conn:
-                            async with conn.cursor() as cur:
-                                await cur.execute(
-                                    """
-                                    INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                                    VALUES (%s,%s,%s)
-                                    ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                                    """,
-                                    (str(it.comment_id), int(uid), int(body.persona_num)),
-                                )
-                                try:
-                                    await conn.commit()
-                                except Exception:
-                                    pass
-                    except Exception:
-                        # If pre-ACK fails, skip to avoid duplicates
-                        results.append({"comment_id": it.comment_id, "ok": False, "status": 500, "error": "pre_ack_failed"})
-                        continue
-
-                    r = await client.post(
-                        f"{IG_GRAPH}/{it.comment_id}/replies",
-                        data={"message": it.message, "access_token": token},
-                    )
-                    if r.status_code != 200:
-                        try:
-                            err = (r.json() or {}).get("error") or {}
-                            if err.get("code") == 190:
-                                # OAuth required/expired
-                                results.append({"comment_id": it.comment_id, "ok": False, "status": 401, "error": "persona_oauth_required"})
-                                continue
-                        except Exception:
-                            pass
-                        results.append({"comment_id": it.comment_id, "ok": False, "status": r.status_code, "error": r.text})
-                        continue
-                    data = r.json() or {}
-                    results.append({"comment_id": it.comment_id, "ok": True, "status": 200, "result": data})
-                    # Already PRE-ACK-ed, no need to ACK again
-                except Exception as e:
-                    results.append({"comment_id": it.comment_id, "ok": False, "status": 500, "error": str(e)})
-        return {"ok": True, "results": results}
+                        await limiter.acquire(ig_user_id)
+                        r = await client.post(
+                            f"{IG_GRAPH}/{it.comment_id}/replies",
+                            data={"message": it.message, "access_token": token},
+                        )
+                        if r.status_code != 200:
+                            try:
+                                err = (r.json() or {}).get("error") or {}
+                                if err.get("code") == 190:
+                                    # OAuth required/expired
+                                    return {"comment_id": it.comment_id, "ok": False, "status": 401, "error": "persona_oauth_required"}
+                            except Exception:
+                                pass
+                            return {"comment_id": it.comment_id, "ok": False, "status": r.status_code, "error": r.text}
+                        # Already PRE-ACK-ed, no need to ACK again
+                        return {"comment_id": it.comment_id, "ok": True, "status": 200, "result": r.json() or {}}
+                    except Exception as e:
+                        return {"comment_id": it.comment_id, "ok": False, "status": 500, "error": str(e)}
+
+            # gather는 입력 순서대로 결과를 돌려주므로 항목 순서 유지
+            results = await asyncio.gather(*(_reply(it) for it in body.items))
+        return {"ok": True, "results": list(results)}
     except HTTPException:
         raise
     except Exception as e:
@@ -1,11 +1,16 @@
 from __future__ import annotations
+import json
+import logging
 import os
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import PlainTextResponse
 
+from app.api.core.ig_webhook import note_received, parse_events, store_events, verify_signature
+
 router = APIRouter(prefix="/webhooks/instagram", tags=["instagram"])
 
 VERIFY_TOKEN = os.getenv("META_WEBHOOK_VERIFY_TOKEN", "")
+log = logging.getLogger("instagram_webhook")
 
 
 @router.get("")
@@ -29,11 +34,25 @@ async def verify_webhook(request: Request):
 
 
 @router.post("")
-async def receive_webhook(body: dict):
+async def receive_webhook(request: Request):
     """
     Receive Instagram Graph Webhook events.
-    For now, just acknowledge. You can extend to process events.
+    X-Hub-Signature-256 검증 → comments/mentions 이벤트를 DB에 저장(중복 무시) → 답글 파이프라인 깨우기.
+    저장에 실패하면 5xx를 돌려 Meta가 재전송하도록 합니다.
     """
-    # TODO: add signature validation (X-Hub-Signature) if needed
-    # and process body events.
-    return {"ok": True}
+    raw = await request.body()
+    valid = verify_signature(raw, request.headers.get("X-Hub-Signature-256"))
+    note_received(valid)
+    if not valid:
+        raise HTTPException(status_code=403, detail="invalid_signature")
+    try:
+        body = json.loads(raw or b"{}")
+    except Exception:
+        raise HTTPException(status_code=400, detail="invalid_json")
+    rows = parse_events(body)
+    try:
+        stored = await store_events(rows)
+    except Exception as e:
+        log.warning("webhook: failed to persist %d events: %s", len(rows), e)
+        raise HTTPException(status_code=503, detail="persist_failed")
+    return {"ok": True, "events": len(rows), "stored": stored}
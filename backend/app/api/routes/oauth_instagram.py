@@ -4,8 +4,10 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import RedirectResponse
 import httpx
+from app.core.http_clients import http_client
 import aiomysql
 from app.api.core.mysql import get_mysql_pool
+from app.api.core.persona_context import invalidate_persona, mapping_from_row as _mapping_from_row
 from datetime import datetime, timedelta, timezone
 import secrets
 import json
@@ -56,53 +58,31 @@ def _verify_state(state: str) -> Optional[dict]:
         return None
 
 
-async def _ensure_persona_instagram_columns():
-    """ss_persona에 ig_user_id, ig_username, fb_page_id, ig_linked_at 컬럼이 없으면 추가"""
-    pool = await get_mysql_pool()
-    async with pool.acquire() as conn:
-        async with conn.cursor(aiomysql.DictCursor) as cur:
-            await cur.execute(
+# ss_persona.id 컬럼 존재 여부(스키마는 배포 중 바뀌지 않으므로 프로세스당 1회만 조회)
+_persona_has_id_col: Optional[bool] = None
+
+
+async def _persona_has_id_column(conn) -> bool:
+    global _persona_has_id_col
+    if _persona_has_id_col is None:
+        async with conn.cursor(aiomysql.DictCursor) as curcols:
+            await curcols.execute(
                 """
                 SELECT COLUMN_NAME
                 FROM INFORMATION_SCHEMA.COLUMNS
                 WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ss_persona'
                 """
             )
-            cols = {r["COLUMN_NAME"].lower() for r in (await cur.fetchall() or [])}
-        alters = []
-        if "ig_user_id" not in cols:
-            alters.append("ADD COLUMN ig_user_id VARCHAR(64) NULL")
-        if "ig_username" not in cols:
-            alters.append("ADD COLUMN ig_username VARCHAR(150) NULL")
-        if "fb_page_id" not in cols:
-            alters.append("ADD COLUMN fb_page_id VARCHAR(64) NULL")
-        if "ig_linked_at" not in cols:
-            alters.append("ADD COLUMN ig_linked_at DATETIME NULL")
-        if alters:
-            sql = "ALTER TABLE ss_persona " + ", ".join(alters)
-            async with conn.cursor() as cur2:
-                await cur2.execute(sql)
-                try:
-                    await conn.commit()
-                except Exception:
-                    pass
+            cols = {r.get("COLUMN_NAME", "").lower() for r in (await curcols.fetchall() or [])}
+        _persona_has_id_col = "id" in cols
+    return _persona_has_id_col
 
 async def _resolve_persona_num_by_id(user_id: int, persona_id: int) -> Optional[int]:
     """사용자 소유의 persona_id로 user_persona_num을 구한다."""
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         # 테이블 컬럼 확인 후 안전하게 WHERE 절 구성
-        has_id_col = False
-        async with conn.cursor(aiomysql.DictCursor) as curcols:
-            await curcols.execute(
-                """
-                SELECT COLUMN_NAME
-                FROM INFORMATION_SCHEMA.COLUMNS
-                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'ss_persona'
-                """
-            )
-            cols = {r.get("COLUMN_NAME", "").lower() for r in (await curcols.fetchall() or [])}
-            has_id_col = "id" in cols
+        has_id_col = await _persona_has_id_column(conn)
 
         where = "user_id=%s AND persona_id=%s"
         params = (user_id, int(persona_id))
@@ -130,7 +110,6 @@ async def _resolve_persona_num_by_id(user_id: int, persona_id: int) -> Optional[
 
 async def _update_persona_instagram_mapping(user_id: int, persona_num: int, ig_user_id: str, ig_username: Optional[str], fb_page_id: str):
     """ss_persona에 instagram 매핑을 저장 (컬럼 + JSON 동기화)"""
-    await _ensure_persona_instagram_columns()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         async with conn.cursor(aiomysql.DictCursor) as cur:
@@ -174,10 +153,10 @@ async def _update_persona_instagram_mapping(user_id: int, persona_num: int, ig_u
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, int(persona_num))
 
 async def _clear_persona_instagram_mapping(user_id: int, persona_num: int):
     """ss_persona에서 instagram 매핑 제거(컬럼 + JSON 동기화)."""
-    await _ensure_persona_instagram_columns()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         # 기존 JSON 로드
@@ -217,12 +196,12 @@ async def _clear_persona_instagram_mapping(user_id: int, persona_num: int):
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, int(persona_num))
+
 
 async def _get_persona_instagram_mapping(user_id: int, persona_num: int) -> Optional[Dict[str, Any]]:
-    await _ensure_persona_instagram_columns()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
-        # 1) 컬럼 우선 조회
         async with conn.cursor(aiomysql.DictCursor) as cur:
             await cur.execute(
                 """
@@ -236,79 +215,42 @@ async def _get_persona_instagram_mapping(user_id: int, persona_num: int) -> Opti
             row = await cur.fetchone()
             if not row:
                 return None
-            if row.get("ig_user_id") and row.get("fb_page_id"):
-                return {
-                    "user_id": user_id,
-                    "user_persona_num": int(persona_num),
-                    "ig_user_id": row.get("ig_user_id"),
-                    "ig_username": row.get("ig_username"),
-                    "fb_page_id": row.get("fb_page_id"),
-                }
-            # 2) 컬럼이 비어있으면 JSON에서 시도(과거 데이터 호환)
-            try:
-                params = json.loads(row.get("persona_parameters") or "{}") or {}
-            except Exception:
-                params = {}
-            ig = params.get("instagram")
-            if isinstance(ig, dict) and ig.get("ig_user_id") and ig.get("fb_page_id"):
-                return {
-                    "user_id": user_id,
-                    "user_persona_num": int(persona_num),
-                    "ig_user_id": ig.get("ig_user_id"),
-                    "ig_username": ig.get("ig_username"),
-                    "fb_page_id": ig.get("fb_page_id"),
-                }
-            return None
-
+            return _mapping_from_row(user_id, persona_num, row)
 
 
-async def _ensure_connector_table():
-    pool = await get_mysql_pool()
-    async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
-            await cur.execute(
-                """
-                CREATE TABLE IF NOT EXISTS ss_instagram_connector (
-                  user_id INT NOT NULL PRIMARY KEY,
-                  long_lived_user_token TEXT NOT NULL,
-                  expires_at DATETIME NULL,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  updated_at TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-                """
-            )
-            try:
-                await conn.commit()
-            except Exception:
-                pass
+async def _get_persona_links(user_id: int) -> Dict[int, Dict[str, Any]]:
+    """사용자의 모든 페르소나에 대한 IG 매핑 + 페르소나 토큰을 한 번의 조인 쿼리로 조회.
 
-
-async def _ensure_connector_persona_table():
-    """Persona별 OAuth 토큰 저장 테이블 생성"""
+    반환: {persona_num: {"mapping": {...} | None, "token": str | None}}
+    """
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
-        async with conn.cursor() as cur:
+        async with conn.cursor(aiomysql.DictCursor) as cur:
             await cur.execute(
                 """
-                CREATE TABLE IF NOT EXISTS ss_instagram_connector_persona (
-                  user_id INT NOT NULL,
-                  user_persona_num INT NOT NULL,
-                  long_lived_user_token TEXT NOT NULL,
-                  expires_at DATETIME NULL,
-                  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                  updated_at TIMESTAMP NULL DEFAULT NULL ON UPDATE CURRENT_TIMESTAMP,
-                  PRIMARY KEY (user_id, user_persona_num)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
-                """
+                SELECT p.user_persona_num, p.ig_user_id, p.ig_username, p.fb_page_id, p.persona_parameters,
+                       t.long_lived_user_token
+                FROM ss_persona p
+                LEFT JOIN ss_instagram_connector_persona t
+                  ON t.user_id = p.user_id AND t.user_persona_num = p.user_persona_num
+                WHERE p.user_id=%s
+                """,
+                (user_id,),
             )
-            try:
-                await conn.commit()
-            except Exception:
-                pass
+            rows = await cur.fetchall() or []
+    out: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        num = row.get("user_persona_num")
+        if num is None:
+            continue
+        out[int(num)] = {
+            "mapping": _mapping_from_row(user_id, int(num), row),
+            "token": row.get("long_lived_user_token"),
+        }
+    return out
 
 
 async def _store_user_token(user_id: int, token: str, expires_in: Optional[int] = None):
-    await _ensure_connector_table()
     expires_at: Optional[datetime] = None
     if isinstance(expires_in, int) and expires_in > 0:
         expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
@@ -332,7 +274,6 @@ async def _store_user_token(user_id: int, token: str, expires_in: Optional[int]
 
 
 async def _get_user_token(user_id: int) -> Optional[str]:
-    await _ensure_connector_table()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         async with conn.cursor(aiomysql.DictCursor) as cur:
@@ -347,7 +288,6 @@ async def _get_user_token(user_id: int) -> Optional[str]:
 
 
 async def _store_persona_token(user_id: int, persona_num: int, token: str, expires_in: Optional[int] = None):
-    await _ensure_connector_persona_table()
     expires_at: Optional[datetime] = None
     if isinstance(expires_in, int) and expires_in > 0:
         expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
@@ -368,10 +308,10 @@ async def _store_persona_token(user_id: int, persona_num: int, token: str, expir
                 await conn.commit()
             except Exception:
                 pass
+    invalidate_persona(user_id, int(persona_num))
 
 
 async def _get_persona_token(user_id: int, persona_num: int) -> Optional[str]:
-    await _ensure_connector_persona_table()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         async with conn.cursor(aiomysql.DictCursor) as cur:
@@ -471,7 +411,7 @@ async def start_oauth(
             token_to_revoke = await _get_user_token(uid)
         try:
             if token_to_revoke:
-                async with httpx.AsyncClient(timeout=15) as client:
+                async with http_client("graph", timeout=15) as client:
                     # DELETE /me/permissions → 사용자와 앱의 연결 권한 제거
                     await client.delete(f"{GRAPH}/me/permissions", params={"access_token": token_to_revoke})
         except Exception:
@@ -506,7 +446,7 @@ async def debug_token(request: Request):
     if not (META_APP_ID and META_APP_SECRET):
         raise HTTPException(status_code=500, detail="meta_app_not_configured")
     app_token = f"{META_APP_ID}|{META_APP_SECRET}"
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         r = await client.get(f"{GRAPH}/debug_token", params={"input_token": token, "access_token": app_token})
     return {"ok": r.status_code == 200, "status": r.status_code, "json": r.json()}
 
@@ -518,7 +458,7 @@ async def raw_accounts(request: Request):
     token = await _get_user_token(uid) or ENV_USER_TOKEN
     if not token:
         raise HTTPException(status_code=404, detail="no_token")
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         r = await client.get(
             f"{GRAPH}/me/accounts",
             params={
@@ -536,7 +476,7 @@ async def list_permissions(request: Request):
     token = await _get_user_token(uid) or ENV_USER_TOKEN
     if not token:
         raise HTTPException(status_code=404, detail="no_token")
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         r = await client.get(f"{GRAPH}/me/permissions", params={"access_token": token})
     return {"ok": r.status_code == 200, "status": r.status_code, "json": r.json()}
 
@@ -565,7 +505,7 @@ async def oauth_callback(request: Request, code: Optional[str] = None, state: Op
         raise HTTPException(status_code=400, detail="persona_required")
 
     # code -> short-lived user access token 교환
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         token_res = await client.get(
             f"{GRAPH}/oauth/access_token",
             params={
@@ -583,7 +523,7 @@ async def oauth_callback(request: Request, code: Optional[str] = None, state: Op
         raise HTTPException(status_code=502, detail="short_token_missing")
 
     # long-lived user token 교환
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         ll_res = await client.get(
             f"{GRAPH}/oauth/access_token",
             params={
@@ -623,7 +563,7 @@ async def list_ig_accounts(request: Request, persona_num: Optional[int] = None,
     if not token:
         raise HTTPException(status_code=401, detail="persona_oauth_required")
 
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with http_client("graph") as client:
         r = await client.get(
             f"{GRAPH}/me/accounts",
             params={
@@ -680,7 +620,7 @@ async def list_ig_accounts(request: Request, persona_num: Optional[int] = None,
             return {"ok": True, "items": items, "warning": initial_error_text}
         app_token = f"{META_APP_ID}|{META_APP_SECRET}"
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with http_client("graph") as client:
                 dbg = await client.get(
                     f"{GRAPH}/debug_token",
                     params={"input_token": token, "access_token": app_token},
@@ -695,7 +635,7 @@ async def list_ig_accounts(request: Request, persona_num: Optional[int] = None,
                             if isinstance(pid, str):
                                 page_ids.append(pid)
                 # 각 페이지에 대해 IG 연결 조회
-                async with httpx.AsyncClient(timeout=30) as client:
+                async with http_client("graph") as client:
                     for pid in page_ids:
                         pr = await client.get(
                             f"{GRAPH}/{pid}",
@@ -741,7 +681,6 @@ async def unlink_persona_account(
     if persona_num is None:
         raise HTTPException(status_code=400, detail="persona_num_required")
 
-    await _ensure_connector_persona_table()
     pool = await get_mysql_pool()
     async with pool.acquire() as conn:
         async with conn.cursor() as cur:
@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException, status, Request
 from ..schemas.persona import PersonaUpsert, PersonaUpdate
 from app.api.models.persona import create_persona, get_user_personas, update_persona_fields, delete_persona
 import logging
-from app.core.s3 import s3_enabled, presign_get_url
+from app.core.s3 import s3_enabled
+from app.api.core.renditions import resolve_urls
 import os
+from typing import Optional
 
 log = logging.getLogger("personas")
 
@@ -11,28 +13,27 @@ log = logging.getLogger("personas")
 router = APIRouter(prefix="/api/personas", tags=["personas"])
 
 @router.get("/me", status_code=status.HTTP_200_OK)
-async def list_my_personas(request: Request):
+async def list_my_personas(request: Request, w: Optional[int] = None):
     user_id = request.session.get("user_id") if hasattr(request, "session") else None
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not logged in")
 
     try:
         rows = await get_user_personas(int(user_id))
-        items = []
+        backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
+        # 1) 행별 표시 이미지 결정: S3 키는 모아 두었다가 한 번에 프리사인
+        resolved = []  # (row, disp, img_out, presign_key)
         for r in rows:
             params = r.get("persona_parameters") or {}
             # UI 표시용 이름: parameters.name 이 있으면 사용, 없으면 "프로필 {num}"
             disp = params.get("name") or f"프로필 {r.get('user_persona_num')}"
             raw_img = (r.get("persona_img") or "").strip()
             img_out = raw_img
-            # 값이 S3 키처럼 보이면(http/https, /media/가 아닌 경우) 즉시 프리사인 URL로 변환
+            presign_key = None
+            # 값이 S3 키처럼 보이면(http/https, /media/가 아닌 경우) 프리사인 URL로 변환
             if raw_img and not raw_img.lower().startswith("http") and not raw_img.startswith("/media/"):
                 if s3_enabled():
-                    try:
-                        img_out = presign_get_url(raw_img)
-                    except Exception:
-                        # 실패 시 원본 키 그대로 반환
-                        img_out = raw_img
+                    presign_key = raw_img
             # 과거 로컬 절대 URL(http://localhost, http://127.0.0.1) 보정
             elif raw_img.lower().startswith("http://localhost") or raw_img.lower().startswith("http://127.0.0.1"):
                 try:
@@ -42,21 +43,39 @@ async def list_my_personas(request: Request):
                     if path.startswith("/personas/") or path.startswith("/uploads/"):
                         # personas/uploads 경로는 S3 키로 간주하여 프리사인
                         if s3_enabled():
-                            img_out = presign_get_url(path.lstrip("/"))
+                            presign_key = path.lstrip("/")
                         else:
-                            backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
                             img_out = f"{backend_url}{path}"
                     elif path.startswith("/media/"):
-                        backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
                         img_out = f"{backend_url}{path}"
                     else:
-                        backend_url = (os.getenv("BACKEND_URL") or "http://localhost:8000").rstrip("/")
                         img_out = f"{backend_url}{path or '/'}"
                 except Exception:
                     img_out = raw_img
+            resolved.append((r, disp, img_out, presign_key))
+
+        # 2) 렌디션 선택 + 프리사인은 배치 1회(캐시 재사용). 실패 시 원본 키 그대로 반환
+        #    img: 원본, img_thumb: 표시 폭 w(px)에 맞는 썸네일, img_full: 압축 원본 크기(렌디션이 없으면 원본)
+        urls = {}
+        keys = [k for (_r, _d, _i, k) in resolved if k]
+        if keys:
+            try:
+                urls = await resolve_urls(keys, w)
+            except Exception as _pe:
+                log.warning("persona presign failed: %s", _pe)
+        items = []
+        for r, disp, img_out, presign_key in resolved:
+            img_thumb = img_full = img_out
+            if presign_key:
+                got = urls.get(presign_key) or {}
+                img_out = got.get("url") or img_out
+                img_thumb = got.get("thumb_url") or img_out
+                img_full = got.get("full_url") or img_out
             items.append({
                 "num": r.get("user_persona_num"),
                 "img": img_out,
+                "img_thumb": img_thumb,
+                "img_full": img_full,
                 "name": disp,
             })
         return {"ok": True, "items": items}
@@ -0,0 +1,63 @@
+"""AI 서비스 이미지 응답 수신 헬퍼.
+
+AI 서비스(/chat/image, /predict)는 요청 Accept 헤더가 image/* 이면 이미지 바이트를
+응답 본문으로 그대로 보내고(프롬프트는 X-Image-Prompt-B64 헤더), 그렇지 않으면
+기존처럼 JSON(data URI)으로 응답합니다.
+
+백엔드는 항상 바이너리를 요청해 S3에 바로 올리고, data URI는 브라우저가
+필요로 할 때만(to_data_uri) 만듭니다. 구버전 AI 서비스의 JSON 응답도 받아들입니다.
+
+사용 예)
+    r = await client.post(f"{ai_url}/chat/image", json=payload, headers=AI_IMAGE_ACCEPT)
+    got = read_ai_image(r)   # (raw, mime, prompt) 또는 None
+"""
+from __future__ import annotations
+import base64
+from typing import Optional, Tuple
+
+import httpx
+
+from app.core.s3 import parse_data_uri
+
+# 바이너리를 우선 요청하되, 구버전 AI 서비스의 JSON 응답도 허용
+AI_IMAGE_ACCEPT = {"Accept": "image/png, image/*, application/json;q=0.5"}
+PROMPT_HEADER = "X-Image-Prompt-B64"
+
+
+def _decode_prompt(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        pad = "=" * (-len(value) % 4)
+        return base64.urlsafe_b64decode(value + pad).decode("utf-8")
+    except Exception:
+        return None
+
+
+def read_ai_image(r: httpx.Response) -> Optional[Tuple[bytes, str, Optional[str]]]:
+    """AI 응답에서 (이미지 바이트, MIME, 프롬프트)를 꺼냅니다. 이미지가 없으면 None."""
+    ctype = (r.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if ctype.startswith("image/") or ctype == "application/octet-stream":
+        if not r.content:
+            return None
+        mime = ctype if ctype.startswith("image/") else "image/png"
+        return r.content, mime, _decode_prompt(r.headers.get(PROMPT_HEADER))
+    # 호환: JSON {"image": "data:..."}
+    try:
+        data = r.json()
+    except Exception:
+        return None
+    img = data.get("image") if isinstance(data, dict) else None
+    if not (isinstance(img, str) and img.startswith("data:")):
+        return None
+    try:
+        raw, _ext, mime = parse_data_uri(img)
+    except Exception:
+        return None
+    prompt = data.get("prompt") if isinstance(data.get("prompt"), str) else None
+    return raw, mime, prompt
+
+
+def to_data_uri(raw: bytes, mime: str) -> str:
+    """브라우저 미리보기 등 data URI가 꼭 필요한 경우에만 사용."""
+    return f"data:{mime or 'image/png'};base64,{base64.b64encode(raw).decode('ascii')}"
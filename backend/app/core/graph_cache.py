@@ -0,0 +1,227 @@
+"""Instagram Graph GET 응답 캐시(stale-while-revalidate).
+
+인사이트 대시보드는 한 번 열 때마다 Graph 호출을 3~30회 이상 하지만, 대부분의 값은
+길어야 1시간 단위로 바뀌고 며칠 지난 게시물의 인사이트는 거의 변하지 않습니다.
+(ig_user_id, 토큰 지문, 경로, 파라미터) 단위로 200 응답 본문을 보관해 대시보드 응답 시간과
+앱의 Graph 호출 한도를 아낍니다.
+
+- fresh 구간: 캐시 그대로 반환
+- stale 구간(fresh 이후 TTL × GRAPH_CACHE_STALE_MULTIPLIER): 캐시를 즉시 반환하고 백그라운드에서 갱신
+- 그 이후/미보관: Graph 호출 후 저장. 같은 키의 동시 요청은 한 번의 호출로 합칩니다.
+- 200이 아닌 응답은 캐시하지 않습니다.
+- access_token 원문은 키에 넣지 않고 sha256 지문만 넣습니다. scope(ig_user_id)는 호출자가 주는 값이라
+  토큰이 그 계정에 접근할 수 있는지 보장하지 않으므로, 같은 토큰으로 Graph가 허용한 응답만 재사용합니다.
+
+사용 예)
+    r = await graph_get(f"{GRAPH}/{ig_user_id}/insights", params, scope=ig_user_id, kind="user_insights")
+    if r.status_code == 200: data = r.json()
+
+Env
+- GRAPH_CACHE_ENABLED (default 1)
+- GRAPH_CACHE_SIZE (default 5000)          : 최대 보관 항목 수(LRU)
+- GRAPH_CACHE_STALE_MULTIPLIER (default 3)
+- GRAPH_CACHE_TTL_{KIND} (초)               : KIND = USER | USER_INSIGHTS | MEDIA_LIST | MEDIA | MEDIA_INSIGHTS | MEDIA_INSIGHTS_OLD
+- GRAPH_CACHE_OLD_MEDIA_DAYS (default 3)   : 이보다 오래된 게시물의 인사이트는 MEDIA_INSIGHTS_OLD TTL 적용
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.http_clients import http_client
+
+log = logging.getLogger("graph_cache")
+
+# 종류별 기본 fresh TTL(초)
+_TTL_DEFAULTS: Dict[str, float] = {
+    "user": 300.0,                  # username, followers_count
+    "user_insights": 3600.0,        # 일별 사용자 인사이트(하루 단위 집계)
+    "media_list": 300.0,            # 최근 게시물 목록(좋아요/댓글 수 포함)
+    "media": 300.0,                 # 단일 게시물 필드
+    "media_insights": 900.0,        # 최근 게시물 인사이트
+    "media_insights_old": 21600.0,  # 오래된 게시물 인사이트(거의 변하지 않음)
+}
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        v = os.getenv(name)
+        return float(v) if v not in (None, "") else default
+    except Exception:
+        return default
+
+
+def _enabled() -> bool:
+    return (os.getenv("GRAPH_CACHE_ENABLED", "1").strip().lower() in ("1", "true", "yes"))
+
+
+def ttl_for(kind: str) -> float:
+    return _env_num(f"GRAPH_CACHE_TTL_{kind.upper()}", _TTL_DEFAULTS.get(kind, 300.0))
+
+
+def media_insights_kind(timestamp: Optional[str]) -> str:
+    """게시 시각(ISO)이 GRAPH_CACHE_OLD_MEDIA_DAYS보다 오래됐으면 'media_insights_old'."""
+    if not timestamp:
+        return "media_insights"
+    try:
+        ts = datetime.strptime(str(timestamp)[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+    except Exception:
+        return "media_insights"
+    age_days = (datetime.now(timezone.utc) - ts).total_seconds() / 86400.0
+    return "media_insights_old" if age_days >= _env_num("GRAPH_CACHE_OLD_MEDIA_DAYS", 3.0) else "media_insights"
+
+
+class GraphResult:
+    """httpx.Response 중 호출부가 쓰는 부분(status_code, json())만 가진 응답."""
+
+    __slots__ = ("status_code", "_body", "text", "cached")
+
+    def __init__(self, status_code: int, body: Any, text: str = "", cached: bool = False):
+        self.status_code = status_code
+        self._body = body
+        self.text = text
+        self.cached = cached
+
+    def json(self) -> Any:
+        return self._body
+
+
+# (scope, 토큰 지문, URL, 파라미터)
+_Key = Tuple[str, str, str, Tuple[Tuple[str, str], ...]]
+# key -> (fresh_until, stale_until, status, body)
+_cache: "OrderedDict[_Key, Tuple[float, float, int, Any]]" = OrderedDict()
+_inflight: Dict[_Key, "asyncio.Task[GraphResult]"] = {}
+# 백그라운드 갱신 태스크(참조를 유지해야 GC되지 않음)
+_refreshing: Dict[_Key, "asyncio.Task[None]"] = {}
+_stats = {"hits": 0, "stale_hits": 0, "misses": 0, "collapsed": 0, "refreshes": 0, "errors": 0, "evictions": 0}
+
+
+def _token_fingerprint(token: Any) -> str:
+    return hashlib.sha256(str(token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def _make_key(scope: str, url: str, params: Dict[str, Any]) -> _Key:
+    params = params or {}
+    items = tuple(sorted((str(k), str(v)) for k, v in params.items() if k != "access_token"))
+    return (str(scope), _token_fingerprint(params.get("access_token")), url.split("?", 1)[0], items)
+
+
+async def _fetch(url: str, params: Dict[str, Any], timeout: Optional[float]) -> GraphResult:
+    async with http_client("graph", timeout=timeout) as client:
+        r = await client.get(url, params=params)
+    try:
+        body = r.json()
+    except Exception:
+        body = None
+    return GraphResult(r.status_code, body, r.text if body is None else "")
+
+
+def _store(key: _Key, kind: str, res: GraphResult) -> None:
+    if res.status_code != 200 or res._body is None:
+        return
+    ttl = ttl_for(kind)
+    if ttl <= 0:
+        return
+    now = time.monotonic()
+    stale = ttl * max(0.0, _env_num("GRAPH_CACHE_STALE_MULTIPLIER", 3.0))
+    _cache[key] = (now + ttl, now + ttl + stale, res.status_code, res._body)
+    _cache.move_to_end(key)
+    limit = max(1, int(_env_num("GRAPH_CACHE_SIZE", 5000)))
+    while len(_cache) > limit:
+        _cache.popitem(last=False)
+        _stats["evictions"] += 1
+
+
+async def _fetch_and_store(key: _Key, kind: str, url: str, params: Dict[str, Any], timeout: Optional[float]) -> GraphResult:
+    try:
+        res = await _fetch(url, params, timeout)
+    except BaseException:
+        _stats["errors"] += 1
+        raise
+    finally:
+        _inflight.pop(key, None)
+    _store(key, kind, res)
+    return res
+
+
+async def _load(key: _Key, kind: str, url: str, params: Dict[str, Any], timeout: Optional[float]) -> GraphResult:
+    """같은 키의 동시 호출은 하나의 Graph 요청으로 합칩니다.
+
+    요청은 호출자와 분리된 태스크로 실행되므로, 호출자가 마감 시간으로 취소돼도
+    응답은 끝까지 받아 캐시에 저장됩니다(다음 조회에서 사용).
+    """
+    task = _inflight.get(key)
+    if task is not None:
+        _stats["collapsed"] += 1
+    else:
+        task = asyncio.create_task(_fetch_and_store(key, kind, url, dict(params), timeout))
+        # 모든 호출자가 취소돼도 예외가 "never retrieved"로 남지 않도록 소비
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def _refresh(key: _Key, kind: str, url: str, params: Dict[str, Any], timeout: Optional[float]) -> None:
+    try:
+        _stats["refreshes"] += 1
+        await _load(key, kind, url, params, timeout)
+    except Exception as e:
+        log.debug("graph cache refresh failed: %s", e)
+    finally:
+        _refreshing.pop(key, None)
+
+
+async def graph_get(
+    url: str,
+    params: Dict[str, Any],
+    *,
+    scope: str,
+    kind: str,
+    timeout: Optional[float] = None,
+) -> GraphResult:
+    """캐시를 거치는 Graph GET. scope는 보통 ig_user_id(무효화 단위)."""
+    if not _enabled():
+        return await _fetch(url, params, timeout)
+    key = _make_key(scope, url, params)
+    now = time.monotonic()
+    hit = _cache.get(key)
+    if hit is not None:
+        fresh_until, stale_until, status, body = hit
+        if now < fresh_until:
+            _cache.move_to_end(key)
+            _stats["hits"] += 1
+            return GraphResult(status, body, cached=True)
+        if now < stale_until:
+            _stats["stale_hits"] += 1
+            if key not in _refreshing and key not in _inflight:
+                _refreshing[key] = asyncio.create_task(_refresh(key, kind, url, dict(params), timeout))
+            return GraphResult(status, body, cached=True)
+        _cache.pop(key, None)
+    _stats["misses"] += 1
+    return await _load(key, kind, url, params, timeout)
+
+
+def invalidate_graph_cache(scope: Optional[str] = None) -> None:
+    """scope(ig_user_id)의 항목 또는 전체를 비웁니다(게시/삭제 직후 등)."""
+    if scope is None:
+        _cache.clear()
+        return
+    for k in [k for k in _cache if k[0] == str(scope)]:
+        _cache.pop(k, None)
+
+
+def graph_cache_stats() -> Dict[str, Any]:
+    served = _stats["hits"] + _stats["stale_hits"]
+    total = served + _stats["misses"]
+    return {
+        "enabled": _enabled(),
+        "size": len(_cache),
+        "inflight": len(_inflight),
+        **_stats,
+        "hit_rate": round(served / total, 4) if total else 0.0,
+    }
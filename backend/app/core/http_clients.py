@@ -0,0 +1,199 @@
+"""업스트림별 공유 httpx.AsyncClient 레지스트리.
+
+요청마다 AsyncClient를 새로 만들면 매번 TCP/TLS 핸드셰이크를 다시 하므로,
+업스트림(graph, ai, kakao, google, naver, default)마다 keep-alive 클라이언트를
+하나씩 두고 앱 수명 주기(시작/종료 훅)에 맞춰 닫습니다.
+
+사용 예)
+    async with http_client("graph", timeout=20) as client:
+        r = await client.get(f"{GRAPH}/me", params=...)
+
+- 블록을 빠져나가도 클라이언트는 닫히지 않습니다(연결 풀 재사용).
+- timeout을 주면 해당 블록의 요청에만 적용됩니다(기본값은 업스트림별 설정).
+
+Env (NAME = GRAPH | AI | KAKAO | GOOGLE | NAVER | DEFAULT)
+- HTTP_{NAME}_TIMEOUT, HTTP_{NAME}_MAX_CONNECTIONS, HTTP_{NAME}_MAX_KEEPALIVE,
+  HTTP_{NAME}_KEEPALIVE_EXPIRY, HTTP_{NAME}_HTTP2 (1/0)
+"""
+from __future__ import annotations
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+log = logging.getLogger("http_clients")
+
+# 업스트림별 기본값. http2는 h2 패키지가 설치된 경우에만 활성화됩니다.
+# AI 서비스(uvicorn)는 HTTP/1.1만 지원하므로 http2를 끕니다.
+_UPSTREAMS: Dict[str, Dict[str, Any]] = {
+    "graph": {"timeout": 30.0, "max_connections": 50, "max_keepalive": 20, "keepalive_expiry": 30.0, "http2": True},
+    "ai": {"timeout": 60.0, "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 30.0, "http2": False},
+    "kakao": {"timeout": 10.0, "max_connections": 10, "max_keepalive": 5, "keepalive_expiry": 30.0, "http2": True},
+    "google": {"timeout": 10.0, "max_connections": 10, "max_keepalive": 5, "keepalive_expiry": 30.0, "http2": True},
+    "naver": {"timeout": 10.0, "max_connections": 10, "max_keepalive": 5, "keepalive_expiry": 30.0, "http2": True},
+    "default": {"timeout": 30.0, "max_connections": 20, "max_keepalive": 10, "keepalive_expiry": 15.0, "http2": False},
+}
+
+_REQUEST_METHODS = frozenset({"request", "get", "post", "put", "patch", "delete", "head", "options", "stream"})
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+
+try:  # HTTP/2는 선택 의존성(h2)
+    import h2  # type: ignore  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except Exception:
+    _HTTP2_AVAILABLE = False
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        v = os.getenv(name)
+        return float(v) if v not in (None, "") else default
+    except Exception:
+        return default
+
+
+def _upstream_config(name: str) -> Dict[str, Any]:
+    base = dict(_UPSTREAMS.get(name) or _UPSTREAMS["default"])
+    prefix = f"HTTP_{name.upper()}_"
+    base["timeout"] = _env_num(prefix + "TIMEOUT", base["timeout"])
+    base["max_connections"] = int(_env_num(prefix + "MAX_CONNECTIONS", base["max_connections"]))
+    base["max_keepalive"] = int(_env_num(prefix + "MAX_KEEPALIVE", base["max_keepalive"]))
+    base["keepalive_expiry"] = _env_num(prefix + "KEEPALIVE_EXPIRY", base["keepalive_expiry"])
+    h2_env = os.getenv(prefix + "HTTP2")
+    if h2_env not in (None, ""):
+        base["http2"] = h2_env.strip().lower() in ("1", "true", "yes")
+    base["http2"] = bool(base["http2"] and _HTTP2_AVAILABLE)
+    return base
+
+
+class _MeteredTransport(httpx.AsyncHTTPTransport):
+    """요청 수/신규 연결 수를 세어 연결 재사용률을 계산할 수 있게 합니다."""
+
+    def __init__(self, stats: Dict[str, int], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        stats = self._stats
+        stats["requests"] += 1
+        prev_trace = request.extensions.get("trace")
+        opened = False
+
+        async def _trace(event_name: str, info: Dict[str, Any]) -> None:
+            nonlocal opened
+            if event_name == "connection.connect_tcp.complete":
+                opened = True
+                stats["connections_opened"] += 1
+            if prev_trace is not None:
+                await prev_trace(event_name, info)
+
+        request.extensions["trace"] = _trace
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            stats["errors"] += 1
+            raise
+        if not opened:
+            stats["reused"] += 1
+        return response
+
+    def open_connections(self) -> int:
+        try:
+            return len(self._pool.connections)
+        except Exception:
+            return 0
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    cfg = _upstream_config(name)
+    stats = _stats.setdefault(name, {"requests": 0, "reused": 0, "connections_opened": 0, "errors": 0})
+    limits = httpx.Limits(
+        max_connections=cfg["max_connections"],
+        max_keepalive_connections=cfg["max_keepalive"],
+        keepalive_expiry=cfg["keepalive_expiry"],
+    )
+    transport = _MeteredTransport(stats, http2=cfg["http2"], limits=limits)
+    log.info(
+        "http client '%s' created (timeout=%s max_conn=%s http2=%s)",
+        name, cfg["timeout"], cfg["max_connections"], cfg["http2"],
+    )
+    return httpx.AsyncClient(timeout=cfg["timeout"], transport=transport)
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """업스트림 이름으로 공유 클라이언트를 반환합니다(없으면 생성). 호출자가 닫지 마세요."""
+    client = _clients.get(name)
+    if client is None or client.is_closed:
+        client = _build_client(name)
+        _clients[name] = client
+    return client
+
+
+class _ClientView:
+    """공유 클라이언트에 블록 단위 기본 timeout만 덧씌운 얇은 뷰(연결 풀은 공유)."""
+
+    __slots__ = ("_client", "_timeout")
+
+    def __init__(self, client: httpx.AsyncClient, timeout: float):
+        self._client = client
+        self._timeout = timeout
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if name not in _REQUEST_METHODS:
+            return attr
+        timeout = self._timeout
+
+        def _call(*args: Any, **kwargs: Any) -> Any:
+            kwargs.setdefault("timeout", timeout)
+            return attr(*args, **kwargs)
+
+        return _call
+
+
+@asynccontextmanager
+async def http_client(name: str = "default", timeout: Optional[float] = None) -> AsyncIterator[Any]:
+    """`async with httpx.AsyncClient(...)`를 대체하는 컨텍스트. 종료 시 클라이언트를 닫지 않습니다."""
+    client = get_http_client(name)
+    yield client if timeout is None else _ClientView(client, timeout)
+
+
+async def init_http_clients() -> None:
+    """자주 쓰는 업스트림 클라이언트를 미리 생성합니다(앱 시작 훅)."""
+    for name in ("graph", "ai"):
+        get_http_client(name)
+
+
+async def close_http_clients() -> None:
+    """모든 공유 클라이언트를 닫습니다(앱 종료 훅)."""
+    clients = list(_clients.items())
+    _clients.clear()
+    for name, client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            log.warning("http client '%s' close failed: %s", name, e)
+
+
+def http_client_stats() -> Dict[str, Dict[str, Any]]:
+    """업스트림별 요청 수, 연결 재사용/신규 수, 재사용률, 현재 열린 연결 수."""
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, st in _stats.items():
+        requests = st["requests"]
+        completed = requests - st["errors"]
+        client = _clients.get(name)
+        transport = getattr(client, "_transport", None) if client is not None else None
+        out[name] = {
+            "requests": requests,
+            "reused": st["reused"],
+            "connections_opened": st["connections_opened"],
+            "errors": st["errors"],
+            "reuse_ratio": round(st["reused"] / completed, 4) if completed > 0 else 0.0,
+            "open_connections": transport.open_connections() if isinstance(transport, _MeteredTransport) else 0,
+            "active": client is not None and not client.is_closed,
+        }
+    return out
@@ -0,0 +1,108 @@
+"""계정 단위 호출 속도 제한(토큰 버킷).
+
+Instagram Graph 쓰기(댓글 답글, 미디어 게시)는 IG 계정마다 호출 한도가 있으므로,
+여러 페르소나를 동시에 처리하더라도 같은 계정으로 나가는 요청은 간격을 두고 보냅니다.
+
+사용 예)
+    limiter = account_limiter("ig_write")
+    await limiter.acquire(ig_user_id)   # 토큰이 생길 때까지 대기
+    r = await client.post(...)
+
+Env (NAME = 리미터 이름 대문자, 예: IG_WRITE)
+- RATE_{NAME}_PER_SECOND (default 1.0) : 계정당 초당 허용 호출 수
+- RATE_{NAME}_BURST (default 1)        : 순간 허용량(버킷 크기)
+"""
+from __future__ import annotations
+import asyncio
+import os
+import time
+from typing import Any, Dict, Tuple
+
+_DEFAULTS: Dict[str, Tuple[float, int]] = {
+    "ig_write": (1.0, 1),
+}
+
+
+def _env_num(name: str, default: float) -> float:
+    try:
+        v = os.getenv(name)
+        return float(v) if v not in (None, "") else default
+    except Exception:
+        return default
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "lock")
+
+    def __init__(self, burst: int):
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+
+class AccountRateLimiter:
+    """키(계정)별 토큰 버킷. 같은 키의 대기자는 도착 순서대로 통과합니다."""
+
+    def __init__(self, name: str, per_second: float, burst: int = 1):
+        self.name = name
+        self.per_second = max(0.001, float(per_second))
+        self.burst = max(1, int(burst))
+        self._buckets: Dict[str, _Bucket] = {}
+        self._stats = {"acquired": 0, "waited": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0}
+
+    async def acquire(self, key: str) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(self.burst)
+        t0 = time.monotonic()
+        async with bucket.lock:
+            while True:
+                now = time.monotonic()
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.per_second)
+                bucket.updated = now
+                if bucket.tokens >= 1.0:
+                    bucket.tokens -= 1.0
+                    break
+                await asyncio.sleep((1.0 - bucket.tokens) / self.per_second)
+        waited_ms = (time.monotonic() - t0) * 1000.0
+        st = self._stats
+        st["acquired"] += 1
+        if waited_ms >= 1.0:
+            st["waited"] += 1
+            st["wait_ms_total"] += waited_ms
+            if waited_ms > st["wait_ms_max"]:
+                st["wait_ms_max"] = waited_ms
+
+    def stats(self) -> Dict[str, Any]:
+        st = self._stats
+        return {
+            "per_second": self.per_second,
+            "burst": self.burst,
+            "accounts": len(self._buckets),
+            "acquired": int(st["acquired"]),
+            "waited": int(st["waited"]),
+            "wait_ms_avg": round(st["wait_ms_total"] / st["waited"], 3) if st["waited"] else 0.0,
+            "wait_ms_max": round(st["wait_ms_max"], 3),
+        }
+
+
+_limiters: Dict[str, AccountRateLimiter] = {}
+
+
+def account_limiter(name: str) -> AccountRateLimiter:
+    """이름별 공유 리미터(프로세스 내 싱글턴)."""
+    limiter = _limiters.get(name)
+    if limiter is None:
+        rate, burst = _DEFAULTS.get(name, (1.0, 1))
+        prefix = f"RATE_{name.upper()}_"
+        limiter = AccountRateLimiter(
+            name,
+            _env_num(prefix + "PER_SECOND", rate),
+            int(_env_num(prefix + "BURST", burst)),
+        )
+        _limiters[name] = limiter
+    return limiter
+
+
+def rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: lim.stats() for name, lim in _limiters.items()}
@@ -1,11 +1,40 @@
+"""오브젝트 스토리지(NCP S3 호환) 헬퍼.
+
+동기 함수(put_bytes, put_data_uri, presign_get_url, delete_object, head_object)는 boto3를
+그대로 호출합니다. async 핸들러에서는 같은 이름에 a- 접두사가 붙은 코루틴
+(aput_bytes, aput_data_uri, apresign_get_url, adelete_object, ahead_object)을 사용하세요.
+제한된 스레드 풀에서 실행되므로 업로드 왕복 동안 이벤트 루프가 멈추지 않습니다.
+
+- 큰 객체(S3_MULTIPART_THRESHOLD_MB 이상)는 멀티파트 업로드로 올립니다.
+- 연산별 호출 수/오류/지연(ms)은 s3_stats()로 조회합니다(/__metrics).
+- 프리사인 URL은 로컬에서 서명하고 만료 직전까지 캐시합니다(presign_many로 일괄 처리).
+- NCP_S3_ENDPOINT를 MinIO 등 로컬 S3로 바꾸면 그대로 동작합니다(테스트는 moto 사용).
+
+Env
+- S3_MAX_WORKERS (default 8)              : S3 호출 스레드 풀/커넥션 풀 크기
+- S3_MULTIPART_THRESHOLD_MB (default 8)   : 멀티파트 업로드 기준 크기
+- S3_MULTIPART_CHUNK_MB (default 8)       : 파트 크기
+- S3_PRESIGN_LOCAL (default 1)            : 0이면 boto3로 서명
+- S3_PRESIGN_CACHE_SIZE (default 5000)    : 프리사인 URL 캐시 최대 항목 수
+"""
 import os
+import asyncio
 import base64
+import functools
+import hashlib
+import hmac
+import io
 import re
 import mimetypes
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import lru_cache
-from typing import Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, urlsplit
 
 
 log = logging.getLogger("s3")
@@ -16,6 +45,13 @@ def _env(name: str, default: Optional[str] = None) -> Optional[str]:
     return v if v not in {None, ""} else default
 
 
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(_env(name, str(default)) or default))
+    except Exception:
+        return default
+
+
 def s3_enabled() -> bool:
     """최소한의 S3 설정이 갖춰졌는지 여부 반환.
 
@@ -46,6 +82,8 @@ def get_s3_client():
     access_key = _env("NCP_S3_ACCESS_KEY")
     secret_key = _env("NCP_S3_SECRET_KEY")
 
+    from botocore.config import Config  # type: ignore
+
     session = boto3.session.Session()
     s3 = session.client(
         "s3",
@@ -53,6 +91,8 @@ def get_s3_client():
         region_name=region,
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
+        # 스레드 풀 크기만큼 동시 요청이 커넥션을 기다리지 않도록 맞춤
+        config=Config(max_pool_connections=_int_env("S3_MAX_WORKERS", 8)),
     )
     return s3
 
@@ -70,7 +110,8 @@ def _guess_ext_and_content_type(mime: str) -> Tuple[str, str]:
     return ext, mime or "application/octet-stream"
 
 
-def _parse_data_uri(data_uri: str) -> Tuple[bytes, str, str]:
+def parse_data_uri(data_uri: str) -> Tuple[bytes, str, str]:
+    """data:<mime>;base64,... → (원본 바이트, 확장자, Content-Type). 형식이 아니면 ValueError."""
     m = re.match(r"^data:(.*?);base64,(.*)$", data_uri)
     if not m:
         raise ValueError("invalid_data_uri")
@@ -106,26 +147,14 @@ def _sanitize_prefix(p: Optional[str]) -> Optional[str]:
     return "/".join(parts) if parts else None
 
 
-def put_data_uri(
-    data_uri: str,
-    model: Optional[str] = None,
-    key_prefix: Optional[str] = None,
-    base_prefix: Optional[str] = None,
-    include_model: bool = True,
-    include_date: bool = True,
+def _build_key(
+    ext: str,
+    model: Optional[str],
+    key_prefix: Optional[str],
+    base_prefix: Optional[str],
+    include_model: bool,
+    include_date: bool,
 ) -> str:
-    """data URI를 S3로 업로드하고 오브젝트 키를 반환합니다.
-
-    키 형식: {prefix}/{model?}/{YYYYMMDD}/gen_{ts}{ext}
-    prefix 기본값은 환경변수 NCP_S3_PREFIX(없으면 'dev').
-    """
-    if not s3_enabled():
-        raise RuntimeError("S3 not enabled/configured")
-
-    raw, ext, content_type = _parse_data_uri(data_uri)
-    s3 = get_s3_client()
-    bucket = _env("NCP_S3_BUCKET")
-
     # 기본 prefix 결정: 전달값이 우선, 빈 문자열은 기본 prefix 비활성화
     if base_prefix is None:
         resolved_base = _env("NCP_S3_PREFIX", "dev")
@@ -150,35 +179,243 @@ def put_data_uri(
         parts.append(date_part)
     parts = [p for p in parts if p]
     key_dir = "/".join(parts) if parts else ""
-    key = f"{key_dir}/{base_name}{ext}" if key_dir else f"{base_name}{ext}"
+    return f"{key_dir}/{base_name}{ext}" if key_dir else f"{base_name}{ext}"
+
+
+def put_bytes(
+    raw: bytes,
+    mime: str,
+    model: Optional[str] = None,
+    key_prefix: Optional[str] = None,
+    base_prefix: Optional[str] = None,
+    include_model: bool = True,
+    include_date: bool = True,
+    key: Optional[str] = None,
+    cache_control: Optional[str] = None,
+) -> str:
+    """이미지 바이트를 그대로 S3로 업로드하고 오브젝트 키를 반환합니다(base64 왕복 없음).
+
+    키 형식은 put_data_uri와 동일합니다. key를 주면 그 키에 그대로 저장합니다(렌디션 등 파생 객체).
+    """
+    if not s3_enabled():
+        raise RuntimeError("S3 not enabled/configured")
+
+    ext, content_type = _guess_ext_and_content_type((mime or "").split(";")[0].strip())
+    s3 = get_s3_client()
+    bucket = _env("NCP_S3_BUCKET")
+    if not key:
+        key = _build_key(ext, model, key_prefix, base_prefix, include_model, include_date)
 
     extra_args = {"ContentType": content_type}
+    if cache_control:
+        extra_args["CacheControl"] = cache_control
     sse = _env("NCP_S3_SSE")
     if sse:
         # 예: 'AES256' 또는 'aws:kms' (버킷 정책으로 KMS 키 설정)
         extra_args["ServerSideEncryption"] = sse
 
-    s3.put_object(Bucket=bucket, Key=key, Body=raw, **extra_args)
-    log.info("Uploaded object to s3: s3://%s/%s (%s)", bucket, key, content_type)
+    threshold = _int_env("S3_MULTIPART_THRESHOLD_MB", 8) * 1024 * 1024
+    if len(raw) >= threshold:
+        # 큰 이미지: 멀티파트 업로드(파트 병렬 전송, 실패 파트만 재시도)
+        from boto3.s3.transfer import TransferConfig  # type: ignore
+
+        cfg = TransferConfig(
+            multipart_threshold=threshold,
+            multipart_chunksize=_int_env("S3_MULTIPART_CHUNK_MB", 8) * 1024 * 1024,
+            max_concurrency=4,
+        )
+        s3.upload_fileobj(io.BytesIO(raw), bucket, key, ExtraArgs=extra_args, Config=cfg)
+        _counters["multipart_uploads"] += 1
+    else:
+        s3.put_object(Bucket=bucket, Key=key, Body=raw, **extra_args)
+    log.info("Uploaded object to s3: s3://%s/%s (%s, %d bytes)", bucket, key, content_type, len(raw))
     return key
 
 
-def presign_get_url(key: str, expires_in: Optional[int] = None) -> str:
+def put_data_uri(
+    data_uri: str,
+    model: Optional[str] = None,
+    key_prefix: Optional[str] = None,
+    base_prefix: Optional[str] = None,
+    include_model: bool = True,
+    include_date: bool = True,
+) -> str:
+    """data URI를 S3로 업로드하고 오브젝트 키를 반환합니다.
+
+    키 형식: {prefix}/{model?}/{YYYYMMDD}/gen_{ts}{ext}
+    prefix 기본값은 환경변수 NCP_S3_PREFIX(없으면 'dev').
+    """
     if not s3_enabled():
         raise RuntimeError("S3 not enabled/configured")
-    s3 = get_s3_client()
-    bucket = _env("NCP_S3_BUCKET")
-    if expires_in is None:
-        try:
-            expires_in = int(_env("PRESIGN_DEFAULT_EXPIRES", "3600"))
-        except Exception:
-            expires_in = 3600
-    url = s3.generate_presigned_url(
+
+    raw, _ext, content_type = parse_data_uri(data_uri)
+    return put_bytes(
+        raw,
+        content_type,
+        model=model,
+        key_prefix=key_prefix,
+        base_prefix=base_prefix,
+        include_model=include_model,
+        include_date=include_date,
+    )
+
+
+# ===== presign: 로컬 SigV4 서명 + TTL 캐시 =====
+# boto3의 generate_presigned_url은 호출마다 이벤트/핸들러 체인을 모두 거칩니다.
+# 목록 API(갤러리/페르소나/댓글 개요)는 행마다 URL이 필요하므로
+# (1) 날짜·리전별 서명 키를 미리 계산해 두고 HMAC 한 번으로 URL을 만들고,
+# (2) (bucket, key, expires_in) 단위로 만료 직전까지 URL을 재사용합니다.
+
+_PRESIGN_ALGO = "AWS4-HMAC-SHA256"
+_presign_lock = threading.Lock()
+_presign_cache: "OrderedDict[Tuple[str, str, int], Tuple[str, float]]" = OrderedDict()
+_signing_keys: Dict[Tuple[str, str, str], bytes] = {}
+_presign_counters: Dict[str, int] = {"hits": 0, "misses": 0, "local_signed": 0, "boto_signed": 0}
+
+
+def _default_expires(expires_in: Optional[int]) -> int:
+    if expires_in is not None:
+        return int(expires_in)
+    try:
+        return int(_env("PRESIGN_DEFAULT_EXPIRES", "3600"))
+    except Exception:
+        return 3600
+
+
+def _reuse_window(expires_in: int) -> float:
+    """캐시된 URL을 재사용할 수 있는 시간(만료 전 여유분을 남김)."""
+    margin = max(30, expires_in // 5)
+    return float(max(0, expires_in - margin))
+
+
+def _signing_key(secret: str, date: str, region: str) -> bytes:
+    ck = (secret, date, region)
+    key = _signing_keys.get(ck)
+    if key is None:
+        k = hmac.new(("AWS4" + secret).encode("utf-8"), date.encode("utf-8"), hashlib.sha256).digest()
+        k = hmac.new(k, region.encode("utf-8"), hashlib.sha256).digest()
+        k = hmac.new(k, b"s3", hashlib.sha256).digest()
+        key = hmac.new(k, b"aws4_request", hashlib.sha256).digest()
+        if len(_signing_keys) > 8:
+            _signing_keys.clear()
+        _signing_keys[ck] = key
+    return key
+
+
+class _LocalPresigner:
+    """한 번의 배치에서 공유하는 서명 컨텍스트(시각·자격증명 범위·서명 키)."""
+
+    __slots__ = ("base", "host", "bucket_path", "amz_date", "credential", "scope", "signing_key")
+
+    def __init__(self, bucket: str, now: float):
+        endpoint = _env("NCP_S3_ENDPOINT", "https://kr.object.ncloudstorage.com").rstrip("/")
+        region = _env("NCP_S3_REGION", "kr-standard")
+        access_key = _env("NCP_S3_ACCESS_KEY")
+        secret_key = _env("NCP_S3_SECRET_KEY")
+        parts = urlsplit(endpoint)
+        if not parts.scheme or not parts.netloc or not access_key or not secret_key:
+            raise ValueError("local presign unavailable")
+        # boto3와 동일하게 사용자 지정 엔드포인트는 path-style 주소 사용
+        self.base = f"{parts.scheme}://{parts.netloc}"
+        self.host = parts.netloc
+        if (parts.scheme == "https" and self.host.endswith(":443")) or (parts.scheme == "http" and self.host.endswith(":80")):
+            self.host = self.host.rsplit(":", 1)[0]
+        self.bucket_path = (parts.path.rstrip("/") + "/" + quote(bucket, safe="/~"))
+        t = datetime.utcfromtimestamp(now)
+        self.amz_date = t.strftime("%Y%m%dT%H%M%SZ")
+        date = t.strftime("%Y%m%d")
+        self.scope = f"{date}/{region}/s3/aws4_request"
+        self.credential = f"{access_key}/{self.scope}"
+        self.signing_key = _signing_key(secret_key, date, region)
+
+    def sign(self, key: str, expires_in: int) -> str:
+        path = self.bucket_path + "/" + quote(key, safe="/~")
+        query = "&".join(
+            f"{k}={quote(v, safe='-_.~')}"
+            for k, v in (
+                ("X-Amz-Algorithm", _PRESIGN_ALGO),
+                ("X-Amz-Credential", self.credential),
+                ("X-Amz-Date", self.amz_date),
+                ("X-Amz-Expires", str(int(expires_in))),
+                ("X-Amz-SignedHeaders", "host"),
+            )
+        )
+        canonical = f"GET\n{path}\n{query}\nhost:{self.host}\n\nhost\nUNSIGNED-PAYLOAD"
+        to_sign = "\n".join(
+            (_PRESIGN_ALGO, self.amz_date, self.scope, hashlib.sha256(canonical.encode("utf-8")).hexdigest())
+        )
+        sig = hmac.new(self.signing_key, to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+        return f"{self.base}{path}?{query}&X-Amz-Signature={sig}"
+
+
+def _boto_presign(bucket: str, key: str, expires_in: int) -> str:
+    return get_s3_client().generate_presigned_url(
         ClientMethod="get_object",
         Params={"Bucket": bucket, "Key": key},
         ExpiresIn=expires_in,
     )
-    return url
+
+
+def presign_many(keys: Iterable[str], expires_in: Optional[int] = None) -> Dict[str, str]:
+    """여러 키의 프리사인 GET URL을 한 번에 계산합니다. {key: url} 반환.
+
+    캐시에 유효한 URL이 있으면 재사용하고, 나머지는 같은 서명 키로 일괄 서명합니다.
+    S3_PRESIGN_LOCAL=0 이면 boto3 서명을 사용합니다.
+    """
+    if not s3_enabled():
+        raise RuntimeError("S3 not enabled/configured")
+    expires_in = _default_expires(expires_in)
+    bucket = _env("NCP_S3_BUCKET") or ""
+    now = time.time()
+    out: Dict[str, str] = {}
+    misses = []
+    with _presign_lock:
+        for key in keys:
+            if not key or key in out:
+                continue
+            ck = (bucket, key, expires_in)
+            hit = _presign_cache.get(ck)
+            if hit is not None and hit[1] > now:
+                _presign_cache.move_to_end(ck)
+                _presign_counters["hits"] += 1
+                out[key] = hit[0]
+            else:
+                out[key] = ""
+                misses.append(key)
+    if not misses:
+        return out
+
+    signer: Optional[_LocalPresigner] = None
+    if (_env("S3_PRESIGN_LOCAL", "1") or "1").strip().lower() in ("1", "true", "yes"):
+        try:
+            signer = _LocalPresigner(bucket, now)
+        except Exception:
+            signer = None
+    signed = []
+    for key in misses:
+        url = signer.sign(key, expires_in) if signer is not None else _boto_presign(bucket, key, expires_in)
+        out[key] = url
+        signed.append(key)
+
+    valid_until = now + _reuse_window(expires_in)
+    max_size = _int_env("S3_PRESIGN_CACHE_SIZE", 5000)
+    with _presign_lock:
+        _presign_counters["misses"] += len(signed)
+        _presign_counters["local_signed" if signer is not None else "boto_signed"] += len(signed)
+        for key in signed:
+            _presign_cache[(bucket, key, expires_in)] = (out[key], valid_until)
+        while len(_presign_cache) > max_size:
+            _presign_cache.popitem(last=False)
+    return out
+
+
+def presign_get_url(key: str, expires_in: Optional[int] = None) -> str:
+    return presign_many([key], expires_in)[key]
+
+
+def clear_presign_cache() -> None:
+    with _presign_lock:
+        _presign_cache.clear()
 
 
 def delete_object(key: str) -> bool:
@@ -197,3 +434,121 @@ def delete_object(key: str) -> bool:
     except Exception as e:
         log.warning("Failed to delete s3 object %s: %s", key, e)
         return False
+
+
+def head_object(key: str) -> Optional[Dict[str, Any]]:
+    """오브젝트 메타데이터(ContentLength, ContentType, ETag, LastModified)를 반환합니다.
+
+    객체가 없으면 None. S3 미설정 시에도 None.
+    """
+    if not s3_enabled():
+        return None
+    s3 = get_s3_client()
+    bucket = _env("NCP_S3_BUCKET")
+    try:
+        resp = s3.head_object(Bucket=bucket, Key=key)
+    except Exception as e:
+        code = str(getattr(e, "response", {}).get("Error", {}).get("Code", ""))
+        if code in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+    return {
+        "key": key,
+        "size": resp.get("ContentLength"),
+        "content_type": resp.get("ContentType"),
+        "etag": (resp.get("ETag") or "").strip('"') or None,
+        "last_modified": resp.get("LastModified"),
+    }
+
+
+# ===== async API (bounded thread pool) =====
+
+_executor: Optional[ThreadPoolExecutor] = None
+_op_stats: Dict[str, Dict[str, float]] = {}
+_counters: Dict[str, int] = {"multipart_uploads": 0}
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_int_env("S3_MAX_WORKERS", 8), thread_name_prefix="s3")
+    return _executor
+
+
+def _record(op: str, elapsed_ms: float, ok: bool) -> None:
+    st = _op_stats.setdefault(op, {"calls": 0, "errors": 0, "ms_total": 0.0, "ms_max": 0.0})
+    st["calls"] += 1
+    if not ok:
+        st["errors"] += 1
+    st["ms_total"] += elapsed_ms
+    if elapsed_ms > st["ms_max"]:
+        st["ms_max"] = elapsed_ms
+
+
+async def _run(op: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        result = await loop.run_in_executor(_get_executor(), functools.partial(fn, *args, **kwargs))
+        ok = True
+        return result
+    finally:
+        _record(op, (time.perf_counter() - t0) * 1000.0, ok)
+
+
+async def aput_bytes(raw: bytes, mime: str, **kwargs: Any) -> str:
+    """put_bytes의 비동기 버전. 인자는 put_bytes와 동일."""
+    return await _run("upload", put_bytes, raw, mime, **kwargs)
+
+
+async def aput_data_uri(data_uri: str, **kwargs: Any) -> str:
+    """put_data_uri의 비동기 버전(base64 디코드도 스레드에서 수행)."""
+    return await _run("upload", put_data_uri, data_uri, **kwargs)
+
+
+async def apresign_get_url(key: str, expires_in: Optional[int] = None) -> str:
+    # 프리사인은 네트워크 호출이 없는 로컬 계산(+캐시)이므로 스레드 풀을 거치지 않음
+    t0 = time.perf_counter()
+    ok = False
+    try:
+        url = presign_get_url(key, expires_in)
+        ok = True
+        return url
+    finally:
+        _record("presign", (time.perf_counter() - t0) * 1000.0, ok)
+
+
+async def adelete_object(key: str) -> bool:
+    return await _run("delete", delete_object, key)
+
+
+async def ahead_object(key: str) -> Optional[Dict[str, Any]]:
+    return await _run("head", head_object, key)
+
+
+def s3_stats() -> Dict[str, Any]:
+    """연산(upload/presign/delete/head)별 호출 수, 오류 수, 평균/최대 지연(ms)."""
+    out: Dict[str, Any] = {
+        "enabled": s3_enabled(),
+        "workers": _int_env("S3_MAX_WORKERS", 8),
+        "multipart_uploads": _counters["multipart_uploads"],
+        "presign_cache": dict(_presign_counters, size=len(_presign_cache)),
+    }
+    for op, st in _op_stats.items():
+        calls = st["calls"]
+        out[op] = {
+            "calls": int(calls),
+            "errors": int(st["errors"]),
+            "ms_avg": round(st["ms_total"] / calls, 3) if calls else 0.0,
+            "ms_max": round(st["ms_max"], 3),
+        }
+    return out
+
+
+def close_s3() -> None:
+    """스레드 풀 정리(앱 종료 훅)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -16,8 +16,22 @@ from datetime import datetime, timezone
 from app.core.config import settings
 from app.core.logging import get_logger
 from app.schemas.health import HealthResponse
+from app.api.core.mysql import init_mysql_pool, close_mysql_pool, mysql_pool_stats
+from app.api.core.migrations import run_migrations
+from app.api.core.persona_context import get_persona_context, parse_params, extract_mbti, persona_cache_stats
+from app.core.http_clients import http_client, init_http_clients, close_http_clients, http_client_stats
+from app.core.s3 import s3_stats, close_s3
+from app.core.rate_limit import account_limiter, rate_limit_stats
+from app.core.graph_cache import graph_cache_stats, graph_get
+from app.api.core.image_jobs import image_job_stats, start_image_job_workers, stop_image_job_workers
+from app.api.core.renditions import rendition_stats
+from app.api.models.chat_images import insert_chat_image
+from app.api.core.seen_store import claim as seen_claim, is_seen, prune_loop as seen_prune_loop, seen_ids as seen_ids_of, seen_store_stats
+from app.api.core.ig_webhook import claim_events, finish_event, wait_for_events, webhook_stats, webhooks_enabled
+from app.api.core.snapshot_engine import snapshot_scheduler_loop, snapshot_stats
 from urllib.parse import urlparse
 import asyncio
+import time
 import httpx
 import aiomysql
 
@@ -157,52 +171,84 @@ def routes_debug():
     # Route 객체 자체는 JSON 직렬화가 어려우므로 경로 문자열만 반환
     return sorted([getattr(r, "path", "") for r in app.router.routes])
 
+# (디버그) 공유 리소스 사용량 — 풀 크기 산정용
+@app.get("/__metrics")
+def metrics_debug():
+    return {
+        "mysql": mysql_pool_stats(),
+        "http": http_client_stats(),
+        "s3": s3_stats(),
+        "auto_reply": dict(_auto_reply_stats),
+        "rate_limits": rate_limit_stats(),
+        "persona_cache": persona_cache_stats(),
+        "graph_cache": graph_cache_stats(),
+        "snapshot": snapshot_stats(),
+        "ig_webhook": webhook_stats(),
+        "image_jobs": image_job_stats(),
+        "renditions": rendition_stats(),
+        "seen_store": seen_store_stats(),
+    }
+
 # ===== App lifecycle =====
 @app.get("/health", response_model=HealthResponse)
 def health():
     return HealthResponse.ok()
 
+
+@app.on_event("startup")
+async def _init_shared_resources():
+    # 워커당 하나의 MySQL 풀을 미리 생성(실패 시 첫 사용 시점에 지연 생성)
+    try:
+        await init_mysql_pool()
+    except Exception as e:
+        logger.warning(f"MySQL pool init failed; will retry lazily: {e}")
+    # 스키마 마이그레이션은 요청 경로가 아니라 여기서 1회(DB_MIGRATE_ON_STARTUP=0이면 CLI로 별도 실행)
+    if os.getenv("DB_MIGRATE_ON_STARTUP", "1").lower() in ("1", "true", "yes"):
+        try:
+            applied = await run_migrations()
+            if applied:
+                logger.info(f"schema migrations applied: {', '.join(applied)}")
+        except Exception as e:
+            logger.warning(f"schema migration failed: {e}")
+    # 업스트림별 keep-alive HTTP 클라이언트
+    await init_http_clients()
+
+
+@app.on_event("shutdown")
+async def _close_shared_resources():
+    # 실행 중 이미지 작업은 취소 → 다른 워커/재시작 후 stale 회수
+    await stop_image_job_workers()
+    await close_http_clients()
+    await close_mysql_pool()
+    close_s3()
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
 
 # ===== Background: Daily insights snapshot =====
+# 벽시계 기준 일일 실행/배치 커서 재개/동시성 제한은 app.api.core.snapshot_engine 참고
 async def _daily_snapshot_loop():
-    """Run once a day: iterate linked personas and perform snapshot."""
-    # Lazy imports to avoid circular
-    from app.api.core.mysql import get_mysql_pool
-    from app.api.routes.instagram_insights import perform_snapshot
-    import aiomysql
-    while True:
-        try:
-            pool = await get_mysql_pool()
-            personas = []
-            async with pool.acquire() as conn:
-                async with conn.cursor(aiomysql.DictCursor) as cur:
-                    # ss_persona에 IG가 연결되어 있고, persona 토큰도 존재하는 페르소나만
-                    await cur.execute(
-                        """
-                        SELECT p.user_id, p.user_persona_num
-                        FROM ss_persona p
-                        JOIN ss_instagram_connector_persona t
-                          ON t.user_id = p.user_id AND t.user_persona_num = p.user_persona_num
-                        WHERE p.ig_user_id IS NOT NULL
-                        LIMIT 500
-                        """
-                    )
-                    personas = await cur.fetchall() or []
-            for row in personas:
-                try:
-                    await perform_snapshot(int(row["user_id"]), int(row["user_persona_num"]))
-                except Exception:
-                    # non-fatal; continue others
-                    pass
-        except Exception:
-            pass
-        # sleep until next run (~24h). Start quickly next day; if server restarts midday, still runs 24h cadence.
-        await asyncio.sleep(60 * 60 * 24)
+    """Run the daily insights snapshot at INSIGHTS_SNAPSHOT_AT (UTC)."""
+    await snapshot_scheduler_loop()
 
 
 # ===== Background: Auto-reply scheduler (interval configurable) =====
+# 사이클 지표(/__metrics): 사이클 시간, 초과 횟수, 대기 중인 페르소나/댓글 수(backlog)
+_auto_reply_stats: dict = {
+    "running": False,
+    "cycles": 0,
+    "overruns": 0,
+    "last_started_at": None,
+    "last_cycle_ms": 0.0,
+    "max_cycle_ms": 0.0,
+    "last_personas": 0,
+    "last_posted": 0,
+    "pending_personas": 0,
+    "pending_comments": 0,
+    "posted_total": 0,
+    "failed_total": 0,
+}
+
 async def _auto_reply_scheduler_loop():
     """Every few minutes, for Business users' linked personas:
     - Fetch recent media and comments
@@ -213,28 +259,50 @@ async def _auto_reply_scheduler_loop():
     Env toggles:
     - AUTO_REPLY_SCHEDULER_ENABLED (1/0; default 1)
     - AUTO_REPLY_INTERVAL_SECONDS (default 300)
+    - IG_WEBHOOK_ENABLED (1/0; default 0): 웹훅 구독을 켠 경우 1 — 새 댓글은 웹훅 이벤트 큐로 수 초 내 처리하고,
+      폴링은 AUTO_REPLY_RECONCILE_INTERVAL_SECONDS(default 1800) 간격의 정합성 점검으로만 실행
+    - IG_WEBHOOK_POLL_SECONDS (default 15): 다른 워커가 받은 웹훅 이벤트 확인 주기
     - AUTO_REPLY_MEDIA_LIMIT (default 3)
     - AUTO_REPLY_COMMENTS_LIMIT (default 5)
     - AUTO_REPLY_MAX_PER_PERSONA (default 5 per cycle)
+    - AUTO_REPLY_PERSONA_CONCURRENCY (default 8): 동시에 처리하는 페르소나 수
+    - AUTO_REPLY_GLOBAL_CONCURRENCY (default 16): 전체 AI/Graph 작업 동시 실행 상한
+    - AUTO_REPLY_PIPELINE (1/0; default 1): 페르소나 내 댓글의 AI 생성과 Graph 게시를 겹쳐 실행
+    - RATE_IG_WRITE_PER_SECOND / RATE_IG_WRITE_BURST: IG 계정별 Graph 쓰기 속도 제한
+
+    사이클은 AUTO_REPLY_INTERVAL_SECONDS 간격으로 시작하며(처리 시간 포함),
+    사이클 시간/대기 작업 수는 /__metrics 의 auto_reply 항목에서 확인합니다.
     """
     # Lazy imports to avoid circulars
     from app.api.core.mysql import get_mysql_pool
-    from app.api.routes.oauth_instagram import GRAPH as IG_GRAPH, _get_persona_token
+    from app.api.routes.oauth_instagram import GRAPH as IG_GRAPH
     from app.api.routes.instagram_comments import _fetch_recent_media_and_comments
 
     ai_url = (os.getenv("AI_SERVICE_URL") or "http://ai:8600").rstrip("/")
     enabled = (os.getenv("AUTO_REPLY_SCHEDULER_ENABLED", "1").strip().lower() in ("1", "true", "yes"))
-    interval = int(os.getenv("AUTO_REPLY_INTERVAL_SECONDS", "300") or 300)
+    webhook_enabled = webhooks_enabled()
+    if webhook_enabled:
+        # 새 댓글은 웹훅으로 처리 — 폴링은 누락분을 메우는 저빈도 정합성 점검만
+        interval = int(os.getenv("AUTO_REPLY_RECONCILE_INTERVAL_SECONDS", "1800") or 1800)
+    else:
+        interval = int(os.getenv("AUTO_REPLY_INTERVAL_SECONDS", "300") or 300)
+    webhook_poll = float(os.getenv("IG_WEBHOOK_POLL_SECONDS", "15") or 15)
     media_limit = int(os.getenv("AUTO_REPLY_MEDIA_LIMIT", "3") or 3)
     comments_limit = int(os.getenv("AUTO_REPLY_COMMENTS_LIMIT", "5") or 5)
     max_per_persona = int(os.getenv("AUTO_REPLY_MAX_PER_PERSONA", "5") or 5)
+    persona_concurrency = max(1, int(os.getenv("AUTO_REPLY_PERSONA_CONCURRENCY", "8") or 8))
+    global_concurrency = max(1, int(os.getenv("AUTO_REPLY_GLOBAL_CONCURRENCY", "16") or 16))
+    pipeline = (os.getenv("AUTO_REPLY_PIPELINE", "1").strip().lower() in ("1", "true", "yes"))
+    persona_sem = asyncio.Semaphore(persona_concurrency)
+    work_sem = asyncio.Semaphore(global_concurrency)
+    ig_limiter = account_limiter("ig_write")
 
     sched_log = get_logger("auto_reply_scheduler")
     if not enabled:
         sched_log.info("Auto-reply scheduler disabled by env. Not starting loop.")
         return
 
-    async def _maybe_generate_image_for_comment(client: httpx.AsyncClient, ai_url: str, text: str, persona_img_norm: str | None, uid: int, persona_num: int, persona_params_json: str | None):
+    async def _maybe_generate_image_for_comment(client: httpx.AsyncClient, ai_url: str, text: str, persona_img_norm: str | None, uid: int, persona_num: int, persona_params_json: str | None, persona_img_ref: dict | None = None):
         """Best-effort image generation and storage for image-like requests.
         Swallows all exceptions to avoid impacting reply flow.
         """
@@ -250,20 +318,23 @@ async def _auto_reply_scheduler_loop():
                 "user_text": text,
                 "persona_img": persona_img_norm,
                 "persona": persona_params_json or "",
+                **(persona_img_ref or {}),
             }
-            r = await client.post(f"{ai_url}/chat/image", json=ai_payload)
+            from app.core.ai_image import AI_IMAGE_ACCEPT, read_ai_image
+            r = await client.post(f"{ai_url}/chat/image", json=ai_payload, headers=AI_IMAGE_ACCEPT)
             if r.status_code != 200:
                 return
-            aj = r.json() or {}
-            img_data_uri = aj.get("image")
-            if not (isinstance(img_data_uri, str) and img_data_uri.startswith("data:")):
+            got = read_ai_image(r)
+            if got is None:
                 return
+            img_raw, img_mime, _prompt = got
             try:
-                from app.core.s3 import s3_enabled, put_data_uri
+                from app.core.s3 import s3_enabled, aput_bytes
                 if not s3_enabled():
                     return
-                key = put_data_uri(
-                    img_data_uri,
+                key = await aput_bytes(
+                    img_raw,
+                    img_mime,
                     model=None,
                     key_prefix=f"drafts/{uid}/{persona_num}",
                     base_prefix="",
@@ -271,73 +342,15 @@ async def _auto_reply_scheduler_loop():
                     include_date=False,
                 )
                 # Store record (best-effort)
-                try:
-                    pool2 = await get_mysql_pool()
-                    async with pool2.acquire() as conn2:
-                        async with conn2.cursor() as cur2:
-                            try:
-                                await cur2.execute(
-                                    """
-                                    INSERT INTO ss_chat_img (user_id, persona_id, img_key)
-                                    VALUES (%s, %s, %s)
-                                    """,
-                                    (int(uid), int(persona_num), key),
-                                )
-                            except Exception:
-                                try:
-                                    await cur2.execute(
-                                        """
-                                        INSERT INTO ss_chat_img (user_id, persona_id, persona_chat_img)
-                                        VALUES (%s, %s, %s)
-                                        """,
-                                        (int(uid), int(persona_num), key),
-                                    )
-                                except Exception:
-                                    pass
-                            try:
-                                await conn2.commit()
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
+                await insert_chat_image(int(uid), int(persona_num), key)
             except Exception:
                 pass
         except Exception:
             pass
 
-    def _extract_mbti_from_params(pp_raw: str | dict | None) -> str:
-        try:
-            import json as _json
-            if isinstance(pp_raw, str):
-                try:
-                    pp = _json.loads(pp_raw)
-                except Exception:
-                    pp = {}
-            else:
-                pp = pp_raw or {}
-            if not isinstance(pp, dict):
-                return ""
-            for key in ("mbti", "MBTI", "mbti_type", "personality_mbti"):
-                val = pp.get(key)
-                if isinstance(val, str) and val.strip():
-                    return val.strip()
-            import re as _re
-            for key in ("personality", "tone", "style", "voice"):
-                val = pp.get(key)
-                if isinstance(val, str) and val.strip():
-                    s = val.strip().upper()
-                    if _re.match(r"^[E|I][N|S][F|T][P|J]$", s):
-                        return s
-            igp = (pp.get("instagram") or {}) if isinstance(pp, dict) else {}
-            val = igp.get("personality") or igp.get("tone")
-            if isinstance(val, str) and val.strip():
-                return val.strip()
-        except Exception:
-            pass
-        return ""
-
     async def _auto_image_publish_for_comment(
         client: httpx.AsyncClient,
+        ai_client: httpx.AsyncClient,
         ai_url: str,
         uid: int,
         persona_num: int,
@@ -348,13 +361,15 @@ async def _auto_reply_scheduler_loop():
         persona_img_norm: str | None,
         persona_params_json: str | None,
         sched_log: logging.Logger,
+        persona_img_ref: dict | None = None,
     ) -> bool:
         """Generate an image and auto-publish to Instagram for Business personas.
         Returns True on successful publish (and ACK), False otherwise.
         """
         try:
             # Require S3 for public URL
-            from app.core.s3 import s3_enabled, put_data_uri, presign_get_url
+            from app.core.s3 import s3_enabled, aput_bytes, apresign_get_url
+            from app.core.ai_image import AI_IMAGE_ACCEPT, read_ai_image
             if not s3_enabled() or not persona_img_norm:
                 return False
             # 1) Generate image via AI
@@ -362,61 +377,35 @@ async def _auto_reply_scheduler_loop():
                 "user_text": comment_text,
                 "persona_img": persona_img_norm,
                 "persona": persona_params_json or "",
+                **(persona_img_ref or {}),
             }
-            r = await client.post(f"{ai_url}/chat/image", json=payload)
+            r = await ai_client.post(f"{ai_url}/chat/image", json=payload, headers=AI_IMAGE_ACCEPT)
             if r.status_code != 200:
                 return False
-            aj = r.json() or {}
-            img_data_uri = aj.get("image")
-            if not (isinstance(img_data_uri, str) and img_data_uri.startswith("data:")):
+            got = read_ai_image(r)
+            if got is None:
                 return False
-            # 2) Upload to S3
-            key = put_data_uri(
-                img_data_uri,
+            img_raw, img_mime, _prompt = got
+            # 2) Upload to S3 (raw bytes, off the event loop)
+            key = await aput_bytes(
+                img_raw,
+                img_mime,
                 model=None,
                 key_prefix=f"drafts/{int(uid)}/{int(persona_num)}",
                 base_prefix="",
                 include_model=False,
                 include_date=False,
             )
-            url = presign_get_url(key)
+            url = await apresign_get_url(key)
 
             # Store record (best-effort)
-            try:
-                pool2 = await get_mysql_pool()
-                async with pool2.acquire() as conn2:
-                    async with conn2.cursor() as cur2:
-                        try:
-                            await cur2.execute(
-                                """
-                                INSERT INTO ss_chat_img (user_id, persona_id, img_key)
-                                VALUES (%s, %s, %s)
-                                """,
-                                (int(uid), int(persona_num), key),
-                            )
-                        except Exception:
-                            try:
-                                await cur2.execute(
-                                    """
-                                    INSERT INTO ss_chat_img (user_id, persona_id, persona_chat_img)
-                                    VALUES (%s, %s, %s)
-                                    """,
-                                    (int(uid), int(persona_num), key),
-                                )
-                            except Exception:
-                                pass
-                        try:
-                            await conn2.commit()
-                        except Exception:
-                            pass
-            except Exception:
-                pass
+            await insert_chat_image(int(uid), int(persona_num), key)
 
             # 3) Generate caption (optional)
-            personality_hint = _extract_mbti_from_params(persona_params_json)
+            personality_hint = extract_mbti(parse_params(persona_params_json))
             auto_caption: str | None = None
             try:
-                cr = await client.post(f"{ai_url}/caption/generate", json={"image": url, "personality": personality_hint or "", "tone": None})
+                cr = await ai_client.post(f"{ai_url}/caption/generate", json={"image": url, "image_key": key, "personality": personality_hint or "", "tone": None})
                 if cr.status_code == 200:
                     cj = cr.json() or {}
                     cap = (cj.get("caption") or "").strip()
@@ -518,18 +507,353 @@ async def _auto_reply_scheduler_loop():
         except Exception:
             return False
 
+    # Simple detector for image-generation requests (shared with routes)
+    _IMAGE_KEYWORDS = [
+        "사진", "이미지", "그림", "그려줘", "만들어줘",
+        "image", "picture", "photo", "render", "generate",
+    ]
+    def _looks_like_image_request(text: str) -> bool:
+        try:
+            low = (text or "").lower()
+            for k in _IMAGE_KEYWORDS:
+                if k.lower() in low:
+                    return True
+            for s in ("만들어줘", "그려줘", "렌더링"):
+                if s in (text or ""):
+                    return True
+        except Exception:
+            pass
+        return False
+
+    async def _process_comment(client: httpx.AsyncClient, ai_client: httpx.AsyncClient, ctx: dict, task: dict) -> bool:
+        """댓글 1건 처리: PRE-ACK → (이미지 요청이면 자동 게시) → AI 답글 생성 → Graph 게시.
+        True if something was posted.
+        """
+        uid = ctx["uid"]
+        persona_num = ctx["persona_num"]
+        ig_user_id = ctx["ig_user_id"]
+        token = ctx["token"]
+        try:
+            # PRE-ACK: Mark as seen BEFORE processing to prevent duplicates
+            comment_id_to_ack = str(task["comment_id"])
+            try:
+                # INSERT IGNORE: 새로 기록한 경우에만 처리(웹훅 소비자/정합성 폴링이 동시에 잡아도 한 번만)
+                claimed = await seen_claim(comment_id_to_ack, uid, persona_num)
+            except Exception:
+                # If pre-ACK fails, skip this comment to avoid duplicates
+                sched_log.warning(f"auto-reply: pre-ACK failed for {comment_id_to_ack}, skipping")
+                return False
+            if not claimed:
+                return False
+
+            # 0) For image-like requests, auto-generate and publish a post (Business personas)
+            if _looks_like_image_request(task.get("text", "")):
+                auto_publish_enabled = (os.getenv("AUTO_IMAGE_AUTOPUBLISH_ENABLED", "1").strip().lower() in ("1", "true", "yes"))
+                if auto_publish_enabled:
+                    await ig_limiter.acquire(ig_user_id)
+                    async with work_sem:
+                        ok = await _auto_image_publish_for_comment(
+                            client, ai_client, ai_url, uid, persona_num, ig_user_id, token, task["comment_id"], task.get("text", ""), ctx["persona_img_norm"], ctx["persona_params_json"], sched_log,
+                            persona_img_ref=ctx.get("persona_img_ref"),
+                        )
+                    if ok:
+                        # After successful publish, skip text reply
+                        return True
+                # If auto-publish disabled or failed, at least try best-effort image generation (no post)
+                async with work_sem:
+                    await _maybe_generate_image_for_comment(
+                        ai_client, ai_url, task.get("text", ""), ctx["persona_img_norm"], uid, persona_num, ctx["persona_params_json"],
+                        persona_img_ref=ctx.get("persona_img_ref"),
+                    )
+
+            # 1) AI generate reply
+            payload = {
+                "post_img": task["post_img"],
+                "post": task["post"],
+                "personality": ctx["personality"] or "",
+                "text": task["text"],
+                "persona_img": ctx["persona_img_norm"],
+            }
+            async with work_sem:
+                ar = await ai_client.post(f"{ai_url}/comment/reply", json=payload)
+            if ar.status_code != 200:
+                try:
+                    sched_log.warning(f"auto-reply: AI failed status={ar.status_code} uid={uid} num={persona_num}")
+                except Exception:
+                    pass
+                return False
+            reply = (ar.json() or {}).get("reply") or ""
+            reply = reply.strip()
+            if not reply:
+                try:
+                    sched_log.info(f"auto-reply: AI empty reply uid={uid} num={persona_num}")
+                except Exception:
+                    pass
+                return False
+
+            # 2) Post to Graph (IG 계정별 속도 제한)
+            await ig_limiter.acquire(ig_user_id)
+            async with work_sem:
+                gr = await client.post(
+                    f"{IG_GRAPH}/{task['comment_id']}/replies",
+                    data={"message": reply, "access_token": token},
+                )
+            if gr.status_code != 200:
+                try:
+                    jb = gr.json() if gr.headers.get("content-type","" ).startswith("application/json") else {"text": gr.text}
+                except Exception:
+                    jb = {"text": gr.text}
+                try:
+                    sched_log.warning(f"auto-reply: Graph reply failed status={gr.status_code} uid={uid} num={persona_num} detail={jb}")
+                except Exception:
+                    pass
+                return False
+
+            # 3) Already ACK-ed before processing
+            return True
+        except Exception:
+            return False
+
+    async def _process_persona(client: httpx.AsyncClient, ai_client: httpx.AsyncClient, p: dict) -> int:
+        """페르소나 1개 처리. 게시한 댓글 수를 반환."""
+        uid = int(p.get("user_id"))
+        persona_num = int(p.get("persona_num"))
+        # 파싱된 파라미터/성격/토큰/AI용 이미지 URL은 페르소나 컨텍스트 캐시에서
+        pctx = await get_persona_context(uid, persona_num)
+        if pctx is None:
+            return 0
+        token = pctx.token
+        ig_user_id = p.get("ig_user_id") or pctx.ig_user_id
+        if not (token and ig_user_id):
+            return 0
+
+        # Fetch recent media & comments
+        async with work_sem:
+            media_items, _dbg = await _fetch_recent_media_and_comments(
+                client,
+                str(ig_user_id),
+                str(token),
+                media_limit=media_limit,
+                comments_limit=comments_limit,
+                return_debug=False,
+            )
+        try:
+            sched_log.info(f"auto-reply: persona uid={uid} num={persona_num} media={len(media_items)}")
+        except Exception:
+            pass
+
+        # Gather unseen top-level comment ids and needed context
+        comment_tasks: list[dict] = []
+        all_comment_ids: list[str] = []
+        for m in media_items:
+            for c in (m.get("comments") or []):
+                cid = c.get("id")
+                text = c.get("text")
+                if isinstance(cid, str) and text and text.strip():
+                    all_comment_ids.append(cid)
+        if not all_comment_ids:
+            try:
+                sched_log.info(f"auto-reply: no comments found uid={uid} num={persona_num}")
+            except Exception:
+                pass
+            return 0
+
+        # Filter seen comments (이미 처리한 댓글은 대부분 프로세스 내 캐시에서 걸러짐)
+        try:
+            seen_ids = await seen_ids_of(all_comment_ids)
+        except Exception:
+            seen_ids = set()
+
+        # Build tasks capped per persona
+        for m in media_items:
+            post_img = m.get("media_url") or m.get("thumbnail_url")
+            caption = m.get("caption")
+            for c in (m.get("comments") or []):
+                cid = c.get("id")
+                if not cid or cid in seen_ids:
+                    continue
+                text = (c.get("text") or "").strip()
+                if not text:
+                    continue
+                comment_tasks.append({
+                    "comment_id": cid,
+                    "text": text,
+                    "post_img": post_img,
+                    "post": caption,
+                })
+                if len(comment_tasks) >= max_per_persona:
+                    break
+            if len(comment_tasks) >= max_per_persona:
+                break
+
+        if not comment_tasks:
+            try:
+                sched_log.info(f"auto-reply: no unseen comments uid={uid} num={persona_num}")
+            except Exception:
+                pass
+            return 0
+
+        ctx = {
+            "uid": uid,
+            "persona_num": persona_num,
+            "ig_user_id": str(ig_user_id),
+            "token": str(token),
+            "personality": pctx.personality,
+            "persona_img_norm": pctx.image_url,
+            "persona_img_ref": pctx.image_ref,
+            "persona_params_json": pctx.params_json or None,
+        }
+
+        _auto_reply_stats["pending_comments"] += len(comment_tasks)
+
+        async def _run_task(task: dict) -> bool:
+            try:
+                ok = await _process_comment(client, ai_client, ctx, task)
+            finally:
+                _auto_reply_stats["pending_comments"] -= 1
+            _auto_reply_stats["posted_total" if ok else "failed_total"] += 1
+            return ok
+
+        if pipeline:
+            # 댓글별 AI 생성은 동시에, Graph 게시는 계정 리미터 순서대로(생성과 게시가 겹침)
+            results = await asyncio.gather(*(_run_task(t) for t in comment_tasks), return_exceptions=True)
+        else:
+            results = [await _run_task(t) for t in comment_tasks]
+        posted_count = sum(1 for r in results if r is True)
+        try:
+            sched_log.info(f"auto-reply: posted={posted_count} uid={uid} num={persona_num}")
+        except Exception:
+            pass
+        return posted_count
+
+    async def _handle_webhook_event(client: httpx.AsyncClient, ai_client: httpx.AsyncClient, ev: dict) -> str:
+        """웹훅 이벤트 1건 → 'done' | 'skipped' | 'failed' | 'retry'."""
+        if ev.get("field") != "comments":
+            # 멘션은 저장만(다른 계정 게시물이라 답글 파이프라인 대상 아님)
+            return "skipped"
+        ig_user_id = str(ev.get("ig_user_id") or "")
+        text = (ev.get("text") or "").strip()
+        # 대댓글/자기 계정 댓글(우리 답글 포함)/빈 댓글은 폴링과 동일하게 제외
+        if ev.get("parent_id") or not text or (ev.get("from_id") and str(ev["from_id"]) == ig_user_id):
+            return "skipped"
+        try:
+            async with (await get_mysql_pool()).acquire() as conn:
+                async with conn.cursor(aiomysql.DictCursor) as cur:
+                    await cur.execute(
+                        """
+                        SELECT p.user_id, p.user_persona_num AS persona_num
+                        FROM ss_persona p
+                        JOIN ss_user u ON u.user_id = p.user_id
+                        WHERE p.ig_user_id = %s
+                          AND LOWER(u.user_credit) IN ('business', 'biz')
+                        LIMIT 1
+                        """,
+                        (ig_user_id,),
+                    )
+                    prow = await cur.fetchone()
+                    if not prow:
+                        return "skipped"
+            if await is_seen(ev["external_id"]):
+                return "skipped"
+        except Exception as e:
+            sched_log.warning(f"webhook: lookup failed event={ev.get('id')}: {e}")
+            return "retry"
+        uid = int(prow["user_id"])
+        persona_num = int(prow["persona_num"])
+        pctx = await get_persona_context(uid, persona_num)
+        if pctx is None or not pctx.token:
+            return "skipped"
+        post_img = None
+        caption = None
+        if ev.get("media_id"):
+            try:
+                mr = await graph_get(
+                    f"{IG_GRAPH}/{ev['media_id']}",
+                    {"fields": "media_url,thumbnail_url,caption", "access_token": pctx.token},
+                    scope=ig_user_id,
+                    kind="media",
+                )
+                if mr.status_code == 200:
+                    mj = mr.json() or {}
+                    post_img = mj.get("media_url") or mj.get("thumbnail_url")
+                    caption = mj.get("caption")
+            except Exception:
+                pass
+        ctx = {
+            "uid": uid,
+            "persona_num": persona_num,
+            "ig_user_id": ig_user_id,
+            "token": str(pctx.token),
+            "personality": pctx.personality,
+            "persona_img_norm": pctx.image_url,
+            "persona_img_ref": pctx.image_ref,
+            "persona_params_json": pctx.params_json or None,
+        }
+        task = {"comment_id": str(ev["external_id"]), "text": text, "post_img": post_img, "post": caption}
+        _auto_reply_stats["pending_comments"] += 1
+        try:
+            ok = await _process_comment(client, ai_client, ctx, task)
+        finally:
+            _auto_reply_stats["pending_comments"] -= 1
+        _auto_reply_stats["posted_total" if ok else "failed_total"] += 1
+        return "done" if ok else "failed"
+
+    async def _webhook_consumer_loop():
+        """저장된 웹훅 이벤트를 선점해 답글 파이프라인으로 처리(같은 워커 수신 시 즉시, 아니면 주기적으로)."""
+        while True:
+            await wait_for_events(webhook_poll)
+            try:
+                while True:
+                    batch = await claim_events(limit=persona_concurrency * max_per_persona)
+                    if not batch:
+                        break
+                    async with http_client("graph") as client, http_client("ai", timeout=30) as ai_client:
+                        results = await asyncio.gather(
+                            *(_handle_webhook_event(client, ai_client, ev) for ev in batch),
+                            return_exceptions=True,
+                        )
+                    for ev, res in zip(batch, results):
+                        status = res if isinstance(res, str) else "retry"
+                        try:
+                            await finish_event(ev, status)
+                        except Exception as e:
+                            sched_log.warning(f"webhook: finish failed event={ev.get('id')}: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                sched_log.warning(f"webhook consumer iteration failed: {e}")
+
+    async def _guarded_persona(client: httpx.AsyncClient, ai_client: httpx.AsyncClient, p: dict) -> int:
+        try:
+            async with persona_sem:
+                _auto_reply_stats["pending_personas"] -= 1
+                return await _process_persona(client, ai_client, p)
+        except Exception:
+            # Continue other personas
+            return 0
+
+    # 웹훅을 쓰지 않으면 이벤트 테이블을 주기적으로 선점 조회할 이유가 없음
+    if webhook_enabled:
+        try:
+            asyncio.create_task(_webhook_consumer_loop())
+        except Exception:
+            pass
+
     while True:
+        cycle_t0 = time.monotonic()
+        _auto_reply_stats["running"] = True
+        _auto_reply_stats["last_started_at"] = datetime.now(timezone.utc).isoformat()
+        posted = 0
+        personas: list[dict] = []
         try:
             pool = await get_mysql_pool()
-            personas: list[dict] = []
             # Discover business users' IG-linked personas which have persona-level tokens
             async with pool.acquire() as conn:
                 async with conn.cursor(aiomysql.DictCursor) as cur:
                     try:
                         await cur.execute(
                             """
-                            SELECT p.user_id, p.user_persona_num AS persona_num,
-                                   p.ig_user_id, p.persona_img, p.persona_parameters
+                            SELECT p.user_id, p.user_persona_num AS persona_num, p.ig_user_id
                             FROM ss_persona p
                             JOIN ss_user u ON u.user_id = p.user_id
                             JOIN ss_instagram_connector_persona t
@@ -544,283 +868,38 @@ async def _auto_reply_scheduler_loop():
                         sched_log.warning(f"persona discovery failed: {e}")
                         personas = []
 
-            if not personas:
-                await asyncio.sleep(interval)
-                continue
-
-            async with httpx.AsyncClient(timeout=30) as client:
-                for p in personas:
-                    try:
-                        uid = int(p.get("user_id"))
-                        persona_num = int(p.get("persona_num"))
-                        token = await _get_persona_token(uid, persona_num)
-                        ig_user_id = p.get("ig_user_id")
-                        if not (token and ig_user_id):
-                            continue
-
-                        # Fetch recent media & comments
-                        media_items, _dbg = await _fetch_recent_media_and_comments(
-                            client,
-                            str(ig_user_id),
-                            str(token),
-                            media_limit=media_limit,
-                            comments_limit=comments_limit,
-                            return_debug=False,
-                        )
-                        try:
-                            sched_log.info(f"auto-reply: persona uid={uid} num={persona_num} media={len(media_items)}")
-                        except Exception:
-                            pass
-
-                        # Gather unseen top-level comment ids and needed context
-                        comment_tasks: list[dict] = []
-                        all_comment_ids: list[str] = []
-                        for m in media_items:
-                            for c in (m.get("comments") or []):
-                                cid = c.get("id")
-                                text = c.get("text")
-                                if isinstance(cid, str) and text and text.strip():
-                                    all_comment_ids.append(cid)
-                        if not all_comment_ids:
-                            try:
-                                sched_log.info(f"auto-reply: no comments found uid={uid} num={persona_num}")
-                            except Exception:
-                                pass
-                            continue
-
-                        # Filter seen comments
-                        seen_ids: set[str] = set()
-                        async with (await get_mysql_pool()).acquire() as conn:
-                            async with conn.cursor(aiomysql.DictCursor) as cur:
-                                try:
-                                    chunks = [all_comment_ids[i:i+100] for i in range(0, len(all_comment_ids), 100)]
-                                    for ch in chunks:
-                                        ph = ",".join(["%s"] * len(ch))
-                                        await cur.execute(
-                                            f"""
-                                            SELECT external_id FROM ss_instagram_event_seen
-                                            WHERE external_id IN ({ph})
-                                            """,
-                                            ch,
-                                        )
-                                        for r in (await cur.fetchall()) or []:
-                                            sid = r.get("external_id")
-                                            if isinstance(sid, str):
-                                                seen_ids.add(sid)
-                                except Exception:
-                                    seen_ids = set()
-
-                        # Build tasks capped per persona
-                        for m in media_items:
-                            post_img = m.get("media_url") or m.get("thumbnail_url")
-                            caption = m.get("caption")
-                            for c in (m.get("comments") or []):
-                                cid = c.get("id")
-                                if not cid or cid in seen_ids:
-                                    continue
-                                text = (c.get("text") or "").strip()
-                                if not text:
-                                    continue
-                                comment_tasks.append({
-                                    "comment_id": cid,
-                                    "text": text,
-                                    "post_img": post_img,
-                                    "post": caption,
-                                })
-                                if len(comment_tasks) >= max_per_persona:
-                                    break
-                            if len(comment_tasks) >= max_per_persona:
-                                break
-
-                        if not comment_tasks:
-                            try:
-                                sched_log.info(f"auto-reply: no unseen comments uid={uid} num={persona_num}")
-                            except Exception:
-                                pass
-                            continue
-
-                        # Extract persona personality and image
-                        personality = ""
-                        persona_img = p.get("persona_img")
-                        persona_params_json: str | None = None
-                        try:
-                            raw = p.get("persona_parameters")
-                            import json as _json
-                            pp = _json.loads(raw) if isinstance(raw, str) else (raw or {})
-                            try:
-                                if isinstance(raw, (dict, list)):
-                                    import json as _json2
-                                    persona_params_json = _json2.dumps(raw, ensure_ascii=False)
-                                elif isinstance(raw, str):
-                                    persona_params_json = raw
-                            except Exception:
-                                persona_params_json = None
-                            if isinstance(pp, dict):
-                                for key in ("personality", "tone", "style", "voice"):
-                                    val = pp.get(key)
-                                    if isinstance(val, str) and val.strip():
-                                        personality = val.strip()
-                                        break
-                                if not personality:
-                                    igp = pp.get("instagram") or {}
-                                    if isinstance(igp, dict):
-                                        val = igp.get("personality") or igp.get("tone")
-                                        if isinstance(val, str) and val.strip():
-                                            personality = val.strip()
-                        except Exception:
-                            pass
-
-                        # Normalize persona_img for AI if needed
-                        def _norm_img(raw_url: str | None) -> str | None:
-                            if not raw_url:
-                                return None
-                            s = str(raw_url)
-                            try:
-                                from app.core.s3 import s3_enabled, presign_get_url
-                                if s.startswith("data:"):
-                                    return s
-                                if s.startswith("/"):
-                                    base = (os.getenv("BACKEND_INTERNAL_URL") or "http://backend:8000").rstrip("/")
-                                    return f"{base}{s}"
-                                if s.lower().startswith("http://localhost") or s.lower().startswith("http://127.0.0.1"):
-                                    from urllib.parse import urlparse, urlunparse
-                                    purl = urlparse(s)
-                                    return urlunparse(purl._replace(netloc="backend:8000"))
-                                if s3_enabled() and not s.lower().startswith("http"):
-                                    return presign_get_url(s)
-                                return s
-                            except Exception:
-                                return s
-
-                        persona_img_norm = _norm_img(persona_img)
-
-                        # Simple detector for image-generation requests (shared with routes)
-                        _IMAGE_KEYWORDS = [
-                            "사진", "이미지", "그림", "그려줘", "만들어줘",
-                            "image", "picture", "photo", "render", "generate",
-                        ]
-                        def _looks_like_image_request(text: str) -> bool:
-                            try:
-                                low = (text or "").lower()
-                                for k in _IMAGE_KEYWORDS:
-                                    if k.lower() in low:
-                                        return True
-                                for s in ("만들어줘", "그려줘", "렌더링"):
-                                    if s in (text or ""):
-                                        return True
-                            except Exception:
-                                pass
-                            return False
-
-                        # Execute replies sequentially to keep load modest
-                        posted_count = 0
-                        for task in comment_tasks:
-                            try:
-                                # PRE-ACK: Mark as seen BEFORE processing to prevent duplicates
-                                comment_id_to_ack = str(task["comment_id"])
-                                try:
-                                    async with (await get_mysql_pool()).acquire() as conn:
-                                        async with conn.cursor() as cur:
-                                            await cur.execute(
-                                                """
-                                                INSERT INTO ss_instagram_event_seen (external_id, user_id, user_persona_num)
-                                                VALUES (%s,%s,%s)
-                                                ON DUPLICATE KEY UPDATE updated_at=CURRENT_TIMESTAMP
-                                                """,
-                                                (comment_id_to_ack, uid, persona_num),
-                                            )
-                                            try:
-                                                await conn.commit()
-                                            except Exception:
-                                                pass
-                                except Exception:
-                                    # If pre-ACK fails, skip this comment to avoid duplicates
-                                    sched_log.warning(f"auto-reply: pre-ACK failed for {comment_id_to_ack}, skipping")
-                                    continue
-
-                                # 0) For image-like requests, auto-generate and publish a post (Business personas)
-                                if _looks_like_image_request(task.get("text", "")):
-                                    auto_publish_enabled = (os.getenv("AUTO_IMAGE_AUTOPUBLISH_ENABLED", "1").strip().lower() in ("1", "true", "yes"))
-                                    if auto_publish_enabled:
-                                        ok = await _auto_image_publish_for_comment(
-                                            client, ai_url, uid, persona_num, str(ig_user_id), str(token), task["comment_id"], task.get("text", ""), persona_img_norm, persona_params_json, sched_log
-                                        )
-                                        if ok:
-                                            # After successful publish, skip text reply
-                                            try:
-                                                posted_count += 1
-                                            except Exception:
-                                                pass
-                                            continue
-                                    # If auto-publish disabled or failed, at least try best-effort image generation (no post)
-                                    await _maybe_generate_image_for_comment(
-                                        client, ai_url, task.get("text", ""), persona_img_norm, uid, persona_num, persona_params_json
-                                    )
-
-                                # 1) AI generate reply
-                                payload = {
-                                    "post_img": task["post_img"],
-                                    "post": task["post"],
-                                    "personality": personality or "",
-                                    "text": task["text"],
-                                    "persona_img": persona_img_norm,
-                                }
-                                ar = await client.post(f"{ai_url}/comment/reply", json=payload)
-                                if ar.status_code != 200:
-                                    try:
-                                        sched_log.warning(f"auto-reply: AI failed status={ar.status_code} uid={uid} num={persona_num}")
-                                    except Exception:
-                                        pass
-                                    continue
-                                reply = (ar.json() or {}).get("reply") or ""
-                                reply = reply.strip()
-                                if not reply:
-                                    try:
-                                        sched_log.info(f"auto-reply: AI empty reply uid={uid} num={persona_num}")
-                                    except Exception:
-                                        pass
-                                    continue
-
-                                # 2) Post to Graph
-                                gr = await client.post(
-                                    f"{IG_GRAPH}/{task['comment_id']}/replies",
-                                    data={"message": reply, "access_token": token},
-                                )
-                                if gr.status_code != 200:
-                                    try:
-                                        jb = gr.json() if gr.headers.get("content-type","" ).startswith("application/json") else {"text": gr.text}
-                                    except Exception:
-                                        jb = {"text": gr.text}
-                                    try:
-                                        sched_log.warning(f"auto-reply: Graph reply failed status={gr.status_code} uid={uid} num={persona_num} detail={jb}")
-                                    except Exception:
-                                        pass
-                                    continue
-
-                                # 3) Already ACK-ed before processing, so just increment counter
-                                try:
-                                    posted_count += 1
-                                except Exception:
-                                    pass
-                            except Exception:
-                                # Continue other comments
-                                continue
-                        try:
-                            sched_log.info(f"auto-reply: posted={posted_count} uid={uid} num={persona_num}")
-                        except Exception:
-                            pass
-                    except Exception:
-                        # Continue other personas
-                        continue
+            if personas:
+                _auto_reply_stats["pending_personas"] = len(personas)
+                async with http_client("graph") as client, http_client("ai", timeout=30) as ai_client:
+                    counts = await asyncio.gather(
+                        *(_guarded_persona(client, ai_client, p) for p in personas),
+                        return_exceptions=True,
+                    )
+                posted = sum(c for c in counts if isinstance(c, int))
         except Exception as e:
             try:
                 sched_log.warning(f"auto-reply scheduler iteration failed: {e}")
             except Exception:
                 pass
         finally:
-            # Sleep for configured interval without enforcing a 60s minimum,
-            # so that demo/dev can run at faster cadences (e.g., 30s).
-            await asyncio.sleep(interval)
+            elapsed = time.monotonic() - cycle_t0
+            st = _auto_reply_stats
+            st["running"] = False
+            st["pending_personas"] = 0
+            st["cycles"] += 1
+            st["last_cycle_ms"] = round(elapsed * 1000.0, 1)
+            st["max_cycle_ms"] = max(st["max_cycle_ms"], st["last_cycle_ms"])
+            st["last_personas"] = len(personas)
+            st["last_posted"] = posted
+            if elapsed > interval:
+                st["overruns"] += 1
+                try:
+                    sched_log.warning(f"auto-reply: cycle took {elapsed:.1f}s (> interval {interval}s)")
+                except Exception:
+                    pass
+            # 다음 사이클은 이번 사이클 시작 기준 interval 뒤에 시작(처리 시간만큼 덜 잠).
+            # 60s 최소값은 강제하지 않음 — demo/dev에서 빠른 주기(예: 30s) 사용 가능
+            await asyncio.sleep(max(0.0, interval - elapsed))
 
 
 async def _delayed_start_background_tasks():
@@ -841,6 +920,16 @@ async def _delayed_start_background_tasks():
         asyncio.create_task(_auto_reply_scheduler_loop())
     except Exception:
         pass
+    # 이미지 생성 작업 워커(ss_image_job 큐)
+    try:
+        start_image_job_workers()
+    except Exception:
+        pass
+    # ss_instagram_event_seen 보존 기간 정리
+    try:
+        asyncio.create_task(seen_prune_loop())
+    except Exception:
+        pass
 
 
 @app.on_event("startup")
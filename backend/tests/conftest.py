@@ -0,0 +1,76 @@
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pytest
+
+# handler(cur, q, params) → 결과 행 목록(없으면 None). q는 공백을 한 칸으로 정규화한 SQL.
+# rowcount/lastrowid가 필요한 테스트는 handler에서 cur에 직접 설정합니다.
+Handler = Callable[["FakeCursor", str, Any], Optional[Iterable[Any]]]
+
+
+class FakeCursor:
+    """실행된 SQL을 db["log"]에 (q, params)로 기록하고 결과는 handler에 맡기는 aiomysql 커서 대용."""
+
+    def __init__(self, db: Dict[str, Any], handler: Handler):
+        self.db = db
+        self.handler = handler
+        self._result: list = []
+        self.rowcount = 0
+        self.lastrowid = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, sql, params=None):
+        q = " ".join(sql.split())
+        self.db.setdefault("log", []).append((q, params))
+        self._result = list(self.handler(self, q, params) or [])
+
+    async def fetchone(self):
+        return self._result[0] if self._result else None
+
+    async def fetchall(self):
+        return list(self._result)
+
+
+class FakeConn:
+    def __init__(self, db: Dict[str, Any], handler: Handler):
+        self.db = db
+        self.handler = handler
+
+    def cursor(self, *args):
+        return FakeCursor(self.db, self.handler)
+
+    async def commit(self):
+        return None
+
+
+class FakePool:
+    def __init__(self, db: Dict[str, Any], handler: Handler):
+        self.db = db
+        self.handler = handler
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield FakeConn(self.db, self.handler)
+
+
+@pytest.fixture
+def fake_mysql(monkeypatch):
+    """fake_mysql(module, handler, db) → module.get_mysql_pool을 db/handler 기반 가짜 풀로 교체하고 db 반환."""
+
+    def install(module, handler: Handler, db: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        db = db if db is not None else {}
+        db.setdefault("log", [])
+        pool = FakePool(db, handler)
+
+        async def _pool():
+            return pool
+
+        monkeypatch.setattr(module, "get_mysql_pool", _pool)
+        return db
+
+    return install
@@ -0,0 +1,24 @@
+import base64
+
+import httpx
+
+from app.core.ai_image import PROMPT_HEADER, read_ai_image, to_data_uri
+
+
+def test_read_ai_image_binary():
+    prompt = "한강 산책 사진"
+    r = httpx.Response(
+        200,
+        content=b"\x89PNGdata",
+        headers={
+            "content-type": "image/png",
+            PROMPT_HEADER: base64.urlsafe_b64encode(prompt.encode("utf-8")).decode("ascii").rstrip("="),
+        },
+    )
+    assert read_ai_image(r) == (b"\x89PNGdata", "image/png", prompt)
+
+
+def test_read_ai_image_json_fallback():
+    r = httpx.Response(200, json={"ok": True, "prompt": "p", "image": to_data_uri(b"abc", "image/jpeg")})
+    assert read_ai_image(r) == (b"abc", "image/jpeg", "p")
+    assert read_ai_image(httpx.Response(200, json={"ok": True})) is None
@@ -0,0 +1,53 @@
+import pytest
+
+from app.api.models import chat_images
+
+
+@pytest.fixture
+def db(fake_mysql):
+    state = {"cols": []}
+
+    def handle(cur, q, params):
+        if "INFORMATION_SCHEMA.COLUMNS" in q:
+            return [(c,) for c in state["cols"]]
+        return None
+
+    fake_mysql(chat_images, handle, state)
+    chat_images.reset_schema_cache()
+    yield state
+    chat_images.reset_schema_cache()
+
+
+def _selects(db):
+    return [(q, p) for q, p in db["log"] if q.startswith("SELECT") and "INFORMATION_SCHEMA" not in q]
+
+
+@pytest.mark.asyncio
+async def test_list_uses_kind_and_cursor(db):
+    db["cols"] = ["img_id", "user_id", "persona_id", "img_key", "kind", "created_at"]
+    await chat_images.list_chat_images(7, kind="drafts", persona_id=2, limit=30, before_id=500, offset=90)
+    await chat_images.list_chat_images(7, kind="chat", limit=30)
+
+    # 스키마 조회는 프로세스당 1회
+    assert sum("INFORMATION_SCHEMA" in q for q, _p in db["log"]) == 1
+    (q1, p1), (q2, p2) = _selects(db)
+    assert "kind=%s" in q1 and "img_id < %s" in q1 and "OFFSET" not in q1
+    assert p1 == (7, 2, "drafts", 500, 30)
+    assert q2.endswith("ORDER BY img_id DESC LIMIT %s") and p2 == (7, "chat", 30)
+
+
+@pytest.mark.asyncio
+async def test_list_legacy_schema_single_path(db):
+    db["cols"] = ["chat_img_id", "user_id", "persona_id", "persona_chat_img", "created_at"]
+    await chat_images.list_chat_images(7, kind="drafts", limit=10, offset=20)
+
+    (q, p), = _selects(db)
+    assert "chat_img_id AS img_id" in q and "persona_chat_img LIKE 'drafts/%%'" in q
+    assert q.endswith("LIMIT %s OFFSET %s") and p == (7, 10, 20)
+
+
+def test_image_kind_and_prefix():
+    assert chat_images.image_kind("drafts/1/2/a.png") == "drafts"
+    assert chat_images.image_kind("chat/1/2/a.png") == "chat"
+    assert chat_images.kind_for_prefix("drafts/") == "drafts"
+    assert chat_images.kind_for_prefix("uploads/") is None
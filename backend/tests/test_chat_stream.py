@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.routes import chat
+
+_SSE = [
+    b'event: delta\ndata: {"text": "\xec\x95\x88\xeb\x85\x95"}\n\n',
+    b'event: delta\ndata: {"text": "!"}\n\n',
+    b'event: done\ndata: {"reply": "\xec\x95\x88\xeb\x85\x95!"}\n\n',
+]
+
+
+def _app(monkeypatch, handler):
+    monkeypatch.setattr(chat, "get_http_client", lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def _session(request, call_next):
+        request.scope["session"] = {"user_id": 1}
+        return await call_next(request)
+
+    app.include_router(chat.router)
+    return TestClient(app)
+
+
+def test_send_stream_relays_ai_sse(monkeypatch):
+    seen = {}
+
+    async def _chunks():
+        for c in _SSE:
+            yield c
+
+    def handler(request):
+        seen["path"] = request.url.path
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=_chunks())
+
+    client = _app(monkeypatch, handler)
+    r = client.post("/api/chat/send/stream", json={"messages": [{"role": "user", "content": "안녕"}]})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert seen["path"] == "/chat/stream"
+    assert r.content == b"".join(_SSE)
+
+
+def test_send_stream_maps_ai_error(monkeypatch):
+    client = _app(monkeypatch, lambda request: httpx.Response(500, json={"detail": "boom"}))
+    r = client.post("/api/chat/send/stream", json={"messages": [{"role": "user", "content": "hi"}]})
+    assert r.status_code == 502
+    assert r.json()["detail"]["status"] == 500
+
+
+@pytest.mark.asyncio
+async def test_send_stream_closes_upstream_if_body_never_sent(monkeypatch):
+    closed = []
+
+    class _Stream(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield _SSE[0]
+
+        async def aclose(self):
+            closed.append(True)
+
+    def handler(request):
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=_Stream())
+
+    monkeypatch.setattr(chat, "get_http_client", lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    req = chat.ChatRequest(messages=[{"role": "user", "content": "hi"}])
+    resp = await chat.send_stream(req, SimpleNamespace(session={"user_id": 1}))
+
+    # 본문 이터레이션 없이(클라이언트가 먼저 끊김) 응답 종료 처리만 실행
+    await resp.background()
+    assert closed
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.core import graph_cache as gc
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    calls = []
+
+    async def _fetch(url, params, timeout):
+        calls.append((url, dict(params)))
+        await asyncio.sleep(0.01)
+        return gc.GraphResult(200, {"n": len(calls)})
+
+    monkeypatch.setattr(gc, "_fetch", _fetch)
+    gc.invalidate_graph_cache()
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_collapses_same_token_and_scopes_by_token(fake_fetch):
+    url = "https://graph.example/v20.0/1/insights"
+    a, b = await asyncio.gather(
+        gc.graph_get(url, {"metric": "reach", "access_token": "t1"}, scope="1", kind="user_insights"),
+        gc.graph_get(url, {"access_token": "t1", "metric": "reach"}, scope="1", kind="user_insights"),
+    )
+    assert len(fake_fetch) == 1
+    assert a.json() == b.json() == {"n": 1}
+
+    # 같은 scope(ig_user_id)라도 다른 토큰은 캐시를 공유하지 않음(Graph가 그 토큰으로 허용해야 함)
+    c = await gc.graph_get(url, {"metric": "reach", "access_token": "other"}, scope="1", kind="user_insights")
+    assert not c.cached and len(fake_fetch) == 2
+    assert all("t1" not in str(k) for k in gc._cache)
+
+    # 무효화는 scope 단위로 토큰과 무관하게
+    gc.invalidate_graph_cache("1")
+    assert not gc._cache
+
+
+@pytest.mark.asyncio
+async def test_serves_stale_and_refreshes(fake_fetch, monkeypatch):
+    monkeypatch.setenv("GRAPH_CACHE_TTL_USER", "0.05")
+    monkeypatch.setenv("GRAPH_CACHE_STALE_MULTIPLIER", "100")
+    url = "https://graph.example/v20.0/1"
+    first = await gc.graph_get(url, {"fields": "username"}, scope="1", kind="user")
+    await asyncio.sleep(0.08)
+    stale = await gc.graph_get(url, {"fields": "username"}, scope="1", kind="user")
+    assert stale.json() == first.json() == {"n": 1}
+    await asyncio.sleep(0.05)  # background refresh
+    fresh = await gc.graph_get(url, {"fields": "username"}, scope="1", kind="user")
+    assert fresh.json() == {"n": 2}
+    assert len(fake_fetch) == 2
+
+
+def test_old_media_gets_long_ttl_kind():
+    assert gc.media_insights_kind("2020-01-01T00:00:00+0000") == "media_insights_old"
+    assert gc.media_insights_kind(None) == "media_insights"
+    assert gc.ttl_for("media_insights_old") > gc.ttl_for("media_insights")
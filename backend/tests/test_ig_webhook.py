@@ -0,0 +1,77 @@
+import hashlib
+import hmac
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.core import ig_webhook
+from app.api.routes import instagram_webhook
+
+_BODY = {
+    "object": "instagram",
+    "entry": [
+        {
+            "id": "1789",
+            "time": 1700000000,
+            "changes": [
+                {
+                    "field": "comments",
+                    "value": {
+                        "id": "c1",
+                        "text": "예뻐요",
+                        "from": {"id": "42", "username": "fan"},
+                        "media": {"id": "m1", "media_product_type": "FEED"},
+                    },
+                },
+                {"field": "mentions", "value": {"media_id": "m9", "comment_id": "c9"}},
+                {"field": "story_insights", "value": {"media_id": "s1"}},
+            ],
+        }
+    ],
+}
+
+
+def _sign(raw: bytes, secret: str = "shh") -> str:
+    return "sha256=" + hmac.new(secret.encode(), raw, hashlib.sha256).hexdigest()
+
+
+def test_verify_signature(monkeypatch):
+    monkeypatch.delenv("IG_WEBHOOK_SKIP_SIGNATURE", raising=False)
+    raw = b'{"a":1}'
+    assert ig_webhook.verify_signature(raw, _sign(raw), "shh")
+    assert not ig_webhook.verify_signature(raw, _sign(raw, "other"), "shh")
+    assert not ig_webhook.verify_signature(raw, None, "shh")
+    assert not ig_webhook.verify_signature(raw, _sign(raw), "")
+
+
+def test_parse_comment_and_mention_events():
+    rows = ig_webhook.parse_events(_BODY)
+    assert [(r[0], r[1], r[2], r[3], r[5], r[6]) for r in rows] == [
+        ("comments", "c1", "1789", "m1", "42", "예뻐요"),
+        ("mentions", "c9", "1789", "m9", None, None),
+    ]
+
+
+def test_receive_rejects_bad_signature_and_persists_valid(monkeypatch):
+    monkeypatch.setenv("META_APP_SECRET", "shh")
+    monkeypatch.delenv("IG_WEBHOOK_SKIP_SIGNATURE", raising=False)
+    stored = []
+
+    async def _store(rows):
+        stored.extend(rows)
+        return len(rows)
+
+    monkeypatch.setattr(instagram_webhook, "store_events", _store)
+    app = FastAPI()
+    app.include_router(instagram_webhook.router)
+    client = TestClient(app)
+    raw = json.dumps(_BODY).encode()
+
+    bad = client.post("/webhooks/instagram", content=raw, headers={"X-Hub-Signature-256": _sign(raw, "x")})
+    assert bad.status_code == 403 and not stored
+
+    ok = client.post("/webhooks/instagram", content=raw, headers={"X-Hub-Signature-256": _sign(raw)})
+    assert ok.status_code == 200
+    assert ok.json() == {"ok": True, "events": 2, "stored": 2}
+    assert [r[1] for r in stored] == ["c1", "c9"]
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.core import image_jobs
+from app.api.routes import chat
+
+
+def test_idempotency_keys_explicit_and_derived(monkeypatch):
+    monkeypatch.setenv("IMAGE_JOB_DEDUPE_SECONDS", "100")
+    req = {"persona_num": 1, "user_text": "바다"}
+    assert image_jobs.idempotency_keys(req, "abc") == ("k:abc", ["k:abc"])
+    key, lookup = image_jobs.idempotency_keys(req, None, now=1050.0)
+    assert key.endswith(":10") and lookup[1].endswith(":9")
+    # 구간 경계 직후 재시도도 직전 구간 키로 같은 작업을 찾음
+    key_next, lookup_next = image_jobs.idempotency_keys(dict(reversed(list(req.items()))), None, now=1101.0)
+    assert key in lookup_next and key_next != key
+
+
+@pytest.fixture
+def job_updates(monkeypatch):
+    updates = []
+
+    async def _update(job, sql_set, params):
+        updates.append((sql_set.split(",")[0], params))
+
+    monkeypatch.setattr(image_jobs, "_update", _update)
+    return updates
+
+
+def _job():
+    return {
+        "job_id": "j1",
+        "user_id": 7,
+        "claim_token": "t",
+        "request": json.dumps({"persona_num": 1, "user_text": "바다"}),
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_stages_and_result(job_updates, monkeypatch):
+    async def _gen(user_id, req, on_stage=None):
+        assert user_id == 7 and req.user_text == "바다"
+        await on_stage("generating")
+        await on_stage("storing")
+        return {"ok": True, "prompt": "p", "stored": {"key": "chat/7/1/x.png", "url": "https://s3/x", "id": 3}}
+
+    monkeypatch.setattr(chat, "generate_chat_image", _gen)
+    await image_jobs._run_job(_job())
+    assert [u[0] for u in job_updates] == ["stage=%s", "stage=%s", "status='done'"]
+    assert json.loads(job_updates[-1][1][0]) == {"prompt": "p", "stored": {"key": "chat/7/1/x.png", "id": 3}}
+
+
+@pytest.mark.asyncio
+async def test_run_job_records_failure(job_updates, monkeypatch):
+    async def _gen(user_id, req, on_stage=None):
+        raise HTTPException(status_code=404, detail="persona_not_found")
+
+    monkeypatch.setattr(chat, "generate_chat_image", _gen)
+    await image_jobs._run_job(_job())
+    assert job_updates[-1][0] == "status='failed'"
+    assert json.loads(job_updates[-1][1][0]) == "persona_not_found"
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api.routes.instagram_insights import _gather_within
+
+
+async def _after(delay, value):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _boom():
+    raise RuntimeError("graph down")
+
+
+@pytest.mark.asyncio
+async def test_gather_within_returns_partial_results_at_deadline():
+    t0 = time.monotonic()
+    got, partial = await _gather_within(
+        0.2,
+        user=_after(0.05, "u"),
+        insights=_after(0.1, "i"),
+        media=_after(5.0, "m"),
+        likes=_boom(),
+    )
+    elapsed = time.monotonic() - t0
+    # 합(5.15s)이 아니라 마감 시간 근처에서 반환
+    assert elapsed < 1.0
+    assert got == {"user": "u", "insights": "i"}
+    assert sorted(partial) == ["likes", "media"]
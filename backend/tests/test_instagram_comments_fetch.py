@@ -0,0 +1,124 @@
+import httpx
+import pytest
+
+from app.api.routes import instagram_comments as ic
+
+
+def _client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_fetch_uses_field_expansion_single_request():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        assert "comments.limit(2)" in request.url.params["fields"]
+        return httpx.Response(200, json={"data": [
+            {"id": "m1", "caption": "c1", "comments": {"data": [{"id": "c1", "text": "hi", "username": "u"}]}},
+            {"id": "m2", "caption": "c2"},
+        ]})
+
+    async with _client(handler) as client:
+        items, dbg = await ic._fetch_recent_media_and_comments(client, "ig1", "tok", media_limit=2, comments_limit=2)
+    assert len(calls) == 1
+    assert [m["media_id"] for m in items] == ["m1", "m2"]
+    assert items[0]["comments"] == [{"id": "c1", "text": "hi", "username": "u", "timestamp": None, "like_count": None}]
+    assert items[1]["comments"] == []
+    assert dbg is None
+
+
+@pytest.mark.asyncio
+async def test_fetch_falls_back_to_per_media_requests():
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("/ig1/media"):
+            if "comments" in request.url.params["fields"]:
+                return httpx.Response(400, json={"error": {"message": "nope"}})
+            return httpx.Response(200, json={"data": [{"id": "m1"}, {"id": "m2"}]})
+        if path.endswith("/m1/comments"):
+            return httpx.Response(200, json={"data": [{"id": "c1", "text": "a"}]})
+        return httpx.Response(500, json={"error": {}})
+
+    async with _client(handler) as client:
+        items, dbg = await ic._fetch_recent_media_and_comments(client, "ig1", "tok", return_debug=True)
+    assert [m["media_id"] for m in items] == ["m1", "m2"]
+    assert [c["id"] for c in items[0]["comments"]] == ["c1"]
+    assert items[1]["comments"] == []
+    assert dbg["expansion_status"] == 400
+    assert dbg["comments"][0]["media_id"] == "m2"
+
+
+class _SyncCursor:
+    def __init__(self, log):
+        self.log = log
+        self.rowcount = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def executemany(self, sql, rows):
+        self.log.append(("executemany", " ".join(sql.split()), list(rows)))
+
+    async def execute(self, sql, params=None):
+        self.log.append(("execute", " ".join(sql.split()), params))
+        self.rowcount = 1
+
+
+@pytest.mark.asyncio
+async def test_sync_posts_many_personas_batches_db_writes(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    log = []
+
+    class _Pool:
+        @asynccontextmanager
+        async def acquire(self):
+            class _Conn:
+                def cursor(self, *args):
+                    return _SyncCursor(log)
+
+                async def commit(self):
+                    return None
+
+            yield _Conn()
+
+    async def _pool():
+        return _Pool()
+
+    async def _links(uid):
+        return {
+            1: {"mapping": {"ig_user_id": "ig1"}, "token": "t1"},
+            2: {"mapping": {"ig_user_id": "ig2"}, "token": "t2"},
+            3: {"mapping": {"ig_user_id": "ig3"}, "token": None},
+        }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        ig = request.url.path.split("/")[-2]
+        return httpx.Response(200, json={"data": [{"id": f"{ig}_a", "like_count": 3}, {"id": f"{ig}_b"}]})
+
+    @asynccontextmanager
+    async def _http(name):
+        async with _client(handler) as c:
+            yield c
+
+    monkeypatch.setattr(ic, "_require_login", lambda request: 7)
+    monkeypatch.setattr(ic, "_get_persona_links", _links)
+    monkeypatch.setattr(ic, "http_client", _http)
+    monkeypatch.setattr(ic, "get_mysql_pool", _pool)
+
+    out = await ic.sync_posts(None, persona_nums="all", days=7)
+    assert out["synced"] == 4 and out["pruned"] == 2
+    assert out["results"][2] == {"persona_num": 3, "error": "persona_oauth_required"}
+
+    # 게시물 저장은 executemany 한 번, 정리는 페르소나당 DELETE 한 번
+    (kind, sql, rows), *deletes = log
+    assert kind == "executemany" and len(rows) == 4
+    assert [d[0] for d in deletes] == ["execute", "execute"]
+    _k, q, params = deletes[0]
+    assert q.startswith("DELETE p FROM ss_instagram_post p") and "NOT IN (%s,%s)" in q
+    assert params[:2] == (7, 1) and params[-2:] == ("ig1_a", "ig1_b")
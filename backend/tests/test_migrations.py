@@ -0,0 +1,41 @@
+import pytest
+
+from app.api.core import migrations
+
+
+def _schema_version_sql(db):
+    """ss_schema_version 상태와 ss_persona 컬럼 조회만 흉내 냄."""
+
+    def handle(cur, q, params):
+        if q.startswith("SELECT GET_LOCK") or q.startswith("SELECT RELEASE_LOCK"):
+            return [(1,)]
+        if q.startswith("SELECT version FROM ss_schema_version"):
+            return [(v,) for v in sorted(db["versions"])]
+        if q.startswith("INSERT INTO ss_schema_version"):
+            db["versions"].add(int(params[0]))
+        elif "INFORMATION_SCHEMA.COLUMNS" in q:
+            return [(c,) for c in db["persona_cols"]]
+        return None
+
+    return handle
+
+
+@pytest.mark.asyncio
+async def test_run_migrations_applies_pending_once(fake_mysql):
+    db = {"versions": set(), "persona_cols": ["user_id", "ig_user_id"]}
+    fake_mysql(migrations, _schema_version_sql(db), db)
+
+    applied = await migrations.run_migrations()
+    assert [a.split("_", 1)[0] for a in applied] == [f"{v:04d}" for v, _n, _f in migrations.MIGRATIONS]
+    assert db["versions"] == {v for v, _n, _f in migrations.MIGRATIONS}
+    alters = [q for q, _p in db["log"] if q.startswith("ALTER TABLE ss_persona")]
+    assert len(alters) == 1 and "ig_user_id" not in alters[0]
+    assert db["log"][-1][0].startswith("SELECT RELEASE_LOCK")
+
+    # 두 번째 실행(다른 워커/재시작)은 아무것도 적용하지 않음
+    db["log"].clear()
+    assert await migrations.run_migrations() == []
+    assert not any(q.startswith(("CREATE TABLE IF NOT EXISTS ss_credit", "ALTER")) for q, _p in db["log"])
+
+    st = await migrations.migration_status()
+    assert st["pending"] == [] and st["version"] == st["latest"]
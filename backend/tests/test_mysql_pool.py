@@ -0,0 +1,56 @@
+import pytest
+
+from app.api.core import mysql
+
+
+class _FakePool:
+    def __init__(self, **kwargs):
+        self.minsize = kwargs.get("minsize", 1)
+        self.maxsize = kwargs.get("maxsize", 10)
+        self.size = 0
+        self.freesize = 0
+        self.closed = False
+
+    async def acquire(self):
+        self.size = max(self.size, 1)
+        return object()
+
+    def release(self, conn):
+        self.freesize += 1
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_get_mysql_pool_is_shared(monkeypatch):
+    created = []
+
+    async def fake_create_pool(**kwargs):
+        created.append(kwargs)
+        return _FakePool(**kwargs)
+
+    monkeypatch.setattr(mysql.aiomysql, "create_pool", fake_create_pool)
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "4")
+    await mysql.close_mysql_pool()
+
+    p1 = await mysql.get_mysql_pool()
+    p2 = await mysql.get_mysql_pool()
+    assert p1 is p2
+    assert len(created) == 1
+    assert created[0]["maxsize"] == 4
+
+    async with p1.acquire() as conn:
+        assert conn is not None
+    stats = mysql.mysql_pool_stats()
+    assert stats["initialized"] is True
+    assert stats["maxsize"] == 4
+    assert stats["acquires"] >= 1
+
+    raw = p1._pool
+    await mysql.close_mysql_pool()
+    assert raw.closed is True
+    assert mysql.mysql_pool_stats()["initialized"] is False
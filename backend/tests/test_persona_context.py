@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from app.api.core import persona_context as pc
+
+
+def _row(**kw):
+    row = {
+        "persona_img": "/media/p1.png",
+        "persona_parameters": '{"name": "A", "personality": "infp", "instagram": {"tone": "warm"}}',
+        "ig_user_id": "178",
+        "ig_username": "a",
+        "fb_page_id": "99",
+        "long_lived_user_token": "tok",
+    }
+    row.update(kw)
+    return row
+
+
+def test_build_context_parses_once():
+    ctx = pc.build_context(1, 2, _row())
+    assert ctx.params["name"] == "A"
+    assert ctx.personality == "infp"
+    assert ctx.mbti == "INFP"
+    assert ctx.ig_user_id == "178" and ctx.token == "tok"
+    assert ctx.image_url.endswith("/media/p1.png") and ctx.image_url.startswith("http")
+    assert ctx.params_json.startswith("{")
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_collapses_and_invalidates(monkeypatch):
+    calls = []
+
+    async def fake_load(user_id, persona_num):
+        calls.append((user_id, persona_num))
+        await asyncio.sleep(0.01)
+        return pc.build_context(user_id, persona_num, _row(long_lived_user_token=f"tok{len(calls)}"))
+
+    monkeypatch.setattr(pc, "_load", fake_load)
+    monkeypatch.setenv("PERSONA_CACHE_TTL_SECONDS", "60")
+    pc.clear_persona_cache()
+    before = dict(pc.persona_cache_stats())
+
+    # 동시 미스는 한 번만 적재
+    a, b = await asyncio.gather(pc.get_persona_context(1, 1), pc.get_persona_context(1, 1))
+    assert a is b and len(calls) == 1
+    assert (await pc.get_persona_context(1, 1)).token == "tok1"
+    assert pc.persona_cache_stats()["hits"] - before["hits"] == 1
+
+    pc.invalidate_persona(1, 1)
+    assert (await pc.get_persona_context(1, 1)).token == "tok2"
+    assert len(calls) == 2
+
+    # 사용자 전체 무효화
+    await pc.get_persona_context(1, 2)
+    pc.invalidate_persona(1)
+    assert pc.persona_cache_stats()["size"] == 0
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.rate_limit import AccountRateLimiter
+
+
+@pytest.mark.asyncio
+async def test_limiter_spaces_calls_per_account_only():
+    limiter = AccountRateLimiter("test", per_second=20.0, burst=1)
+    t0 = time.monotonic()
+    await asyncio.gather(*(limiter.acquire("a") for _ in range(3)), limiter.acquire("b"))
+    elapsed = time.monotonic() - t0
+    # "a": 1 immediately + 2 more at 50ms spacing; "b" is independent
+    assert 0.08 <= elapsed < 0.5
+    st = limiter.stats()
+    assert st["accounts"] == 2
+    assert st["acquired"] == 4
+    assert st["waited"] == 2
+
+
+@pytest.mark.asyncio
+async def test_reply_bulk_is_paced_per_account_and_keeps_order(monkeypatch):
+    from contextlib import asynccontextmanager
+
+    import httpx
+
+    from app.api.routes import instagram_reply as ir
+
+    acquired = []
+    marked = []
+
+    class _Limiter:
+        async def acquire(self, key):
+            acquired.append(key)
+
+    async def _mapping(uid, num):
+        return {"ig_user_id": "ig1"}
+
+    async def _token(uid, num):
+        return "tok"
+
+    async def _mark_seen(ids, uid, num):
+        marked.append(list(ids))
+        return len(ids)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        cid = request.url.path.split("/")[-2]
+        # 앞 항목이 더 늦게 끝나도 결과 순서는 요청 순서
+        await asyncio.sleep(0.03 if cid.endswith("1") else 0)
+        if cid.endswith("3"):
+            return httpx.Response(400, json={"error": {"code": 190}})
+        return httpx.Response(200, json={"id": f"r_{cid}"})
+
+    @asynccontextmanager
+    async def _http(name, timeout=None):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as c:
+            yield c
+
+    monkeypatch.setattr(ir, "_require_login", lambda request: 7)
+    monkeypatch.setattr(ir, "_get_persona_instagram_mapping", _mapping)
+    monkeypatch.setattr(ir, "_get_persona_token", _token)
+    monkeypatch.setattr(ir, "mark_seen", _mark_seen)
+    monkeypatch.setattr(ir, "account_limiter", lambda name: _Limiter())
+    monkeypatch.setattr(ir, "http_client", _http)
+
+    body = ir.BulkReplyBody(persona_num=1, items=[
+        {"comment_id": f"cmt_{i}", "message": "thanks"} for i in (1, 2, 3)
+    ])
+    out = await ir.reply_to_comments_bulk(None, body)
+
+    assert marked == [["cmt_1", "cmt_2", "cmt_3"]]
+    assert acquired == ["ig1"] * 3
+    assert [r["comment_id"] for r in out["results"]] == ["cmt_1", "cmt_2", "cmt_3"]
+    assert [r["status"] for r in out["results"]] == [200, 200, 401]
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from app.api.core import renditions
+
+
+def test_rendition_key_and_pick():
+    assert renditions.rendition_key("chat/7/1/gen_1.png", "t320", ".webp") == "chat/7/1/gen_1.r-t320.webp"
+    assert renditions.rendition_key("a.b/noext", "full", ".jpg") == "a.b/noext.r-full.jpg"
+    names = ["full", "t320", "t640"]
+    assert renditions.pick_rendition(names) == "t640"
+    assert renditions.pick_rendition(names, 200) == "t320"
+    assert renditions.pick_rendition(names, 1200) == "full"
+    assert renditions.pick_rendition([], 200) is None
+
+
+def test_build_renditions_shrinks_png(monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    monkeypatch.setenv("IMAGE_RENDITION_THUMB_SIZES", "320,640,4000")
+    buf = io.BytesIO()
+    Image.linear_gradient("L").resize((1024, 768)).convert("RGB").save(buf, format="PNG")
+    raw = buf.getvalue()
+
+    out = renditions.build_renditions(raw)
+    # 원본보다 큰 썸네일은 만들지 않음
+    assert set(out) == {"full", "t320", "t640"}
+    assert all(mime == "image/webp" for _d, mime in out.values())
+    assert len(out["t320"][0]) < len(out["full"][0]) < len(raw)
+    assert Image.open(io.BytesIO(out["t320"][0])).size == (320, 240)
+
+
+@pytest.mark.asyncio
+async def test_resolve_urls_keeps_original_url(monkeypatch):
+    async def _map(keys):
+        return {"chat/1/a.png": (["full", "t320", "t640"], ".webp")}
+
+    monkeypatch.setattr(renditions, "rendition_map", _map)
+    monkeypatch.setattr(renditions, "presign_many", lambda keys: {k: f"https://s3/{k}?sig" for k in keys})
+
+    got = await renditions.resolve_urls(["chat/1/a.png", "chat/1/b.png"], 300)
+    assert got["chat/1/a.png"] == {
+        "url": "https://s3/chat/1/a.png?sig",
+        "thumb_url": "https://s3/chat/1/a.r-t320.webp?sig",
+        "full_url": "https://s3/chat/1/a.r-full.webp?sig",
+    }
+    assert got["chat/1/b.png"] == {
+        "url": "https://s3/chat/1/b.png?sig",
+        "thumb_url": "https://s3/chat/1/b.png?sig",
+        "full_url": "https://s3/chat/1/b.png?sig",
+    }
+
+    # w가 없어도 url은 원본(게시에 쓰이므로 썸네일로 바뀌면 안 됨)
+    got = await renditions.resolve_urls(["chat/1/a.png"])
+    assert got["chat/1/a.png"]["url"] == "https://s3/chat/1/a.png?sig"
+    assert got["chat/1/a.png"]["thumb_url"] == "https://s3/chat/1/a.r-t640.webp?sig"
@@ -0,0 +1,86 @@
+import pytest
+
+moto = pytest.importorskip("moto")
+
+from app.core import s3
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    monkeypatch.setenv("NCP_S3_BUCKET", "test-bucket")
+    monkeypatch.setenv("NCP_S3_ACCESS_KEY", "testing")
+    monkeypatch.setenv("NCP_S3_SECRET_KEY", "testing")
+    monkeypatch.setenv("NCP_S3_ENDPOINT", "https://s3.us-east-1.amazonaws.com")
+    monkeypatch.setenv("NCP_S3_REGION", "us-east-1")
+    with moto.mock_aws():
+        s3.get_s3_client.cache_clear()
+        s3.get_s3_client().create_bucket(Bucket="test-bucket")
+        yield "test-bucket"
+    s3.get_s3_client.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_async_upload_head_delete(bucket):
+    key = await s3.aput_bytes(b"\x89PNG" + b"0" * 100, "image/png", key_prefix="t", base_prefix="", include_date=False)
+    assert key.startswith("t/") and key.endswith(".png")
+
+    meta = await s3.ahead_object(key)
+    assert meta["size"] == 104
+    assert meta["content_type"] == "image/png"
+
+    url = await s3.apresign_get_url(key, expires_in=60)
+    assert key in url
+
+    assert await s3.adelete_object(key) is True
+    assert await s3.ahead_object(key) is None
+
+    stats = s3.s3_stats()
+    assert stats["upload"]["calls"] >= 1
+    assert stats["head"]["calls"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_large_upload_uses_multipart(bucket, monkeypatch):
+    monkeypatch.setenv("S3_MULTIPART_THRESHOLD_MB", "5")
+    monkeypatch.setenv("S3_MULTIPART_CHUNK_MB", "5")
+    before = s3.s3_stats()["multipart_uploads"]
+    raw = b"x" * (11 * 1024 * 1024)
+    key = await s3.aput_bytes(raw, "image/jpeg", key_prefix="big", base_prefix="", include_date=False)
+    assert s3.s3_stats()["multipart_uploads"] == before + 1
+    meta = await s3.ahead_object(key)
+    assert meta["size"] == len(raw)
+
+
+def test_presign_many_matches_boto_and_caches(monkeypatch):
+    import datetime as _dt
+    import botocore.auth
+
+    monkeypatch.setenv("NCP_S3_BUCKET", "my-bucket")
+    monkeypatch.setenv("NCP_S3_ACCESS_KEY", "AK")
+    monkeypatch.setenv("NCP_S3_SECRET_KEY", "SK")
+    monkeypatch.delenv("NCP_S3_ENDPOINT", raising=False)
+    monkeypatch.delenv("NCP_S3_REGION", raising=False)
+    s3.get_s3_client.cache_clear()
+    s3.clear_presign_cache()
+
+    now = 1_760_000_000.0
+    fixed = _dt.datetime.utcfromtimestamp(now)
+
+    class _FixedDateTime(_dt.datetime):
+        @classmethod
+        def utcnow(cls):
+            return fixed
+
+    monkeypatch.setattr(s3.time, "time", lambda: now)
+    monkeypatch.setattr(botocore.auth.datetime, "datetime", _FixedDateTime)
+
+    keys = ["chat/1/2/gen_20250101_000000.png", "dev/a b/한글+x.png"]
+    urls = s3.presign_many(keys + keys[:1], expires_in=600)
+    assert set(urls) == set(keys)
+    for k in keys:
+        assert urls[k] == s3._boto_presign("my-bucket", k, 600)
+
+    before = s3.s3_stats()["presign_cache"]["hits"]
+    assert s3.presign_get_url(keys[0], 600) == urls[keys[0]]
+    assert s3.s3_stats()["presign_cache"]["hits"] == before + 1
+    s3.get_s3_client.cache_clear()
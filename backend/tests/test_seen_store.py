@@ -0,0 +1,106 @@
+import pytest
+
+from app.api.core import seen_store
+
+
+DAY = 86400
+
+
+def _seen_table_sql(rows):
+    """ss_instagram_event_seen을 {external_id: [user_id, persona_num, updated_at 이후 경과 초]}로 흉내 냄."""
+
+    def handle(cur, q, params):
+        if q.startswith("INSERT IGNORE"):
+            cur.rowcount = 0 if params[0] in rows else 1
+            rows.setdefault(params[0], [params[1], params[2], 0])
+        elif q.startswith("INSERT INTO"):
+            for i in range(0, len(params), 3):
+                rows[params[i]] = [params[i + 1], params[i + 2], 0]
+        elif q.startswith("SELECT"):
+            return [(k, *rows[k]) for k in params if k in rows]
+        elif q.startswith("UPDATE"):
+            for k in params:
+                rows[k][2] = 0
+        elif q.startswith("DELETE") and "INTERVAL" in q:
+            days, limit = params
+            old = [k for k, v in rows.items() if v[2] > days * DAY][:limit]
+            for k in old:
+                del rows[k]
+            cur.rowcount = len(old)
+        return None
+
+    return handle
+
+
+@pytest.fixture
+def db(fake_mysql):
+    state = {"rows": {}}
+    fake_mysql(seen_store, _seen_table_sql(state["rows"]), state)
+    seen_store.clear_cache()
+    yield state
+    seen_store.clear_cache()
+
+
+@pytest.mark.asyncio
+async def test_mark_seen_is_one_multi_row_insert(db):
+    assert await seen_store.mark_seen(["c1", "c2", "c1", "c3"], 7, 1) == 3
+    inserts = [q for q, _p in db["log"] if q.startswith("INSERT")]
+    assert len(inserts) == 1 and inserts[0].count("(%s,%s,%s)") == 3
+    assert set(db["rows"]) == {"c1", "c2", "c3"}
+
+
+@pytest.mark.asyncio
+async def test_seen_ids_uses_cache_for_known_ids(db):
+    db["rows"]["old"] = [7, 1, 0]
+    assert await seen_store.seen_ids(["old", "new"]) == {"old"}
+    db["log"].clear()
+
+    # 확인된 ID는 캐시에서, 미확인 ID만 다시 DB 조회
+    assert await seen_store.seen_ids(["old", "new"]) == {"old"}
+    (q, params), = db["log"]
+    assert q.startswith("SELECT") and params == ("new",)
+
+
+@pytest.mark.asyncio
+async def test_claim_only_once(db):
+    assert await seen_store.claim("c9", 7, 1) is True
+    seen_store.clear_cache()
+    assert await seen_store.claim("c9", 7, 1) is False  # DB에 이미 있음
+    db["log"].clear()
+    assert await seen_store.claim("c9", 7, 1) is False  # 캐시 히트(DB 미접근)
+    assert db["log"] == []
+
+
+@pytest.mark.asyncio
+async def test_observed_ids_survive_prune(db, monkeypatch):
+    monkeypatch.delenv("SEEN_REFRESH_DAYS", raising=False)
+    # 170일 전에 ACK한 댓글(스케줄러가 아직 매 주기 보는 중)과 더 이상 안 보이는 200일 된 댓글
+    db["rows"]["c_live"] = [7, 1, 170 * DAY]
+    db["rows"]["c_gone"] = [7, 1, 200 * DAY]
+
+    # 재시작 직후 스케줄러 필터: DB에서 확인되고 오래된 updated_at은 갱신됨
+    assert await seen_store.seen_ids(["c_live", "c_new"]) == {"c_live"}
+    assert db["rows"]["c_live"][2] == 0
+
+    # 20일 뒤 정리 → 갱신된 행은 남고 안 보이는 행만 삭제
+    db["rows"]["c_live"][2] = 20 * DAY
+    assert await seen_store.prune(retention_days=180) == 1
+    assert set(db["rows"]) == {"c_live"}
+
+    # 다른 워커/재시작(빈 캐시)에서도 여전히 처리됨으로 취급
+    seen_store.clear_cache()
+    assert await seen_store.seen_ids(["c_live"]) == {"c_live"}
+
+
+@pytest.mark.asyncio
+async def test_cache_hits_refresh_after_interval(db, monkeypatch):
+    await seen_store.mark_seen(["c1"], 7, 1)
+    db["log"].clear()
+    assert await seen_store.seen_ids(["c1"]) == {"c1"}
+    assert db["log"] == []  # 최근 갱신된 캐시 히트는 DB 미접근
+
+    now = seen_store.time.monotonic()
+    monkeypatch.setattr(seen_store.time, "monotonic", lambda: now + 8 * DAY)
+    assert await seen_store.seen_ids(["c1"]) == {"c1"}
+    (q, params), = db["log"]
+    assert q.startswith("UPDATE ss_instagram_event_seen SET updated_at") and params == ("c1",)
@@ -0,0 +1,68 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.api.core import snapshot_engine as se
+from app.api.routes import instagram_insights
+
+
+def _run_row_sql(db):
+    """ss_snapshot_run 한 행과 GET_LOCK만 흉내 냄."""
+
+    def handle(cur, q, params):
+        if q.startswith("SELECT GET_LOCK") or q.startswith("SELECT RELEASE_LOCK"):
+            return [(1,)]
+        if q.startswith("SELECT status"):
+            r = db["run"]
+            return [(r["status"], r["cursor"][0], r["cursor"][1], r["processed"], r["failed"])]
+        if q.startswith("UPDATE ss_snapshot_run SET cursor_user_id"):
+            db["run"].update(cursor=(params[0], params[1]), processed=params[2], failed=params[3])
+        elif "status='done'" in q:
+            db["run"]["status"] = "done"
+        return None
+
+    return handle
+
+
+@pytest.fixture
+def engine(monkeypatch, fake_mysql):
+    personas = [(u, n) for u in (1, 2, 3) for n in (1, 2)]
+    db = {"run": {"status": "running", "cursor": (0, 0), "processed": 0, "failed": 0}, "done": []}
+
+    async def _next_batch(after, limit):
+        rows = [p for p in personas if p > tuple(after)][:limit]
+        return [{"user_id": u, "user_persona_num": n, "ig_user_id": "ig", "long_lived_user_token": "t"} for u, n in rows]
+
+    async def _perform(uid, num, *, ig_user_id=None, token=None):
+        if (uid, num) == (2, 2):
+            raise RuntimeError("graph down")
+        db["done"].append((uid, num))
+        return {"partial": []}
+
+    fake_mysql(se, _run_row_sql(db), db)
+    monkeypatch.setattr(se, "_next_batch", _next_batch)
+    monkeypatch.setattr(instagram_insights, "perform_snapshot", _perform)
+    monkeypatch.setenv("INSIGHTS_SNAPSHOT_BATCH_SIZE", "4")
+    return db
+
+
+@pytest.mark.asyncio
+async def test_run_processes_batches_and_resumes_from_cursor(engine):
+    engine["run"]["cursor"] = (1, 2)  # 이전 실행이 (1, 2)까지 처리
+    engine["run"]["processed"] = 2
+    out = await se.run_snapshot(date(2026, 1, 1))
+    assert out == {"status": "done", "processed": 5, "failed": 1}
+    assert engine["done"] == [(2, 1), (3, 1), (3, 2)]
+    assert engine["run"]["cursor"] == (3, 2)
+    assert se.snapshot_stats()["last_error"].startswith("uid=2 num=2")
+    # 이미 끝난 날은 다시 돌지 않음
+    again = await se.run_snapshot(date(2026, 1, 1))
+    assert again["status"] == "done" and engine["done"] == [(2, 1), (3, 1), (3, 2)]
+
+
+def test_next_run_time_is_wall_clock(monkeypatch):
+    monkeypatch.setenv("INSIGHTS_SNAPSHOT_AT", "03:15")
+    before = datetime(2026, 1, 1, 1, 0, tzinfo=timezone.utc)
+    after = datetime(2026, 1, 1, 4, 0, tzinfo=timezone.utc)
+    assert se.next_run_time(before) == datetime(2026, 1, 1, 3, 15, tzinfo=timezone.utc)
+    assert se.next_run_time(after) == datetime(2026, 1, 2, 3, 15, tzinfo=timezone.utc)